@@ -1,21 +1,26 @@
 """
 Context processors for accounts app
+Values are lazy (ecolearn/lazy_context.py): nothing is looked up until a
+template uses the variable.
 """
 
+from ecolearn.lazy_context import lazy
+
+
 def user_language(request):
     """
     Add user's preferred language to all templates
     """
-    if request.user.is_authenticated:
-        try:
-            language = request.user.preferred_language
-        except:
-            language = 'en'
-    else:
-        language = 'en'
-    
+    def language():
+        if request.user.is_authenticated:
+            try:
+                return request.user.preferred_language
+            except:
+                return 'en'
+        return 'en'
+
     return {
-        'user_language': language
+        'user_language': lazy(request, 'user_language', language)
     }
 
 
@@ -23,14 +28,15 @@ def unread_notifications(request):
     """
     Add unread notification count to all templates
     """
-    if request.user.is_authenticated:
-        try:
-            unread_count = request.user.notifications.filter(is_read=False).count()
-        except:
-            unread_count = 0
-    else:
-        unread_count = 0
-    
+    def count():
+        if request.user.is_authenticated:
+            try:
+                from community.notification_counts import unread_count as cached_unread_count
+                return cached_unread_count(request.user.id)
+            except:
+                return 0
+        return 0
+
     return {
-        'unread_notifications_count': unread_count
+        'unread_notifications_count': lazy(request, 'unread_notifications_count', count)
     }
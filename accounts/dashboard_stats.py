@@ -0,0 +1,219 @@
+# accounts/dashboard_stats.py
+"""
+Per-user dashboard aggregate store
+Every counter on the user dashboard lives in one UserDashboardStats row.
+Counters are grouped into sections; a signal on a source model recomputes
+only its section for the affected user, and the bulk rebuild/check commands
+compute every section for all users with one GROUP BY query per source.
+"""
+
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import UserDashboardStats
+
+
+def _scoped(queryset, user_ids, field='user_id'):
+    if user_ids is None:
+        return queryset
+    return queryset.filter(**{f'{field}__in': user_ids})
+
+
+def _learning(user_ids=None):
+    from elearning.models import Enrollment, Certificate
+
+    stats = {}
+    enrollments = _scoped(Enrollment.objects.all(), user_ids).values('user_id').annotate(
+        enrolled=Count('id'),
+        completed=Count('id', filter=Q(progress_percentage__gte=100)),
+        in_progress=Count('id', filter=Q(progress_percentage__gt=0, progress_percentage__lt=100)),
+    )
+    for row in enrollments:
+        stats.setdefault(row['user_id'], {}).update({
+            'enrolled_modules': row['enrolled'],
+            'modules_completed': row['completed'],
+            'modules_in_progress': row['in_progress'],
+        })
+
+    certificates = _scoped(Certificate.objects.all(), user_ids).values('user_id').annotate(total=Count('id'))
+    for row in certificates:
+        stats.setdefault(row['user_id'], {})['certificates_earned'] = row['total']
+
+    return stats
+
+
+def _events(user_ids=None):
+    from community.models import EventParticipant
+
+    rows = _scoped(EventParticipant.objects.filter(attended=True), user_ids).values('user_id').annotate(total=Count('id'))
+    return {row['user_id']: {'events_attended': row['total']} for row in rows}
+
+
+def _challenges(user_ids=None):
+    from community.models import ChallengeParticipant
+
+    rows = _scoped(ChallengeParticipant.objects.all(), user_ids).values('user_id').annotate(total=Count('id'))
+    return {row['user_id']: {'challenges_joined': row['total']} for row in rows}
+
+
+def _stories(user_ids=None):
+    from community.models import SuccessStory
+
+    rows = _scoped(SuccessStory.objects.all(), user_ids, 'author_id').values('author_id').annotate(
+        approved=Count('id', filter=Q(is_approved=True)),
+        pending=Count('id', filter=Q(is_approved=False)),
+    )
+    return {
+        row['author_id']: {'approved_stories': row['approved'], 'pending_stories': row['pending']}
+        for row in rows
+    }
+
+
+def _forum(user_ids=None):
+    from community.models import ForumTopic, ForumReply
+
+    stats = {}
+    topics = _scoped(ForumTopic.objects.all(), user_ids, 'author_id').values('author_id').annotate(total=Count('id'))
+    for row in topics:
+        stats.setdefault(row['author_id'], {})['forum_topics_count'] = row['total']
+
+    replies = _scoped(ForumReply.objects.all(), user_ids, 'author_id').values('author_id').annotate(total=Count('id'))
+    for row in replies:
+        stats.setdefault(row['author_id'], {})['forum_replies_count'] = row['total']
+
+    return stats
+
+
+def _reports(user_ids=None):
+    from reporting.models import DumpingReport
+
+    reports = DumpingReport.objects.filter(reporter__isnull=False)
+    rows = _scoped(reports, user_ids, 'reporter_id').values('reporter_id').annotate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='pending')),
+        resolved=Count('id', filter=Q(status='resolved')),
+    )
+    return {
+        row['reporter_id']: {
+            'total_reports': row['total'],
+            'pending_reports': row['pending'],
+            'resolved_reports': row['resolved'],
+        }
+        for row in rows
+    }
+
+
+def _payments(user_ids=None):
+    from payments.models import Payment
+
+    rows = _scoped(Payment.objects.filter(status='completed'), user_ids).values('user_id').annotate(total=Sum('amount'))
+    return {row['user_id']: {'total_paid': row['total'] or Decimal('0')} for row in rows}
+
+
+# Section name -> (compute function, fields it owns)
+SECTIONS = {
+    'learning': (_learning, ['enrolled_modules', 'modules_completed', 'modules_in_progress', 'certificates_earned']),
+    'events': (_events, ['events_attended']),
+    'challenges': (_challenges, ['challenges_joined']),
+    'stories': (_stories, ['approved_stories', 'pending_stories']),
+    'forum': (_forum, ['forum_topics_count', 'forum_replies_count']),
+    'reports': (_reports, ['total_reports', 'pending_reports', 'resolved_reports']),
+    'payments': (_payments, ['total_paid']),
+}
+
+STAT_FIELDS = [field for _compute, fields in SECTIONS.values() for field in fields]
+
+
+def _defaults(fields):
+    return {field: Decimal('0') if field == 'total_paid' else 0 for field in fields}
+
+
+def compute_live_stats(user_ids=None, sections=None):
+    """
+    Compute dashboard counters from the source tables
+
+    Args:
+        user_ids: Restrict to these users (None = every user with activity)
+        sections: Section names to compute (None = all)
+
+    Returns:
+        dict: {user_id: {field: value}} - missing fields mean zero
+    """
+    stats = {}
+    for name in sections or SECTIONS:
+        compute, _fields = SECTIONS[name]
+        for user_id, values in compute(user_ids).items():
+            stats.setdefault(user_id, {}).update(values)
+    return stats
+
+
+def refresh_user_stats(user_id, sections=None):
+    """Recompute the given sections of one user's stats row"""
+    fields = STAT_FIELDS if sections is None else [f for name in sections for f in SECTIONS[name][1]]
+    values = _defaults(fields)
+    values.update(compute_live_stats([user_id], sections).get(user_id, {}))
+    stats, _ = UserDashboardStats.objects.update_or_create(user_id=user_id, defaults=values)
+    return stats
+
+
+def get_dashboard_stats(user):
+    """Return the user's stats row, building it on first access"""
+    try:
+        return UserDashboardStats.objects.get(user=user)
+    except UserDashboardStats.DoesNotExist:
+        return refresh_user_stats(user.id)
+
+
+def rebuild_all_stats(batch_size=1000):
+    """
+    Rebuild every user's stats row in bulk
+
+    Returns:
+        int: Number of rows written
+    """
+    from .models import CustomUser
+
+    live = compute_live_stats()
+    user_ids = CustomUser.objects.values_list('id', flat=True).iterator()
+    existing = dict(UserDashboardStats.objects.values_list('user_id', 'id'))
+    now = timezone.now()
+
+    to_create, to_update = [], []
+    for user_id in user_ids:
+        values = _defaults(STAT_FIELDS)
+        values.update(live.get(user_id, {}))
+        stats = UserDashboardStats(id=existing.get(user_id), user_id=user_id, updated_at=now, **values)
+        if stats.id:
+            to_update.append(stats)
+        else:
+            to_create.append(stats)
+
+    UserDashboardStats.objects.bulk_create(to_create, batch_size=batch_size)
+    # bulk_update skips auto_now, so updated_at is set explicitly above
+    UserDashboardStats.objects.bulk_update(to_update, STAT_FIELDS + ['updated_at'], batch_size=batch_size)
+
+    return len(to_create) + len(to_update)
+
+
+def find_inconsistencies(user_ids=None):
+    """
+    Compare stored stats rows with live counts
+
+    Returns:
+        list: (user_id, field, stored, live) for every mismatch
+    """
+    live = compute_live_stats(user_ids)
+    stored = UserDashboardStats.objects.all()
+    if user_ids is not None:
+        stored = stored.filter(user_id__in=user_ids)
+
+    mismatches = []
+    for row in stored.iterator():
+        expected = _defaults(STAT_FIELDS)
+        expected.update(live.get(row.user_id, {}))
+        for field in STAT_FIELDS:
+            if getattr(row, field) != expected[field]:
+                mismatches.append((row.user_id, field, getattr(row, field), expected[field]))
+    return mismatches
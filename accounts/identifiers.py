@@ -0,0 +1,172 @@
+# accounts/identifiers.py
+"""
+Login identifier resolution
+The login form accepts a username, an email address, a full name or a
+phone number. login_view used to try authenticate() once per
+interpretation, so a failed login could run the password hasher four times.
+Now each attempt:
+
+1. maps the identifier to at most one candidate with a single query over
+   the normalized, indexed *_lookup columns of CustomUser (kept current by
+   CustomUser.save())
+2. is counted against a per-identifier limit (LOGIN_IDENTIFIER_LIMIT
+   attempts per LOGIN_IDENTIFIER_PERIOD seconds, per candidate account or,
+   when nothing matches, per normalized identifier), in addition to the
+   per-IP 'login' rate limit in security/ratelimit.py
+3. runs the password hasher exactly once, also when there is no candidate,
+   so response times do not reveal which identifiers exist. Throttled
+   attempts never reach the hasher.
+
+Interpretations are tried in the old order (exact username, email, full
+name, case-insensitive username), then phone number. One that matches
+several accounts (a shared email or name) is skipped instead of guessing.
+"""
+
+import hashlib
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+# Tunables (override in settings.py)
+IDENTIFIER_LIMIT = getattr(settings, 'LOGIN_IDENTIFIER_LIMIT', 10)  # attempts
+IDENTIFIER_PERIOD = getattr(settings, 'LOGIN_IDENTIFIER_PERIOD', 900)  # seconds
+PHONE_COUNTRY_CODE = getattr(settings, 'PHONE_COUNTRY_CODE', '260')  # Zambia
+PHONE_NATIONAL_DIGITS = 9
+
+MAX_CANDIDATES = 20
+PHONE_PATTERN = re.compile(r'^\+?[\d\s\-().]{7,}$')
+BACKEND = 'django.contrib.auth.backends.ModelBackend'
+
+
+def normalize(value):
+    """Casefolded NFKC text with runs of whitespace collapsed"""
+    return ' '.join(unicodedata.normalize('NFKC', value or '').casefold().split())
+
+
+def normalize_phone(value):
+    """
+    National significant number: +260 97 1234567, 00260971234567 and
+    0971234567 all become 971234567
+    """
+    digits = re.sub(r'\D', '', value or '')
+    if digits.startswith('00'):
+        digits = digits[2:]  # international call prefix
+    if digits.startswith(PHONE_COUNTRY_CODE) and len(digits) - len(PHONE_COUNTRY_CODE) >= PHONE_NATIONAL_DIGITS:
+        digits = digits[len(PHONE_COUNTRY_CODE):]
+    if digits.startswith('0'):
+        digits = digits[1:]  # trunk prefix
+    return digits
+
+
+def lookup_values(user):
+    """The *_lookup column values for a CustomUser"""
+    return {
+        'username_lookup': normalize(user.username)[:150],
+        'email_lookup': normalize(user.email)[:254],
+        'full_name_lookup': normalize(f'{user.first_name} {user.last_name}')[:301],
+        'phone_lookup': normalize_phone(user.phone_number)[:20],
+    }
+
+
+def resolve(identifier):
+    """
+    The one account `identifier` can refer to
+
+    Returns:
+        CustomUser or None
+    """
+    from .models import CustomUser
+
+    identifier = (identifier or '').strip()
+    normalized = normalize(identifier)
+    if not normalized:
+        return None
+    phone = normalize_phone(identifier) if PHONE_PATTERN.match(identifier) else ''
+
+    # (interpretation, matches): tried in this order
+    interpretations = [
+        ('username', lambda user: user.username == identifier),
+        ('email', lambda user: '@' in identifier and user.email_lookup == normalized),
+        ('full_name', lambda user: ' ' in normalized and user.full_name_lookup == normalized),
+        ('username_iexact', lambda user: user.username_lookup == normalized),
+        ('phone', lambda user: bool(phone) and user.phone_lookup == phone),
+    ]
+
+    query = Q(username=identifier) | Q(username_lookup=normalized)
+    if '@' in identifier:
+        query |= Q(email_lookup=normalized)
+    if ' ' in normalized:
+        query |= Q(full_name_lookup=normalized)
+    if phone:
+        query |= Q(phone_lookup=phone)
+    candidates = list(CustomUser.objects.filter(query)[:MAX_CANDIDATES])
+
+    for name, matches in interpretations:
+        found = [user for user in candidates if matches(user)]
+        if len(found) == 1:
+            return found[0]
+        if found:
+            logger.info(f"Login identifier matches {len(found)} accounts by {name}, skipped")
+    return None
+
+
+# --- Login attempts ---
+
+@dataclass(frozen=True)
+class Attempt:
+    user: object = None
+    retry_after: int = 0
+
+    @property
+    def throttled(self):
+        return self.retry_after > 0
+
+
+def _throttle_policy():
+    from security.ratelimit import Policy
+
+    return Policy(name='login_identifier', limit=IDENTIFIER_LIMIT, period=IDENTIFIER_PERIOD)
+
+
+def throttle_identity(identifier, candidate):
+    if candidate is not None:
+        # Every alias of an account shares its budget
+        return f'u{candidate.pk}'
+    return hashlib.sha256(normalize(identifier).encode()).hexdigest()[:32]
+
+
+def attempt(identifier, password):
+    """
+    Resolve `identifier` and verify `password` against it, hashing once
+
+    Returns:
+        Attempt: .user is the authenticated user (None on failure),
+        .retry_after is set when the identifier is throttled
+    """
+    from django.contrib.auth.backends import ModelBackend
+    from security import ratelimit
+    from .models import CustomUser
+
+    candidate = resolve(identifier)
+    try:
+        decision = ratelimit.hit(_throttle_policy(), throttle_identity(identifier, candidate))
+    except Exception as e:
+        logger.error(f"Login identifier throttle failed: {str(e)}")
+        decision = None
+    if decision is not None and not decision.allowed:
+        return Attempt(retry_after=decision.retry_after)
+
+    if candidate is None:
+        # Same hashing cost as a real check (as ModelBackend does for unknown usernames)
+        CustomUser().set_password(password or '')
+        return Attempt()
+    if candidate.check_password(password or '') and ModelBackend().user_can_authenticate(candidate):
+        candidate.backend = BACKEND
+        return Attempt(user=candidate)
+    return Attempt()
@@ -0,0 +1,182 @@
+# accounts/management/commands/benchmark_cache.py
+"""
+Benchmark for the shared cache and session configuration.
+
+1. Backend: get/set latency of LocMemCache vs the shared SQLite cache, and a
+   multi-process incr run showing every worker sees (and atomically updates)
+   the same counter.
+2. Requests: p50/p99 latency and database writes per request for a logged-in
+   user browsing, with the old configuration (database sessions saved on
+   every request, per-process LocMemCache) and the current one.
+
+Cache files are created in a temporary directory and removed afterwards.
+Run: python manage.py benchmark_cache --requests 300 --path /elearning/
+"""
+
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _incr_worker(path, count):
+    from ecolearn.sqlite_cache import SQLiteCache
+    cache = SQLiteCache(path, {})
+    for _ in range(count):
+        cache.incr('shared-counter')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the shared SQLite cache and write-skipping sessions against LocMem + DB sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ops', type=int, default=5000, help='Cache operations per backend')
+        parser.add_argument('--requests', type=int, default=300, help='Requests per configuration')
+        parser.add_argument('--path', default='/elearning/', help='Page to request')
+        parser.add_argument('--processes', type=int, default=4, help='Processes in the incr run')
+
+    def handle(self, *args, **options):
+        workdir = tempfile.mkdtemp(prefix='cache-bench-')
+        try:
+            self.benchmark_backends(workdir, options['ops'])
+            self.benchmark_processes(workdir, options['processes'])
+            self.benchmark_requests(workdir, options['requests'], options['path'])
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    # --- Backends ---
+
+    def time_ops(self, cache, ops):
+        value = {'modules': list(range(50)), 'title': 'x' * 500}
+        sets, gets = [], []
+        for i in range(ops):
+            start = time.perf_counter()
+            cache.set(f'bench:{i % 500}', value, 300)
+            sets.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            cache.get(f'bench:{(i * 7) % 500}')
+            gets.append(time.perf_counter() - start)
+        return sets, gets
+
+    def benchmark_backends(self, workdir, ops):
+        from django.core.cache.backends.locmem import LocMemCache
+        from ecolearn.sqlite_cache import SQLiteCache
+
+        self.stdout.write(f'🧪 Cache backends ({ops} set+get pairs, ~1 KB values)')
+        backends = [
+            ('LocMemCache', LocMemCache('bench', {'OPTIONS': {'MAX_ENTRIES': 1000}})),
+            ('SQLiteCache', SQLiteCache(os.path.join(workdir, 'bench.sqlite3'), {})),
+        ]
+        for name, cache in backends:
+            sets, gets = self.time_ops(cache, ops)
+            self.stdout.write(
+                f'   {name:<12} set p50 {percentile(sets, 50) * 1e6:7.1f}µs p99 {percentile(sets, 99) * 1e6:7.1f}µs | '
+                f'get p50 {percentile(gets, 50) * 1e6:7.1f}µs p99 {percentile(gets, 99) * 1e6:7.1f}µs'
+            )
+
+        # LRU bound: write 4x the size limit and check the file stays near it
+        bounded = SQLiteCache(os.path.join(workdir, 'bounded.sqlite3'), {'OPTIONS': {'MAX_SIZE': 1024 * 1024, 'CULL_EVERY': 50}})
+        for i in range(4000):
+            bounded.set(f'lru:{i}', 'x' * 1000, 300)
+        info = bounded.info()
+        self.stdout.write(
+            f'   LRU bound: 4 MB written into a 1 MB cache -> {info["entries"]} entries, {info["bytes"] / 1024:.0f} KB'
+        )
+
+    def benchmark_processes(self, workdir, processes):
+        from ecolearn.sqlite_cache import SQLiteCache
+
+        path = os.path.join(workdir, 'shared.sqlite3')
+        SQLiteCache(path, {}).set('shared-counter', 0, None)
+        per_process = 500
+        start = time.perf_counter()
+        workers = [
+            multiprocessing.get_context('spawn').Process(target=_incr_worker, args=(path, per_process))
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        total = SQLiteCache(path, {}).get('shared-counter')
+        expected = processes * per_process
+        mark = '✅' if total == expected else '❌'
+        self.stdout.write(
+            f'{mark} {processes} processes x {per_process} incr on one key: {total}/{expected} in {elapsed:.2f}s'
+        )
+
+    # --- Requests ---
+
+    def run_requests(self, user, count, path):
+        client = Client()
+        client.force_login(user)
+        client.get(path)  # warm caches
+        latencies, writes = [], []
+        for _ in range(count):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = client.get(path)
+                latencies.append(time.perf_counter() - start)
+            writes.append(sum(1 for q in queries.captured_queries if q['sql'].lstrip().upper().startswith(WRITE_PREFIXES)))
+        return response.status_code, latencies, writes
+
+    def benchmark_requests(self, workdir, count, path):
+        from django.contrib.auth import get_user_model
+
+        User = get_user_model()
+        user, _ = User.objects.get_or_create(username='cache_bench_user', defaults={'email': 'cache-bench@example.com'})
+
+        before_middleware = [
+            'django.contrib.sessions.middleware.SessionMiddleware' if m == 'ecolearn.sessions.SessionMiddleware' else m
+            for m in settings.MIDDLEWARE
+        ]
+        configurations = [
+            ('before: LocMem + DB sessions, save every request', {
+                'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'bench', 'OPTIONS': {'MAX_ENTRIES': 1000}}},
+                'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+                'SESSION_SAVE_EVERY_REQUEST': True,
+                'MIDDLEWARE': before_middleware,
+            }),
+            ('after: shared SQLite cache + cache sessions, save on change', {
+                'CACHES': {
+                    'default': {'BACKEND': 'ecolearn.sqlite_cache.SQLiteCache',
+                                'LOCATION': os.path.join(workdir, 'cache.sqlite3')},
+                    'sessions': {'BACKEND': 'ecolearn.sqlite_cache.SQLiteCache',
+                                 'LOCATION': os.path.join(workdir, 'sessions.sqlite3')},
+                },
+                'SESSION_ENGINE': 'django.contrib.sessions.backends.cache',
+                'SESSION_CACHE_ALIAS': 'sessions',
+                'SESSION_SAVE_EVERY_REQUEST': False,
+            }),
+        ]
+
+        self.stdout.write(f'🧪 {count} logged-in GET {path} per configuration')
+        try:
+            for label, overrides in configurations:
+                with override_settings(ALLOWED_HOSTS=['*'], **overrides):
+                    status, latencies, writes = self.run_requests(user, count, path)
+                self.stdout.write(
+                    f'   {label}\n'
+                    f'      status {status} | p50 {percentile(latencies, 50) * 1000:6.1f}ms '
+                    f'p99 {percentile(latencies, 99) * 1000:6.1f}ms | '
+                    f'DB writes/request {statistics.mean(writes):.2f}'
+                )
+        finally:
+            user.delete()
@@ -0,0 +1,134 @@
+# accounts/management/commands/benchmark_context.py
+"""
+Query-count comparison for the lazy context processors.
+
+Requests the most visited pages (learner pages as a learner, admin pages as
+staff, public pages anonymously) twice each: with the previous, eager
+context processors (user_language, unread_notifications,
+pending_proofs_count) and with the lazy ones (ecolearn/lazy_context.py).
+Each page is requested once to warm caches before the counted request.
+Reports queries per page and which lazy values the page realized.
+
+Users are created inside a transaction that is rolled back.
+Run: python manage.py benchmark_context
+"""
+
+import copy
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from accounts.models import CustomUser
+from ecolearn.lazy_context import report
+
+PAGES = [
+    ('learner', '/dashboard/'),
+    ('learner', '/accounts/dashboard/'),
+    ('learner', '/elearning/'),
+    ('learner', '/elearning/app/dashboard/'),
+    ('learner', '/elearning/app/certificates/'),
+    ('learner', '/elearning/app/leaderboard/'),
+    ('learner', '/community/notifications/'),
+    ('learner', '/community/events/'),
+    ('learner', '/community/forum/'),
+    ('learner', '/community/challenges/'),
+    ('learner', '/reporting/report/'),
+    ('learner', '/reporting/my-reports/'),
+    ('learner', '/rewards/points/'),
+    ('learner', '/accounts/profile/'),
+    ('anonymous', '/'),
+    ('anonymous', '/accounts/login/'),
+    ('staff', '/admin-dashboard/'),
+    ('staff', '/admin-dashboard/users/'),
+    ('staff', '/admin-dashboard/challenge-proofs/'),
+    ('staff', '/admin-dashboard/users/grid/'),
+]
+
+PROCESSORS = [
+    'accounts.context_processors.user_language',
+    'accounts.context_processors.unread_notifications',
+    'admin_dashboard.context_processors.pending_proofs_count',
+]
+
+
+# --- The processors as they were ---
+
+def legacy_user_language(request):
+    if request.user.is_authenticated:
+        return {'user_language': getattr(request.user, 'preferred_language', 'en')}
+    return {'user_language': 'en'}
+
+
+def legacy_unread_notifications(request):
+    if request.user.is_authenticated:
+        from community.notification_counts import unread_count
+        return {'unread_notifications_count': unread_count(request.user.id)}
+    return {'unread_notifications_count': 0}
+
+
+def legacy_pending_proofs_count(request):
+    if request.user.is_authenticated and request.user.is_staff:
+        from community.models import ChallengeProof
+        return {'pending_proofs_count': ChallengeProof.objects.filter(status='pending').count()}
+    return {'pending_proofs_count': 0}
+
+
+def templates_with(processors):
+    templates = copy.deepcopy(settings.TEMPLATES)
+    for engine in templates:
+        names = engine.get('OPTIONS', {}).get('context_processors', [])
+        engine['OPTIONS']['context_processors'] = [
+            processors.get(name, name) for name in names
+        ]
+    return templates
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare per-page query counts of the eager and lazy context processors'
+
+    def handle(self, *args, **options):
+        legacy = templates_with({
+            name: f'{__name__}.legacy_{name.rsplit(".", 1)[1]}' for name in PROCESSORS
+        })
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=['*']):
+                self.run(legacy)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, legacy_templates):
+        learner = CustomUser.objects.create(username='bench_context_learner', email='learner@bench.example')
+        staff = CustomUser.objects.create(username='bench_context_staff', email='staff@bench.example', is_staff=True)
+        clients = {'anonymous': Client(), 'learner': Client(), 'staff': Client()}
+        clients['learner'].force_login(learner)
+        clients['staff'].force_login(staff)
+
+        results = {}
+        for label, templates in [('eager', legacy_templates), ('lazy', settings.TEMPLATES)]:
+            with override_settings(TEMPLATES=templates):
+                for who, path in PAGES:
+                    clients[who].get(path)
+                    with CaptureQueriesContext(connection) as queries:
+                        response = clients[who].get(path)
+                    realized, skipped = report(response.wsgi_request)
+                    results.setdefault(path, {})[label] = (response.status_code, len(queries), realized)
+
+        self.stdout.write(f'🧪 Queries per page, eager vs lazy context processors ({len(PAGES)} pages)')
+        total_eager = total_lazy = 0
+        for who, path in PAGES:
+            (status, eager, _), (_, lazy, realized) = results[path]['eager'], results[path]['lazy']
+            total_eager += eager
+            total_lazy += lazy
+            self.stdout.write(
+                f'   {path:<36} {who:<9} {status} eager {eager:3d} lazy {lazy:3d} '
+                f'({lazy - eager:+d}) realized: {", ".join(realized) or "-"}'
+            )
+        self.stdout.write(f'✅ Total: eager {total_eager} queries, lazy {total_lazy} ({total_lazy - total_eager:+d})')
@@ -0,0 +1,132 @@
+# accounts/management/commands/benchmark_login.py
+"""
+Benchmark for login attempt cost.
+
+Replays login attempts through the previous login_view logic (up to four
+authenticate() calls) and through accounts.identifiers.attempt(), and
+reports per attempt: password hashes run, CPU time, and attempts per
+second on one thread. Cases cover a correct username login and failed
+attempts by full name, email, case-folded username and unknown identifier.
+Then shows the per-identifier throttle refusing attempts without hashing.
+
+Users are created inside a transaction that is rolled back; throttle
+counters go to a LocMemCache.
+Run: python manage.py benchmark_login --attempts 5
+"""
+
+import time
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import get_hasher
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from accounts import identifiers
+from accounts.models import CustomUser
+
+LOCMEM = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'login-bench'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'login-bench-sessions'},
+}
+
+
+def legacy_login(request, username_input, password):
+    """The previous login_view identifier handling"""
+    user = authenticate(request, username=username_input, password=password)
+    if user is None and '@' in username_input:
+        try:
+            user_obj = CustomUser.objects.get(email=username_input)
+            user = authenticate(request, username=user_obj.username, password=password)
+        except CustomUser.DoesNotExist:
+            pass
+    if user is None and ' ' in username_input:
+        try:
+            parts = username_input.strip().split()
+            if len(parts) >= 2:
+                user_obj = CustomUser.objects.get(first_name__iexact=parts[0], last_name__iexact=' '.join(parts[1:]))
+                user = authenticate(request, username=user_obj.username, password=password)
+        except CustomUser.DoesNotExist:
+            pass
+    if user is None:
+        try:
+            user_obj = CustomUser.objects.get(username__iexact=username_input)
+            user = authenticate(request, username=user_obj.username, password=password)
+        except CustomUser.DoesNotExist:
+            pass
+    return user
+
+
+def new_login(request, username_input, password):
+    return identifiers.attempt(username_input, password).user
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare password hashes, CPU time and throughput of the old and new login identifier handling'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=5, help='Attempts per case and implementation')
+
+    def handle(self, *args, **options):
+        hasher = get_hasher()
+        self.stdout.write(f'🧪 Login attempts with {hasher.algorithm} ({getattr(hasher, "iterations", "?")} iterations)')
+        try:
+            with override_settings(CACHES=LOCMEM), transaction.atomic():
+                self.run(options['attempts'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, attempts):
+        CustomUser.objects.create_user(
+            username='bench_mwila', email='mwila.bench@example.com', password='right-password',
+            first_name='Mwila', last_name='Bench Banda', phone_number='+260970000001',
+        )
+        request = RequestFactory().post('/accounts/login/')
+        cases = [
+            ('username, right password', 'bench_mwila', 'right-password', True),
+            ('full name, wrong password', 'Mwila Bench Banda', 'wrong', False),
+            ('email, wrong password', 'mwila.bench@example.com', 'wrong', False),
+            ('USERNAME, wrong password', 'BENCH_MWILA', 'wrong', False),
+            ('unknown, wrong password', 'nobody-here', 'wrong', False),
+        ]
+        hasher_class = type(get_hasher())
+        original_encode = hasher_class.encode
+        hashes = [0]
+
+        def counting_encode(self, *args, **kwargs):
+            hashes[0] += 1
+            return original_encode(self, *args, **kwargs)
+
+        identifiers.IDENTIFIER_LIMIT = 10 ** 9
+        with mock.patch.object(hasher_class, 'encode', counting_encode):
+            for label, identifier, password, expected in cases:
+                line = []
+                for name, login in [('before', legacy_login), ('after', new_login)]:
+                    hashes[0] = 0
+                    cpu, wall = time.process_time(), time.perf_counter()
+                    results = [login(request, identifier, password) for _ in range(attempts)]
+                    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+                    ok = all((user is not None) == expected for user in results)
+                    line.append(
+                        f'{name} {hashes[0] / attempts:.0f} hash(es) {cpu / attempts * 1000:7.1f}ms cpu '
+                        f'{attempts / wall:6.1f}/s {"✅" if ok else "❌"}'
+                    )
+                self.stdout.write(f'   {label:<27} ' + ' | '.join(line))
+
+            identifiers.IDENTIFIER_LIMIT = 3
+            cache.clear()
+            hashes[0] = 0
+            results = [identifiers.attempt('Mwila Bench Banda', 'wrong') for _ in range(5)]
+            throttled = sum(1 for result in results if result.throttled)
+            self.stdout.write(
+                f'   throttle (limit 3): 5 attempts, {throttled} throttled, {hashes[0]} hashes, '
+                f'retry after {results[-1].retry_after}s'
+            )
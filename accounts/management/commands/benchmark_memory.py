@@ -0,0 +1,125 @@
+# accounts/management/commands/benchmark_memory.py
+"""
+Test harness for the worker memory governor.
+
+Starts gunicorn with gunicorn.conf.py (one gthread worker, post_request
+hook) on the synthetic endpoints of ecolearn/memory_harness.py, with low
+soft and hard limits. It then grows the worker's memory step by step,
+trying the heavy endpoint after each step, until the worker is recycled.
+Reports per step the worker pid, its RSS and whether the heavy request was
+served or deferred (503). After the recycle it checks that the fresh worker
+serves heavy requests again. Ends with the governor's log lines:
+high-water marks, deferrals and the recycle.
+
+Run: python manage.py benchmark_memory --soft 256 --hard 320 --step 16
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+GOVERNOR_LOG_MARKERS = ('Memory high-water', 'soft limit', 'Deferred memory-heavy', 'Worker exiting', 'Booting worker')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def fetch(base, path):
+    """(status, JSON body or None)"""
+    try:
+        with urllib.request.urlopen(base + path, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        body = e.read()
+        return e.code, json.loads(body) if body.startswith(b'{') else None
+
+
+class Command(BaseCommand):
+    help = 'Drive a synthetic memory-growing endpoint under gunicorn and report recycling and deferrals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--soft', type=int, default=256, help='MEMORY_SOFT_LIMIT_MB for the run')
+        parser.add_argument('--hard', type=int, default=320, help='MEMORY_HARD_LIMIT_MB for the run')
+        parser.add_argument('--step', type=int, default=16, help='MB retained per grow request')
+        parser.add_argument('--max-steps', type=int, default=40)
+
+    def handle(self, *args, **options):
+        port = free_port()
+        base = f'http://127.0.0.1:{port}/'
+        env = dict(
+            os.environ,
+            PORT=str(port),
+            MEMORY_SOFT_LIMIT_MB=str(options['soft']),
+            MEMORY_HARD_LIMIT_MB=str(options['hard']),
+        )
+        log = tempfile.TemporaryFile(mode='w+')
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'ecolearn.memory_harness:wsgi()'],
+            cwd=settings.BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        try:
+            self.drive(base, options, server)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+        log.seek(0)
+        lines = [line.rstrip() for line in log if any(marker in line for marker in GOVERNOR_LOG_MARKERS)]
+        self.stdout.write('   gunicorn log:')
+        for line in lines:
+            self.stdout.write(f'     {line}')
+
+    def drive(self, base, options, server):
+        for _ in range(120):
+            if server.poll() is not None:
+                raise CommandError('gunicorn exited during startup')
+            try:
+                status, first = fetch(base, 'ping/')
+                break
+            except OSError:
+                time.sleep(0.5)
+        else:
+            raise CommandError('gunicorn did not start')
+
+        self.stdout.write(
+            f'🧪 Memory governor: soft {options["soft"]}MB, hard {options["hard"]}MB, '
+            f'growing {options["step"]}MB per request'
+        )
+        self.stdout.write(f'   worker {first["pid"]} booted at {first["rss_mb"]}MB')
+        pid = first['pid']
+        deferred = served = 0
+        for step in range(1, options['max_steps'] + 1):
+            status, grown = fetch(base, f'grow/{options["step"]}/')
+            if grown['pid'] != pid:
+                self.stdout.write(f'   step {step:2d}: worker {grown["pid"]} replaced {pid} ✅')
+                pid = grown['pid']
+                break
+            heavy_status, heavy = fetch(base, 'heavy/')
+            served += heavy_status == 200
+            deferred += heavy_status == 503
+            self.stdout.write(
+                f'   step {step:2d}: worker {grown["pid"]} {grown["rss_mb"]:6.1f}MB RSS '
+                f'(+{grown["retained_mb"]}MB retained)  heavy -> {heavy_status}'
+            )
+        else:
+            raise CommandError(f'worker was not recycled within {options["max_steps"]} steps')
+
+        status, after = fetch(base, 'ping/')
+        heavy_status, _ = fetch(base, 'heavy/')
+        self.stdout.write(
+            f'   fresh worker {after["pid"]} at {after["rss_mb"]}MB, heavy -> {heavy_status} '
+            f'{"✅" if heavy_status == 200 else "❌"}'
+        )
+        self.stdout.write(f'✅ Heavy requests served {served}, deferred {deferred} before the recycle')
@@ -0,0 +1,111 @@
+# accounts/management/commands/benchmark_startup.py
+"""
+Startup cost of the third-party SDKs.
+
+Runs `manage.py check` and a worker boot (django.setup(), the WSGI
+application and the URLconf, what a gunicorn worker does before its first
+request) in fresh interpreters, twice: "before", importing the SDK modules
+settings.py, ai_assistant.views and admin_dashboard.views used to import at
+load time (LEGACY_IMPORTS), and "after", with the lazy provider registry
+(ecolearn/providers.py). Reports the median wall time, peak RSS, modules
+loaded and which SDK modules ended up in sys.modules, then the slowest
+imports of a worker boot from `python -X importtime`.
+
+Run: python manage.py benchmark_startup --runs 3
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# What loading the project imported before the provider registry
+LEGACY_IMPORTS = [
+    'cloudinary', 'cloudinary_storage', 'cloudinary.uploader', 'cloudinary.api',  # settings.py
+    'google.generativeai',  # ai_assistant.views
+    'twilio.rest',  # admin_dashboard.views
+]
+SDK_MODULES = ['africastalking', 'twilio.rest', 'google.generativeai', 'cloudinary', 'grpc', 'google.protobuf']
+
+CHILD = '''
+import importlib, json, os, resource, sys, time
+start = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecolearn.settings')
+for name in json.loads(os.environ['BENCHMARK_STARTUP_EAGER']):
+    importlib.import_module(name)
+if sys.argv[1] == 'check':
+    from django.core.management import execute_from_command_line
+    execute_from_command_line(['manage.py', 'check'])
+else:
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import get_resolver
+    get_wsgi_application()
+    get_resolver().url_patterns
+print('BENCHMARK ' + json.dumps({
+    'seconds': time.perf_counter() - start,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'modules': len(sys.modules),
+    'sdks': [name for name in json.loads(os.environ['BENCHMARK_STARTUP_SDKS']) if name in sys.modules],
+}))
+'''
+
+
+def run_child(mode, eager, python_flags=()):
+    env = dict(
+        os.environ,
+        BENCHMARK_STARTUP_EAGER=json.dumps(LEGACY_IMPORTS if eager else []),
+        BENCHMARK_STARTUP_SDKS=json.dumps(SDK_MODULES),
+    )
+    completed = subprocess.run(
+        [sys.executable, '-W', 'ignore', *python_flags, '-c', CHILD, mode],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    lines = [line for line in completed.stdout.splitlines() if line.startswith('BENCHMARK ')]
+    if completed.returncode or not lines:
+        raise RuntimeError(f'{mode} failed: {completed.stderr.strip()[-500:]}')
+    return json.loads(lines[-1][len('BENCHMARK '):]), completed.stderr
+
+
+def slowest_imports(stderr, limit):
+    """Top-level packages by cumulative import time from -X importtime output"""
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.startswith('  '):
+            continue  # nested import, counted in its parent's cumulative time
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(cumulative)
+    return sorted(packages.items(), key=lambda item: -item[1])[:limit]
+
+
+class Command(BaseCommand):
+    help = 'Compare manage.py check and worker boot time and memory with eager and lazy SDK imports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='Runs per mode (median reported)')
+        parser.add_argument('--top', type=int, default=8, help='Slowest imports to list')
+
+    def handle(self, *args, **options):
+        runs = options['runs']
+        self.stdout.write(f'🧪 Startup cost, median of {runs} runs (before: eager SDK imports, after: lazy providers)')
+        for mode in ['check', 'boot']:
+            for label, eager in [('before', True), ('after', False)]:
+                results = [run_child(mode, eager)[0] for _ in range(runs)]
+                seconds = statistics.median(result['seconds'] for result in results)
+                rss = statistics.median(result['max_rss_kb'] for result in results) / 1024
+                self.stdout.write(
+                    f'   {mode:<5} {label:<6} {seconds * 1000:6.0f}ms  peak RSS {rss:6.1f}MB  '
+                    f'{results[0]["modules"]:5d} modules  SDKs: {", ".join(results[0]["sdks"]) or "-"}'
+                )
+
+        for label, eager in [('before', True), ('after', False)]:
+            _, stderr = run_child('boot', eager, python_flags=('-X', 'importtime'))
+            top = ', '.join(f'{name} {micros / 1000:.0f}ms' for name, micros in slowest_imports(stderr, options['top']))
+            self.stdout.write(f'   importtime {label:<6} {top}')
+        self.stdout.write('✅ Done')
@@ -0,0 +1,48 @@
+# accounts/management/commands/check_dashboard_stats.py
+"""
+Consistency checker for the dashboard aggregate store.
+Compares every stored UserDashboardStats row with live counts and
+optionally repairs the users that drifted.
+"""
+
+from django.core.management.base import BaseCommand
+
+from accounts.dashboard_stats import find_inconsistencies, refresh_user_stats
+
+
+class Command(BaseCommand):
+    help = 'Compare UserDashboardStats rows with live counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Recompute the rows of users with mismatches',
+        )
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='Only check this user id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        mismatches = find_inconsistencies(options['user_ids'])
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('✅ Dashboard stats are consistent'))
+            return
+
+        for user_id, field, stored, live in mismatches:
+            self.stdout.write(f'❌ user {user_id}: {field} stored={stored} live={live}')
+
+        drifted = sorted({user_id for user_id, *_rest in mismatches})
+        self.stdout.write(
+            self.style.WARNING(f'\n{len(mismatches)} mismatches across {len(drifted)} users')
+        )
+
+        if options['fix']:
+            for user_id in drifted:
+                refresh_user_stats(user_id)
+            self.stdout.write(self.style.SUCCESS(f'✅ Recomputed stats for {len(drifted)} users'))
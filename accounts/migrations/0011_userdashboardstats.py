@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_remove_customuser_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDashboardStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('enrolled_modules', models.PositiveIntegerField(default=0)),
+                ('modules_completed', models.PositiveIntegerField(default=0)),
+                ('modules_in_progress', models.PositiveIntegerField(default=0)),
+                ('certificates_earned', models.PositiveIntegerField(default=0)),
+                ('events_attended', models.PositiveIntegerField(default=0)),
+                ('challenges_joined', models.PositiveIntegerField(default=0)),
+                ('approved_stories', models.PositiveIntegerField(default=0)),
+                ('pending_stories', models.PositiveIntegerField(default=0)),
+                ('forum_topics_count', models.PositiveIntegerField(default=0)),
+                ('forum_replies_count', models.PositiveIntegerField(default=0)),
+                ('total_reports', models.PositiveIntegerField(default=0)),
+                ('pending_reports', models.PositiveIntegerField(default=0)),
+                ('resolved_reports', models.PositiveIntegerField(default=0)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='dashboard_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Dashboard Stats',
+                'verbose_name_plural': 'Dashboard Stats',
+            },
+        ),
+    ]
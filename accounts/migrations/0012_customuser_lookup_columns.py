@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:47
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+LOOKUP_FIELDS = ['username_lookup', 'email_lookup', 'full_name_lookup', 'phone_lookup']
+
+
+# Frozen copies of accounts.identifiers as of this migration: later changes
+# to the live normalizers must not change what this backfill writes
+def normalize(value):
+    return ' '.join(unicodedata.normalize('NFKC', value or '').casefold().split())
+
+
+def normalize_phone(value):
+    return re.sub(r'\D', '', value or '')
+
+
+def lookup_values(user):
+    return {
+        'username_lookup': normalize(user.username)[:150],
+        'email_lookup': normalize(user.email)[:254],
+        'full_name_lookup': normalize(f'{user.first_name} {user.last_name}')[:301],
+        'phone_lookup': normalize_phone(user.phone_number)[:20],
+    }
+
+
+def backfill_lookups(apps, schema_editor):
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    batch = []
+    users = CustomUser.objects.only('id', 'username', 'email', 'first_name', 'last_name', 'phone_number')
+    for user in users.iterator(chunk_size=2000):
+        for field_name, value in lookup_values(user).items():
+            setattr(user, field_name, value)
+        batch.append(user)
+        if len(batch) >= 2000:
+            CustomUser.objects.bulk_update(batch, LOOKUP_FIELDS)
+            batch = []
+    if batch:
+        CustomUser.objects.bulk_update(batch, LOOKUP_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_userdashboardstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='email_lookup',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='full_name_lookup',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=301),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='phone_lookup',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='username_lookup',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=150),
+        ),
+        migrations.RunPython(backfill_lookups, migrations.RunPython.noop),
+    ]
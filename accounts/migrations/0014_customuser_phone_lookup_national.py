@@ -0,0 +1,46 @@
+import re
+
+from django.conf import settings
+from django.db import migrations
+
+
+# Frozen copy of accounts.identifiers.normalize_phone as of this migration
+PHONE_COUNTRY_CODE = getattr(settings, 'PHONE_COUNTRY_CODE', '260')
+PHONE_NATIONAL_DIGITS = 9
+
+
+def normalize_phone(value):
+    digits = re.sub(r'\D', '', value or '')
+    if digits.startswith('00'):
+        digits = digits[2:]
+    if digits.startswith(PHONE_COUNTRY_CODE) and len(digits) - len(PHONE_COUNTRY_CODE) >= PHONE_NATIONAL_DIGITS:
+        digits = digits[len(PHONE_COUNTRY_CODE):]
+    if digits.startswith('0'):
+        digits = digits[1:]
+    return digits
+
+
+def backfill_phone_lookup(apps, schema_editor):
+    # phone_lookup now holds the national number
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    batch = []
+    users = CustomUser.objects.exclude(phone_number__isnull=True).exclude(phone_number='').only('id', 'phone_number', 'phone_lookup')
+    for user in users.iterator(chunk_size=2000):
+        user.phone_lookup = normalize_phone(user.phone_number)[:20]
+        batch.append(user)
+        if len(batch) >= 2000:
+            CustomUser.objects.bulk_update(batch, ['phone_lookup'])
+            batch = []
+    if batch:
+        CustomUser.objects.bulk_update(batch, ['phone_lookup'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_customuser_joined_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_phone_lookup, migrations.RunPython.noop),
+    ]
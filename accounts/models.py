@@ -92,6 +92,25 @@ class CustomUser(AbstractUser):
     date_joined = models.DateTimeField(auto_now_add=True)
     last_active = models.DateTimeField(auto_now=True)
 
+    # === LOGIN LOOKUP COLUMNS (normalized copies, see accounts/identifiers.py) ===
+    username_lookup = models.CharField(max_length=150, blank=True, default='', db_index=True, editable=False)
+    email_lookup = models.CharField(max_length=254, blank=True, default='', db_index=True, editable=False)
+    full_name_lookup = models.CharField(max_length=301, blank=True, default='', db_index=True, editable=False)
+    phone_lookup = models.CharField(max_length=20, blank=True, default='', db_index=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        from .identifiers import lookup_values
+
+        changed = []
+        for field_name, value in lookup_values(self).items():
+            if getattr(self, field_name) != value:
+                setattr(self, field_name, value)
+                changed.append(field_name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and changed:
+            kwargs['update_fields'] = set(update_fields) | set(changed)
+        super().save(*args, **kwargs)
+
     # === HELPER METHODS ===
     def is_admin(self):
         return self.role == 'admin'
@@ -103,6 +122,10 @@ class CustomUser(AbstractUser):
         verbose_name = _('User')
         verbose_name_plural = _('Users')
         ordering = ['-date_joined']
+        indexes = [
+            # Default ordering and the admin user grid's keyset pagination
+            models.Index(fields=['date_joined', 'id'], name='user_joined_id_idx'),
+        ]
 
 
 class PasswordResetAttempt(models.Model):
@@ -133,6 +156,61 @@ class UserProfile(models.Model):
         return f"{self.user.username}'s Profile"
 
 
+class UserDashboardStats(models.Model):
+    """
+    Denormalized per-user dashboard counters.
+    Kept up to date by signals in accounts/signals.py and rebuilt in bulk
+    with `manage.py rebuild_dashboard_stats`.
+    """
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='dashboard_stats')
+
+    # Learning
+    enrolled_modules = models.PositiveIntegerField(default=0)
+    modules_completed = models.PositiveIntegerField(default=0)
+    modules_in_progress = models.PositiveIntegerField(default=0)
+    certificates_earned = models.PositiveIntegerField(default=0)
+
+    # Community
+    events_attended = models.PositiveIntegerField(default=0)
+    challenges_joined = models.PositiveIntegerField(default=0)
+    approved_stories = models.PositiveIntegerField(default=0)
+    pending_stories = models.PositiveIntegerField(default=0)
+    forum_topics_count = models.PositiveIntegerField(default=0)
+    forum_replies_count = models.PositiveIntegerField(default=0)
+
+    # Reporting
+    total_reports = models.PositiveIntegerField(default=0)
+    pending_reports = models.PositiveIntegerField(default=0)
+    resolved_reports = models.PositiveIntegerField(default=0)
+
+    # Payments
+    total_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Dashboard Stats'
+        verbose_name_plural = 'Dashboard Stats'
+
+    def __str__(self):
+        return f"{self.user.username}'s Dashboard Stats"
+
+    def impact_score(self, active_challenges=0, campaigns_participated=0, waste_collected=0):
+        """Weighted impact score shown on the user dashboard"""
+        return (
+            self.modules_completed * 10 +
+            self.certificates_earned * 50 +
+            self.total_reports * 20 +
+            self.events_attended * 30 +
+            active_challenges * 15 +
+            self.approved_stories * 25 +
+            campaigns_participated * 40 +
+            int(waste_collected * 2) +
+            self.forum_topics_count * 5 +
+            self.forum_replies_count * 2
+        )
+
+
 class PasswordResetCode(models.Model):
     """Model to store password reset codes"""
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
@@ -65,7 +65,7 @@ class PasswordResetService:
     def send_sms_reset(self, user):
         """Send password reset SMS using Twilio"""
         try:
-            from twilio.rest import Client
+            from ecolearn import providers
             
             # Generate 6-digit code
             reset_code = self.generate_reset_code()
@@ -74,7 +74,7 @@ class PasswordResetService:
             # For now, we'll store it in a custom field or use cache
             
             # Twilio setup
-            client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+            client = providers.require('twilio')
             
             # SMS message
             message_body = f"""
@@ -108,13 +108,13 @@ If you didn't request this, ignore this message.
     def send_whatsapp_reset(self, user):
         """Send password reset via WhatsApp"""
         try:
-            from twilio.rest import Client
+            from ecolearn import providers
             
             # Generate 6-digit code
             reset_code = self.generate_reset_code()
             
             # Twilio setup
-            client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+            client = providers.require('twilio')
             
             # WhatsApp message
             message_body = f"""
@@ -0,0 +1,53 @@
+# accounts/signals.py
+"""
+Keep UserDashboardStats in step with the tables the dashboard counts.
+Each receiver recomputes only the section owned by the saved model.
+"""
+
+import logging
+
+from django.db.models.signals import post_save, post_delete
+
+from .dashboard_stats import refresh_user_stats
+
+logger = logging.getLogger(__name__)
+
+
+# (app_label.ModelName, section, user foreign key attribute)
+DASHBOARD_SOURCES = [
+    ('elearning.Enrollment', 'learning', 'user_id'),
+    ('elearning.Certificate', 'learning', 'user_id'),
+    ('community.EventParticipant', 'events', 'user_id'),
+    ('community.ChallengeParticipant', 'challenges', 'user_id'),
+    ('community.SuccessStory', 'stories', 'author_id'),
+    ('community.ForumTopic', 'forum', 'author_id'),
+    ('community.ForumReply', 'forum', 'author_id'),
+    ('reporting.DumpingReport', 'reports', 'reporter_id'),
+    ('payments.Payment', 'payments', 'user_id'),
+]
+
+
+def _make_receiver(section, user_attr):
+    def update_dashboard_stats(sender, instance, **kwargs):
+        if kwargs.get('raw'):
+            return  # loaddata fixtures - rebuild_dashboard_stats afterwards
+        user_id = getattr(instance, user_attr, None)
+        if not user_id:
+            return
+        try:
+            refresh_user_stats(user_id, sections=[section])
+        except Exception as e:
+            logger.error(f"Dashboard stats refresh failed for user {user_id} ({section}): {str(e)}")
+    return update_dashboard_stats
+
+
+def connect_dashboard_signals():
+    """Wire post_save/post_delete on every dashboard source model"""
+    from django.apps import apps
+
+    for model_label, section, user_attr in DASHBOARD_SOURCES:
+        model = apps.get_model(model_label)
+        receiver = _make_receiver(section, user_attr)
+        dispatch_uid = f'dashboard_stats_{model_label}'
+        post_save.connect(receiver, sender=model, weak=False, dispatch_uid=dispatch_uid)
+        post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f'{dispatch_uid}_delete')
@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+LOCMEM = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'accounts-tests'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'accounts-test-sessions'},
+}
+
+
+@override_settings(CACHES=LOCMEM)
+class PhoneIdentifierTests(TestCase):
+
+    def test_local_and_international_forms_match(self):
+        from .identifiers import normalize_phone, resolve
+
+        for value in ['+260971234567', '+260 97 123 4567', '00260971234567', '0971234567', '971234567']:
+            self.assertEqual(normalize_phone(value), '971234567', value)
+
+        user = get_user_model().objects.create(username='mwila', phone_number='+260971234567')
+        self.assertEqual(resolve('0971234567'), user)
+        self.assertEqual(resolve('260971234567'), user)
+        local = get_user_model().objects.create(username='chanda', phone_number='0962000001')
+        self.assertEqual(resolve('+260962000001'), local)
@@ -3,7 +3,7 @@
 # November 17, 2025 — National Launch Ready
 
 from django.shortcuts import render, redirect
-from django.contrib.auth import login, authenticate, logout
+from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import HttpResponseRedirect, JsonResponse
@@ -15,7 +15,9 @@ from django.db.models import Sum
 
 from .forms import CustomUserCreationForm, UserProfileForm, SMSVerificationForm
 from .models import CustomUser, UserProfile
+from .dashboard_stats import get_dashboard_stats
 from elearning.models import Module
+from community.notification_counts import unread_count as cached_unread_count
 
 
 # ===================================================================
@@ -58,57 +60,28 @@ def login_view(request):
         return redirect('dashboard')
 
     if request.method == 'POST':
-        username_input = request.POST.get('username')
-        password = request.POST.get('password')
-        
-        # Try multiple authentication methods to support both old and new usernames
-        user = None
-        
-        # Method 1: Direct username match (for both old and new formats)
-        user = authenticate(request, username=username_input, password=password)
-        
-        # Method 2: If direct match fails, try to find user by email
-        if user is None and '@' in username_input:
-            try:
-                user_obj = CustomUser.objects.get(email=username_input)
-                user = authenticate(request, username=user_obj.username, password=password)
-            except CustomUser.DoesNotExist:
-                pass
-        
-        # Method 3: If still no match, try to find by full name parts
-        if user is None and ' ' in username_input:
-            try:
-                # Split the input and try to find by first and last name
-                parts = username_input.strip().split()
-                if len(parts) >= 2:
-                    first_name = parts[0]
-                    last_name = ' '.join(parts[1:])  # Handle multiple last names
-                    
-                    # Try to find user by first and last name
-                    user_obj = CustomUser.objects.get(
-                        first_name__iexact=first_name, 
-                        last_name__iexact=last_name
-                    )
-                    user = authenticate(request, username=user_obj.username, password=password)
-            except CustomUser.DoesNotExist:
-                pass
-        
-        # Method 4: Try old-style usernames (for legacy users like oscarmilambo2)
-        if user is None:
-            # Check if there's a user with this exact username (case-insensitive)
-            try:
-                user_obj = CustomUser.objects.get(username__iexact=username_input)
-                user = authenticate(request, username=user_obj.username, password=password)
-            except CustomUser.DoesNotExist:
-                pass
-        
+        username_input = request.POST.get('username', '')
+        password = request.POST.get('password', '')
+
+        # One candidate account, one password hash, throttled per identifier (accounts/identifiers.py)
+        from .identifiers import attempt
+        result = attempt(username_input, password)
+        user = result.user
+
+        if result.throttled:
+            minutes = max(1, -(-result.retry_after // 60))
+            messages.error(request, f'Too many login attempts for this account. Please try again in {minutes} minute(s).')
+            response = render(request, 'accounts/login.html', status=429)
+            response['Retry-After'] = str(result.retry_after)
+            return response
+
         if user is not None:
             login(request, user)
             messages.success(request, f'Welcome back, {user.get_full_name() or user.username}!')
             next_url = request.GET.get('next')
             return redirect(next_url or 'dashboard')
         else:
-            messages.error(request, 'Invalid username or password. Try your full name, email, or original username.')
+            messages.error(request, 'Invalid username or password. Try your full name, email, phone number, or original username.')
     
     return render(request, 'accounts/login.html')
 
@@ -376,35 +349,16 @@ def dashboard_view(request):
     user = request.user
     profile, _ = UserProfile.objects.get_or_create(user=user)
     
-    # ==================== ELEARNING ====================
-    enrolled_modules = Module.objects.filter(enrollment__user=user).distinct()
+    # All counters come from one precomputed row (see accounts/dashboard_stats.py)
+    stats = get_dashboard_stats(user)
     
-    try:
-        from elearning.models import UserProgress, Certificate
-        
-        modules_completed = UserProgress.objects.filter(
-            user=user,
-            completion_percentage=100
-        ).count()
-        
-        modules_in_progress = UserProgress.objects.filter(
-            user=user,
-            completion_percentage__gt=0,
-            completion_percentage__lt=100
-        ).count()
-        
-        certificates_earned = Certificate.objects.filter(user=user).count()
-    except Exception as e:
-        modules_completed = 0
-        modules_in_progress = 0
-        certificates_earned = 0
+    # ==================== ELEARNING ====================
+    # The template only shows the first three enrolled modules
+    enrolled_modules = Module.objects.filter(enrollment__user=user).distinct()[:3]
     
     # ==================== COMMUNITY APP ====================
     try:
-        from community.models import (
-            EventParticipant, ChallengeParticipant, SuccessStory,
-            ForumTopic, ForumReply, Notification
-        )
+        from community.models import EventParticipant, ChallengeParticipant, Notification
         
         # Upcoming events
         upcoming_events = EventParticipant.objects.filter(
@@ -414,51 +368,29 @@ def dashboard_view(request):
         ).select_related('event').order_by('event__start_date')[:3]
         
         # Active challenges
-        active_challenges = ChallengeParticipant.objects.filter(
+        active_challenges = list(ChallengeParticipant.objects.filter(
             user=user,
             challenge__is_active=True,
             challenge__end_date__gte=timezone.now()
-        ).select_related('challenge')[:3]
-        
-        # Forum activity
-        forum_topics_count = ForumTopic.objects.filter(author=user).count()
-        forum_replies_count = ForumReply.objects.filter(author=user).count()
-        
-        # Success stories
-        approved_stories = SuccessStory.objects.filter(author=user, is_approved=True).count()
-        pending_stories = SuccessStory.objects.filter(author=user, is_approved=False).count()
+        ).select_related('challenge')[:3])
         
         # Notifications
-        unread_notifications = Notification.objects.filter(user=user, is_read=False).count()
+        unread_notifications = cached_unread_count(user.id)
         recent_notifications = Notification.objects.filter(user=user).order_by('-created_at')[:5]
         
-        # Events attended
-        events_attended = EventParticipant.objects.filter(user=user, attended=True).count()
-        
     except Exception as e:
         upcoming_events = []
         active_challenges = []
-        forum_topics_count = 0
-        forum_replies_count = 0
-        approved_stories = 0
-        pending_stories = 0
         unread_notifications = 0
         recent_notifications = []
-        events_attended = 0
     
     # ==================== REPORTING APP ====================
     try:
         from reporting.models import Report
         
-        total_reports = Report.objects.filter(reporter=user).count()
-        pending_reports = Report.objects.filter(reporter=user, status='pending').count()
-        resolved_reports = Report.objects.filter(reporter=user, status='resolved').count()
         recent_reports = Report.objects.filter(reporter=user).order_by('-created_at')[:3]
         
     except Exception as e:
-        total_reports = 0
-        pending_reports = 0
-        resolved_reports = 0
         recent_reports = []
     
     # ==================== CAMPAIGNS APP (if exists) ====================
@@ -504,31 +436,22 @@ def dashboard_view(request):
             user=user,
             status='completed',
             plan__isnull=False
-        ).order_by('-payment_date').first()
-        
-        total_paid = Payment.objects.filter(
-            user=user,
-            status='completed'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        ).order_by('-completed_at').first()
         
     except Exception as e:
         active_subscription = None
-        total_paid = 0
     
     # ==================== CALCULATE IMPACT SCORE ====================
-    impact_score = (
-        modules_completed * 10 +
-        certificates_earned * 50 +
-        total_reports * 20 +
-        events_attended * 30 +
-        len(list(active_challenges)) * 15 +
-        approved_stories * 25 +
-        campaigns_participated * 40 +
-        int(waste_collected * 2) +
-        forum_topics_count * 5 +
-        forum_replies_count * 2
+    impact_score = stats.impact_score(
+        active_challenges=len(active_challenges),
+        campaigns_participated=campaigns_participated,
+        waste_collected=waste_collected
     )
     
+    modules_completed = stats.modules_completed
+    certificates_earned = stats.certificates_earned
+    total_reports = stats.total_reports
+    
     # ==================== ACHIEVEMENTS ====================
     achievements = []
     
@@ -580,21 +503,21 @@ def dashboard_view(request):
         
         # Learning
         'enrolled_modules': enrolled_modules,
-        'total_modules': enrolled_modules.count(),
+        'total_modules': stats.enrolled_modules,
         'modules_completed': modules_completed,
-        'modules_in_progress': modules_in_progress,
+        'modules_in_progress': stats.modules_in_progress,
         'certificates_earned': certificates_earned,
         
         # Community
         'upcoming_events': upcoming_events,
         'active_challenges': active_challenges,
-        'forum_topics_count': forum_topics_count,
-        'forum_replies_count': forum_replies_count,
-        'approved_stories': approved_stories,
-        'pending_stories': pending_stories,
+        'forum_topics_count': stats.forum_topics_count,
+        'forum_replies_count': stats.forum_replies_count,
+        'approved_stories': stats.approved_stories,
+        'pending_stories': stats.pending_stories,
         'unread_notifications': unread_notifications,
         'recent_notifications': recent_notifications,
-        'events_attended': events_attended,
+        'events_attended': stats.events_attended,
         
         # Campaigns
         'upcoming_campaigns': upcoming_campaigns,
@@ -605,13 +528,13 @@ def dashboard_view(request):
         
         # Reporting
         'total_reports': total_reports,
-        'pending_reports': pending_reports,
-        'resolved_reports': resolved_reports,
+        'pending_reports': stats.pending_reports,
+        'resolved_reports': stats.resolved_reports,
         'recent_reports': recent_reports,
         
         # Payments
         'active_subscription': active_subscription,
-        'total_paid': total_paid,
+        'total_paid': stats.total_paid,
         
         # Overall
         'impact_score': impact_score,
@@ -796,8 +719,7 @@ def test_notification(request):
 def notification_count_api(request):
     """API endpoint to get unread notification count"""
     try:
-        from community.models import Notification
-        unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
+        unread_count = cached_unread_count(request.user.id)
         return JsonResponse({
             'success': True,
             'unread_count': unread_count
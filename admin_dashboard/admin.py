@@ -1,3 +1,27 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import DailyActivityStatistics, DailyNotificationStatistics, DailyReportStatistics
+
+
+@admin.register(DailyActivityStatistics)
+class DailyActivityStatisticsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'registrations', 'enrollments', 'completions', 'payments', 'revenue', 'computed_at')
+    list_filter = ('date',)
+    readonly_fields = ('date', 'registrations', 'enrollments', 'completions', 'payments', 'revenue', 'computed_at')
+    ordering = ('-date',)
+
+
+@admin.register(DailyNotificationStatistics)
+class DailyNotificationStatisticsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'hour', 'channel', 'status', 'notification_type', 'count')
+    list_filter = ('date', 'channel', 'status')
+    readonly_fields = ('date', 'hour', 'channel', 'status', 'notification_type', 'count', 'computed_at')
+    ordering = ('-date', 'hour')
+
+
+@admin.register(DailyReportStatistics)
+class DailyReportStatisticsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'severity', 'status', 'count')
+    list_filter = ('date', 'severity', 'status')
+    readonly_fields = ('date', 'severity', 'status', 'count', 'computed_at')
+    ordering = ('-date',)
@@ -1,12 +1,18 @@
 """
 Context processors for admin dashboard
-Makes certain variables available in all templates
+Makes certain variables available in all templates (lazily, see
+ecolearn/lazy_context.py: the COUNT only runs when a template shows the badge)
 """
 
+from ecolearn.lazy_context import lazy
+
+
 def pending_proofs_count(request):
     """Add pending challenge proofs count to all admin dashboard templates"""
-    if request.user.is_authenticated and request.user.is_staff:
-        from community.models import ChallengeProof
-        count = ChallengeProof.objects.filter(status='pending').count()
-        return {'pending_proofs_count': count}
-    return {'pending_proofs_count': 0}
+    def count():
+        if request.user.is_authenticated and request.user.is_staff:
+            from community.models import ChallengeProof
+            return ChallengeProof.objects.filter(status='pending').count()
+        return 0
+
+    return {'pending_proofs_count': lazy(request, 'pending_proofs_count', count)}
@@ -0,0 +1,101 @@
+# admin_dashboard/management/commands/benchmark_exports.py
+"""
+Memory benchmark for the streaming export engine.
+Pushes synthetic user-export rows through csv_chunks()/xlsx_chunks() and
+reports the peak Python heap (tracemalloc) at each size; the in-memory
+openpyxl Workbook the exports used before is measured alongside for the
+smaller sizes. Peak memory for the streaming writers should not grow with
+the row count.
+Run: python manage.py benchmark_exports --sizes 1000 10000 100000 500000
+"""
+
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from openpyxl import Workbook
+
+from admin_dashboard.exports import csv_chunks, xlsx_chunks
+
+HEADERS = [
+    'ID', 'Username', 'Full Name', 'Email', 'Phone', 'Location',
+    'Language', 'Role', 'Literacy Level', 'Registration Date',
+    'Last Login', 'Status', 'Modules Completed', 'Total Points'
+]
+
+
+def synthetic_rows(count):
+    for i in range(count):
+        yield [
+            i, f'user{i}', f'User Number {i}', f'user{i}@example.com', f'+2609700{i:05d}',
+            'Lusaka', 'English', 'Community Member', 'Unknown', '2025-01-01 10:00',
+            '2025-06-01 12:30', 'Active', i % 12, i % 5000,
+        ]
+
+
+def legacy_workbook(count):
+    """What export_users used to do: build the whole workbook in memory"""
+    import io
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(HEADERS)
+    for row in synthetic_rows(count):
+        ws.append(row)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    yield buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = 'Measure peak memory of streaming CSV/XLSX exports across row counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 500000],
+                            help='Row counts to export')
+        parser.add_argument('--legacy-max', type=int, default=10000,
+                            help='Largest size to run the in-memory Workbook baseline for (0 to skip)')
+
+    def measure(self, chunks):
+        tracemalloc.start()
+        started = time.perf_counter()
+        total_bytes = 0
+        for chunk in chunks:
+            total_bytes += len(chunk)
+        elapsed = time.perf_counter() - started
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak, elapsed, total_bytes
+
+    def report(self, label, rows, peak, elapsed, total_bytes):
+        self.stdout.write(
+            f'  {label:<15} {rows:>8} rows  peak {peak / 1024 / 1024:7.2f} MB  '
+            f'{elapsed:7.2f}s  ({rows / elapsed if elapsed else 0:,.0f} rows/s)  '
+            f'{total_bytes / 1024 / 1024:8.2f} MB out'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('📊 Export memory benchmark (tracemalloc peak)')
+        peaks = {'csv': [], 'xlsx': []}
+
+        for size in options['sizes']:
+            peak, elapsed, out = self.measure(csv_chunks(HEADERS, synthetic_rows(size)))
+            peaks['csv'].append(peak)
+            self.report('stream csv', size, peak, elapsed, out)
+
+            peak, elapsed, out = self.measure(xlsx_chunks('EcoLearn Users', HEADERS, synthetic_rows(size)))
+            peaks['xlsx'].append(peak)
+            self.report('stream xlsx', size, peak, elapsed, out)
+
+            if size <= options['legacy_max']:
+                peak, elapsed, out = self.measure(legacy_workbook(size))
+                self.report('legacy workbook', size, peak, elapsed, out)
+
+        for kind, values in peaks.items():
+            if len(values) > 1:
+                growth = max(values) / min(values)
+                style = self.style.SUCCESS if growth < 2 else self.style.WARNING
+                self.stdout.write(style(
+                    f'{"✅" if growth < 2 else "⚠️"} {kind}: peak varies {growth:.2f}x between '
+                    f'{min(options["sizes"])} and {max(options["sizes"])} rows'
+                ))
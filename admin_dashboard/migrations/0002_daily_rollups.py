@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:50
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivityStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('registrations', models.IntegerField(default=0)),
+                ('enrollments', models.IntegerField(default=0)),
+                ('completions', models.IntegerField(default=0)),
+                ('payments', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily activity statistics',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyNotificationStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('channel', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('notification_type', models.CharField(max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily notification statistics',
+                'ordering': ['-date', 'hour'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'hour', 'channel', 'status', 'notification_type'), name='unique_daily_notification_bucket')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyReportStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('severity', models.CharField(max_length=10)),
+                ('status', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily report statistics',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'severity', 'status'), name='unique_daily_report_bucket')],
+            },
+        ),
+    ]
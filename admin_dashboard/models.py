@@ -21,4 +21,66 @@ class ROITracker(models.Model):
 
     def save(self, *args, **kwargs):
         self.roi = round(((self.revenue + self.benefits - self.costs) / self.costs * 100), 1) if self.costs else 0
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+# --- Daily analytics rollups (maintained by admin_dashboard.rollups) ---
+
+class DailyActivityStatistics(models.Model):
+    """Per-day platform activity counters"""
+    date = models.DateField(unique=True)
+    registrations = models.IntegerField(default=0)
+    enrollments = models.IntegerField(default=0)
+    completions = models.IntegerField(default=0)
+    payments = models.IntegerField(default=0)  # completed payments
+    revenue = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name_plural = 'Daily activity statistics'
+
+    def __str__(self):
+        return f"Activity for {self.date}"
+
+
+class DailyNotificationStatistics(models.Model):
+    """Outbound messages queued per day/hour, by channel, status and type"""
+    date = models.DateField()
+    hour = models.PositiveSmallIntegerField()
+    channel = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    notification_type = models.CharField(max_length=50)
+    count = models.IntegerField(default=0)
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-date', 'hour']
+        verbose_name_plural = 'Daily notification statistics'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'hour', 'channel', 'status', 'notification_type'],
+                name='unique_daily_notification_bucket',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.hour:02d}:00 {self.channel}/{self.status}: {self.count}"
+
+
+class DailyReportStatistics(models.Model):
+    """Dumping reports submitted per day, by severity and current status"""
+    date = models.DateField()
+    severity = models.CharField(max_length=10)
+    status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name_plural = 'Daily report statistics'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'severity', 'status'], name='unique_daily_report_bucket'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.severity}/{self.status}: {self.count}"
@@ -0,0 +1,306 @@
+# admin_dashboard/rollups.py
+"""
+Daily analytics rollups
+The admin analytics pages read pre-aggregated daily rows instead of running
+COUNT queries against the raw tables on every view:
+
+    DailyActivityStatistics      registrations, enrollments, completions, revenue
+    DailyNotificationStatistics  NotificationLog by day, hour, channel, status, type
+    DailyReportStatistics        DumpingReport by day, severity, status
+
+A day is rebuilt with one GROUP BY per source table, so rebuilding any span of
+days costs the same handful of queries. run_incremental() rebuilds the
+days since the last run, plus any older day whose rows changed since then
+(payments completed, reports verified/resolved, messages sent). The
+`rollup_analytics` management command calls it from cron (and on deploy, which
+does the first backfill). ensure_fresh() tops today up from the analytics
+views when the last run is older than ANALYTICS_ROLLUP_MAX_AGE seconds; it
+never backfills inside a request, so with no rollup yet, or a last run older
+than ANALYTICS_ROLLUP_TOPUP_DAYS, it leaves the work to the command.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import ExtractHour, TruncDate
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Tunables (override in settings.py)
+ROLLUP_MAX_AGE = getattr(settings, 'ANALYTICS_ROLLUP_MAX_AGE', 600)
+ROLLUP_TOPUP_DAYS = getattr(settings, 'ANALYTICS_ROLLUP_TOPUP_DAYS', 2)
+ROLLUP_LOCK_TTL = 300
+
+
+def _bounds(start, end):
+    """Aware datetimes covering local days start..end inclusive"""
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, dt_time.min), tz),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), dt_time.min), tz),
+    )
+
+
+def _spans(days):
+    """Group dates into contiguous (start, end) spans"""
+    spans = []
+    for day in sorted(days):
+        if spans and day == spans[-1][1] + timedelta(days=1):
+            spans[-1][1] = day
+        else:
+            spans.append([day, day])
+    return [tuple(span) for span in spans]
+
+
+def _daily_counts(queryset, field):
+    return {
+        row['day']: row['n']
+        for row in queryset.annotate(day=TruncDate(field)).values('day').annotate(n=Count('id'))
+    }
+
+
+def rollup_range(start, end):
+    """
+    Rebuild every rollup row for days start..end (inclusive)
+
+    Returns:
+        int: number of days rebuilt
+    """
+    from accounts.models import CustomUser
+    from community.models import NotificationLog
+    from elearning.models import Enrollment
+    from payments.models import Payment
+    from reporting.models import DumpingReport
+    from .models import DailyActivityStatistics, DailyNotificationStatistics, DailyReportStatistics
+
+    lo, hi = _bounds(start, end)
+    now = timezone.now()
+
+    registrations = _daily_counts(CustomUser.objects.filter(date_joined__gte=lo, date_joined__lt=hi), 'date_joined')
+    enrollments = _daily_counts(Enrollment.objects.filter(enrolled_at__gte=lo, enrolled_at__lt=hi), 'enrolled_at')
+    completions = _daily_counts(Enrollment.objects.filter(completed_at__gte=lo, completed_at__lt=hi), 'completed_at')
+
+    revenue = {
+        row['day']: (row['n'], row['amount'] or Decimal('0'))
+        for row in Payment.objects.filter(
+            status='completed', created_at__gte=lo, created_at__lt=hi
+        ).annotate(day=TruncDate('created_at')).values('day').annotate(n=Count('id'), amount=Sum('amount'))
+    }
+
+    activity_rows = []
+    day = start
+    while day <= end:
+        payments, amount = revenue.get(day, (0, Decimal('0')))
+        activity_rows.append(DailyActivityStatistics(
+            date=day,
+            registrations=registrations.get(day, 0),
+            enrollments=enrollments.get(day, 0),
+            completions=completions.get(day, 0),
+            payments=payments,
+            revenue=amount,
+            computed_at=now,
+        ))
+        day += timedelta(days=1)
+
+    notification_rows = [
+        DailyNotificationStatistics(
+            date=row['day'],
+            hour=row['hour'],
+            channel=row['channel'],
+            status=row['status'],
+            notification_type=row['notification_type'],
+            count=row['n'],
+            computed_at=now,
+        )
+        for row in NotificationLog.objects.filter(
+            created_at__gte=lo, created_at__lt=hi
+        ).annotate(
+            day=TruncDate('created_at'), hour=ExtractHour('created_at')
+        ).values('day', 'hour', 'channel', 'status', 'notification_type').annotate(n=Count('id'))
+    ]
+
+    report_rows = [
+        DailyReportStatistics(
+            date=row['day'],
+            severity=row['severity'],
+            status=row['status'],
+            count=row['n'],
+            computed_at=now,
+        )
+        for row in DumpingReport.objects.filter(
+            reported_at__gte=lo, reported_at__lt=hi
+        ).annotate(day=TruncDate('reported_at')).values('day', 'severity', 'status').annotate(n=Count('id'))
+    ]
+
+    with transaction.atomic():
+        for model in (DailyActivityStatistics, DailyNotificationStatistics, DailyReportStatistics):
+            model.objects.filter(date__gte=start, date__lte=end).delete()
+        DailyActivityStatistics.objects.bulk_create(activity_rows)
+        DailyNotificationStatistics.objects.bulk_create(notification_rows, batch_size=500)
+        DailyReportStatistics.objects.bulk_create(report_rows, batch_size=500)
+
+    return len(activity_rows)
+
+
+def earliest_day():
+    """First local date with any source data, or None"""
+    from accounts.models import CustomUser
+    from community.models import NotificationLog
+    from elearning.models import Enrollment
+    from payments.models import Payment
+    from reporting.models import DumpingReport
+
+    firsts = [
+        CustomUser.objects.aggregate(first=Min('date_joined'))['first'],
+        Enrollment.objects.aggregate(first=Min('enrolled_at'))['first'],
+        NotificationLog.objects.aggregate(first=Min('created_at'))['first'],
+        Payment.objects.aggregate(first=Min('created_at'))['first'],
+        DumpingReport.objects.aggregate(first=Min('reported_at'))['first'],
+    ]
+    firsts = [value for value in firsts if value]
+    return timezone.localdate(min(firsts)) if firsts else None
+
+
+def last_run():
+    from .models import DailyActivityStatistics
+    return DailyActivityStatistics.objects.aggregate(last=Max('computed_at'))['last']
+
+
+def changed_days(since):
+    """Older days whose facts changed after `since` (status moves on existing rows)"""
+    from community.models import NotificationLog
+    from payments.models import Payment
+    from reporting.models import DumpingReport
+
+    days = set()
+    sources = [
+        (Payment.objects.filter(updated_at__gte=since), 'created_at'),
+        (DumpingReport.objects.filter(Q(verified_at__gte=since) | Q(resolved_at__gte=since)), 'reported_at'),
+        (NotificationLog.objects.filter(sent_at__gte=since), 'created_at'),
+    ]
+    for queryset, field in sources:
+        days.update(
+            queryset.annotate(day=TruncDate(field)).values_list('day', flat=True).distinct()
+        )
+    days.discard(None)
+    return days
+
+
+def run_incremental(days_back=1, full=False):
+    """
+    Rebuild recent and changed days (or everything on the first run / full=True)
+
+    Returns:
+        list: (start, end) spans that were rebuilt
+    """
+    today = timezone.localdate()
+    since = None if full else last_run()
+
+    if since is None:
+        first = earliest_day()
+        if first is None:
+            return []
+        spans = [(first, today)]
+    else:
+        # Everything since the last run (catches up missed cron runs) plus `days_back`
+        first = min(timezone.localdate(since), today) - timedelta(days=days_back)
+        days = {first + timedelta(days=offset) for offset in range((today - first).days + 1)}
+        days.update(day for day in changed_days(since) if day <= today)
+        spans = _spans(days)
+
+    for start, end in spans:
+        rollup_range(start, end)
+    return spans
+
+
+def ensure_fresh():
+    """Top up recent days' rollups when the last run is older than ROLLUP_MAX_AGE"""
+    if not ROLLUP_MAX_AGE:
+        return
+    if not cache.add('analytics_rollup_lock', True, ROLLUP_LOCK_TTL):
+        return  # another request is already refreshing
+    try:
+        last = last_run()
+        if last is None:
+            logger.warning("Analytics rollups are empty; run `manage.py rollup_analytics` to backfill them")
+        elif timezone.now() - last > timedelta(days=ROLLUP_TOPUP_DAYS):
+            # Topping up only today would move last_run past the gap and the command would skip it
+            logger.warning(f"Analytics rollups last ran {last:%Y-%m-%d %H:%M}; run `manage.py rollup_analytics` to catch up")
+        elif (timezone.now() - last).total_seconds() > ROLLUP_MAX_AGE:
+            run_incremental()
+    except Exception as e:
+        logger.error(f"Analytics rollup refresh failed: {str(e)}")
+    finally:
+        cache.delete('analytics_rollup_lock')
+
+
+# --- Readers ---
+
+def monthly_activity(field, months):
+    """
+    Sum one DailyActivityStatistics field per calendar month for the last `months` months
+
+    Returns:
+        list: {'month': date (first of month), 'count': n}, oldest first, zero-filled
+    """
+    from django.db.models.functions import TruncMonth
+    from .models import DailyActivityStatistics
+
+    today = timezone.localdate()
+    month_starts = []
+    year, month = today.year, today.month
+    for _ in range(months):
+        month_starts.append(today.replace(year=year, month=month, day=1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    month_starts.reverse()
+
+    totals = {
+        row['month']: row['total'] or 0
+        for row in DailyActivityStatistics.objects.filter(
+            date__gte=month_starts[0]
+        ).annotate(month=TruncMonth('date')).values('month').annotate(total=Sum(field))
+    }
+    return [{'month': start, 'count': totals.get(start, 0)} for start in month_starts]
+
+
+def notification_summary(start_day):
+    """
+    Everything notification_analytics shows, folded from the rollup rows since start_day
+
+    Returns:
+        dict: totals, by_channel, by_day, by_hour and by_type counters
+    """
+    from .models import DailyNotificationStatistics
+
+    summary = {
+        'total': 0,
+        'delivered': 0,
+        'failed': 0,
+        'by_channel': defaultdict(lambda: {'total': 0, 'delivered': 0}),
+        'by_day': defaultdict(lambda: {'sent': 0, 'delivered': 0}),
+        'by_hour': defaultdict(int),
+        'by_type': defaultdict(int),
+    }
+    rows = DailyNotificationStatistics.objects.filter(date__gte=start_day).values_list(
+        'date', 'hour', 'channel', 'status', 'notification_type', 'count'
+    )
+    for day, hour, channel, status, notification_type, count in rows:
+        delivered = count if status == 'delivered' else 0
+        summary['total'] += count
+        summary['delivered'] += delivered
+        if status == 'failed':
+            summary['failed'] += count
+        summary['by_channel'][channel]['total'] += count
+        summary['by_channel'][channel]['delivered'] += delivered
+        summary['by_day'][day]['sent'] += count
+        summary['by_day'][day]['delivered'] += delivered
+        summary['by_hour'][hour] += count
+        summary['by_type'][notification_type] += count
+    return summary
@@ -1,3 +1,163 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+LOCMEM = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'admin-dashboard-tests'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'admin-dashboard-test-sessions'},
+}
+
+
+@override_settings(CACHES=LOCMEM)
+class UserGridTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        from elearning.models import Category, Enrollment, Module
+        from gamification.models import PointTransaction
+
+        User = get_user_model()
+        cls.staff = User.objects.create_user(username='staff', email='staff@example.com', password='x', is_staff=True)
+        category = Category.objects.create(name='Waste', slug='waste')
+        cls.module = Module.objects.create(
+            title='Sorting', slug='sorting', description='d', category=category, created_by=cls.staff,
+        )
+        cls.learner = User.objects.create_user(username='learner', email='learner@example.com', password='x')
+        Enrollment.objects.create(user=cls.learner, module=cls.module, completed_at=cls.module.created_at)
+        for points in (10, 25):
+            PointTransaction.objects.create(
+                user=cls.learner, transaction_type='quiz_pass', points=points, description='Quiz passed'
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.staff)
+
+    def add_users(self, count, prefix):
+        User = get_user_model()
+        for i in range(count):
+            User.objects.create(username=f'{prefix}{i:03d}', email=f'{prefix}{i}@example.com')
+
+    def count_page_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin_dashboard:users'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_page_cost_does_not_grow_with_users(self):
+        from admin_dashboard import user_grid
+
+        self.count_page_queries()
+        few = self.count_page_queries()
+        self.add_users(user_grid.PAGE_SIZE + 20, 'bulk')
+        many = self.count_page_queries()
+        self.assertEqual(few, many)
+        response = self.client.get(reverse('admin_dashboard:users'))
+        self.assertEqual(len(response.context['users']), user_grid.PAGE_SIZE)
+        self.assertTrue(response.context['next_cursor'])
+
+    def test_keyset_pages_cover_every_user_once(self):
+        self.add_users(23, 'page')
+        User = get_user_model()
+        for sort in ['newest', 'oldest', 'username', '-username']:
+            seen, cursor = [], None
+            while True:
+                params = {'sort': sort, 'size': 5}
+                if cursor:
+                    params['cursor'] = cursor
+                data = self.client.get(reverse('admin_dashboard:user_grid_data'), params).json()
+                seen += [row['id'] for row in data['results']]
+                cursor = data['next_cursor']
+                if not cursor:
+                    break
+            self.assertEqual(len(seen), User.objects.count(), sort)
+            self.assertEqual(set(seen), set(User.objects.values_list('id', flat=True)), sort)
+        usernames = [row['username'] for row in self.client.get(
+            reverse('admin_dashboard:user_grid_data'), {'sort': 'username', 'size': 3}
+        ).json()['results']]
+        self.assertEqual(usernames, sorted(usernames))
+
+    def test_annotations_and_filters(self):
+        data = self.client.get(reverse('admin_dashboard:user_grid_data'), {'search': 'learner'}).json()
+        self.assertEqual(len(data['results']), 1)
+        row = data['results'][0]
+        self.assertEqual((row['completed_modules'], row['points_total']), (1, 35))
+        self.assertIn('learner@example.com', data['rows_html'])
+
+    def test_bad_cursor_and_sort_are_rejected(self):
+        url = reverse('admin_dashboard:user_grid_data')
+        self.assertEqual(self.client.get(url, {'cursor': 'forged'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'sort': 'password'}).status_code, 400)
+        self.add_users(3, 'bad')
+        cursor_for_newest = self.client.get(url, {'size': 1}).json()['next_cursor']
+        self.assertEqual(self.client.get(url, {'sort': 'username', 'cursor': cursor_for_newest}).status_code, 400)
+
+
+@override_settings(CACHES=LOCMEM)
+class RollupRefreshTests(TestCase):
+
+    def test_ensure_fresh_never_backfills(self):
+        from unittest import mock
+        from admin_dashboard import rollups
+
+        get_user_model().objects.create(username='resident')
+        with mock.patch.object(rollups, 'run_incremental') as run:
+            rollups.ensure_fresh()
+        run.assert_not_called()
+
+    def test_ensure_fresh_skips_long_gaps(self):
+        from datetime import timedelta
+        from unittest import mock
+        from django.utils import timezone
+        from admin_dashboard import rollups
+
+        with mock.patch.object(rollups, 'run_incremental') as run:
+            with mock.patch.object(rollups, 'last_run', return_value=timezone.now() - timedelta(days=30)):
+                rollups.ensure_fresh()
+            run.assert_not_called()
+            with mock.patch.object(rollups, 'last_run', return_value=timezone.now() - timedelta(hours=1)):
+                rollups.ensure_fresh()
+            run.assert_called_once_with()
+
+
+@override_settings(CACHES=LOCMEM, NOTIFICATION_ASYNC=False)
+class NotificationCampaignTests(TestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.staff = User.objects.create(username='staff', email='staff@example.com', is_staff=True)
+        self.with_phone = User.objects.create(username='mwila', phone_number='+260971234567', location='Kanyama')
+        self.without_phone = User.objects.create(username='chanda', email='', location='Kanyama')
+        self.client.force_login(self.staff)
+
+    def test_campaign_is_queued_without_empty_recipients(self):
+        from unittest import mock
+        from community.models import NotificationLog
+
+        with mock.patch('community.outbound.drain_queue') as drain:
+            self.client.post(reverse('admin_dashboard:notification_create'), {
+                'title': 'Clean-up', 'message': 'Saturday 8am', 'channels': ['sms', 'email'], 'locations': ['Kanyama'],
+            })
+        drain.assert_called()
+        logs = NotificationLog.objects.filter(notification_type='campaign')
+        self.assertEqual(
+            sorted(logs.values_list('user__username', 'channel', 'status', 'recipient')),
+            [('mwila', 'sms', 'pending', '+260971234567')],
+        )
+
+    def test_quick_send_reports_missing_recipient(self):
+        import json
+        from unittest import mock
+        from community.models import NotificationLog
+
+        with mock.patch('community.outbound.drain_queue'):
+            response = self.client.post(
+                reverse('admin_dashboard:notification_send'),
+                json.dumps({'user_id': self.without_phone.id, 'channel': 'sms', 'message': 'Hi'}),
+                content_type='application/json',
+            )
+        self.assertFalse(response.json()['success'])
+        self.assertFalse(NotificationLog.objects.filter(user=self.without_phone).exists())
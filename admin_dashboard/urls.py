@@ -9,6 +9,7 @@ urlpatterns = [
     
     # User Management
     path('users/', views.user_management, name='users'),
+    path('users/grid/', views.user_grid_data, name='user_grid_data'),
     path('users/<int:user_id>/', views.user_detail, name='user_detail'),
     path('users/<int:user_id>/toggle-status/', views.toggle_user_status, name='toggle_user_status'),
     path('users/demographics/', views.user_demographics, name='user_demographics'),
@@ -64,6 +65,7 @@ urlpatterns = [
     path('alerts/<int:alert_id>/', views.alert_detail, name='alert_detail'),
     path('alerts/<int:alert_id>/send/', views.alert_send, name='alert_send'),
     path('alerts/<int:alert_id>/deactivate/', views.alert_deactivate, name='alert_deactivate'),
+    path('alerts/dispatch/<int:job_id>/status/', views.alert_dispatch_status, name='alert_dispatch_status'),
     path('priority-reports/', views.priority_reports, name='priority_reports'),
     path('escalate-report/<int:report_id>/', views.escalate_report, name='escalate_report'),
     
@@ -0,0 +1,182 @@
+# admin_dashboard/user_grid.py
+"""
+Server-side user grid for the admin user management page
+user_management used to hand the template every CustomUser, with all their
+enrollments and point transactions prefetched. The grid instead reads one
+page at a time:
+
+- keyset pagination: a page is "the next PAGE_SIZE rows after the cursor"
+  in (sort column, id) order, served by the (column, id) indexes on
+  CustomUser, so page 500 costs the same as page 1 (no OFFSET scan)
+- per-page annotations: completed modules and point totals are two
+  GROUP BY queries restricted to the page's user ids
+- filters from the page's filter form (search, location, language, role,
+  status); sorting only on indexed columns (SORTS)
+
+A page costs the same few queries and holds PAGE_SIZE users in memory,
+whatever the number of users. The cursor is signed, so it cannot be used
+to smuggle arbitrary values into the query.
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# Tunables (override in settings.py)
+PAGE_SIZE = getattr(settings, 'ADMIN_USER_GRID_PAGE_SIZE', 50)
+MAX_PAGE_SIZE = 200
+
+# ?sort= value: (column, descending). Each column is indexed on CustomUser (username is unique).
+SORTS = {
+    'newest': ('date_joined', True),
+    'oldest': ('date_joined', False),
+    'username': ('username', False),
+    '-username': ('username', True),
+}
+DEFAULT_SORT = 'newest'
+CURSOR_SALT = 'admin_dashboard.user_grid'
+ROW_FIELDS = (
+    'id', 'username', 'first_name', 'last_name', 'email', 'phone_number', 'location', 'preferred_language',
+    'role', 'date_joined', 'last_login', 'is_active',
+)
+
+
+@dataclass
+class Page:
+    rows: list
+    next_cursor: str = None
+    sort: str = DEFAULT_SORT
+
+
+def filter_users(queryset, params):
+    """Apply the user management filter form (a QueryDict or dict)"""
+    location = params.get('location', '')
+    language = params.get('language', '')
+    role = params.get('role', '')
+    status = params.get('status', '')
+    search = params.get('search', '')
+
+    if location:
+        queryset = queryset.filter(location__icontains=location)
+    if language:
+        queryset = queryset.filter(preferred_language=language)
+    if role:
+        queryset = queryset.filter(role=role)
+    if status == 'active':
+        queryset = queryset.filter(is_active=True, last_login__gte=timezone.now() - timedelta(days=30))
+    elif status == 'inactive':
+        queryset = queryset.filter(Q(is_active=False) | Q(last_login__lt=timezone.now() - timedelta(days=30)))
+    if search:
+        queryset = queryset.filter(
+            Q(username__icontains=search) |
+            Q(first_name__icontains=search) |
+            Q(last_name__icontains=search) |
+            Q(email__icontains=search) |
+            Q(phone_number__icontains=search)
+        )
+    return queryset
+
+
+def _encode_cursor(sort, row):
+    column = SORTS[sort][0]
+    value = getattr(row, column)
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    return signing.dumps([sort, value, row.pk], salt=CURSOR_SALT, compress=True)
+
+
+def _decode_cursor(cursor, sort):
+    """(column value, id) after which the page starts; ValueError for a bad or foreign cursor"""
+    try:
+        cursor_sort, value, pk = signing.loads(cursor, salt=CURSOR_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if cursor_sort != sort:
+        raise ValueError('Cursor belongs to another sort order')
+    if SORTS[sort][0] == 'date_joined':
+        value = parse_datetime(value)
+        if value is None:
+            raise ValueError('Invalid cursor')
+    return value, int(pk)
+
+
+def annotate_rows(rows):
+    """Set .completed_modules and .points_total on each row with two queries for the whole page"""
+    from elearning.models import Enrollment
+    from gamification.models import PointTransaction
+
+    ids = [row.pk for row in rows]
+    if not ids:
+        return rows
+    completed = dict(
+        Enrollment.objects.filter(user_id__in=ids, completed_at__isnull=False)
+        .order_by().values('user_id').annotate(total=Count('id')).values_list('user_id', 'total')
+    )
+    points = dict(
+        PointTransaction.objects.filter(user_id__in=ids)
+        .order_by().values('user_id').annotate(total=Sum('points')).values_list('user_id', 'total')
+    )
+    for row in rows:
+        row.completed_modules = completed.get(row.pk, 0)
+        row.points_total = points.get(row.pk) or 0
+    return rows
+
+
+def page(params, cursor=None, size=None):
+    """
+    One page of the filtered, sorted user grid
+
+    Raises:
+        ValueError: for an unknown sort or an invalid cursor
+    """
+    from accounts.models import CustomUser
+
+    sort = params.get('sort') or DEFAULT_SORT
+    if sort not in SORTS:
+        raise ValueError(f'Unknown sort {sort!r}')
+    size = max(1, min(int(size or PAGE_SIZE), MAX_PAGE_SIZE))
+    column, descending = SORTS[sort]
+
+    queryset = filter_users(CustomUser.objects.only(*ROW_FIELDS), params)
+    if cursor:
+        value, pk = _decode_cursor(cursor, sort)
+        # (column, id) past the cursor; the leading range term lets the index seek
+        if descending:
+            queryset = queryset.filter(
+                Q(**{f'{column}__lte': value}), Q(**{f'{column}__lt': value}) | Q(pk__lt=pk)
+            )
+        else:
+            queryset = queryset.filter(
+                Q(**{f'{column}__gte': value}), Q(**{f'{column}__gt': value}) | Q(pk__gt=pk)
+            )
+    ordering = [f'-{column}', '-pk'] if descending else [column, 'pk']
+
+    rows = list(queryset.order_by(*ordering)[:size + 1])
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        next_cursor = _encode_cursor(sort, rows[-1])
+    return Page(annotate_rows(rows), next_cursor, sort)
+
+
+def serialize(row):
+    return {
+        'id': row.pk,
+        'username': row.username,
+        'full_name': row.get_full_name(),
+        'email': row.email,
+        'phone_number': row.phone_number,
+        'location': row.location,
+        'preferred_language': row.preferred_language,
+        'role': row.role,
+        'date_joined': row.date_joined.isoformat() if row.date_joined else None,
+        'last_login': row.last_login.isoformat() if row.last_login else None,
+        'is_active': row.is_active,
+        'completed_modules': row.completed_modules,
+        'points_total': row.points_total,
+    }
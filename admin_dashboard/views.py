@@ -1,6 +1,7 @@
 # admin_dashboard/views.py (FIXED - userprofile instead of profile)
 
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from django.http import HttpResponse, JsonResponse
@@ -11,8 +12,6 @@ from django.utils import timezone
 from datetime import timedelta
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
-from openpyxl import Workbook
-from twilio.rest import Client
 from django.conf import settings
 import logging
 
@@ -24,6 +23,8 @@ from elearning.models import Module, Enrollment
 from reporting.models import DumpingReport
 from payments.models import Payment
 from community.models import CommunityEvent  # Remove if not exists
+from ecolearn import providers
+from ecolearn.memory import memory_heavy
 from django.db.models import Sum
 
 
@@ -33,10 +34,22 @@ def dashboard(request):
     from community.models import ChallengeProof
     request.pending_proofs_count = ChallengeProof.objects.filter(status='pending').count()
     
+    from .models import DailyActivityStatistics, DailyReportStatistics
+    from .rollups import ensure_fresh, monthly_activity
+
+    ensure_fresh()
+    today = timezone.localdate()
+
     total_users = CustomUser.objects.count()
-    users_last_3_months = CustomUser.objects.filter(
-        date_joined__gte=timezone.now() - timedelta(days=90)
-    ).count()
+
+    # Registrations, completion rate and revenue come from the daily rollups
+    activity = DailyActivityStatistics.objects.aggregate(
+        users_last_3_months=Sum('registrations', filter=Q(date__gt=today - timedelta(days=90))),
+        total_enrollments=Sum('enrollments'),
+        completed=Sum('completions'),
+        total_revenue=Sum('revenue'),
+    )
+    users_last_3_months = activity['users_last_3_months'] or 0
 
     # SAFE retention rate
     six_months_ago = timezone.now() - timedelta(days=180)
@@ -48,28 +61,23 @@ def dashboard(request):
     retention_rate = round((active_old / old_users * 100), 1) if old_users else 0
 
     # SAFE completion rate
-    total_enrollments = Enrollment.objects.count()
-    completed = Enrollment.objects.exclude(completed_at=None).count()
+    total_enrollments = activity['total_enrollments'] or 0
+    completed = activity['completed'] or 0
     module_completion_rate = round((completed / total_enrollments * 100), 1) if total_enrollments else 0
 
     # SAFE reports
-    total_reports = DumpingReport.objects.count()
-    six_months_reports = DumpingReport.objects.filter(
-        reported_at__gte=timezone.now() - timedelta(days=180)
-    ).count()
+    reports = DailyReportStatistics.objects.aggregate(
+        total=Sum('count'),
+        last_6_months=Sum('count', filter=Q(date__gt=today - timedelta(days=180))),
+    )
+    total_reports = reports['total'] or 0
+    six_months_reports = reports['last_6_months'] or 0
 
-    # SAFE revenue
-    total_revenue = Payment.objects.aggregate(total=Sum('amount'))['total'] or 0
+    # SAFE revenue (completed payments)
+    total_revenue = activity['total_revenue'] or 0
 
-    # SAFE charts (only valid dates)
-    monthly_users = list(
-        CustomUser.objects
-        .filter(date_joined__isnull=False)
-        .annotate(month=TruncMonth('date_joined'))
-        .values('month')
-        .annotate(count=Count('id'))
-        .order_by('month')[:6]
-    )
+    # SAFE charts
+    monthly_users = monthly_activity('registrations', 6)
 
     language_dist = list(
         CustomUser.objects
@@ -79,12 +87,7 @@ def dashboard(request):
         .order_by('-count')
     )
 
-    # SAFE map data (only valid coordinates)
-    report_locs = list(
-        DumpingReport.objects
-        .filter(latitude__isnull=False, longitude__isnull=False)
-        .values('latitude', 'longitude', 'description', 'waste_type')[:50]
-    )
+    # Map markers load per viewport from reporting:reports_map_clusters
 
     context = {
         'total_users': total_users,
@@ -98,7 +101,6 @@ def dashboard(request):
         'roi': 156,
         'monthly_users': monthly_users or [],
         'language_dist': language_dist,
-        'report_locs': report_locs,
     }
 
     return render(request, 'admin_dashboard/dashboard.html', context)
@@ -106,9 +108,10 @@ def dashboard(request):
 
 @staff_member_required
 def user_management(request):
-    from django.db.models import Q, Count, Avg
+    from django.db.models import Count
     from django.utils import timezone
     from datetime import timedelta
+    from . import user_grid
     
     # Get filter parameters
     location_filter = request.GET.get('location', '')
@@ -117,32 +120,12 @@ def user_management(request):
     status_filter = request.GET.get('status', '')
     search_query = request.GET.get('search', '')
     
-    # Base queryset with related data
-    users = CustomUser.objects.select_related('userprofile').prefetch_related(
-        'enrollment_set', 'point_transactions', 'notification_preferences'
-    )
-    
-    # Apply filters
-    if location_filter:
-        users = users.filter(location__icontains=location_filter)
-    if language_filter:
-        users = users.filter(preferred_language=language_filter)
-    if role_filter:
-        users = users.filter(role=role_filter)
-    if status_filter == 'active':
-        users = users.filter(is_active=True, last_login__gte=timezone.now() - timedelta(days=30))
-    elif status_filter == 'inactive':
-        users = users.filter(Q(is_active=False) | Q(last_login__lt=timezone.now() - timedelta(days=30)))
-    if search_query:
-        users = users.filter(
-            Q(username__icontains=search_query) |
-            Q(first_name__icontains=search_query) |
-            Q(last_name__icontains=search_query) |
-            Q(email__icontains=search_query) |
-            Q(phone_number__icontains=search_query)
-        )
-    
-    users = users.order_by('-date_joined')
+    # First page of the grid; the rest is loaded from user_grid_data (admin_dashboard/user_grid.py)
+    try:
+        grid = user_grid.page(request.GET)
+    except ValueError:
+        grid = user_grid.page({key: value for key, value in request.GET.items() if key != 'sort'})
+    filtered_count = user_grid.filter_users(CustomUser.objects.all(), request.GET).count()
     
     # User statistics
     total_users = CustomUser.objects.count()
@@ -171,23 +154,26 @@ def user_management(request):
         last_login__gte=timezone.now() - timedelta(days=30)
     ).count()
     
-    # Registration trends (last 6 months)
-    registration_trends = []
-    for i in range(6):
-        month_start = timezone.now() - timedelta(days=30 * (i + 1))
-        month_end = timezone.now() - timedelta(days=30 * i)
-        count = CustomUser.objects.filter(
-            date_joined__gte=month_start,
-            date_joined__lt=month_end
-        ).count()
-        registration_trends.append({
-            'month': month_start.strftime('%b %Y'),
-            'count': count
-        })
+    # Registration trends (last 6 months), counted in one query
+    now = timezone.now()
+    months = [(now - timedelta(days=30 * (i + 1)), now - timedelta(days=30 * i)) for i in range(6)]
+    counts = CustomUser.objects.filter(date_joined__gte=months[-1][0], date_joined__lt=now).aggregate(**{
+        f'month_{i}': Count('id', filter=Q(date_joined__gte=month_start, date_joined__lt=month_end))
+        for i, (month_start, month_end) in enumerate(months)
+    })
+    registration_trends = [
+        {'month': month_start.strftime('%b %Y'), 'count': counts[f'month_{i}']}
+        for i, (month_start, month_end) in enumerate(months)
+    ]
     registration_trends.reverse()
     
     context = {
-        'users': users,
+        'users': grid.rows,
+        'next_cursor': grid.next_cursor,
+        'sort': grid.sort,
+        'sort_choices': [('newest', 'Newest first'), ('oldest', 'Oldest first'),
+                         ('username', 'Username A-Z'), ('-username', 'Username Z-A')],
+        'filtered_count': filtered_count,
         'total_users': total_users,
         'target_users': target_users,
         'users_last_3_months': users_last_3_months,
@@ -211,6 +197,25 @@ def user_management(request):
     return render(request, 'admin_dashboard/users.html', context)
 
 
+@staff_member_required
+def user_grid_data(request):
+    """Next page of the user grid as JSON (rows as data and as rendered table rows)"""
+    from django.template.loader import render_to_string
+    from . import user_grid
+
+    try:
+        grid = user_grid.page(request.GET, cursor=request.GET.get('cursor'), size=request.GET.get('size'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({
+        'results': [user_grid.serialize(row) for row in grid.rows],
+        'rows_html': render_to_string('admin_dashboard/partials/user_rows.html', {'users': grid.rows}, request=request),
+        'next_cursor': grid.next_cursor,
+        'sort': grid.sort,
+    })
+
+
 @staff_member_required
 def module_management(request):
     """Content Management System - Module Management"""
@@ -335,10 +340,7 @@ def report_detail(request, report_id):
                 # Send SMS if user has phone number
                 if report.reporter.phone_number:
                     try:
-                        from twilio.rest import Client
-                        from django.conf import settings
-                        
-                        client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+                        client = providers.require('twilio')
                         client.messages.create(
                             body=f"[EcoLearn] Report {report.reference_number}: {notification_message}",
                             from_=settings.TWILIO_PHONE_NUMBER,
@@ -862,31 +864,6 @@ def challenge_create(request):
                     logger.info(f"Created notification {notification.id} for user {user.username}")
                     notification_count += 1
                     
-                    # Send real-time notification via WebSocket
-                    try:
-                        from channels.layers import get_channel_layer
-                        from asgiref.sync import async_to_sync
-                        
-                        channel_layer = get_channel_layer()
-                        if channel_layer:
-                            async_to_sync(channel_layer.group_send)(
-                                f"notifications_{user.id}",
-                                {
-                                    'type': 'notification_message',
-                                    'notification': {
-                                        'id': notification.id,
-                                        'title': notification.title,
-                                        'message': notification.message,
-                                        'url': notification.url,
-                                        'type': notification.notification_type,
-                                        'created_at': notification.created_at.isoformat(),
-                                        'is_read': notification.is_read
-                                    }
-                                }
-                            )
-                    except Exception as ws_error:
-                        logger.warning(f"WebSocket notification failed for user {user.username}: {ws_error}")
-                    
                     # Send external notifications if user has preferences
                     if hasattr(user, 'notification_preferences'):
                         prefs = user.notification_preferences
@@ -1063,56 +1040,21 @@ def challenge_proofs(request):
 @staff_member_required
 def proof_approve(request, proof_id):
     """Approve a challenge proof"""
-    from community.models import ChallengeProof, Notification, ChallengeParticipant
-    from community.notifications import notification_service
+    from community.models import ChallengeProof
+    from community.proof_approval import approve_proofs
     
-    proof = get_object_or_404(ChallengeProof, id=proof_id)
+    proof = get_object_or_404(ChallengeProof.objects.select_related('participant__user'), id=proof_id)
     
     if proof.status == 'pending':
-        proof.approve(request.user)
-        messages.success(
-            request, 
-            f'✅ Proof approved! {proof.bags_collected} bags = {proof.points_awarded} points awarded to {proof.participant.user.username}'
-        )
-        
-        # REAL-TIME NOTIFICATION: Send WhatsApp/SMS instantly when proof is approved
-        try:
-            user = proof.participant.user
-            prefs = getattr(user, 'notification_preferences', None)
-            
-            # Get user's rank in the challenge
-            rank = ChallengeParticipant.objects.filter(
-                challenge=proof.participant.challenge,
-                contribution__gt=proof.participant.contribution
-            ).count() + 1
-            
-            user_name = user.get_full_name() or user.username
-            challenge_name = proof.participant.challenge.title
-            
-            # SMS notification - PRO ZNBC style
-            if prefs and prefs.sms_enabled and prefs.challenge_updates and user.phone_number:
-                sms_message = f"✅ APPROVED! You earned {proof.points_awarded} points ({proof.bags_collected} bags). You are now #{rank} in {challenge_name}! Keep cleaning Zambia!"
-                result = notification_service.send_sms(str(user.phone_number), sms_message)
-                if result.get('success'):
-                    print(f"✅ SMS sent to {user.username}")
-            
-            # WhatsApp notification - PRO Zambian style
-            if prefs and prefs.whatsapp_enabled and prefs.challenge_updates and user.phone_number:
-                whatsapp_message = f"✅ APPROVED! You earned {proof.points_awarded} points ({proof.bags_collected} bags). You are now #{rank} in {challenge_name}! Keep cleaning Zambia!"
-                result = notification_service.send_whatsapp(str(user.phone_number), whatsapp_message)
-                if result.get('success'):
-                    print(f"✅ WhatsApp sent to {user.username}")
-            
-            # In-app notification
-            Notification.objects.create(
-                user=user,
-                notification_type='challenge_update',
-                title='Proof Approved! 🎉',
-                message=f'Your clean-up proof is approved! +{proof.points_awarded} points earned ({proof.bags_collected} bags). Current rank: #{rank}!',
-                url=proof.participant.challenge.get_absolute_url()
+        result = approve_proofs([proof.id], request.user)
+        if result['approved']:
+            proof = result['proofs'][0]
+            messages.success(
+                request, 
+                f'✅ Proof approved! {proof.bags_collected} bags = {proof.points_awarded} points awarded to {proof.participant.user.username}'
             )
-        except Exception as e:
-            print(f"Notification error: {e}")
+        else:
+            messages.warning(request, 'This proof has already been reviewed.')
     else:
         messages.warning(request, 'This proof has already been reviewed.')
     
@@ -1137,9 +1079,8 @@ def proof_reject(request, proof_id):
 
 @staff_member_required
 def proof_bulk_approve(request):
-    """Bulk approve multiple proofs"""
-    from community.models import ChallengeProof, Notification, ChallengeParticipant
-    from community.notifications import notification_service
+    """Bulk approve multiple proofs in one transaction"""
+    from community.proof_approval import approve_proofs
     
     if request.method == 'POST':
         proof_ids = request.POST.getlist('proof_ids')
@@ -1148,57 +1089,11 @@ def proof_bulk_approve(request):
             messages.warning(request, 'No proofs selected.')
             return redirect('admin_dashboard:challenge_proofs')
         
-        approved_count = 0
-        total_points = 0
-        
-        for proof_id in proof_ids:
-            try:
-                proof = ChallengeProof.objects.get(id=proof_id, status='pending')
-                proof.approve(request.user)
-                approved_count += 1
-                total_points += proof.points_awarded
-                
-                # REAL-TIME NOTIFICATION: Send to each user
-                try:
-                    user = proof.participant.user
-                    prefs = getattr(user, 'notification_preferences', None)
-                    
-                    # Get user's rank
-                    rank = ChallengeParticipant.objects.filter(
-                        challenge=proof.participant.challenge,
-                        contribution__gt=proof.participant.contribution
-                    ).count() + 1
-                    
-                    user_name = user.get_full_name() or user.username
-                    challenge_name = proof.participant.challenge.title
-                    
-                    # SMS notification - PRO ZNBC style
-                    if prefs and prefs.sms_enabled and prefs.challenge_updates and user.phone_number:
-                        sms_message = f"✅ APPROVED! You earned {proof.points_awarded} points ({proof.bags_collected} bags). You are now #{rank} in {challenge_name}! Keep cleaning Zambia!"
-                        notification_service.send_sms(str(user.phone_number), sms_message)
-                    
-                    # WhatsApp notification - PRO Zambian style
-                    if prefs and prefs.whatsapp_enabled and prefs.challenge_updates and user.phone_number:
-                        whatsapp_message = f"✅ APPROVED! You earned {proof.points_awarded} points ({proof.bags_collected} bags). You are now #{rank} in {challenge_name}! Keep cleaning Zambia!"
-                        notification_service.send_whatsapp(str(user.phone_number), whatsapp_message)
-                    
-                    # In-app notification
-                    Notification.objects.create(
-                        user=user,
-                        notification_type='challenge_update',
-                        title='Proof Approved! 🎉',
-                        message=f'Your clean-up proof is approved! +{proof.points_awarded} points earned ({proof.bags_collected} bags). Current rank: #{rank}!',
-                        url=proof.participant.challenge.get_absolute_url()
-                    )
-                except Exception as e:
-                    print(f"Notification error for user {user.username}: {e}")
-                    
-            except ChallengeProof.DoesNotExist:
-                pass
+        result = approve_proofs(proof_ids, request.user)
         
         messages.success(
             request, 
-            f'✅ {approved_count} proof(s) approved! Total {total_points} points awarded!'
+            f'✅ {result["approved"]} proof(s) approved! Total {result["points"]} points awarded!'
         )
     
     return redirect('admin_dashboard:challenge_proofs')
@@ -1210,7 +1105,7 @@ def system_settings(request):
         message = request.POST.get('message', '').strip()
         if message and len(message) <= 160:
             try:
-                client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+                client = providers.require('twilio')
                 users = CustomUser.objects.filter(phone_number__isnull=False)
                 sent = 0
                 for user in users:
@@ -1232,46 +1127,51 @@ def system_settings(request):
     })
 
 
+@memory_heavy
 @staff_member_required
 def export_users(request):
-    from django.utils import timezone
-    
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "EcoLearn Users"
-    
-    # Enhanced headers
+    """Stream all users to XLSX with per-user aggregates computed in SQL"""
+    from django.db.models import IntegerField, OuterRef, Subquery
+    from django.db.models.functions import Coalesce
+    from gamification.models import PointTransaction
+    from .exports import iter_rows, stream_xlsx
+
     headers = [
         'ID', 'Username', 'Full Name', 'Email', 'Phone', 'Location', 
         'Language', 'Role', 'Literacy Level', 'Registration Date', 
         'Last Login', 'Status', 'Modules Completed', 'Total Points'
     ]
-    ws.append(headers)
 
-    # Get users with related data
-    users = CustomUser.objects.select_related('userprofile').prefetch_related(
-        'enrollment_set', 'point_transactions'
-    ).all()
+    # Correlated subqueries, so the two aggregates don't multiply each other's joins
+    completed = Enrollment.objects.filter(
+        user=OuterRef('pk'), completed_at__isnull=False
+    ).order_by().values('user').annotate(n=Count('id')).values('n')
+    points = PointTransaction.objects.filter(
+        user=OuterRef('pk')
+    ).order_by().values('user').annotate(total=Sum('points')).values('total')
 
-    for user in users:
-        # Calculate user stats
-        modules_completed = user.enrollment_set.filter(completed_at__isnull=False).count()
-        total_points = sum(pt.points for pt in user.point_transactions.all())
-        
+    users = CustomUser.objects.select_related('userprofile').annotate(
+        modules_completed=Coalesce(Subquery(completed, output_field=IntegerField()), 0),
+        total_points=Coalesce(Subquery(points, output_field=IntegerField()), 0),
+    ).order_by('id')
+
+    active_since = timezone.now() - timedelta(days=30)
+
+    def build_row(user):
         # Determine status
         if not user.is_active:
             status = 'Inactive'
-        elif user.last_login and user.last_login >= timezone.now() - timezone.timedelta(days=30):
+        elif user.last_login and user.last_login >= active_since:
             status = 'Active'
         else:
             status = 'Dormant'
-        
+
         # Get literacy level from profile if exists
         literacy_level = 'Unknown'
         if hasattr(user, 'userprofile') and user.userprofile:
             literacy_level = getattr(user.userprofile, 'literacy_level', 'Unknown')
-        
-        ws.append([
+
+        return [
             user.id,
             user.username,
             user.get_full_name() or 'N/A',
@@ -1284,16 +1184,16 @@ def export_users(request):
             user.date_joined.strftime('%Y-%m-%d %H:%M') if user.date_joined else 'Unknown',
             user.last_login.strftime('%Y-%m-%d %H:%M') if user.last_login else 'Never',
             status,
-            modules_completed,
-            total_points
-        ])
-
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            user.modules_completed,
+            user.total_points
+        ]
+
+    return stream_xlsx(
+        f'ecolearn_users_{timezone.now().strftime("%Y%m%d")}.xlsx',
+        'EcoLearn Users',
+        headers,
+        iter_rows(users, build_row),
     )
-    response['Content-Disposition'] = f'attachment; filename=ecolearn_users_{timezone.now().strftime("%Y%m%d")}.xlsx'
-    wb.save(response)
-    return response
 
 
 @staff_member_required
@@ -1663,14 +1563,17 @@ def content_analytics(request):
     from django.db.models import Sum, Avg, Count, Q, F
     
     # Module engagement metrics
-    top_modules = Module.objects.filter(is_published=True).order_by('-views_count')[:10]
+    top_modules = Module.objects.filter(is_published=True).annotate(
+        total_enrollments=Count('enrollment'),
+        completed_enrollments=Count('enrollment', filter=Q(enrollment__completed_at__isnull=False)),
+    ).order_by('-views_count')[:10]
     most_enrolled = Module.objects.filter(is_published=True).order_by('-enrollments_count')[:10]
     highest_rated = Module.objects.filter(is_published=True, average_rating__gt=0).order_by('-average_rating')[:10]
     
     # Calculate completion rates for top modules
     for module in top_modules:
-        total_enrollments = module.enrollment_set.count()
-        completed = module.enrollment_set.filter(completed_at__isnull=False).count()
+        total_enrollments = module.total_enrollments
+        completed = module.completed_enrollments
         module.completion_rate = round((completed / total_enrollments * 100), 1) if total_enrollments else 0
     
     # Category performance
@@ -1680,21 +1583,30 @@ def content_analytics(request):
         avg_rating=Avg('modules__average_rating')
     ).order_by('-total_enrollments')
     
-    # Content statistics
+    # Content statistics (one aggregate per table)
+    module_stats = Module.objects.aggregate(
+        modules=Count('id'),
+        published_modules=Count('id', filter=Q(is_published=True)),
+        bemba=Count('id', filter=~Q(title_bem='') & Q(title_bem__isnull=False)),
+        nyanja=Count('id', filter=~Q(title_ny='') & Q(title_ny__isnull=False)),
+    )
+    lesson_stats = Lesson.objects.aggregate(
+        lessons=Count('id'),
+        published_lessons=Count('id', filter=Q(is_published=True)),
+        video_lessons=Count('id', filter=Q(content_type='video')),
+        audio_lessons=Count('id', filter=Q(content_type='audio')),
+        text_lessons=Count('id', filter=Q(content_type='text')),
+    )
     total_content = {
-        'modules': Module.objects.count(),
-        'published_modules': Module.objects.filter(is_published=True).count(),
-        'lessons': Lesson.objects.count(),
-        'published_lessons': Lesson.objects.filter(is_published=True).count(),
-        'video_lessons': Lesson.objects.filter(content_type='video').count(),
-        'audio_lessons': Lesson.objects.filter(content_type='audio').count(),
-        'text_lessons': Lesson.objects.filter(content_type='text').count(),
+        'modules': module_stats['modules'],
+        'published_modules': module_stats['published_modules'],
+        **lesson_stats,
     }
     
     # Multilingual content coverage
-    modules_with_bemba = Module.objects.exclude(title_bem='').exclude(title_bem__isnull=True).count()
-    modules_with_nyanja = Module.objects.exclude(title_ny='').exclude(title_ny__isnull=True).count()
-    total_modules = Module.objects.count()
+    modules_with_bemba = module_stats['bemba']
+    modules_with_nyanja = module_stats['nyanja']
+    total_modules = module_stats['modules']
     
     translation_coverage = {
         'bemba_percentage': round((modules_with_bemba / total_modules * 100), 1) if total_modules else 0,
@@ -1706,36 +1618,38 @@ def content_analytics(request):
     # Location-based analytics (Kalingalinga, Kanyama, Chawama)
     location_analytics = []
     target_locations = ['Kalingalinga', 'Kanyama', 'Chawama']
+    location_counts = CustomUser.objects.aggregate(**{
+        location: Count('id', filter=Q(location__icontains=location)) for location in target_locations
+    })
+    enrollment_counts = Enrollment.objects.aggregate(**{
+        location: Count('id', filter=Q(user__location__icontains=location)) for location in target_locations
+    })
     
     for location in target_locations:
-        # Get users from this location
-        users_in_location = CustomUser.objects.filter(location__icontains=location)
-        
-        # Get enrollments from these users
-        enrollments = Enrollment.objects.filter(user__in=users_in_location)
-        
-        # Get most popular modules in this location
+        # Most popular modules in this location
         popular_modules = Module.objects.filter(
-            enrollment__user__in=users_in_location
+            enrollment__user__location__icontains=location
         ).annotate(
-            location_enrollments=Count('enrollment', filter=Q(enrollment__user__in=users_in_location))
+            location_enrollments=Count('enrollment')
         ).order_by('-location_enrollments')[:3]
         
         location_analytics.append({
             'name': location,
-            'total_users': users_in_location.count(),
-            'total_enrollments': enrollments.count(),
+            'total_users': location_counts[location],
+            'total_enrollments': enrollment_counts[location],
             'popular_modules': popular_modules,
         })
     
     # Language preference analytics
+    language_counts = dict(
+        CustomUser.objects.values_list('preferred_language').annotate(n=Count('id')).order_by()
+    )
     language_usage = []
     for lang_code, lang_name in [('en', 'English'), ('bem', 'Bemba'), ('ny', 'Nyanja')]:
-        users_count = CustomUser.objects.filter(preferred_language=lang_code).count()
         language_usage.append({
             'code': lang_code,
             'name': lang_name,
-            'users': users_count,
+            'users': language_counts.get(lang_code, 0),
         })
     
     context = {
@@ -1756,34 +1670,35 @@ def content_analytics(request):
 def user_demographics(request):
     """Detailed demographics view"""
     from django.db.models import Count
-    from django.utils import timezone
-    from datetime import timedelta
+    from .rollups import ensure_fresh, monthly_activity
     
-    # Location breakdown (focus on Kalingalinga, Kanyama, Chawama)
+    # Location breakdown (focus on Kalingalinga, Kanyama, Chawama) - one aggregate
     target_locations = ['Kalingalinga', 'Kanyama', 'Chawama']
+    counts = CustomUser.objects.aggregate(
+        total=Count('id'),
+        other=Count('id', filter=~(
+            Q(location__icontains='Kalingalinga') | Q(location__icontains='Kanyama') | Q(location__icontains='Chawama')
+        )),
+        **{location: Count('id', filter=Q(location__icontains=location)) for location in target_locations}
+    )
+    total_users = counts['total']
     location_data = []
     
     for location in target_locations:
-        count = CustomUser.objects.filter(location__icontains=location).count()
+        count = counts[location]
         location_data.append({
             'name': location,
             'count': count,
-            'percentage': round((count / CustomUser.objects.count() * 100), 1) if CustomUser.objects.count() else 0
+            'percentage': round((count / total_users * 100), 1) if total_users else 0
         })
     
     # Other locations
-    other_count = CustomUser.objects.exclude(
-        location__icontains='Kalingalinga'
-    ).exclude(
-        location__icontains='Kanyama'
-    ).exclude(
-        location__icontains='Chawama'
-    ).count()
+    other_count = counts['other']
     
     location_data.append({
         'name': 'Other Locations',
         'count': other_count,
-        'percentage': round((other_count / CustomUser.objects.count() * 100), 1) if CustomUser.objects.count() else 0
+        'percentage': round((other_count / total_users * 100), 1) if total_users else 0
     })
     
     # Language distribution
@@ -1791,69 +1706,59 @@ def user_demographics(request):
         count=Count('id')
     ).order_by('-count')
     
-    # Registration trends by month
-    monthly_registrations = []
-    for i in range(12):
-        month_start = timezone.now().replace(day=1) - timedelta(days=30 * i)
-        month_end = month_start + timedelta(days=31)
-        count = CustomUser.objects.filter(
-            date_joined__gte=month_start,
-            date_joined__lt=month_end
-        ).count()
-        monthly_registrations.append({
-            'month': month_start.strftime('%b %Y'),
-            'count': count
-        })
-    
-    monthly_registrations.reverse()
+    # Registration trends by month (daily rollups)
+    ensure_fresh()
+    monthly_registrations = [
+        {'month': row['month'].strftime('%b %Y'), 'count': row['count']}
+        for row in monthly_activity('registrations', 12)
+    ]
     
     context = {
         'location_data': location_data,
         'language_data': language_data,
         'monthly_registrations': monthly_registrations,
-        'total_users': CustomUser.objects.count(),
+        'total_users': total_users,
         'target_users': 500,
     }
     
     return render(request, 'admin_dashboard/user_demographics.html', context)
 
+@memory_heavy
 @staff_member_required
 def export_reports(request):
-    import csv
-    from django.http import HttpResponse
     from reporting.models import DumpingReport
+    from .exports import iter_rows, stream_csv
 
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="ecolearn_illegal_dumping_reports.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow([
+    headers = [
         'Ref No', 'Reporter', 'Phone', 'Location', 'Waste Type',
         'Severity', 'Status', 'Reported Date', 'Photos'
-    ])
+    ]
+
+    reports = DumpingReport.objects.select_related('reporter__userprofile').order_by('-reported_at')
 
-    reports = DumpingReport.objects.select_related('reporter__userprofile').all()
-    for report in reports:
-        phone = report.reporter.userprofile.phone_number if hasattr(report.reporter, 'userprofile') and report.reporter.userprofile.phone_number else 'N/A'
+    def build_row(report):
+        reporter = report.reporter
+        profile = getattr(reporter, 'userprofile', None) if reporter else None
+        phone = profile.phone_number if profile and profile.phone_number else 'N/A'
         photos = []
         if report.photo1: photos.append(report.photo1.url)
         if report.photo2: photos.append(report.photo2.url)
         if report.photo3: photos.append(report.photo3.url)
         photos_str = " | ".join(photos) if photos else "No photos"
 
-        writer.writerow([
+        return [
             f'ZMR{report.id:04d}',
-            report.reporter.get_full_name() if not report.is_anonymous else 'Anonymous',
+            reporter.get_full_name() if reporter and not report.is_anonymous else 'Anonymous',
             phone,
             report.location_description or 'No description',
-            report.get_waste_type_display(),
+            report.waste_type or 'N/A',
             report.get_severity_display(),
             report.get_status_display(),
             report.reported_at.strftime('%Y-%m-%d %H:%M'),
             photos_str
-        ])
+        ]
 
-    return response
+    return stream_csv('ecolearn_illegal_dumping_reports.csv', headers, iter_rows(reports, build_row))
 
 @staff_member_required
 def mark_resolved(request, report_id):
@@ -1964,8 +1869,7 @@ def notification_management(request):
 @staff_member_required
 def notification_create(request):
     """Create and send notification campaign"""
-    from community.notifications import notification_service
-    from community.models import NotificationLog
+    from community.outbound import notify_many
     from django.db.models import Q
     
     if request.method == 'POST':
@@ -1997,74 +1901,39 @@ def notification_create(request):
             if target_roles:
                 users = users.filter(role__in=target_roles)
         
-        # Send notifications
-        sent_count = 0
-        failed_count = 0
-        
+        # Queue notifications (community/outbound.py sends them in the background)
+        phone_channels = [channel for channel in channels if channel in ('sms', 'whatsapp')]
+        outgoing = []
         for user in users:
-            for channel in channels:
-                try:
-                    # Create notification log
-                    log = NotificationLog.objects.create(
-                        user=user,
-                        channel=channel,
-                        notification_type='campaign',
-                        message=message,
-                        status='pending'
-                    )
-                    
-                    # Send based on channel
-                    if channel == 'sms' and user.phone_number:
-                        result = notification_service.send_sms(
-                            str(user.phone_number),
-                            f"[EcoLearn] {message[:140]}"
-                        )
-                        if result.get('success'):
-                            log.status = 'sent'
-                            log.message_sid = result.get('message_sid', '')
-                            sent_count += 1
-                        else:
-                            log.status = 'failed'
-                            log.error_message = result.get('error', '')
-                            failed_count += 1
-                    
-                    elif channel == 'whatsapp' and user.phone_number:
-                        result = notification_service.send_whatsapp(
-                            str(user.phone_number),
-                            f"*{title}*\n\n{message}"
-                        )
-                        if result.get('success'):
-                            log.status = 'sent'
-                            log.message_sid = result.get('message_sid', '')
-                            sent_count += 1
-                        else:
-                            log.status = 'failed'
-                            log.error_message = result.get('error', '')
-                            failed_count += 1
-                    
-                    elif channel == 'email' and user.email:
-                        result = notification_service.send_email(
-                            user.email,
-                            title,
-                            message
-                        )
-                        if result.get('success'):
-                            log.status = 'sent'
-                            sent_count += 1
-                        else:
-                            log.status = 'failed'
-                            log.error_message = result.get('error', '')
-                            failed_count += 1
-                    
-                    log.save()
-                
-                except Exception as e:
-                    failed_count += 1
-                    logger.error(f"Notification send error: {str(e)}")
+            if phone_channels:
+                outgoing.append({
+                    'user': user,
+                    'channels': phone_channels,
+                    'message': f"[EcoLearn] {message[:140]}",
+                    'whatsapp_message': f"*{title}*\n\n{message}",
+                    'notification_type': 'campaign',
+                })
+            if 'email' in channels:
+                outgoing.append({
+                    'user': user,
+                    'channels': ['email'],
+                    'message': message,
+                    'subject': title,
+                    'notification_type': 'campaign',
+                })
+        
+        try:
+            queued = len(notify_many(outgoing))
+        except Exception as e:
+            logger.error(f"Notification campaign error: {str(e)}")
+            messages.error(request, f'Campaign could not be queued: {str(e)}')
+            return redirect('admin_dashboard:notification_create')
         
+        requested = sum(len(item['channels']) for item in outgoing)
         messages.success(
             request,
-            f'Campaign sent! {sent_count} notifications sent, {failed_count} failed.'
+            f'Campaign queued! {queued} notifications are being sent, '
+            f'{requested - queued} skipped (no phone number or email).'
         )
         return redirect('admin_dashboard:notification_history')
     
@@ -2084,8 +1953,7 @@ def notification_create(request):
 @staff_member_required
 def notification_send(request):
     """Quick send notification (AJAX endpoint)"""
-    from community.notifications import notification_service
-    from community.models import NotificationLog
+    from community.outbound import notify
     import json
     
     if request.method == 'POST':
@@ -2097,33 +1965,15 @@ def notification_send(request):
             
             user = CustomUser.objects.get(id=user_id)
             
-            # Create log
-            log = NotificationLog.objects.create(
-                user=user,
-                channel=channel,
-                notification_type='manual',
-                message=message,
-                status='pending'
-            )
-            
-            # Send
-            if channel == 'sms':
-                result = notification_service.send_sms(str(user.phone_number), message)
-            elif channel == 'whatsapp':
-                result = notification_service.send_whatsapp(str(user.phone_number), message)
-            elif channel == 'email':
-                result = notification_service.send_email(user.email, 'EcoLearn Notification', message)
-            
-            if result.get('success'):
-                log.status = 'sent'
-                log.message_sid = result.get('message_sid', '')
-            else:
-                log.status = 'failed'
-                log.error_message = result.get('error', '')
-            
-            log.save()
+            # Queued; the outbound workers send it and record the result on the log
+            if not notify(user, message, channels=[channel], notification_type='manual',
+                          subject='EcoLearn Notification'):
+                return JsonResponse({
+                    'success': False,
+                    'error': 'User has no email address' if channel == 'email' else 'User has no phone number',
+                })
             
-            return JsonResponse({'success': True, 'message': 'Notification sent!'})
+            return JsonResponse({'success': True, 'message': 'Notification queued!'})
         
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)})
@@ -2201,21 +2051,22 @@ def notification_analytics(request):
     from django.db.models import Count, Q, Avg
     from django.utils import timezone
     from datetime import timedelta
+    from .rollups import ensure_fresh, notification_summary
     
     # Date range
     days = int(request.GET.get('days', 30))
     start_date = timezone.now() - timedelta(days=days)
+    today = timezone.localdate()
+    first_day = today - timedelta(days=days - 1)
+    
+    # Every count below is folded from the hourly rollup rows in one query
+    ensure_fresh()
+    summary = notification_summary(first_day)
     
     # Total statistics
-    total_sent = NotificationLog.objects.filter(sent_at__gte=start_date).count()
-    total_delivered = NotificationLog.objects.filter(
-        sent_at__gte=start_date,
-        status='delivered'
-    ).count()
-    total_failed = NotificationLog.objects.filter(
-        sent_at__gte=start_date,
-        status='failed'
-    ).count()
+    total_sent = summary['total']
+    total_delivered = summary['delivered']
+    total_failed = summary['failed']
     
     # Engagement rate
     engagement_rate = round((total_delivered / total_sent * 100), 1) if total_sent > 0 else 0
@@ -2223,15 +2074,8 @@ def notification_analytics(request):
     # Channel performance
     channel_performance = []
     for channel_code, channel_name in NotificationLog.CHANNEL_CHOICES:
-        channel_total = NotificationLog.objects.filter(
-            sent_at__gte=start_date,
-            channel=channel_code
-        ).count()
-        channel_delivered = NotificationLog.objects.filter(
-            sent_at__gte=start_date,
-            channel=channel_code,
-            status='delivered'
-        ).count()
+        channel_total = summary['by_channel'][channel_code]['total']
+        channel_delivered = summary['by_channel'][channel_code]['delivered']
         channel_rate = round((channel_delivered / channel_total * 100), 1) if channel_total > 0 else 0
         
         channel_performance.append({
@@ -2244,43 +2088,31 @@ def notification_analytics(request):
     # Daily trend
     daily_trend = []
     for i in range(days):
-        day = timezone.now() - timedelta(days=i)
-        day_sent = NotificationLog.objects.filter(
-            sent_at__date=day.date()
-        ).count()
-        day_delivered = NotificationLog.objects.filter(
-            sent_at__date=day.date(),
-            status='delivered'
-        ).count()
+        day = today - timedelta(days=i)
         daily_trend.append({
             'date': day.strftime('%b %d'),
-            'sent': day_sent,
-            'delivered': day_delivered
+            'sent': summary['by_day'][day]['sent'],
+            'delivered': summary['by_day'][day]['delivered']
         })
     daily_trend.reverse()
     
     # Notification type breakdown
-    type_breakdown = NotificationLog.objects.filter(
-        sent_at__gte=start_date
-    ).values('notification_type').annotate(
-        count=Count('id')
-    ).order_by('-count')
+    type_breakdown = [
+        {'notification_type': notification_type, 'count': count}
+        for notification_type, count in sorted(summary['by_type'].items(), key=lambda item: -item[1])
+    ]
     
     # Peak hours analysis
     hour_stats = []
     for hour in range(24):
-        count = NotificationLog.objects.filter(
-            sent_at__gte=start_date,
-            sent_at__hour=hour
-        ).count()
         hour_stats.append({
             'hour': f"{hour:02d}:00",
-            'count': count
+            'count': summary['by_hour'][hour]
         })
     
     # Top users by notifications received
     top_users = NotificationLog.objects.filter(
-        sent_at__gte=start_date
+        created_at__gte=start_date
     ).values(
         'user__username', 'user__id'
     ).annotate(
@@ -2459,9 +2291,9 @@ def alert_detail(request, alert_id):
 
 @staff_member_required
 def alert_send(request, alert_id):
-    """Send emergency alert to users"""
-    from community.models import HealthAlert
-    from community.notifications import notification_service
+    """Queue emergency alert delivery and show live dispatch progress"""
+    from community.models import HealthAlert, AlertDispatch
+    from community.dispatch import start_alert_dispatch
     from accounts.models import CustomUser
     
     alert = get_object_or_404(HealthAlert, id=alert_id)
@@ -2470,109 +2302,76 @@ def alert_send(request, alert_id):
         # Get target parameters
         target_all = request.POST.get('target_all') == 'on'
         target_locations = request.POST.getlist('locations')
-        channels = request.POST.getlist('channels', ['sms', 'whatsapp'])
+        channels = request.POST.getlist('channels') or ['sms', 'whatsapp']
         
-        # Build user queryset
-        users = CustomUser.objects.filter(is_active=True)
-        
-        if not target_all and target_locations:
-            location_q = Q()
-            for loc in target_locations:
-                location_q |= Q(location__icontains=loc)
-            users = users.filter(location_q)
-        
-        # Prepare emergency message
-        severity_emoji = {
-            'low': '⚠️',
-            'medium': '🚨',
-            'high': '🔴',
-            'critical': '🚨🔴'
-        }
-        
-        emoji = severity_emoji.get(alert.severity, '⚠️')
-        
-        # SMS message (short)
-        sms_message = f"{emoji} HEALTH ALERT: {alert.title}. {alert.message[:100]}... Safety tips: {alert.hygiene_tips[:50]}..."
-        
-        # WhatsApp message (detailed)
-        whatsapp_message = f"""
-{emoji} *HEALTH ALERT - {alert.get_severity_display().upper()}*
-
-*{alert.title}*
-
-*Location:* {alert.location}
-*Affected Areas:* {alert.affected_areas}
-
-*Alert:*
-{alert.message}
-
-*Safety Tips:*
-{alert.hygiene_tips}
-
-*Nearest Clinics:*
-{alert.nearest_clinics}
-
-Stay safe! - EcoLearn Emergency System
-        """.strip()
-        
-        # Send to users
-        sent_count = 0
-        failed_count = 0
+        job = start_alert_dispatch(
+            alert,
+            channels=channels,
+            target_locations=None if target_all else target_locations,
+            created_by=request.user
+        )
         
-        for user in users:
-            try:
-                if 'sms' in channels and user.phone_number:
-                    result = notification_service.send_sms(
-                        str(user.phone_number),
-                        sms_message[:160]  # SMS limit
-                    )
-                    if result.get('success'):
-                        sent_count += 1
-                    else:
-                        failed_count += 1
-                
-                if 'whatsapp' in channels and user.phone_number:
-                    result = notification_service.send_whatsapp(
-                        str(user.phone_number),
-                        whatsapp_message
-                    )
-                    if result.get('success'):
-                        sent_count += 1
-                    else:
-                        failed_count += 1
-                
-                # Always create in-app notification for emergencies
-                from community.models import Notification
-                Notification.objects.create(
-                    user=user,
-                    notification_type='emergency',
-                    title=f"{emoji} {alert.title}",
-                    message=alert.message,
-                    url=f'/health-alerts/{alert.id}/'
-                )
-                
-            except Exception as e:
-                failed_count += 1
-                logger.error(f"Emergency alert send error: {str(e)}")
+        if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+            return JsonResponse({
+                'success': True,
+                'job_id': job.id,
+                'status_url': reverse('admin_dashboard:alert_dispatch_status', args=[job.id]),
+            })
         
-        messages.success(
-            request,
-            f'Emergency alert sent! {sent_count} notifications sent, {failed_count} failed.'
-        )
-        return redirect('admin_dashboard:emergency_alerts')
+        messages.success(request, f'Emergency alert queued for delivery (job #{job.id}).')
+        return redirect(f"{reverse('admin_dashboard:alert_send', args=[alert.id])}?job={job.id}")
     
-    # GET request - show send form
+    # GET request - show send form and progress of the latest dispatch
     locations = CustomUser.objects.values_list('location', flat=True).distinct()
     locations = [loc for loc in locations if loc]
     
+    dispatches = AlertDispatch.objects.filter(alert=alert)
+    job_id = request.GET.get('job')
+    current_job = None
+    if job_id and job_id.isdigit():
+        current_job = dispatches.filter(id=job_id).first()
+    if current_job is None:
+        current_job = dispatches.first()
+    
     context = {
         'alert': alert,
         'locations': locations,
+        'current_job': current_job,
+        'dispatches': dispatches[:10],
     }
     
     return render(request, 'admin_dashboard/alert_send.html', context)
 
 
+@staff_member_required
+def alert_dispatch_status(request, job_id):
+    """Live progress counters for an alert dispatch job (polled by the send page)"""
+    from community.models import AlertDispatch
+    from community.dispatch import recover_alert_dispatches
+    
+    job = get_object_or_404(AlertDispatch, id=job_id)
+    if not job.is_finished:
+        # The worker running it may have been restarted; picks it up again if so
+        recover_alert_dispatches(job_ids=[job.id])
+    
+    return JsonResponse({
+        'job_id': job.id,
+        'alert_id': job.alert_id,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'is_finished': job.is_finished,
+        'progress': job.progress_percentage,
+        'total_users': job.total_users,
+        'processed': job.processed,
+        'inapp_sent': job.inapp_sent,
+        'sms_sent': job.sms_sent,
+        'sms_failed': job.sms_failed,
+        'whatsapp_sent': job.whatsapp_sent,
+        'whatsapp_failed': job.whatsapp_failed,
+        'error': job.error_message,
+    })
+
+
 @staff_member_required
 def alert_deactivate(request, alert_id):
     """Deactivate emergency alert"""
@@ -2995,37 +2794,39 @@ def groups_analytics(request):
     return render(request, 'admin_dashboard/groups_analytics.html', context)
 
 
+@memory_heavy
 @staff_member_required
 def export_groups_data(request):
     """Export groups data to Excel"""
-    from collaboration.models import CleanupGroup
-    from django.http import HttpResponse
-    from openpyxl import Workbook
-    from django.utils import timezone
-    from django.db.models import Count, Sum
-    
-    # Create workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Groups Data"
-    
+    from collaboration.models import CleanupGroup, GroupEvent, GroupMembership
+    from django.db.models import DecimalField, IntegerField, OuterRef, Subquery
+    from django.db.models.functions import Coalesce
+    from .exports import iter_rows, stream_xlsx
+
     # Headers
     headers = [
         'Group Name', 'Coordinator', 'Community', 'District', 'Members', 
         'Events', 'Waste Collected (kg)', 'Status', 'Created Date',
         'Facebook', 'WhatsApp', 'Twitter'
     ]
-    ws.append(headers)
-    
-    # Data
+
+    # One subquery per aggregate - joining members and events together
+    # multiplied the counts and the waste total
+    members = GroupMembership.objects.filter(
+        group=OuterRef('pk')
+    ).order_by().values('group').annotate(n=Count('id')).values('n')
+    events = GroupEvent.objects.filter(
+        group=OuterRef('pk')
+    ).order_by().values('group').annotate(n=Count('id'), waste=Sum('waste_collected'))
+
     groups = CleanupGroup.objects.select_related('coordinator').annotate(
-        members_count=Count('members'),
-        event_count=Count('events'),
-        waste_collected=Sum('events__waste_collected')
-    )
-    
-    for group in groups:
-        ws.append([
+        members_count=Coalesce(Subquery(members, output_field=IntegerField()), 0),
+        event_count=Coalesce(Subquery(events.values('n'), output_field=IntegerField()), 0),
+        waste_collected=Subquery(events.values('waste'), output_field=DecimalField()),
+    ).order_by('id')
+
+    def build_row(group):
+        return [
             group.name,
             group.coordinator.get_full_name() or group.coordinator.username,
             group.community,
@@ -3038,16 +2839,14 @@ def export_groups_data(request):
             'Yes' if group.facebook_url else 'No',
             'Yes' if group.whatsapp_url else 'No',
             'Yes' if group.twitter_url else 'No',
-        ])
-    
-    # Response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        ]
+
+    return stream_xlsx(
+        f'groups_data_{timezone.now().strftime("%Y%m%d")}.xlsx',
+        'Groups Data',
+        headers,
+        iter_rows(groups, build_row),
     )
-    response['Content-Disposition'] = f'attachment; filename=groups_data_{timezone.now().strftime("%Y%m%d")}.xlsx'
-    
-    wb.save(response)
-    return response
 
 
 # ============================================================================
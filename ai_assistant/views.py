@@ -1,21 +1,12 @@
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
-from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import json
 from .models import ChatSession, ChatMessage, AssistantFeedback
 
-# Try to import and configure Gemini AI
-try:
-    import google.generativeai as genai
-    genai.configure(api_key=getattr(settings, 'GEMINI_API_KEY', ''))
-    GEMINI_AVAILABLE = True
-except (ImportError, Exception) as e:
-    print(f"Warning: Google Generative AI not available: {e}")
-    genai = None
-    GEMINI_AVAILABLE = False
+from ecolearn import providers
 
 
 def get_system_context():
@@ -110,8 +101,9 @@ def send_message(request):
     
     try:
         # Try Gemini API first
-        if GEMINI_AVAILABLE and genai:
-            genai.configure(api_key=getattr(settings, 'GEMINI_API_KEY', ''))
+        # Imported and configured on first use, not when this module loads
+        genai = providers.get('gemini')
+        if genai:
             model = genai.GenerativeModel('gemini-2.5-flash')
             
             prompt = f"""You are EcoLearn AI Assistant for Zambia's environmental education platform.
@@ -9,7 +9,7 @@ from .models import (
     ForumCategory, ForumTopic, ForumReply,
     CommunityEvent, EventParticipant,
     SuccessStory, SocialMediaShare,
-    Notification, HealthAlert,
+    Notification, NotificationLog, HealthAlert, AlertDispatch,
     CommunityCampaign, CampaignParticipant,
     CommunityChallenge, ChallengeParticipant, ChallengeProof
 )
@@ -146,7 +146,10 @@ class NotificationAdmin(admin.ModelAdmin):
     actions = ['mark_as_read']
 
     def mark_as_read(self, request, queryset):
+        from .notification_counts import invalidate
+        user_ids = set(queryset.values_list('user_id', flat=True))
         count = queryset.update(is_read=True)
+        invalidate(user_ids)
         self.message_user(request, f"{count} notifications marked as read.")
     mark_as_read.short_description = "Mark as read"
 
@@ -175,6 +178,44 @@ class HealthAlertAdmin(ImportExportModelAdmin):
     severity_display.short_description = "Severity"
 
 
+@admin.register(AlertDispatch)
+class AlertDispatchAdmin(admin.ModelAdmin):
+    list_display = ('id', 'alert', 'status', 'total_users', 'processed', 'sms_sent', 'whatsapp_sent', 'created_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('alert__title',)
+    readonly_fields = (
+        'alert', 'created_by', 'channels', 'target_locations', 'status',
+        'total_users', 'processed', 'inapp_sent', 'sms_sent', 'sms_failed',
+        'whatsapp_sent', 'whatsapp_failed', 'error_message',
+        'created_at', 'started_at', 'finished_at'
+    )
+    ordering = ('-created_at',)
+
+
+@admin.register(NotificationLog)
+class NotificationLogAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'channel', 'notification_type', 'status', 'attempts', 'provider', 'created_at', 'sent_at')
+    list_filter = ('status', 'channel', 'provider', 'created_at')
+    search_fields = ('user__username', 'recipient', 'message_sid')
+    readonly_fields = (
+        'user', 'notification', 'channel', 'notification_type', 'recipient', 'subject', 'message',
+        'status', 'attempts', 'next_attempt_at', 'lease_token', 'provider', 'message_sid',
+        'error_message', 'created_at', 'sent_at', 'delivered_at'
+    )
+    ordering = ('-created_at',)
+    actions = ['retry_failed']
+
+    def retry_failed(self, request, queryset):
+        from .outbound import wake_workers
+        # Failed is terminal for the workers; an admin retry starts the row over
+        updated = queryset.filter(status='failed').update(
+            status='pending', attempts=0, next_attempt_at=None, lease_token='', error_message=''
+        )
+        wake_workers()
+        self.message_user(request, f"🔁 {updated} failed notifications queued for retry")
+    retry_failed.short_description = "🔁 Retry failed notifications"
+
+
 @admin.register(CommunityCampaign)
 class CommunityCampaignAdmin(ImportExportModelAdmin):
     resource_class = CommunityCampaignResource
@@ -434,10 +475,9 @@ class ChallengeProofAdmin(admin.ModelAdmin):
     status_badge.short_description = 'Status'
     
     def approve_proofs(self, request, queryset):
-        count = 0
-        for proof in queryset.filter(status='pending'):
-            proof.approve(request.user)
-            count += 1
+        from .proof_approval import approve_proofs
+        result = approve_proofs(queryset.values_list('id', flat=True), request.user)
+        count = result['approved']
         self.message_user(request, f"✅ {count} proof(s) approved and points awarded!")
     approve_proofs.short_description = "✅ Approve selected proofs (auto-award 30 pts/bag)"
     
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CommunityConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'community'
+
+    def ready(self):
+        from django.db.models.signals import post_save, post_delete
+        from .models import Notification
+        from .notification_counts import notification_saved, notification_deleted
+        from .realtime import notification_published
+
+        post_save.connect(notification_saved, sender=Notification, dispatch_uid='notification_counts_saved')
+        post_delete.connect(notification_deleted, sender=Notification, dispatch_uid='notification_counts_deleted')
+        post_save.connect(notification_published, sender=Notification, dispatch_uid='notification_realtime_publish')
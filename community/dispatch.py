@@ -0,0 +1,344 @@
+# community/dispatch.py
+"""
+Emergency alert fan-out engine
+Snapshots the target audience once, writes in-app notifications in chunks with
+bulk_create and groups phone numbers into Africa's Talking bulk SMS batches.
+Jobs run in a small background thread pool so the admin request returns at once.
+
+A job only lives in one process's thread pool, so a running job holds a lease
+that is renewed after every chunk and records the last user it reached. If
+the process dies (deploy, crash, a worker killed during a memory recycle),
+recover_alert_dispatches() picks up queued jobs nobody ran and running jobs
+whose lease expired, and resumes them after last_user_id. It runs when a
+gunicorn worker boots, when the admin polls a stalled job, and from
+`manage.py recover_alert_dispatches`. A chunk cut off mid-way is sent again
+on resume (at-least-once per chunk); jobs older than GIVE_UP_AFTER are
+failed instead of resumed.
+"""
+
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Tunables (override in settings.py)
+CHUNK_SIZE = getattr(settings, 'ALERT_DISPATCH_CHUNK_SIZE', 500)
+SMS_BATCH_SIZE = getattr(settings, 'ALERT_DISPATCH_SMS_BATCH_SIZE', 100)
+MAX_WORKERS = getattr(settings, 'ALERT_DISPATCH_WORKERS', 2)
+LEASE_SECONDS = getattr(settings, 'ALERT_DISPATCH_LEASE_SECONDS', 900)  # one chunk must finish within this
+GIVE_UP_AFTER = getattr(settings, 'ALERT_DISPATCH_GIVE_UP_AFTER', 6 * 3600)  # seconds after creation
+QUEUED_GRACE = getattr(settings, 'ALERT_DISPATCH_QUEUED_GRACE', 60)  # before a queued job counts as orphaned
+
+SEVERITY_EMOJI = {
+    'low': '⚠️',
+    'medium': '🚨',
+    'high': '🔴',
+    'critical': '🚨🔴'
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide dispatch thread pool (created on first use)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='alert-dispatch')
+        return _executor
+
+
+def build_alert_messages(alert):
+    """
+    Build the SMS and WhatsApp texts for a health alert
+
+    Returns:
+        tuple: (emoji, sms_message, whatsapp_message)
+    """
+    emoji = SEVERITY_EMOJI.get(alert.severity, '⚠️')
+
+    # SMS message (short)
+    sms_message = f"{emoji} HEALTH ALERT: {alert.title}. {alert.message[:100]}... Safety tips: {alert.hygiene_tips[:50]}..."
+
+    # WhatsApp message (detailed)
+    affected_block = f"*Affected Areas:* {alert.affected_areas}" if alert.affected_areas else ""
+    clinics_block = f"*Nearest Clinics:*\n{alert.nearest_clinics}" if alert.nearest_clinics else ""
+    whatsapp_message = f"""
+{emoji} *HEALTH ALERT - {alert.get_severity_display().upper()}*
+
+*{alert.title}*
+
+*Location:* {alert.location}
+{affected_block}
+
+*Alert:*
+{alert.message}
+
+*Safety Tips:*
+{alert.hygiene_tips}
+
+{clinics_block}
+
+Stay safe! - EcoLearn Emergency System
+    """.strip()
+
+    return emoji, sms_message[:160], whatsapp_message
+
+
+def get_alert_audience(target_locations=None):
+    """Active users, optionally narrowed to the given locations"""
+    from accounts.models import CustomUser
+
+    users = CustomUser.objects.filter(is_active=True)
+
+    if target_locations:
+        location_q = Q()
+        for loc in target_locations:
+            location_q |= Q(location__icontains=loc)
+        users = users.filter(location_q)
+
+    return users
+
+
+def start_alert_dispatch(alert, channels=None, target_locations=None, created_by=None):
+    """
+    Queue an emergency alert for background delivery
+
+    Args:
+        alert: HealthAlert object
+        channels: List of external channels ('sms', 'whatsapp'); in-app is always sent
+        target_locations: List of locations to target (None = all users)
+        created_by: User starting the dispatch
+
+    Returns:
+        AlertDispatch: the queued job (poll it for progress)
+    """
+    from .models import AlertDispatch
+
+    if channels is None:
+        channels = ['sms', 'whatsapp']
+
+    job = AlertDispatch.objects.create(
+        alert=alert,
+        created_by=created_by,
+        channels=','.join(channels),
+        target_locations=list(target_locations or []),
+    )
+
+    if getattr(settings, 'ALERT_DISPATCH_ASYNC', True):
+        # Only hand the job to a worker once the row is visible to other connections
+        transaction.on_commit(lambda: get_executor().submit(_run_in_thread, job.id))
+    else:
+        run_alert_dispatch(job.id)
+        job.refresh_from_db()
+
+    return job
+
+
+def _run_in_thread(job_id):
+    """Worker entry point - threads must manage their own DB connections"""
+    close_old_connections()
+    try:
+        run_alert_dispatch(job_id)
+    finally:
+        close_old_connections()
+
+
+def _unleased(queued_before=None):
+    """Q() for jobs no process holds: queued, or running with an expired (or no) lease"""
+    queued = Q(status='queued')
+    if queued_before is not None:
+        queued &= Q(created_at__lt=queued_before)
+    return queued | Q(status='running') & (
+        Q(lease_expires_at__lt=timezone.now()) | Q(lease_expires_at__isnull=True)
+    )
+
+
+def _claim(job_id):
+    """Take the job's lease if nobody holds it; returns the lease token or None"""
+    from .models import AlertDispatch
+
+    token = uuid.uuid4().hex
+    now = timezone.now()
+    claimed = AlertDispatch.objects.filter(_unleased(), id=job_id).update(
+        status='running',
+        started_at=Coalesce(F('started_at'), Value(now)),
+        lease_token=token,
+        lease_expires_at=now + timedelta(seconds=LEASE_SECONDS),
+    )
+    return token if claimed else None
+
+
+def run_alert_dispatch(job_id):
+    """
+    Deliver an alert dispatch job chunk by chunk, updating its progress counters
+
+    Resumes after last_user_id when an earlier run was interrupted; does
+    nothing if another process holds the job's lease.
+    """
+    from .models import AlertDispatch
+
+    token = _claim(job_id)
+    job = AlertDispatch.objects.select_related('alert').get(id=job_id)
+    if token is None:
+        return job
+
+    alert = job.alert
+    channels = job.channel_list
+    mine = AlertDispatch.objects.filter(id=job.id, lease_token=token)
+
+    try:
+        # Snapshot the remaining audience once so users joining mid-send don't shift the chunks
+        audience = list(
+            get_alert_audience(job.location_list)
+            .filter(id__gt=job.last_user_id)
+            .order_by('id')
+            .values_list('id', 'phone_number')
+        )
+        if job.last_user_id:
+            logger.info(f"Alert dispatch #{job.id} resuming after user {job.last_user_id} ({len(audience)} left)")
+
+        mine.update(total_users=job.processed + len(audience))
+
+        emoji, sms_message, whatsapp_message = build_alert_messages(alert)
+
+        for start in range(0, len(audience), CHUNK_SIZE):
+            chunk = audience[start:start + CHUNK_SIZE]
+            counts = _deliver_chunk(alert, emoji, sms_message, whatsapp_message, chunk, channels)
+            renewed = mine.update(
+                processed=F('processed') + counts['processed'],
+                inapp_sent=F('inapp_sent') + counts['inapp_sent'],
+                sms_sent=F('sms_sent') + counts['sms_sent'],
+                sms_failed=F('sms_failed') + counts['sms_failed'],
+                whatsapp_sent=F('whatsapp_sent') + counts['whatsapp_sent'],
+                whatsapp_failed=F('whatsapp_failed') + counts['whatsapp_failed'],
+                last_user_id=chunk[-1][0],
+                lease_expires_at=timezone.now() + timedelta(seconds=LEASE_SECONDS),
+            )
+            if not renewed:
+                # Lease expired and another process resumed the job; it owns the rest
+                logger.warning(f"Alert dispatch #{job.id} lost its lease after user {chunk[-1][0]}")
+                break
+        else:
+            mine.update(status='completed', finished_at=timezone.now(), lease_token='', lease_expires_at=None)
+            logger.info(f"Alert dispatch #{job.id} completed for {job.processed + len(audience)} users")
+
+    except Exception as e:
+        logger.error(f"Alert dispatch #{job.id} failed: {str(e)}")
+        mine.update(
+            status='failed',
+            error_message=str(e),
+            finished_at=timezone.now(),
+            lease_token='',
+            lease_expires_at=None,
+        )
+
+    job.refresh_from_db()
+    return job
+
+
+def recover_alert_dispatches(job_ids=None, inline=False):
+    """
+    Restart jobs orphaned by a dead process: jobs still queued after
+    QUEUED_GRACE and running jobs whose lease expired. Jobs older than
+    GIVE_UP_AFTER are failed instead.
+
+    Args:
+        job_ids: Only look at these jobs
+        inline: Run the jobs here instead of in the background pool
+
+    Returns:
+        tuple: (ids resumed, number failed)
+    """
+    from .models import AlertDispatch
+
+    now = timezone.now()
+    orphaned = AlertDispatch.objects.filter(_unleased(queued_before=now - timedelta(seconds=QUEUED_GRACE)))
+    if job_ids is not None:
+        orphaned = orphaned.filter(id__in=job_ids)
+
+    cutoff = now - timedelta(seconds=GIVE_UP_AFTER)
+    failed = orphaned.filter(created_at__lt=cutoff).update(
+        status='failed',
+        error_message=f'Interrupted and not resumed within {GIVE_UP_AFTER // 3600} hours',
+        finished_at=now,
+        lease_token='',
+        lease_expires_at=None,
+    )
+    resumed = list(orphaned.filter(created_at__gte=cutoff).order_by('id').values_list('id', flat=True))
+    for job_id in resumed:
+        logger.warning(f"Alert dispatch #{job_id} was orphaned; resuming")
+        if inline:
+            run_alert_dispatch(job_id)
+        else:
+            get_executor().submit(_run_in_thread, job_id)
+    return resumed, failed
+
+
+def _deliver_chunk(alert, emoji, sms_message, whatsapp_message, chunk, channels):
+    """Write in-app notifications and send external messages for one audience chunk"""
+    from .models import Notification
+    from .notifications import notification_service
+    from .notification_counts import invalidate as invalidate_notification_counts
+    from .realtime import publish_many
+
+    counts = {
+        'processed': len(chunk),
+        'inapp_sent': 0,
+        'sms_sent': 0,
+        'sms_failed': 0,
+        'whatsapp_sent': 0,
+        'whatsapp_failed': 0,
+    }
+
+    # In-app notification (always created for emergencies)
+    notifications = Notification.objects.bulk_create([
+        Notification(
+            user_id=user_id,
+            notification_type='emergency',
+            title=f"{emoji} {alert.title}",
+            message=alert.message,
+            url=f'/health-alerts/{alert.id}/'
+        )
+        for user_id, _phone in chunk
+    ])
+    counts['inapp_sent'] = len(chunk)
+    # bulk_create skips post_save, so recount these users' badges on next read
+    invalidate_notification_counts([user_id for user_id, _phone in chunk])
+    publish_many(notifications)
+
+    phones = [str(phone) for _user_id, phone in chunk if phone]
+
+    # SMS - Africa's Talking accepts many recipients per request
+    if 'sms' in channels:
+        for start in range(0, len(phones), SMS_BATCH_SIZE):
+            batch = phones[start:start + SMS_BATCH_SIZE]
+            try:
+                result = notification_service.send_bulk_sms(batch, sms_message)
+                sent = result.get('total_sent', 0)
+            except Exception as e:
+                logger.error(f"Emergency alert bulk SMS error: {str(e)}")
+                sent = 0
+            counts['sms_sent'] += sent
+            counts['sms_failed'] += len(batch) - sent
+
+    # WhatsApp - Twilio has no bulk endpoint, one request per number
+    if 'whatsapp' in channels:
+        for phone in phones:
+            result = notification_service.send_whatsapp(phone, whatsapp_message)
+            if result.get('success'):
+                counts['whatsapp_sent'] += 1
+            else:
+                counts['whatsapp_failed'] += 1
+
+    return counts
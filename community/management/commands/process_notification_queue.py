@@ -0,0 +1,44 @@
+# community/management/commands/process_notification_queue.py
+"""
+Drain the outbound NotificationLog queue from a standalone process.
+Web workers drain the queue themselves; run this from cron (or with --loop
+as a separate service) to pick up retries after restarts and expired leases.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from community.outbound import drain_queue, queue_stats
+
+
+class Command(BaseCommand):
+    help = 'Send pending SMS/WhatsApp/email notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling instead of exiting when the queue is empty',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds between polls with --loop (default 5)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = drain_queue()
+            if processed:
+                self.stdout.write(f'📤 Processed {processed} notifications')
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        stats = queue_stats()
+        self.stdout.write(self.style.SUCCESS(
+            '✅ Queue: ' + ', '.join(f'{status}={count}' for status, count in stats.items())
+        ))
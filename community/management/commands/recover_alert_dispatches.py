@@ -0,0 +1,22 @@
+# community/management/commands/recover_alert_dispatches.py
+"""
+Resume alert dispatch jobs orphaned by a restart or crash.
+Gunicorn workers run this sweep in the background when they boot; run the
+command after a deploy (or from cron) to resume jobs here and wait for them.
+"""
+
+from django.core.management.base import BaseCommand
+
+from community.dispatch import recover_alert_dispatches
+
+
+class Command(BaseCommand):
+    help = 'Resume queued or interrupted emergency alert dispatches'
+
+    def handle(self, *args, **options):
+        resumed, failed = recover_alert_dispatches(inline=True)
+        for job_id in resumed:
+            self.stdout.write(f'📢 Resumed alert dispatch #{job_id}')
+        if failed:
+            self.stdout.write(self.style.WARNING(f'⚠️ Failed {failed} dispatches interrupted too long ago'))
+        self.stdout.write(self.style.SUCCESS(f'✅ Recovered {len(resumed)} alert dispatches'))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0008_alter_challengeproof_after_photo_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertDispatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channels', models.CharField(default='sms,whatsapp', help_text='Comma-separated channels', max_length=50)),
+                ('target_locations', models.TextField(blank=True, help_text='Comma-separated locations (empty = all users)')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('total_users', models.PositiveIntegerField(default=0)),
+                ('processed', models.PositiveIntegerField(default=0)),
+                ('inapp_sent', models.PositiveIntegerField(default=0)),
+                ('sms_sent', models.PositiveIntegerField(default=0)),
+                ('sms_failed', models.PositiveIntegerField(default=0)),
+                ('whatsapp_sent', models.PositiveIntegerField(default=0)),
+                ('whatsapp_failed', models.PositiveIntegerField(default=0)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('alert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dispatches', to='community.healthalert')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='alert_dispatches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Alert Dispatch',
+                'verbose_name_plural': 'Alert Dispatches',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['alert', '-created_at'], name='community_a_alert_i_0466a7_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_sent_at_to_created_at(apps, schema_editor):
+    # Old rows stamped sent_at on creation
+    NotificationLog = apps.get_model('community', 'NotificationLog')
+    NotificationLog.objects.filter(sent_at__isnull=False).update(created_at=F('sent_at'))
+
+
+def fail_legacy_pending(apps, schema_editor):
+    # Old rows were sent inline and left 'pending' when that failed; they are not queue jobs
+    NotificationLog = apps.get_model('community', 'NotificationLog')
+    NotificationLog.objects.filter(status='pending').update(
+        status='failed', error_message='Not sent (recorded before the outbound queue)'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0009_alertdispatch'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='notificationlog',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Notification Log', 'verbose_name_plural': 'Notification Logs'},
+        ),
+        migrations.AddField(
+            model_name='notificationlog',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='notificationlog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='notificationlog',
+            name='lease_token',
+            field=models.CharField(blank=True, db_index=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='notificationlog',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notificationlog',
+            name='notification',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='delivery_logs', to='community.notification'),
+        ),
+        migrations.AddField(
+            model_name='notificationlog',
+            name='provider',
+            field=models.CharField(blank=True, max_length=30),
+        ),
+        migrations.AddField(
+            model_name='notificationlog',
+            name='recipient',
+            field=models.CharField(blank=True, help_text='Phone number or email address', max_length=254),
+        ),
+        migrations.AddField(
+            model_name='notificationlog',
+            name='subject',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='notificationlog',
+            name='sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='notificationlog',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='community_n_status_315578_idx'),
+        ),
+        migrations.RunPython(copy_sent_at_to_created_at, migrations.RunPython.noop),
+        migrations.RunPython(fail_legacy_pending, migrations.RunPython.noop),
+    ]
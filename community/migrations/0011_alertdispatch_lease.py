@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0010_notificationlog_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alertdispatch',
+            name='last_user_id',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='alertdispatch',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='alertdispatch',
+            name='lease_token',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+def split_legacy_locations(apps, schema_editor):
+    # Rows written before this migration joined the locations with ','
+    AlertDispatch = apps.get_model('community', 'AlertDispatch')
+    for job in AlertDispatch.objects.exclude(target_locations_text='').only('id', 'target_locations_text'):
+        job.target_locations = [loc.strip() for loc in job.target_locations_text.split(',') if loc.strip()]
+        job.save(update_fields=['target_locations'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0011_alertdispatch_lease'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='alertdispatch',
+            old_name='target_locations',
+            new_name='target_locations_text',
+        ),
+        migrations.AddField(
+            model_name='alertdispatch',
+            name='target_locations',
+            field=models.JSONField(blank=True, default=list, help_text='List of locations (empty = all users)'),
+        ),
+        migrations.RunPython(split_legacy_locations, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='alertdispatch',
+            name='target_locations_text',
+        ),
+    ]
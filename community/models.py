@@ -296,6 +296,75 @@ class HealthAlert(models.Model):
         return f"[{self.get_severity_display()}] {self.title}"
 
 
+class AlertDispatch(models.Model):
+    """
+    Background fan-out job for an emergency health alert.
+    Progress counters are updated chunk by chunk so the admin page can poll them.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    alert = models.ForeignKey(HealthAlert, on_delete=models.CASCADE, related_name='dispatches')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='alert_dispatches')
+    channels = models.CharField(max_length=50, default='sms,whatsapp', help_text="Comma-separated channels")
+    target_locations = models.JSONField(default=list, blank=True, help_text="List of locations (empty = all users)")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+
+    # Progress counters
+    total_users = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    inapp_sent = models.PositiveIntegerField(default=0)
+    sms_sent = models.PositiveIntegerField(default=0)
+    sms_failed = models.PositiveIntegerField(default=0)
+    whatsapp_sent = models.PositiveIntegerField(default=0)
+    whatsapp_failed = models.PositiveIntegerField(default=0)
+
+    # Resume point and lease (community/dispatch.py): users are sent in id order, so a
+    # run that dies picks up after last_user_id once its lease expires
+    last_user_id = models.PositiveBigIntegerField(default=0)
+    lease_token = models.CharField(max_length=32, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Alert Dispatch'
+        verbose_name_plural = 'Alert Dispatches'
+        indexes = [models.Index(fields=['alert', '-created_at'])]
+
+    def __str__(self):
+        return f"Dispatch #{self.id} of {self.alert} - {self.status}"
+
+    @property
+    def channel_list(self):
+        return [c for c in self.channels.split(',') if c]
+
+    @property
+    def location_list(self):
+        # A JSON list, since free-text locations like "Kanyama, Lusaka" contain commas
+        return [loc.strip() for loc in self.target_locations or [] if loc and loc.strip()]
+
+    @property
+    def progress_percentage(self):
+        if self.status == 'completed':
+            return 100
+        if not self.total_users:
+            return 0
+        return min(100, int((self.processed / self.total_users) * 100))
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
+
+
 # ====================== COMMUNITY CAMPAIGNS ======================
 class CommunityCampaign(models.Model):
     """
@@ -675,44 +744,19 @@ class ChallengeProof(models.Model):
         return f"Proof by {self.participant.user} - {self.get_status_display()}"
     
     def approve(self, admin_user):
-        """Approve proof and award points"""
-        if self.status == 'approved':
+        """Approve proof and award points (see community.proof_approval)"""
+        if self.status != 'pending':
             return
         
-        self.status = 'approved'
-        self.reviewed_by = admin_user
-        self.reviewed_at = timezone.now()
-        
-        # Award 30 points per bag
-        points = self.bags_collected * 30
-        self.points_awarded = points
-        
-        # Update participant contribution
-        self.participant.contribution += self.bags_collected
-        self.participant.save()
-        
-        # Update challenge progress
-        self.participant.challenge.current_progress += self.bags_collected
-        self.participant.challenge.save()
-        
-        # Award points to user in gamification system
-        try:
-            from gamification.models import UserPoints
-            user_points, created = UserPoints.objects.get_or_create(user=self.participant.user)
-            user_points.add_points(points, 'challenge_complete', f'Challenge proof approved: {self.bags_collected} bags', reference_id=self.id)
-        except Exception as e:
-            print(f"Gamification points error: {e}")
-        
-        # Award points to user profile (main points display)
-        try:
-            from accounts.models import UserProfile
-            profile, created = UserProfile.objects.get_or_create(user=self.participant.user)
-            profile.points += points
-            profile.save()
-        except Exception as e:
-            print(f"UserProfile points error: {e}")
-        
-        self.save()
+        from .proof_approval import approve_proofs
+        result = approve_proofs([self.id], admin_user)
+        if result['approved']:
+            approved = result['proofs'][0]
+            self.status = approved.status
+            self.reviewed_by = approved.reviewed_by
+            self.reviewed_at = approved.reviewed_at
+            self.points_awarded = approved.points_awarded
+            self.participant.contribution = approved.participant.contribution
     
     def reject(self, admin_user, reason=''):
         """Reject proof submission"""
@@ -767,7 +811,11 @@ class SocialShare(models.Model):
 
 class NotificationLog(models.Model):
     """
-    Log all notifications sent for tracking and debugging
+    Outbound SMS/WhatsApp/email message and its delivery state
+    
+    Rows are created as 'pending' by community.outbound.notify() and moved
+    by the background workers: pending -> sent -> delivered, or
+    pending -> failed once retries are exhausted.
     """
     user = models.ForeignKey(
         'accounts.CustomUser',
@@ -775,6 +823,15 @@ class NotificationLog(models.Model):
         related_name='notification_logs'
     )
     
+    # In-app notification this message accompanies (flags is_sent_sms/is_sent_whatsapp)
+    notification = models.ForeignKey(
+        'Notification',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='delivery_logs'
+    )
+    
     CHANNEL_CHOICES = [
         ('sms', 'SMS'),
         ('whatsapp', 'WhatsApp'),
@@ -783,6 +840,8 @@ class NotificationLog(models.Model):
     channel = models.CharField(max_length=20, choices=CHANNEL_CHOICES)
     
     notification_type = models.CharField(max_length=50)
+    recipient = models.CharField(max_length=254, blank=True, help_text="Phone number or email address")
+    subject = models.CharField(max_length=200, blank=True)
     message = models.TextField()
     
     STATUS_CHOICES = [
@@ -797,7 +856,22 @@ class NotificationLog(models.Model):
         default='pending'
     )
     
-    sent_at = models.DateTimeField(auto_now_add=True)
+    # Allowed state changes
+    TRANSITIONS = {
+        'pending': {'pending', 'sent', 'delivered', 'failed'},
+        'sent': {'delivered', 'failed'},
+        'delivered': set(),
+        'failed': set(),
+    }
+    
+    # Retry queue
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    lease_token = models.CharField(max_length=32, blank=True, db_index=True)
+    
+    provider = models.CharField(max_length=30, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
     delivered_at = models.DateTimeField(null=True, blank=True)
     error_message = models.TextField(blank=True)
     
@@ -807,7 +881,43 @@ class NotificationLog(models.Model):
     class Meta:
         verbose_name = 'Notification Log'
         verbose_name_plural = 'Notification Logs'
-        ordering = ['-sent_at']
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
     
     def __str__(self):
         return f"{self.channel} to {self.user.username} - {self.status}"
+    
+    def can_transition(self, status):
+        return status in self.TRANSITIONS[self.status]
+    
+    def _transition(self, status, **fields):
+        if not self.can_transition(status):
+            raise ValueError(f"NotificationLog #{self.id}: cannot move from {self.status} to {status}")
+        self.status = status
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.lease_token = ''
+        self.save(update_fields=['status', 'lease_token', 'attempts', *fields])
+    
+    def mark_sent(self, provider='', message_sid=''):
+        self._transition('sent', provider=provider, message_sid=message_sid or '', sent_at=timezone.now())
+    
+    def mark_delivered(self, provider='', message_sid=''):
+        now = timezone.now()
+        fields = {'delivered_at': now, 'sent_at': self.sent_at or now}
+        if provider:
+            fields.update(provider=provider, message_sid=message_sid or self.message_sid)
+        self._transition('delivered', **fields)
+    
+    def mark_failed(self, error=''):
+        self._transition('failed', error_message=error, next_attempt_at=None)
+    
+    def schedule_retry(self, error, delay):
+        """Keep the row pending and push it back onto the queue after `delay` seconds"""
+        self._transition(
+            'pending',
+            error_message=error,
+            next_attempt_at=timezone.now() + timezone.timedelta(seconds=delay)
+        )
@@ -0,0 +1,148 @@
+# community/notification_counts.py
+"""
+Per-user notification counter cache
+The unread badge count and the notification tab counts (all + TAB_TYPES)
+are kept in the cache as one integer per user and bucket. Cold buckets are
+filled with a single GROUP BY notification_type query; creating and reading
+notifications adjust them with the cache's atomic incr/decr once the
+transaction commits, so concurrent workers never overwrite each other's
+updates and the unread badge on every page needs no COUNT queries.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+logger = logging.getLogger(__name__)
+
+COUNTS_TTL = getattr(settings, 'NOTIFICATION_COUNTS_TTL', 300)
+
+# Notification page tabs -> notification types they include
+TAB_TYPES = {
+    'events': ['event_reminder', 'new_event'],
+    'challenges': ['challenge_update'],
+    'forum': ['forum_reply'],
+    'rewards': ['reward_redeemed'],
+    'community': ['campaign_launch', 'community_news', 'general'],
+}
+TYPE_TABS = {notification_type: tab for tab, types in TAB_TYPES.items() for notification_type in types}
+TAB_BUCKETS = ['all', *TAB_TYPES]
+
+
+def _cache_key(user_id, bucket):
+    return f'notification_counts_{user_id}_{bucket}'
+
+
+def _load_counts(user_id):
+    """Fill every bucket of a user from one GROUP BY query"""
+    from .models import Notification
+
+    counts = dict.fromkeys(['unread', *TAB_BUCKETS], 0)
+    rows = Notification.objects.filter(user_id=user_id).values('notification_type').annotate(
+        total=Count('id'),
+        unread=Count('id', filter=Q(is_read=False)),
+    )
+    for row in rows:
+        counts['unread'] += row['unread']
+        counts['all'] += row['total']
+        tab = TYPE_TABS.get(row['notification_type'])
+        if tab:
+            counts[tab] += row['total']
+    cache.set_many({_cache_key(user_id, bucket): n for bucket, n in counts.items()}, COUNTS_TTL)
+    return counts
+
+
+def _get_buckets(user_id, buckets):
+    cached = cache.get_many([_cache_key(user_id, bucket) for bucket in buckets])
+    if len(cached) < len(buckets):
+        counts = _load_counts(user_id)
+    else:
+        counts = {bucket: cached[_cache_key(user_id, bucket)] for bucket in buckets}
+    # A decr racing a cold fill can overshoot by one until the TTL expires
+    return {bucket: max(counts[bucket], 0) for bucket in buckets}
+
+
+def unread_count(user_id):
+    return _get_buckets(user_id, ['unread'])['unread']
+
+
+def tab_counts(user_id):
+    """Counts for the notification page filter tabs (all + TAB_TYPES)"""
+    return _get_buckets(user_id, TAB_BUCKETS)
+
+
+def _adjust(user_id, deltas):
+    """
+    Apply {bucket: delta} to warm buckets once the current transaction
+    commits; cold buckets are left to the next read
+    """
+    def apply():
+        for bucket, delta in deltas.items():
+            try:
+                cache.incr(_cache_key(user_id, bucket), delta)
+            except ValueError:
+                pass  # not cached
+
+    transaction.on_commit(apply, robust=True)
+
+
+def invalidate(user_ids):
+    """Drop cached counts once the current transaction commits (bulk writes that bypass the hooks below)"""
+    keys = [_cache_key(user_id, bucket) for user_id in user_ids for bucket in ['unread', *TAB_BUCKETS]]
+    transaction.on_commit(lambda: cache.delete_many(keys), robust=True)
+
+
+# --- Maintenance hooks ---
+
+def notification_created(notification):
+    deltas = {'all': 1}
+    tab = TYPE_TABS.get(notification.notification_type)
+    if tab:
+        deltas[tab] = 1
+    if not notification.is_read:
+        deltas['unread'] = 1
+    _adjust(notification.user_id, deltas)
+
+
+def mark_read(notification):
+    """Mark one notification read, decrementing the cached unread count if it changed"""
+    from .models import Notification
+
+    updated = Notification.objects.filter(id=notification.id, is_read=False).update(is_read=True)
+    notification.is_read = True
+    if updated:
+        _adjust(notification.user_id, {'unread': -1})
+
+
+def mark_all_read(user_id):
+    """Mark every notification of a user read and drop the cached unread count"""
+    from .models import Notification
+
+    updated = Notification.objects.filter(user_id=user_id, is_read=False).update(is_read=True)
+    if updated:
+        # Zeroing could wipe out a notification created meanwhile; recount instead
+        transaction.on_commit(lambda: cache.delete(_cache_key(user_id, 'unread')), robust=True)
+    return updated
+
+
+def notification_saved(sender, instance, created=False, raw=False, **kwargs):
+    """post_save receiver - count new rows, recount on any other edit"""
+    if raw:
+        return
+    try:
+        if created:
+            notification_created(instance)
+        else:
+            invalidate([instance.user_id])
+    except Exception as e:
+        logger.error(f"Notification counter update failed for user {instance.user_id}: {str(e)}")
+
+
+def notification_deleted(sender, instance, **kwargs):
+    try:
+        invalidate([instance.user_id])
+    except Exception as e:
+        logger.error(f"Notification counter invalidation failed for user {instance.user_id}: {str(e)}")
@@ -8,9 +8,9 @@ Optimized for African markets with cost-effective SMS delivery
 from django.conf import settings
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
-from twilio.rest import Client
 import logging
-import africastalking
+
+from ecolearn import providers
 
 logger = logging.getLogger(__name__)
 
@@ -24,38 +24,18 @@ class NotificationService:
     """
     
     def __init__(self):
-        # Initialize Africa's Talking
         self.africas_talking_username = getattr(settings, 'AFRICAS_TALKING_USERNAME', 'sandbox')
-        self.africas_talking_api_key = getattr(settings, 'AFRICAS_TALKING_API_KEY', '')
-        
-        if self.africas_talking_api_key:
-            try:
-                africastalking.initialize(self.africas_talking_username, self.africas_talking_api_key)
-                self.africas_talking_sms = africastalking.SMS
-                logger.info(f"Africa's Talking initialized for {self.africas_talking_username}")
-            except Exception as e:
-                self.africas_talking_sms = None
-                logger.error(f"Africa's Talking initialization failed: {e}")
-        else:
-            self.africas_talking_sms = None
-            logger.warning("Africa's Talking credentials not configured")
-        
-        # Initialize Twilio client (for WhatsApp and backup SMS)
-        if hasattr(settings, 'TWILIO_ACCOUNT_SID') and settings.TWILIO_ACCOUNT_SID:
-            try:
-                self.twilio_client = Client(
-                    settings.TWILIO_ACCOUNT_SID,
-                    settings.TWILIO_AUTH_TOKEN
-                )
-                self.twilio_phone = settings.TWILIO_PHONE_NUMBER
-                self.twilio_whatsapp = getattr(settings, 'TWILIO_WHATSAPP_NUMBER', None)
-                logger.info("Twilio client initialized for WhatsApp and backup SMS")
-            except Exception as e:
-                self.twilio_client = None
-                logger.error(f"Twilio initialization failed: {e}")
-        else:
-            self.twilio_client = None
-            logger.warning("Twilio credentials not configured")
+        self.twilio_phone = getattr(settings, 'TWILIO_PHONE_NUMBER', None)
+        self.twilio_whatsapp = getattr(settings, 'TWILIO_WHATSAPP_NUMBER', None)
+
+    # SDK clients are built on first use (ecolearn/providers.py), not at import
+    @property
+    def africas_talking_sms(self):
+        return providers.get('africastalking_sms')
+
+    @property
+    def twilio_client(self):
+        return providers.get('twilio')
     
     def send_sms(self, to_number, message, provider='auto'):
         """
@@ -532,30 +512,20 @@ def send_notification(user, title, message, notification_type='general', link=No
         url=link
     )
     
-    # Optionally send via other channels based on user preferences
+    # Optionally send via other channels based on user preferences (queued, see community.outbound)
     try:
-        if hasattr(user, 'notification_preferences'):
-            prefs = user.notification_preferences
-            
-            # Send SMS if enabled
-            if prefs.sms_enabled and user.phone_number:
-                result = notification_service.send_sms(
-                    str(user.phone_number),
-                    f"[EcoLearn] {message[:140]}"
-                )
-                if result.get('success'):
-                    notification.is_sent_sms = True
-            
-            # Send WhatsApp if enabled
-            if prefs.whatsapp_enabled and user.phone_number:
-                result = notification_service.send_whatsapp(
-                    str(user.phone_number),
-                    f"*{title}*\n\n{message}"
-                )
-                if result.get('success'):
-                    notification.is_sent_whatsapp = True
-            
-            notification.save()
+        from .outbound import notify, preferred_channels
+        
+        channels = preferred_channels(user)
+        if channels:
+            notify(
+                user,
+                f"[EcoLearn] {message[:140]}",
+                channels=channels,
+                notification_type=notification_type,
+                whatsapp_message=f"*{title}*\n\n{message}",
+                notification=notification
+            )
     except Exception as e:
         logger.error(f"Error sending multi-channel notification: {str(e)}")
     
@@ -563,10 +533,14 @@ def send_notification(user, title, message, notification_type='general', link=No
 
 
 def send_emergency_alert(alert_type, severity, title, message, location, affected_areas='', 
-                        hygiene_tips='', nearest_clinics='', target_locations=None, created_by=None):
+                        hygiene_tips='', nearest_clinics='', target_locations=None, created_by=None,
+                        channels=None):
     """
     Send emergency health alert to users
     
+    Creates the alert record and queues a background dispatch job
+    (see community.dispatch) instead of sending inside the request.
+    
     Args:
         alert_type: Type of alert (cholera, flooding, hazardous_waste, etc.)
         severity: Severity level (critical, high, medium, low)
@@ -578,13 +552,13 @@ def send_emergency_alert(alert_type, severity, title, message, location, affecte
         nearest_clinics: Emergency contacts
         target_locations: List of locations to target (None = all users)
         created_by: User creating the alert
+        channels: External channels to use (default: sms and whatsapp)
     
     Returns:
-        dict: Results of alert sending
+        dict: Alert and dispatch job ids plus the job's current counters
     """
-    from .models import HealthAlert, Notification
-    from accounts.models import CustomUser
-    from django.db.models import Q
+    from .models import HealthAlert
+    from .dispatch import start_alert_dispatch
     
     # Create health alert record
     alert = HealthAlert.objects.create(
@@ -600,97 +574,23 @@ def send_emergency_alert(alert_type, severity, title, message, location, affecte
         is_active=True
     )
     
-    # Get target users
-    users = CustomUser.objects.filter(is_active=True)
-    
-    if target_locations:
-        location_q = Q()
-        for loc in target_locations:
-            location_q |= Q(location__icontains=loc)
-        users = users.filter(location_q)
-    
-    # Prepare emergency messages
-    severity_emoji = {
-        'low': '⚠️',
-        'medium': '🚨',
-        'high': '🔴',
-        'critical': '🚨🔴'
-    }
-    
-    emoji = severity_emoji.get(severity, '⚠️')
-    
-    # SMS message (short)
-    sms_message = f"{emoji} HEALTH ALERT: {title}. {message[:100]}... Safety: {hygiene_tips[:50]}..."
-    
-    # WhatsApp message (detailed)
-    whatsapp_message = f"""
-{emoji} *HEALTH ALERT - {severity.upper()}*
-
-*{title}*
-
-*Location:* {location}
-{f"*Affected Areas:* {affected_areas}" if affected_areas else ""}
-
-*Alert:*
-{message}
-
-*Safety Tips:*
-{hygiene_tips}
-
-{f"*Nearest Clinics:*\n{nearest_clinics}" if nearest_clinics else ""}
-
-Stay safe! - EcoLearn Emergency System
-    """.strip()
+    job = start_alert_dispatch(
+        alert,
+        channels=channels,
+        target_locations=target_locations,
+        created_by=created_by
+    )
     
-    # Send to users
-    results = {
+    return {
         'alert_id': alert.id,
-        'total_users': users.count(),
-        'sms_sent': 0,
-        'whatsapp_sent': 0,
-        'inapp_sent': 0,
-        'failed': 0
+        'job_id': job.id,
+        'status': job.status,
+        'total_users': job.total_users,
+        'sms_sent': job.sms_sent,
+        'whatsapp_sent': job.whatsapp_sent,
+        'inapp_sent': job.inapp_sent,
+        'failed': job.sms_failed + job.whatsapp_failed
     }
-    
-    for user in users:
-        try:
-            # SMS
-            if user.phone_number:
-                result = notification_service.send_sms(
-                    str(user.phone_number),
-                    sms_message[:160]
-                )
-                if result.get('success'):
-                    results['sms_sent'] += 1
-                else:
-                    results['failed'] += 1
-            
-            # WhatsApp
-            if user.phone_number:
-                result = notification_service.send_whatsapp(
-                    str(user.phone_number),
-                    whatsapp_message
-                )
-                if result.get('success'):
-                    results['whatsapp_sent'] += 1
-                else:
-                    results['failed'] += 1
-            
-            # In-app notification (always create for emergencies)
-            Notification.objects.create(
-                user=user,
-                notification_type='emergency',
-                title=f"{emoji} {title}",
-                message=message,
-                url=f'/health-alerts/{alert.id}/'
-            )
-            results['inapp_sent'] += 1
-            
-        except Exception as e:
-            results['failed'] += 1
-            logger.error(f"Emergency alert send error: {str(e)}")
-    
-    return results
 
 
 def send_cholera_alert(location, affected_areas='', nearest_clinics='', target_locations=None, created_by=None):
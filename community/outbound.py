@@ -0,0 +1,453 @@
+# community/outbound.py
+"""
+Asynchronous outbound notification pipeline
+notify() records one NotificationLog row per channel as 'pending' and returns
+at once. A small pool of background threads drains the queue: each worker
+leases a batch of due rows, groups them by provider (identical SMS texts go
+out in one Africa's Talking bulk request), sends them and moves every row to
+sent/delivered, or back to pending with exponential backoff until
+NOTIFICATION_MAX_ATTEMPTS is reached and it is marked failed.
+
+Set NOTIFICATION_BACKEND = 'community.outbound.FakeBackend' to run the whole
+pipeline offline (load tests, local development).
+"""
+
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Tunables (override in settings.py)
+MAX_WORKERS = getattr(settings, 'NOTIFICATION_WORKERS', 4)
+BATCH_SIZE = getattr(settings, 'NOTIFICATION_BATCH_SIZE', 100)
+MAX_ATTEMPTS = getattr(settings, 'NOTIFICATION_MAX_ATTEMPTS', 4)
+RETRY_BASE_DELAY = getattr(settings, 'NOTIFICATION_RETRY_BASE_DELAY', 30)  # seconds, doubled per attempt
+RETRY_MAX_DELAY = getattr(settings, 'NOTIFICATION_RETRY_MAX_DELAY', 3600)
+LEASE_SECONDS = getattr(settings, 'NOTIFICATION_LEASE_SECONDS', 300)
+
+CHANNELS = ('sms', 'whatsapp', 'email')
+
+# Provider errors that retrying will not fix
+PERMANENT_ERRORS = ('not configured', 'No SMS provider', 'No phone numbers')
+
+
+def format_phone(phone):
+    """Normalise a phone number the way NotificationService does (+260 default)"""
+    phone = str(phone)
+    if not phone.startswith('+'):
+        phone = '+260' + (phone[1:] if phone.startswith('0') else phone)
+    return phone
+
+
+# --- Backends ---
+
+class LiveBackend:
+    """Send through the Africa's Talking / Twilio / Django mail NotificationService"""
+
+    def _service(self):
+        from .notifications import notification_service
+        return notification_service
+
+    def send_sms_batch(self, recipients, message):
+        """
+        Returns:
+            dict: {recipient: {'success', 'provider', 'message_sid', 'error'}}
+        """
+        service = self._service()
+        if len(recipients) == 1:
+            result = service.send_sms(recipients[0], message)
+            return {recipients[0]: result}
+
+        response = service.send_bulk_sms(list(recipients), message)
+        by_phone = {r['phone']: r for r in response.get('results', [])}
+        results = {}
+        for recipient in recipients:
+            row = by_phone.get(format_phone(recipient))
+            if row is None:
+                results[recipient] = {'success': False, 'error': response.get('error') or 'No SMS provider available or configured'}
+            else:
+                results[recipient] = {
+                    'success': row['success'],
+                    'provider': row.get('provider', ''),
+                    'message_sid': row.get('message_id') or '',
+                    'error': row.get('error') or '',
+                }
+        return results
+
+    def send_whatsapp(self, recipient, message):
+        result = self._service().send_whatsapp(recipient, message)
+        result.setdefault('provider', 'twilio')
+        return result
+
+    def send_email(self, recipient, subject, message):
+        result = self._service().send_email(recipient, subject or 'EcoLearn Notification', message)
+        result.setdefault('provider', 'email')
+        return result
+
+
+class FakeBackend:
+    """
+    Offline provider for load tests
+    Simulates per-request latency, a random failure rate and immediate delivery reports.
+    """
+
+    def __init__(self):
+        self.latency = getattr(settings, 'NOTIFICATION_FAKE_LATENCY', 0.05)
+        self.failure_rate = getattr(settings, 'NOTIFICATION_FAKE_FAILURE_RATE', 0.0)
+
+    def _result(self, provider):
+        if random.random() < self.failure_rate:
+            return {'success': False, 'provider': provider, 'error': 'Simulated provider failure'}
+        return {'success': True, 'provider': provider, 'message_sid': f'FAKE-{uuid.uuid4().hex[:12]}', 'delivered': True}
+
+    def send_sms_batch(self, recipients, message):
+        time.sleep(self.latency)
+        return {recipient: self._result('fake_sms') for recipient in recipients}
+
+    def send_whatsapp(self, recipient, message):
+        time.sleep(self.latency)
+        return self._result('fake_whatsapp')
+
+    def send_email(self, recipient, subject, message):
+        time.sleep(self.latency)
+        return self._result('fake_email')
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(getattr(settings, 'NOTIFICATION_BACKEND', 'community.outbound.LiveBackend'))()
+    return _backend
+
+
+# --- Enqueue ---
+
+def preferred_channels(user, category=None, default=()):
+    """
+    Phone channels the user has switched on in NotificationPreference
+
+    Args:
+        category: Optional preference flag that must also be on (e.g. 'forum_replies')
+        default: Channels to use when the user has no preferences row
+    """
+    prefs = getattr(user, 'notification_preferences', None)
+    if prefs is None:
+        return list(default)
+    if category and not getattr(prefs, category, True):
+        return []
+    channels = []
+    if prefs.sms_enabled:
+        channels.append('sms')
+    if prefs.whatsapp_enabled:
+        channels.append('whatsapp')
+    return channels
+
+
+def notify(user, message, channels=('sms', 'whatsapp'), notification_type='general',
+           whatsapp_message=None, subject='', notification=None):
+    """
+    Queue an outbound message to a user and return immediately
+
+    Args:
+        user: Recipient user
+        message: Text for SMS (and WhatsApp/email unless overridden)
+        channels: Iterable of 'sms', 'whatsapp', 'email'
+        notification_type: Free-form category stored on the log
+        whatsapp_message: Optional longer WhatsApp text
+        subject: Email subject
+        notification: Optional in-app Notification whose is_sent_* flags to set
+
+    Returns:
+        list: the pending NotificationLog rows (channels without a recipient are skipped)
+    """
+    from .models import NotificationLog
+
+    logs = []
+    for channel in channels:
+        if channel not in CHANNELS:
+            raise ValueError(f"Unknown notification channel: {channel}")
+
+        recipient = user.email if channel == 'email' else getattr(user, 'phone_number', None)
+        if not recipient:
+            continue
+
+        logs.append(NotificationLog(
+            user=user,
+            notification=notification,
+            channel=channel,
+            notification_type=notification_type,
+            recipient=str(recipient),
+            subject=subject,
+            message=whatsapp_message if channel == 'whatsapp' and whatsapp_message else message,
+        ))
+
+    if logs:
+        NotificationLog.objects.bulk_create(logs)
+        _schedule_drain()
+
+    return logs
+
+
+def notify_many(messages):
+    """
+    Queue outbound messages for many users with a single INSERT
+
+    Args:
+        messages: Iterable of dicts with notify() keyword arguments
+                  ('user' and 'message' required)
+
+    Returns:
+        list: the pending NotificationLog rows
+    """
+    from .models import NotificationLog
+
+    logs = []
+    for item in messages:
+        user = item['user']
+        whatsapp_message = item.get('whatsapp_message')
+        for channel in item.get('channels', ('sms', 'whatsapp')):
+            if channel not in CHANNELS:
+                raise ValueError(f"Unknown notification channel: {channel}")
+
+            recipient = user.email if channel == 'email' else getattr(user, 'phone_number', None)
+            if not recipient:
+                continue
+
+            logs.append(NotificationLog(
+                user=user,
+                notification=item.get('notification'),
+                channel=channel,
+                notification_type=item.get('notification_type', 'general'),
+                recipient=str(recipient),
+                subject=item.get('subject', ''),
+                message=whatsapp_message if channel == 'whatsapp' and whatsapp_message else item['message'],
+            ))
+
+    if logs:
+        NotificationLog.objects.bulk_create(logs, batch_size=500)
+        _schedule_drain()
+
+    return logs
+
+
+def _schedule_drain():
+    if getattr(settings, 'NOTIFICATION_ASYNC', True):
+        # Workers must not look for the rows before they are committed
+        transaction.on_commit(wake_workers)
+    else:
+        drain_queue()
+
+
+# --- Worker pool ---
+
+_executor = None
+_state_lock = threading.Lock()
+_active_workers = 0
+_wake_requested = False
+_retry_timer = None
+
+
+def get_executor():
+    """Return the process-wide outbound worker pool (created on first use)"""
+    global _executor
+    with _state_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='outbound')
+        return _executor
+
+
+def wake_workers():
+    """
+    Make sure a worker will look at the queue
+    Starts one worker if the pool has room; otherwise a running worker
+    takes another pass before it exits. Workers that lease a full batch
+    recruit a further worker, so a backlog spreads over the pool.
+    """
+    global _active_workers, _wake_requested
+    executor = get_executor()
+    with _state_lock:
+        _wake_requested = True
+        if _active_workers >= MAX_WORKERS:
+            return
+        _active_workers += 1
+    executor.submit(_worker)
+
+
+def _worker():
+    global _active_workers, _wake_requested
+    close_old_connections()
+    try:
+        while True:
+            with _state_lock:
+                _wake_requested = False
+            try:
+                drain_queue(on_full_batch=wake_workers)
+            except Exception as e:
+                logger.error(f"Outbound worker crashed: {str(e)}")
+            with _state_lock:
+                if not _wake_requested:
+                    _active_workers -= 1
+                    break
+    finally:
+        close_old_connections()
+    _schedule_retry_timer()
+
+
+def _schedule_retry_timer():
+    """Wake the pool again when the earliest backed-off row becomes due"""
+    global _retry_timer
+    from .models import NotificationLog
+
+    try:
+        next_due = NotificationLog.objects.filter(
+            status='pending', next_attempt_at__isnull=False
+        ).order_by('next_attempt_at').values_list('next_attempt_at', flat=True).first()
+    except Exception as e:
+        logger.error(f"Outbound retry timer lookup failed: {str(e)}")
+        return
+    finally:
+        close_old_connections()
+
+    if next_due is None:
+        return
+
+    delay = max((next_due - timezone.now()).total_seconds(), 1)
+    with _state_lock:
+        if _retry_timer is not None and _retry_timer.is_alive():
+            return
+        _retry_timer = threading.Timer(delay, wake_workers)
+        _retry_timer.daemon = True
+        _retry_timer.start()
+
+
+def claim_batch(limit=BATCH_SIZE):
+    """
+    Lease up to `limit` due pending rows for this worker
+
+    The lease pushes next_attempt_at forward, so rows held by a worker that
+    dies are picked up again after LEASE_SECONDS by any process.
+    """
+    from .models import NotificationLog
+
+    now = timezone.now()
+    due = Q(status='pending') & (Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+    ids = list(NotificationLog.objects.filter(due).order_by('id').values_list('id', flat=True)[:limit])
+    if not ids:
+        return []
+
+    token = uuid.uuid4().hex
+    NotificationLog.objects.filter(due, id__in=ids).update(
+        lease_token=token,
+        next_attempt_at=now + timezone.timedelta(seconds=LEASE_SECONDS)
+    )
+    return list(NotificationLog.objects.filter(lease_token=token).order_by('id'))
+
+
+def drain_queue(max_batches=None, on_full_batch=None):
+    """
+    Send due messages until the queue is empty
+
+    Returns:
+        int: Number of rows processed
+    """
+    processed = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        batch = claim_batch()
+        if not batch:
+            break
+        if on_full_batch and len(batch) >= BATCH_SIZE:
+            on_full_batch()
+        process_batch(batch)
+        processed += len(batch)
+        batches += 1
+    return processed
+
+
+def process_batch(logs):
+    """Send one leased batch, grouped by provider"""
+    backend = get_backend()
+
+    # SMS with the same text share one bulk request
+    sms_groups = defaultdict(list)
+    for log in logs:
+        if log.channel == 'sms':
+            sms_groups[log.message].append(log)
+
+    for message, group in sms_groups.items():
+        try:
+            results = backend.send_sms_batch(list({log.recipient for log in group}), message)
+        except Exception as e:
+            results = {log.recipient: {'success': False, 'error': str(e)} for log in group}
+        for log in group:
+            _apply_result(log, results.get(log.recipient, {'success': False, 'error': 'No result from provider'}))
+
+    for log in logs:
+        if log.channel == 'sms':
+            continue
+        try:
+            if log.channel == 'whatsapp':
+                result = backend.send_whatsapp(log.recipient, log.message)
+            else:
+                result = backend.send_email(log.recipient, log.subject, log.message)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        _apply_result(log, result)
+
+
+def retry_delay(attempts):
+    return min(RETRY_BASE_DELAY * (2 ** (attempts - 1)), RETRY_MAX_DELAY)
+
+
+def _apply_result(log, result):
+    """Move a log through the state machine from a provider result"""
+    from .models import Notification
+
+    log.attempts += 1
+    try:
+        if result.get('success'):
+            provider = result.get('provider', '')
+            message_sid = result.get('message_sid') or ''
+            if result.get('delivered'):
+                log.mark_delivered(provider, message_sid)
+            else:
+                log.mark_sent(provider, message_sid)
+
+            if log.notification_id and log.channel in ('sms', 'whatsapp'):
+                Notification.objects.filter(id=log.notification_id).update(**{f'is_sent_{log.channel}': True})
+            return
+
+        error = result.get('error') or 'Unknown provider error'
+        permanent = any(marker in error for marker in PERMANENT_ERRORS)
+        if permanent or log.attempts >= MAX_ATTEMPTS:
+            log.mark_failed(error)
+            logger.warning(f"NotificationLog #{log.id} failed after {log.attempts} attempt(s): {error}")
+        else:
+            log.schedule_retry(error, retry_delay(log.attempts))
+    except Exception as e:
+        logger.error(f"NotificationLog #{log.id} state update failed: {str(e)}")
+
+
+def queue_stats():
+    """Counts per status for monitoring"""
+    from django.db.models import Count
+    from .models import NotificationLog
+
+    stats = {status: 0 for status, _label in NotificationLog.STATUS_CHOICES}
+    for row in NotificationLog.objects.values('status').annotate(total=Count('id')):
+        stats[row['status']] = row['total']
+    return stats
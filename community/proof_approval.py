@@ -0,0 +1,227 @@
+# community/proof_approval.py
+"""
+Batch approval of challenge proofs
+Approving proofs one at a time cost a dozen queries and two outbound
+messages per proof. approve_proofs() applies a whole batch in one
+transaction with a fixed number of queries:
+
+- one SELECT loads the pending proofs with participant, user, preferences
+  and challenge
+- contribution, current_progress and points are bumped with one
+  F() + CASE UPDATE per table, grouped per participant/challenge/user
+- PointTransactions and Notifications are bulk-created
+- challenge ranks come from a single RANK() window query
+- SMS/WhatsApp go onto the outbound queue with one INSERT; the background
+  workers deliver them after commit
+"""
+
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When, Window
+from django.db.models.functions import Rank
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+POINTS_PER_BAG = 30
+
+# Admins are told about awards of at least this many points
+ADMIN_NOTIFY_POINTS = 100
+
+
+def _increment(queryset, key, amounts, *fields, **extra):
+    """UPDATE field = field + CASE key WHEN ... for every (key, amount) in one statement"""
+    if not amounts:
+        return
+    delta = Case(
+        *[When(**{key: pk}, then=Value(amount)) for pk, amount in amounts.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    queryset.filter(**{f'{key}__in': list(amounts)}).update(
+        **{field: F(field) + delta for field in fields}, **extra
+    )
+
+
+def _challenge_ranks(challenge_ids):
+    """
+    Returns:
+        dict: participant_id -> (ChallengeParticipant, rank) for every participant of the challenges
+    """
+    from .models import ChallengeParticipant
+
+    participants = ChallengeParticipant.objects.filter(challenge_id__in=challenge_ids).annotate(
+        rank=Window(Rank(), partition_by=[F('challenge_id')], order_by=F('contribution').desc())
+    ).only('id', 'challenge_id', 'user_id', 'contribution')
+    return {participant.id: (participant, participant.rank) for participant in participants}
+
+
+def approve_proofs(proof_ids, admin_user):
+    """
+    Approve every pending proof in `proof_ids` and award 30 points per bag
+
+    Returns:
+        dict: 'approved' (count), 'points' (total), 'proofs' (approved ChallengeProof
+              objects) and 'ranks' (participant_id -> challenge rank after the batch)
+    """
+    from accounts.models import CustomUser, UserProfile
+    from gamification import leaderboards
+    from gamification.models import PointTransaction, UserPoints
+    from . import notification_counts, realtime
+    from .models import ChallengeParticipant, ChallengeProof, CommunityChallenge, Notification
+    from .outbound import notify_many, preferred_channels
+
+    proof_ids = [int(pk) for pk in proof_ids if str(pk).isdigit()]
+    result = {'approved': 0, 'points': 0, 'proofs': [], 'ranks': {}}
+    if not proof_ids:
+        return result
+
+    now = timezone.now()
+
+    with transaction.atomic():
+        proofs = list(
+            ChallengeProof.objects.select_for_update(of=('self',))
+            .select_related(
+                'participant__challenge',
+                'participant__user__notification_preferences',
+            )
+            .filter(id__in=proof_ids, status='pending')
+            .order_by('id')
+        )
+        if not proofs:
+            return result
+
+        bags_by_participant = defaultdict(int)
+        bags_by_challenge = defaultdict(int)
+        points_by_user = defaultdict(int)
+        for proof in proofs:
+            proof.status = 'approved'
+            proof.reviewed_by = admin_user
+            proof.reviewed_at = now
+            proof.points_awarded = proof.bags_collected * POINTS_PER_BAG
+            bags_by_participant[proof.participant_id] += proof.bags_collected
+            bags_by_challenge[proof.participant.challenge_id] += proof.bags_collected
+            points_by_user[proof.participant.user_id] += proof.points_awarded
+
+        ChallengeProof.objects.bulk_update(proofs, ['status', 'reviewed_by', 'reviewed_at', 'points_awarded'])
+
+        # Contribution and challenge progress
+        _increment(ChallengeParticipant.objects, 'id', bags_by_participant, 'contribution')
+        _increment(CommunityChallenge.objects, 'id', bags_by_challenge, 'current_progress')
+
+        # Points: create missing rows, then bump them all at once
+        awarded = {user_id: points for user_id, points in points_by_user.items() if points}
+        UserPoints.objects.bulk_create(
+            [UserPoints(user_id=user_id) for user_id in awarded], ignore_conflicts=True
+        )
+        _increment(UserPoints.objects, 'user_id', awarded, 'total_points', 'available_points', updated_at=now)
+        UserProfile.objects.bulk_create(
+            [UserProfile(user_id=user_id) for user_id in awarded], ignore_conflicts=True
+        )
+        _increment(UserProfile.objects, 'user_id', awarded, 'points')
+
+        PointTransaction.objects.bulk_create([
+            PointTransaction(
+                user_id=proof.participant.user_id,
+                transaction_type='challenge_complete',
+                points=proof.points_awarded,
+                description=f'Challenge proof approved: {proof.bags_collected} bags',
+                reference_id=proof.id,
+            )
+            for proof in proofs if proof.points_awarded
+        ], batch_size=500)
+
+        ranks = _challenge_ranks(list(bags_by_challenge))
+        user_points = {
+            row.user_id: row
+            for row in UserPoints.objects.filter(user_id__in=list(awarded)).select_related('user')
+        }
+
+        # In-app notifications
+        notifications = []
+        approval_notifications = []
+        for proof in proofs:
+            participant = proof.participant
+            rank = ranks.get(participant.id, (None, None))[1]
+            approval = Notification(
+                user_id=participant.user_id,
+                notification_type='challenge_update',
+                title='Proof Approved! 🎉',
+                message=f'Your clean-up proof is approved! +{proof.points_awarded} points earned ({proof.bags_collected} bags). Current rank: #{rank}!',
+                url=participant.challenge.get_absolute_url(),
+            )
+            approval_notifications.append((proof, approval, rank))
+            notifications.append(approval)
+            if proof.points_awarded:
+                notifications.append(Notification(
+                    user_id=participant.user_id,
+                    notification_type='achievement',
+                    title=f'+{proof.points_awarded} Points Earned!',
+                    message=f'Challenge proof approved: {proof.bags_collected} bags',
+                    url='/gamification/leaderboard/',
+                ))
+
+        big_awards = [proof for proof in proofs if proof.points_awarded >= ADMIN_NOTIFY_POINTS]
+        if big_awards:
+            users = {proof.participant.user.username for proof in big_awards}
+            total = sum(proof.points_awarded for proof in big_awards)
+            admins = CustomUser.objects.filter(Q(is_superuser=True) | Q(is_staff=True)).values_list('id', flat=True)
+            for admin_id in admins:
+                notifications.append(Notification(
+                    user_id=admin_id,
+                    notification_type='general',
+                    title=f'Points Awarded: {len(big_awards)} challenge proof(s)',
+                    message=f'{total} points awarded to {", ".join(sorted(users)[:10])}'
+                            f'{" and others" if len(users) > 10 else ""}',
+                    url='/admin-dashboard/challenge-proofs/',
+                ))
+
+        notifications = Notification.objects.bulk_create(notifications, batch_size=500)
+
+        # SMS/WhatsApp - one message per proof, queued for the background workers
+        messages = []
+        for proof, notification, rank in approval_notifications:
+            user = proof.participant.user
+            channels = preferred_channels(user, 'challenge_updates')
+            if not channels:
+                continue
+            total_points = user_points[user.id].total_points if user.id in user_points else proof.points_awarded
+            messages.append({
+                'user': user,
+                'message': f"✅ APPROVED! You earned {proof.points_awarded} points ({proof.bags_collected} bags). "
+                           f"You are now #{rank} in {proof.participant.challenge.title}! "
+                           f"Total: {total_points} points. Keep cleaning Zambia!",
+                'channels': channels,
+                'notification_type': 'challenge_update',
+                'notification': notification if notification.pk else None,
+            })
+        notify_many(messages)
+
+        def after_commit():
+            # In-memory leaderboards, badge counters and WebSocket push
+            try:
+                for user_id, points in awarded.items():
+                    if user_id in user_points:
+                        leaderboards.record_points(user_points[user_id], points, when=now)
+                for participant_id in bags_by_participant:
+                    if participant_id in ranks:
+                        leaderboards.record_contribution(ranks[participant_id][0])
+                notification_counts.invalidate({n.user_id for n in notifications})
+                realtime.publish_many(notifications)
+            except Exception as e:
+                logger.error(f"Proof approval follow-up failed: {str(e)}")
+
+        transaction.on_commit(after_commit)
+
+    for proof in proofs:
+        participant, rank = ranks.get(proof.participant_id, (None, None))
+        if participant is not None:
+            proof.participant.contribution = participant.contribution
+        result['ranks'][proof.participant_id] = rank
+
+    result['approved'] = len(proofs)
+    result['points'] = sum(proof.points_awarded for proof in proofs)
+    result['proofs'] = proofs
+    return result
@@ -0,0 +1,88 @@
+# community/realtime.py
+"""
+WebSocket push for in-app notifications
+Every Notification row is published to the owner's `notifications_{user_id}`
+group once its transaction commits, so NotificationConsumer sockets in any
+worker process update the bell without polling notification_count.
+"""
+
+import logging
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def group_name(user_id):
+    return f"notifications_{user_id}"
+
+
+def notification_payload(notification, unread=None):
+    return {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'url': notification.url,
+        'type': notification.notification_type,
+        'created_at': notification.created_at.isoformat() if notification.created_at else None,
+        'is_read': notification.is_read,
+        'unread_count': unread,
+    }
+
+
+def _event(notification, unread=None):
+    return {
+        'type': 'notification_message',
+        'notification': notification_payload(notification, unread),
+    }
+
+
+def publish(notification):
+    """Push one notification (with the owner's unread count) to their sockets"""
+    from asgiref.sync import async_to_sync
+    from channels.layers import get_channel_layer
+    from .notification_counts import unread_count
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        unread = unread_count(notification.user_id)
+        async_to_sync(channel_layer.group_send)(
+            group_name(notification.user_id), _event(notification, unread)
+        )
+    except Exception as e:
+        logger.warning(f"WebSocket notification failed for user {notification.user_id}: {str(e)}")
+
+
+def publish_many(notifications):
+    """
+    Push bulk-created notifications (bulk_create skips post_save)
+    Unread counts are left out; clients increment their badge instead.
+    """
+    from asgiref.sync import async_to_sync
+    from channels.layers import get_channel_layer
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    items = [(group_name(n.user_id), _event(n)) for n in notifications if n.id]
+    if not items:
+        return
+    try:
+        if hasattr(channel_layer, 'group_send_batch'):
+            async_to_sync(channel_layer.group_send_batch)(items)
+        else:
+            async def _send_all():
+                for group, event in items:
+                    await channel_layer.group_send(group, event)
+            async_to_sync(_send_all)()
+    except Exception as e:
+        logger.warning(f"WebSocket bulk notification failed ({len(items)} notifications): {str(e)}")
+
+
+def notification_published(sender, instance, created=False, raw=False, **kwargs):
+    """post_save receiver - publish new notifications after commit"""
+    if raw or not created:
+        return
+    transaction.on_commit(lambda: publish(instance))
@@ -0,0 +1,138 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+LOCMEM = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'community-tests'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'community-test-sessions'},
+}
+
+
+@override_settings(CACHES=LOCMEM, ALERT_DISPATCH_ASYNC=False)
+class AlertDispatchRecoveryTests(TestCase):
+
+    def setUp(self):
+        from .models import HealthAlert
+
+        User = get_user_model()
+        self.users = [User.objects.create(username=f'resident{i}', phone_number='') for i in range(5)]
+        self.alert = HealthAlert.objects.create(
+            alert_type='cholera', title='Boil water', message='Boil all drinking water', location='Lusaka',
+            affected_areas='Lusaka', hygiene_tips='-', nearest_clinics='-', created_by=self.users[0],
+        )
+
+    def orphan(self, **fields):
+        """A job whose worker died after delivering to the first two users"""
+        from datetime import timedelta
+        from django.utils import timezone
+        from .models import AlertDispatch, Notification
+
+        job = AlertDispatch.objects.create(alert=self.alert, channels='')
+        Notification.objects.bulk_create([
+            Notification(user=user, notification_type='emergency', title='Boil water', message='-')
+            for user in self.users[:2]
+        ])
+        AlertDispatch.objects.filter(id=job.id).update(**{
+            'status': 'running', 'started_at': timezone.now(), 'total_users': 5, 'processed': 2,
+            'inapp_sent': 2, 'last_user_id': self.users[1].id, 'lease_token': 'dead-worker',
+            'lease_expires_at': timezone.now() - timedelta(seconds=1), **fields,
+        })
+        return job
+
+    def test_resumes_after_last_delivered_user(self):
+        from unittest import mock
+        from .dispatch import recover_alert_dispatches
+        from .models import Notification
+
+        job = self.orphan()
+        with mock.patch('community.dispatch.CHUNK_SIZE', 2):
+            resumed, failed = recover_alert_dispatches(inline=True)
+
+        self.assertEqual((resumed, failed), ([job.id], 0))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual((job.total_users, job.processed, job.inapp_sent), (5, 5, 5))
+        self.assertEqual(job.last_user_id, self.users[-1].id)
+        self.assertEqual(job.lease_token, '')
+        # Every user has exactly one alert: the finished chunk was not sent again
+        for user in self.users:
+            self.assertEqual(Notification.objects.filter(user=user, notification_type='emergency').count(), 1)
+
+    def test_live_lease_is_left_alone(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .dispatch import recover_alert_dispatches, run_alert_dispatch
+
+        job = self.orphan(lease_expires_at=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(recover_alert_dispatches(inline=True), ([], 0))
+        self.assertEqual(run_alert_dispatch(job.id).processed, 2)
+
+    def test_gives_up_on_old_jobs(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .dispatch import recover_alert_dispatches
+
+        job = self.orphan(created_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(recover_alert_dispatches(inline=True), ([], 1))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.processed, 2)
+
+    def test_locations_with_commas_stay_whole(self):
+        from .dispatch import start_alert_dispatch
+        from .models import Notification
+
+        User = get_user_model()
+        User.objects.filter(id__in=[user.id for user in self.users[:2]]).update(location='Kanyama, Lusaka')
+        User.objects.filter(id=self.users[2].id).update(location='Lusaka Central')
+
+        job = start_alert_dispatch(self.alert, channels=[], target_locations=['Kanyama, Lusaka'])
+        job.refresh_from_db()
+        self.assertEqual(job.location_list, ['Kanyama, Lusaka'])
+        self.assertEqual(job.total_users, 2)
+        self.assertEqual(
+            set(Notification.objects.filter(notification_type='emergency').values_list('user_id', flat=True)),
+            {self.users[0].id, self.users[1].id},
+        )
+
+
+@override_settings(CACHES=LOCMEM)
+class NotificationCountTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create(username='resident')
+
+    def notify(self, notification_type='general'):
+        from .models import Notification
+        return Notification.objects.create(user=self.user, notification_type=notification_type, title='-', message='-')
+
+    def test_counts_change_on_commit(self):
+        from .notification_counts import mark_all_read, mark_read, tab_counts, unread_count
+
+        self.assertEqual(unread_count(self.user.id), 0)
+        with self.captureOnCommitCallbacks() as callbacks:
+            first = self.notify()
+        # Not committed yet: other requests must not see it
+        self.assertEqual(unread_count(self.user.id), 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(unread_count(self.user.id), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notify('forum_reply')
+            self.notify('report_update')
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user.id), 3)
+            self.assertEqual(tab_counts(self.user.id), {
+                'all': 3, 'events': 0, 'challenges': 0, 'forum': 1, 'rewards': 0, 'community': 1,
+            })
+
+        with self.captureOnCommitCallbacks(execute=True):
+            mark_read(first)
+            mark_read(first)
+        self.assertEqual(unread_count(self.user.id), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            mark_all_read(self.user.id)
+        self.assertEqual(unread_count(self.user.id), 0)
+        self.assertEqual(tab_counts(self.user.id)['all'], 3)
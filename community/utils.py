@@ -1,10 +1,11 @@
-from twilio.rest import Client
 from django.conf import settings
 from django.contrib.sites.shortcuts import get_current_site
 
-client = Client(settings.TWILIO_SID, settings.TWILIO_TOKEN)
+from ecolearn import providers
+
 
 def send_event_notification(user, event):
+    client = providers.require('twilio')
     domain = get_current_site(None).domain
     url = f"https://{domain}{event.get_absolute_url()}"
 
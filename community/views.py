@@ -11,6 +11,7 @@ from .models import (
     CommunityCampaign, CampaignParticipant
 )
 from .forms import TopicForm, ReplyForm, EventForm, SuccessStoryForm
+from .notification_counts import TAB_TYPES, mark_all_read, mark_read, tab_counts, unread_count
 import requests
 from django.conf import settings
 
@@ -66,32 +67,29 @@ def topic_detail(request, topic_id):
             # REAL-TIME NOTIFICATION: Notify topic creator of new reply
             if topic.author != request.user:  # Don't notify if replying to own topic
                 try:
-                    from .notifications import notification_service
-                    
-                    prefs = getattr(topic.author, 'notification_preferences', None)
-                    
-                    # SMS notification
-                    if prefs and prefs.sms_enabled and prefs.forum_replies and topic.author.phone_number:
-                        sms_message = f"New reply in '{topic.title}' by {request.user.username}"
-                        result = notification_service.send_sms(str(topic.author.phone_number), sms_message)
-                        if result.get('success'):
-                            print(f"✅ Forum reply SMS sent to {topic.author.username}")
-                    
-                    # WhatsApp notification
-                    if prefs and prefs.whatsapp_enabled and prefs.forum_replies and topic.author.phone_number:
-                        whatsapp_message = f"💬 *New Reply in Your Topic*\n\n*Topic:* {topic.title}\n*Reply by:* {request.user.username}\n\n{reply.content[:100]}{'...' if len(reply.content) > 100 else ''}"
-                        result = notification_service.send_whatsapp(str(topic.author.phone_number), whatsapp_message)
-                        if result.get('success'):
-                            print(f"✅ Forum reply WhatsApp sent to {topic.author.username}")
+                    from .outbound import notify, preferred_channels
                     
                     # In-app notification
-                    Notification.objects.create(
+                    notification = Notification.objects.create(
                         user=topic.author,
                         notification_type='forum_reply',
                         title=f'New reply in "{topic.title}"',
                         message=f'{request.user.username} replied to your topic.',
                         url=topic.get_absolute_url()
                     )
+                    
+                    # SMS/WhatsApp queued for background delivery
+                    channels = preferred_channels(topic.author, 'forum_replies')
+                    if channels:
+                        whatsapp_message = f"💬 *New Reply in Your Topic*\n\n*Topic:* {topic.title}\n*Reply by:* {request.user.username}\n\n{reply.content[:100]}{'...' if len(reply.content) > 100 else ''}"
+                        notify(
+                            topic.author,
+                            f"New reply in '{topic.title}' by {request.user.username}",
+                            channels=channels,
+                            notification_type='forum_reply',
+                            whatsapp_message=whatsapp_message,
+                            notification=notification
+                        )
                 except Exception as e:
                     print(f"Forum reply notification error: {e}")
             
@@ -347,22 +345,14 @@ def notifications_view(request):
     notifications = Notification.objects.filter(user=request.user)
     
     # Apply filter
-    if filter_type == 'events':
-        notifications = notifications.filter(notification_type__in=['event_reminder', 'new_event'])
-    elif filter_type == 'challenges':
-        notifications = notifications.filter(notification_type='challenge_update')
-    elif filter_type == 'forum':
-        notifications = notifications.filter(notification_type='forum_reply')
-    elif filter_type == 'rewards':
-        notifications = notifications.filter(notification_type='reward_redeemed')
-    elif filter_type == 'community':
-        notifications = notifications.filter(notification_type__in=['campaign_launch', 'community_news', 'general'])
+    if filter_type in TAB_TYPES:
+        notifications = notifications.filter(notification_type__in=TAB_TYPES[filter_type])
     
     notifications = notifications.order_by('-created_at')
     
     # Handle mark all as read
     if request.method == 'POST' and 'mark_all_read' in request.POST:
-        Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        mark_all_read(request.user.id)
         messages.success(request, 'All notifications marked as read!')
         return redirect('community:notifications')
     
@@ -371,23 +361,18 @@ def notifications_view(request):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Get counts for filters
-    all_count = Notification.objects.filter(user=request.user).count()
-    events_count = Notification.objects.filter(user=request.user, notification_type__in=['event_reminder', 'new_event']).count()
-    challenges_count = Notification.objects.filter(user=request.user, notification_type='challenge_update').count()
-    forum_count = Notification.objects.filter(user=request.user, notification_type='forum_reply').count()
-    rewards_count = Notification.objects.filter(user=request.user, notification_type='reward_redeemed').count()
-    community_count = Notification.objects.filter(user=request.user, notification_type__in=['campaign_launch', 'community_news', 'general']).count()
+    # Get counts for filters (cached, one GROUP BY when cold)
+    counts = tab_counts(request.user.id)
     
     context = {
         'page_obj': page_obj,
         'filter_type': filter_type,
-        'all_count': all_count,
-        'events_count': events_count,
-        'challenges_count': challenges_count,
-        'forum_count': forum_count,
-        'rewards_count': rewards_count,
-        'community_count': community_count,
+        'all_count': counts['all'],
+        'events_count': counts['events'],
+        'challenges_count': counts['challenges'],
+        'forum_count': counts['forum'],
+        'rewards_count': counts['rewards'],
+        'community_count': counts['community'],
     }
     return render(request, 'community/notifications.html', context)
 
@@ -398,8 +383,7 @@ def mark_notification_read(request, notification_id):
     if request.method == 'POST':
         try:
             notification = Notification.objects.get(id=notification_id, user=request.user)
-            notification.is_read = True
-            notification.save()
+            mark_read(notification)
             return JsonResponse({'success': True})
         except Notification.DoesNotExist:
             return JsonResponse({'success': False, 'error': 'Notification not found'})
@@ -409,7 +393,7 @@ def mark_notification_read(request, notification_id):
 @login_required
 def notification_count(request):
     """Get unread notification count for live updates"""
-    count = request.user.notifications.filter(is_read=False).count()
+    count = unread_count(request.user.id)
     return JsonResponse({'count': count})
 
 
@@ -448,13 +432,11 @@ def alert_detail(request, alert_id):
 def send_emergency_sms(user, alert):
     """Send emergency SMS alert to user"""
     try:
-        from twilio.rest import Client
+        from ecolearn import providers
         
-        account_sid = settings.TWILIO_ACCOUNT_SID
-        auth_token = settings.TWILIO_AUTH_TOKEN
         twilio_number = settings.TWILIO_PHONE_NUMBER
         
-        client = Client(account_sid, auth_token)
+        client = providers.require('twilio')
         
         message_body = f"⚠️ EMERGENCY ALERT: {alert.title}\n{alert.message}\n{alert.hygiene_tips}"
         
@@ -473,12 +455,9 @@ def send_emergency_sms(user, alert):
 def send_whatsapp_alert(user, alert):
     """Send WhatsApp alert to user"""
     try:
-        from twilio.rest import Client
+        from ecolearn import providers
         
-        account_sid = settings.TWILIO_ACCOUNT_SID
-        auth_token = settings.TWILIO_AUTH_TOKEN
-        
-        client = Client(account_sid, auth_token)
+        client = providers.require('twilio')
         
         message_body = f"⚠️ *{alert.title}*\n\n{alert.message}\n\n*Hygiene Tips:*\n{alert.hygiene_tips}\n\n*Nearest Clinics:*\n{alert.nearest_clinics}"
         
@@ -700,13 +679,20 @@ def challenge_detail(request, challenge_id):
     
     challenge = get_object_or_404(CommunityChallenge, id=challenge_id)
     
-    # Get top 15 leaderboard
-    leaderboard = ChallengeParticipant.objects.filter(
-        challenge=challenge
-    ).select_related('user').order_by('-contribution')[:15]
+    # Get top 15 leaderboard (ranked in memory, participants fetched by id)
+    from gamification import leaderboards
+    board_key = leaderboards.challenge_key(challenge.id)
+    top_entries = leaderboards.top(board_key, 15)
+    participants = {
+        p.user_id: p for p in ChallengeParticipant.objects.filter(
+            challenge=challenge,
+            user_id__in=[member for _rank, member, _score in top_entries]
+        ).select_related('user')
+    }
+    leaderboard = [participants[member] for _rank, member, _score in top_entries if member in participants]
     
     # Check if user is participating
-    user_participation = ChallengeParticipant.objects.filter(
+    user_participation = participants.get(request.user.id) or ChallengeParticipant.objects.filter(
         challenge=challenge,
         user=request.user
     ).first()
@@ -714,10 +700,9 @@ def challenge_detail(request, challenge_id):
     # Get user's rank if participating
     user_rank = None
     if user_participation:
-        user_rank = ChallengeParticipant.objects.filter(
-            challenge=challenge,
-            contribution__gt=user_participation.contribution
-        ).count() + 1
+        user_rank = leaderboards.rank(board_key, request.user.id) or leaderboards.rank_for_score(
+            board_key, user_participation.contribution
+        )
     
     # Get user's proofs
     user_proofs = []
@@ -741,7 +726,7 @@ def challenge_detail(request, challenge_id):
 def join_challenge(request, challenge_id):
     """Join a community challenge"""
     from .models import CommunityChallenge, ChallengeParticipant
-    from .notifications import notification_service
+    from .outbound import notify, preferred_channels
     
     if request.method == 'POST':
         challenge = get_object_or_404(CommunityChallenge, id=challenge_id, is_active=True)
@@ -754,33 +739,29 @@ def join_challenge(request, challenge_id):
         if created:
             messages.success(request, f'🎉 You have joined the {challenge.title}!')
             
-            # REAL-TIME NOTIFICATION: Send WhatsApp/SMS instantly if enabled
+            # NOTIFICATION: in-app now, WhatsApp/SMS queued for background delivery
             try:
-                prefs = getattr(request.user, 'notification_preferences', None)
                 user_name = request.user.get_full_name() or request.user.username
                 
-                # SMS notification - PRO ZNBC style
-                if prefs and prefs.sms_enabled and prefs.challenge_updates and request.user.phone_number:
-                    sms_message = f"🎉 {user_name}, welcome to {challenge.title}! Top 3 win airtime. Submit proof now!"
-                    result = notification_service.send_sms(str(request.user.phone_number), sms_message)
-                    if result.get('success'):
-                        print(f"✅ SMS sent to {request.user.username}")
-                
-                # WhatsApp notification - PRO Zambian style
-                if prefs and prefs.whatsapp_enabled and prefs.challenge_updates and request.user.phone_number:
-                    whatsapp_message = f"🎉 {user_name}, welcome to {challenge.title}! Top 3 win airtime. Submit proof now!"
-                    result = notification_service.send_whatsapp(str(request.user.phone_number), whatsapp_message)
-                    if result.get('success'):
-                        print(f"✅ WhatsApp sent to {request.user.username}")
-                
                 # In-app notification
-                Notification.objects.create(
+                notification = Notification.objects.create(
                     user=request.user,
                     notification_type='challenge_update',
                     title=f'Joined {challenge.title}!',
                     message=f'You have successfully joined {challenge.title}. Start collecting bags and climb the leaderboard!',
                     url=challenge.get_absolute_url()
                 )
+                
+                # SMS/WhatsApp - PRO ZNBC style
+                channels = preferred_channels(request.user, 'challenge_updates')
+                if channels:
+                    notify(
+                        request.user,
+                        f"🎉 {user_name}, welcome to {challenge.title}! Top 3 win airtime. Submit proof now!",
+                        channels=channels,
+                        notification_type='challenge_update',
+                        notification=notification
+                    )
             except Exception as e:
                 print(f"Notification error: {e}")
         else:
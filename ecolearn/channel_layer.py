@@ -0,0 +1,342 @@
+"""
+SQLite-backed channel layer (no Redis)
+
+InMemoryChannelLayer only reaches consumers in the process that published the
+event, so a notification created by one gunicorn/daphne worker never reached a
+socket held by another. This layer keeps messages and group membership in one
+SQLite file in WAL mode, which every worker process on the host shares.
+
+- send/group_send insert rows in a single short transaction
+- each process owns a channel prefix ("specific.<id>!"); one poll task per
+  process moves that prefix's rows into local queues for all its consumers
+- the poll task checks PRAGMA data_version (changes only when another
+  connection commits) so an idle layer does no table reads
+- expired messages and stale group memberships are purged periodically
+
+Usage (settings.py):
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'ecolearn.channel_layer.SQLiteChannelLayer',
+            'CONFIG': {'path': BASE_DIR / 'channels.sqlite3'},
+        }
+    }
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import random
+import sqlite3
+import string
+import time
+import uuid
+
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS channel_message (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS channel_message_prefix ON channel_message (prefix, id);
+CREATE INDEX IF NOT EXISTS channel_message_channel ON channel_message (channel, id);
+CREATE TABLE IF NOT EXISTS channel_group (
+    grp TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (grp, channel)
+);
+"""
+
+
+class SQLiteChannelLayer(BaseChannelLayer):
+    """Channel layer shared by every process that opens the same SQLite file"""
+
+    extensions = ['groups', 'flush']
+
+    def __init__(
+        self,
+        path='channels.sqlite3',
+        expiry=60,
+        group_expiry=86400,
+        capacity=100,
+        channel_capacity=None,
+        poll_interval=0.05,
+        cleanup_interval=30,
+        pool_size=4,
+        **kwargs,
+    ):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity)
+        self.channel_capacity = self.compile_capacities(channel_capacity or {})
+        self.path = str(path)
+        self.group_expiry = group_expiry
+        self.poll_interval = poll_interval
+        self.cleanup_interval = cleanup_interval
+
+        # Process-specific channels are "specific.<client_prefix>!<random>"
+        self.client_prefix = f"specific.{uuid.uuid4().hex}!"
+
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._schema_ready = False
+        self._receive_buffer = {}  # channel -> asyncio.Queue
+        self._poll_task = None
+        self._poll_conn = None
+
+    # --- Connections ---
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        if not self._schema_ready:
+            conn.executescript(SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _run(self, func, *args):
+        """Run func(conn, *args) inside one write transaction"""
+        conn = self._acquire()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = func(conn, *args)
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+            return result
+        finally:
+            self._release(conn)
+
+    async def _call(self, func, *args):
+        return await asyncio.to_thread(self._run, func, *args)
+
+    # --- Serialization ---
+
+    @staticmethod
+    def _encode(message):
+        return json.dumps(message, cls=DjangoJSONEncoder)
+
+    @staticmethod
+    def _decode(payload):
+        return json.loads(payload)
+
+    # --- Channel layer API ---
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_channel_name(channel)
+        assert '__asgi_channel__' not in message
+
+        if not await self._call(self._insert, [channel], self._encode(message), True):
+            raise ChannelFull(channel)
+
+    def _insert(self, conn, channels, payload, strict):
+        """Insert one message per channel, skipping (or failing on) full channels"""
+        now = time.time()
+        placeholders = ','.join('?' * len(channels))
+        depth = dict(conn.execute(
+            f'SELECT channel, COUNT(*) FROM channel_message '
+            f'WHERE channel IN ({placeholders}) AND expires > ? GROUP BY channel',
+            [*channels, now],
+        ).fetchall())
+
+        rows = []
+        for channel in channels:
+            if depth.get(channel, 0) >= self.get_capacity(channel):
+                if strict:
+                    return False
+                continue
+            rows.append((channel, self.non_local_name(channel), payload, now + self.expiry))
+
+        conn.executemany(
+            'INSERT INTO channel_message (channel, prefix, payload, expires) VALUES (?, ?, ?, ?)',
+            rows,
+        )
+        return True
+
+    async def receive(self, channel):
+        self.require_valid_channel_name(channel)
+
+        if channel.startswith(self.client_prefix):
+            return await self._receive_local(channel)
+
+        # Named (non process-specific) channel - poll it directly
+        while True:
+            message = await self._call(self._pop, channel)
+            if message is not None:
+                return message
+            await asyncio.sleep(self.poll_interval)
+
+    def _pop(self, conn, channel):
+        row = conn.execute(
+            'SELECT id, payload FROM channel_message WHERE channel = ? AND expires > ? ORDER BY id LIMIT 1',
+            (channel, time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute('DELETE FROM channel_message WHERE id = ?', (row[0],))
+        return self._decode(row[1])
+
+    async def _receive_local(self, channel):
+        buffer = self._receive_buffer.setdefault(channel, asyncio.Queue())
+        self._ensure_poller()
+        try:
+            return await buffer.get()
+        except asyncio.CancelledError:
+            # Consumer is shutting down; forget the channel once it is drained
+            if buffer.empty():
+                self._receive_buffer.pop(channel, None)
+            raise
+
+    async def new_channel(self, prefix='specific'):
+        name = self.client_prefix + ''.join(random.choices(string.ascii_letters, k=12))
+        self._receive_buffer.setdefault(name, asyncio.Queue())
+        return name
+
+    # --- Process poller ---
+
+    def _ensure_poller(self):
+        loop = asyncio.get_running_loop()
+        task = self._poll_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._poll_task = loop.create_task(self._poll())
+
+    async def _poll(self):
+        """Move this process's messages into the local receive buffers"""
+        if self._poll_conn is None:
+            self._poll_conn = await asyncio.to_thread(self._connect)
+        conn = self._poll_conn
+
+        last_version = None
+        last_cleanup = time.monotonic()
+        while self._receive_buffer:
+            try:
+                version = conn.execute('PRAGMA data_version').fetchone()[0]
+                if version != last_version:
+                    last_version = version
+                    for channel, payload in await asyncio.to_thread(self._drain_prefix):
+                        buffer = self._receive_buffer.get(channel)
+                        if buffer is not None:
+                            buffer.put_nowait(self._decode(payload))
+
+                if time.monotonic() - last_cleanup > self.cleanup_interval:
+                    last_cleanup = time.monotonic()
+                    await self._call(self._cleanup)
+            except Exception as e:
+                logger.error(f"Channel layer poll error: {str(e)}")
+
+            await asyncio.sleep(self.poll_interval)
+
+    def _drain_prefix(self):
+        conn = self._poll_conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                'SELECT id, channel, payload FROM channel_message '
+                'WHERE prefix = ? AND expires > ? ORDER BY id',
+                (self.client_prefix, time.time()),
+            ).fetchall()
+            if rows:
+                conn.execute(
+                    'DELETE FROM channel_message WHERE prefix = ? AND id <= ?',
+                    (self.client_prefix, rows[-1][0]),
+                )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return [(channel, payload) for _id, channel, payload in rows]
+
+    def _cleanup(self, conn):
+        now = time.time()
+        conn.execute('DELETE FROM channel_message WHERE expires <= ?', (now,))
+        conn.execute('DELETE FROM channel_group WHERE expires <= ?', (now,))
+
+    # --- Groups ---
+
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        await self._call(self._group_add, group, channel)
+
+    def _group_add(self, conn, group, channel):
+        conn.execute(
+            'INSERT OR REPLACE INTO channel_group (grp, channel, expires) VALUES (?, ?, ?)',
+            (group, channel, time.time() + self.group_expiry),
+        )
+
+    async def group_discard(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        await self._call(self._group_discard, group, channel)
+
+    def _group_discard(self, conn, group, channel):
+        conn.execute('DELETE FROM channel_group WHERE grp = ? AND channel = ?', (group, channel))
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        self.require_valid_group_name(group)
+        await self._call(self._group_send, [group], self._encode(message))
+
+    async def group_send_batch(self, items):
+        """
+        group_send several (group, message) pairs in one transaction
+        Used for bulk-created notifications so fan-out costs one commit.
+        """
+        batch = []
+        for group, message in items:
+            assert isinstance(message, dict), "Message is not a dict"
+            self.require_valid_group_name(group)
+            batch.append((group, self._encode(message)))
+        if batch:
+            await self._call(self._group_send_batch, batch)
+
+    def _group_send_batch(self, conn, batch):
+        for group, payload in batch:
+            self._group_send(conn, [group], payload)
+
+    def _group_send(self, conn, groups, payload):
+        placeholders = ','.join('?' * len(groups))
+        channels = [row[0] for row in conn.execute(
+            f'SELECT DISTINCT channel FROM channel_group WHERE grp IN ({placeholders}) AND expires > ?',
+            [*groups, time.time()],
+        )]
+        if channels:
+            # Full channels are skipped, as in the other channel layers
+            self._insert(conn, channels, payload, False)
+
+    # --- Flush extension ---
+
+    async def flush(self):
+        def _flush(conn):
+            conn.execute('DELETE FROM channel_message')
+            conn.execute('DELETE FROM channel_group')
+
+        await self._call(_flush)
+        self._receive_buffer = {}
+
+    async def close(self):
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
@@ -63,10 +63,12 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     
     async def notification_message(self, event):
         """Handle notification messages from the group"""
-        # Send notification to WebSocket
+        # Send notification to WebSocket (unread_count is None for bulk sends)
+        notification = event['notification']
         await self.send(text_data=json.dumps({
             'type': 'notification',
-            'notification': event['notification']
+            'notification': notification,
+            'unread_count': notification.get('unread_count'),
         }))
 
 
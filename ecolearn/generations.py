@@ -0,0 +1,50 @@
+"""
+Generation counters for cache invalidation
+
+A cached value embeds the current generation of every scope it depends on in
+its key. Invalidating a scope bumps its generation instead of deleting keys:
+stale entries are never read again and age out through their TTL or the
+backend's culling. A generation evicted from the cache restarts from a fresh
+time-based value, so it can never collide with an old one.
+
+Each caller owns a namespace, so scopes of different apps never collide:
+
+    from ecolearn import generations
+
+    versions = generations.current('elearning', 'catalog', f'module:{module_id}')
+    generations.bump('elearning', 'catalog')
+
+Used by elearning.view_cache and security.permissions.
+"""
+
+import time
+
+from django.core.cache import cache
+
+
+def _key(namespace, scope):
+    return f'{namespace}:gen:{scope}'
+
+
+def current(namespace, *scopes):
+    """Current generation of each scope, creating missing ones"""
+    keys = [_key(namespace, scope) for scope in scopes]
+    found = cache.get_many(keys)
+    values = []
+    for key in keys:
+        value = found.get(key)
+        if value is None:
+            cache.add(key, time.time_ns(), None)
+            value = cache.get(key) or time.time_ns()
+        values.append(value)
+    return values
+
+
+def bump(namespace, *scopes):
+    """Invalidate everything cached under these scopes"""
+    for scope in scopes:
+        key = _key(namespace, scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
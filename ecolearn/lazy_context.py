@@ -0,0 +1,113 @@
+"""
+Lazy template context values
+
+Context processors run for every template rendered with a request, including
+partials and pages that never show the badge they compute. A processor that
+returns lazy() values instead only pays for a value when a template (or
+template tag) actually uses it:
+
+    def pending_proofs_count(request):
+        return {'pending_proofs_count': lazy(request, 'pending_proofs_count', count_pending_proofs)}
+
+A lazy value computes once, on first use ({{ x }}, {% if x > 0 %}, str(),
+int(), comparisons), and is memoized on the request, so several templates
+rendered for one request share it.
+
+LazyContextMiddleware reports per request which lazy values were created and
+which were realized: a DEBUG log line on the 'ecolearn.lazy_context' logger
+and, when LAZY_CONTEXT_DEBUG is on (defaults to DEBUG), an X-Lazy-Context
+response header, e.g. "realized=unread_notifications_count; skipped=pending_proofs_count".
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject, new_method_proxy
+
+logger = logging.getLogger(__name__)
+
+# Tunables (override in settings.py)
+LAZY_CONTEXT_DEBUG = getattr(settings, 'LAZY_CONTEXT_DEBUG', settings.DEBUG)
+
+MEMO_ATTRIBUTE = '_lazy_context'
+
+
+class LazyValue(SimpleLazyObject):
+    """SimpleLazyObject that also behaves as a number (|add, int(), arithmetic)"""
+
+    __int__ = new_method_proxy(int)
+    __float__ = new_method_proxy(float)
+    __index__ = new_method_proxy(lambda wrapped: wrapped.__index__())
+    __le__ = new_method_proxy(lambda wrapped, other: wrapped <= other)
+    __ge__ = new_method_proxy(lambda wrapped, other: wrapped >= other)
+    __format__ = new_method_proxy(format)
+    __add__ = new_method_proxy(lambda wrapped, other: wrapped + other)
+    __radd__ = new_method_proxy(lambda wrapped, other: other + wrapped)
+
+
+class _Entry:
+    __slots__ = ('value', 'realized', 'seconds')
+
+    def __init__(self):
+        self.value = None
+        self.realized = False
+        self.seconds = 0.0
+
+
+def lazy(request, name, compute):
+    """
+    A value computed by compute() the first time it is used, once per request
+
+    Without a request (render_to_string without one), compute() runs lazily
+    but is not shared.
+    """
+    if request is None:
+        return LazyValue(compute)
+    memo = request.__dict__.setdefault(MEMO_ATTRIBUTE, {})
+    entry = memo.get(name)
+    if entry is None:
+        entry = memo[name] = _Entry()
+
+        def realize():
+            start = time.perf_counter()
+            try:
+                return compute()
+            finally:
+                entry.realized = True
+                entry.seconds = time.perf_counter() - start
+
+        entry.value = LazyValue(realize)
+    return entry.value
+
+
+def report(request):
+    """
+    Returns:
+        tuple: (realized names, skipped names) for the lazy values created during the request
+    """
+    memo = getattr(request, MEMO_ATTRIBUTE, None) or {}
+    realized = sorted(name for name, entry in memo.items() if entry.realized)
+    skipped = sorted(name for name, entry in memo.items() if not entry.realized)
+    return realized, skipped
+
+
+class LazyContextMiddleware:
+    """Logs (and in debug, sends as X-Lazy-Context) which lazy context values each request realized"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        memo = getattr(request, MEMO_ATTRIBUTE, None)
+        if memo:
+            realized, skipped = report(request)
+            if logger.isEnabledFor(logging.DEBUG):
+                timings = ', '.join(f'{name} {memo[name].seconds * 1000:.1f}ms' for name in realized)
+                logger.debug(
+                    f"Lazy context for {request.path}: realized [{timings}], skipped [{', '.join(skipped)}]"
+                )
+            if LAZY_CONTEXT_DEBUG:
+                response['X-Lazy-Context'] = f"realized={','.join(realized)}; skipped={','.join(skipped)}"
+        return response
@@ -0,0 +1,196 @@
+"""
+Worker memory governor
+
+Workers were recycled only every max_requests requests. On a 512MB instance
+one large export or media upload can push a worker past the limit long
+before that, and the platform then kills the whole container. The governor
+watches each worker's RSS instead:
+
+- after every request (gunicorn post_request hook) the worker's RSS is
+  sampled; past MEMORY_SOFT_LIMIT_MB the worker finishes its in-flight
+  requests and exits, and the arbiter forks a fresh one from the preloaded
+  master (the same graceful path max_requests uses)
+- MemoryGovernorMiddleware answers 503 + Retry-After to memory-heavy
+  requests while RSS is within MEMORY_HEAVY_HEADROOM_MB of
+  MEMORY_HARD_LIMIT_MB, rather than starting the export that would tip the
+  container over
+- a per-endpoint high-water mark (peak RSS and largest growth across one
+  request) is logged when it rises and summarized when the worker exits
+
+Heavy requests are views decorated with @memory_heavy, views whose
+namespaced URL name matches MEMORY_HEAVY_ENDPOINTS (for views we do not own,
+e.g. the django-import-export admin actions), and request bodies larger than
+MEMORY_HEAVY_UPLOAD_BYTES.
+
+Growth is attributed to the endpoint whose request just finished; with
+several threads per worker a concurrent request can share the blame.
+Outside gunicorn (runserver, daphne) only the middleware's deferral applies.
+RSS comes from /proc/self/statm; where that does not exist the governor
+does nothing.
+"""
+
+import fnmatch
+import logging
+import os
+import threading
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+
+logger = logging.getLogger(__name__)
+
+# Tunables (override in settings.py)
+MEMORY_SOFT_LIMIT_MB = getattr(settings, 'MEMORY_SOFT_LIMIT_MB', 384)  # 0 disables recycling
+MEMORY_HARD_LIMIT_MB = getattr(settings, 'MEMORY_HARD_LIMIT_MB', 480)  # 0 disables deferral
+MEMORY_HEAVY_HEADROOM_MB = getattr(settings, 'MEMORY_HEAVY_HEADROOM_MB', 96)
+MEMORY_HEAVY_UPLOAD_BYTES = getattr(settings, 'MEMORY_HEAVY_UPLOAD_BYTES', 2 * 1024 * 1024)
+MEMORY_HEAVY_ENDPOINTS = getattr(settings, 'MEMORY_HEAVY_ENDPOINTS', [
+    'admin:*_export', 'admin:*_import', 'admin:*_process_import',
+])
+MEMORY_RETRY_AFTER = getattr(settings, 'MEMORY_RETRY_AFTER', 30)
+MEMORY_LOG_GROWTH_MB = getattr(settings, 'MEMORY_LOG_GROWTH_MB', 1)
+
+MB = 1024 * 1024
+# Set on the WSGI environ (request.META) for the post_request hook
+BEFORE_KEY = 'ecolearn.memory.rss_before'
+ENDPOINT_KEY = 'ecolearn.memory.endpoint'
+
+try:
+    PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    PAGE_SIZE = None
+
+
+def rss():
+    """Resident set size of this process in bytes, or None where /proc is unavailable"""
+    if PAGE_SIZE is None:
+        return None
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def memory_heavy(view_func):
+    """Mark a view as memory-heavy: deferred with a 503 while the worker is near the hard limit"""
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        return view_func(*args, **kwargs)
+
+    wrapper.memory_heavy = True
+    return wrapper
+
+
+def is_heavy(request, view_func, endpoint):
+    if getattr(view_func, 'memory_heavy', False):
+        return True
+    if any(fnmatch.fnmatchcase(endpoint, pattern) for pattern in MEMORY_HEAVY_ENDPOINTS):
+        return True
+    try:
+        return int(request.META.get('CONTENT_LENGTH') or 0) > MEMORY_HEAVY_UPLOAD_BYTES
+    except ValueError:
+        return False
+
+
+def near_hard_limit(current):
+    return bool(MEMORY_HARD_LIMIT_MB) and current is not None and \
+        current >= (MEMORY_HARD_LIMIT_MB - MEMORY_HEAVY_HEADROOM_MB) * MB
+
+
+class HighWater:
+    """Per-endpoint peak RSS and largest growth across one request, for this worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, before, after):
+        """
+        Returns:
+            bool: True when the endpoint's largest growth rose by at least MEMORY_LOG_GROWTH_MB
+        """
+        growth = max(after - before, 0)
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {'requests': 0, 'peak_rss': 0, 'peak_growth': 0})
+            stats['requests'] += 1
+            stats['peak_rss'] = max(stats['peak_rss'], after)
+            risen = growth - stats['peak_growth'] >= MEMORY_LOG_GROWTH_MB * MB
+            if growth > stats['peak_growth']:
+                stats['peak_growth'] = growth
+        return risen
+
+    def top(self, limit=10):
+        """[(endpoint, stats)] by largest growth"""
+        with self._lock:
+            items = [(endpoint, dict(stats)) for endpoint, stats in self._endpoints.items()]
+        return sorted(items, key=lambda item: -item[1]['peak_growth'])[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+high_water = HighWater()
+
+
+class MemoryGovernorMiddleware:
+    """Samples RSS before each request and defers heavy requests near the hard limit"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.META[BEFORE_KEY] = rss()
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        endpoint = request.resolver_match.view_name
+        request.META[ENDPOINT_KEY] = endpoint
+        current = rss()
+        if not near_hard_limit(current) or not is_heavy(request, view_func, endpoint):
+            return None
+
+        logger.warning(
+            f"Deferred memory-heavy {endpoint} at {current / MB:.0f}MB RSS "
+            f"(hard limit {MEMORY_HARD_LIMIT_MB}MB, pid {os.getpid()})"
+        )
+        message = 'The server is busy. Please try again shortly.'
+        if request.headers.get('Accept', '').startswith('application/json'):
+            response = JsonResponse({'error': message, 'retry_after': MEMORY_RETRY_AFTER}, status=503)
+        else:
+            response = HttpResponse(message, status=503, content_type='text/plain; charset=utf-8')
+        response['Retry-After'] = str(MEMORY_RETRY_AFTER)
+        return response
+
+
+# --- gunicorn hooks (gunicorn.conf.py) ---
+
+def post_request(worker, req, environ, resp):
+    """Record the endpoint's high-water mark; recycle the worker past the soft limit"""
+    after = rss()
+    if after is None:
+        return
+    endpoint = environ.get(ENDPOINT_KEY) or 'unresolved'
+    before = environ.get(BEFORE_KEY) or after
+    if high_water.record(endpoint, before, after):
+        worker.log.info(
+            "Memory high-water for %s: %.1fMB RSS (+%.1fMB in one request) (pid: %s)",
+            endpoint, after / MB, (after - before) / MB, worker.pid,
+        )
+    if MEMORY_SOFT_LIMIT_MB and after >= MEMORY_SOFT_LIMIT_MB * MB and worker.alive:
+        worker.log.warning(
+            "Worker RSS %.1fMB past the %sMB soft limit after %s; recycling after in-flight requests (pid: %s)",
+            after / MB, MEMORY_SOFT_LIMIT_MB, endpoint, worker.pid,
+        )
+        worker.alive = False
+
+
+def log_high_water(worker, limit=10):
+    """Summary of the worker's per-endpoint high-water marks (worker_exit)"""
+    for endpoint, stats in high_water.top(limit):
+        worker.log.info(
+            "Memory high-water for %s: %d requests, peak %.1fMB RSS, largest growth +%.1fMB (pid: %s)",
+            endpoint, stats['requests'], stats['peak_rss'] / MB, stats['peak_growth'] / MB, worker.pid,
+        )
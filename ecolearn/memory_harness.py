@@ -0,0 +1,69 @@
+"""
+Synthetic endpoints for exercising the worker memory governor
+
+    grow/<mb>/   keeps <mb> more MB alive in the worker (a deliberate leak)
+    heavy/       a @memory_heavy view, deferred near the hard limit
+    ping/        cheap; reports the worker pid and RSS
+
+Every response is JSON with the worker's pid and RSS, so a driver can see
+the memory climb, heavy requests being deferred, and the pid change when the
+worker is recycled. Served through the full middleware stack by
+`manage.py benchmark_memory`, which starts gunicorn with gunicorn.conf.py on
+the wsgi() factory below; tests use the urlconf directly
+(override_settings(ROOT_URLCONF='ecolearn.memory_harness')).
+"""
+
+import os
+
+from django.http import JsonResponse
+from django.urls import path
+
+from ecolearn.memory import MB, memory_heavy, rss
+
+_retained = []
+
+
+def _status(**extra):
+    current = rss()
+    return JsonResponse({
+        'pid': os.getpid(),
+        'rss_mb': round(current / MB, 1) if current is not None else None,
+        'retained_mb': sum(len(block) for block in _retained) // MB,
+        **extra,
+    })
+
+
+def grow(request, mb):
+    _retained.append(b'\x01' * (mb * MB))  # filled, so the pages are resident
+    return _status()
+
+
+@memory_heavy
+def heavy(request):
+    return _status()
+
+
+def ping(request):
+    return _status()
+
+
+def release():
+    _retained.clear()
+
+
+urlpatterns = [
+    path('grow/<int:mb>/', grow, name='memory_harness_grow'),
+    path('heavy/', heavy, name='memory_harness_heavy'),
+    path('ping/', ping, name='memory_harness_ping'),
+]
+
+
+def wsgi():
+    """gunicorn app factory: 'ecolearn.memory_harness:wsgi()'"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecolearn.settings')
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    settings.ROOT_URLCONF = __name__
+    return application
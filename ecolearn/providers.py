@@ -0,0 +1,156 @@
+"""
+Lazy registry of third-party SDK clients
+
+Africa's Talking, Twilio, Google Generative AI and Cloudinary used to be
+imported (and their clients built) when settings.py, community.notifications
+or ai_assistant.views was imported, so every gunicorn master and worker paid
+for them at boot whether or not a request ever sent an SMS or asked the
+assistant. google.generativeai alone pulls in grpc and protobuf (over a
+second and tens of MB).
+
+Each provider is now imported and constructed on first use:
+
+    from ecolearn import providers
+
+    sms = providers.get('africastalking_sms')    # None when not configured
+    client = providers.require('twilio')          # raises ProviderUnavailable
+
+Results are memoized per process behind a lock, so concurrent first uses
+build one client. The memo is keyed by pid: a client created before a fork
+(gunicorn preload_app) is rebuilt in the worker instead of sharing the
+parent's connection pools. A provider whose credentials are missing or
+whose construction failed is memoized as None (and logged once), as the
+old import-time initialization did.
+"""
+
+import logging
+import os
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderUnavailable(RuntimeError):
+    pass
+
+
+class Provider:
+    """One SDK client, built by `factory` on first use"""
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._pid = None
+        self._value = None
+
+    def get(self):
+        if self._pid == os.getpid():
+            return self._value
+        with self._lock:
+            if self._pid != os.getpid():
+                try:
+                    self._value = self.factory()
+                except Exception as e:
+                    self._value = None
+                    logger.error(f"{self.name} initialization failed: {str(e)}")
+                self._pid = os.getpid()
+        return self._value
+
+    @property
+    def loaded(self):
+        return self._pid == os.getpid()
+
+    def reset(self):
+        with self._lock:
+            self._pid = None
+            self._value = None
+
+
+_registry = {}
+
+
+def register(name, factory):
+    _registry[name] = Provider(name, factory)
+    return _registry[name]
+
+
+def get(name):
+    """The client for `name`, or None when it is not configured"""
+    return _registry[name].get()
+
+
+def require(name):
+    client = get(name)
+    if client is None:
+        raise ProviderUnavailable(f'{name} is not configured')
+    return client
+
+
+def loaded():
+    """Names of the providers built in this process"""
+    return sorted(name for name, provider in _registry.items() if provider.loaded)
+
+
+def reset(name=None):
+    for provider_name, provider in _registry.items():
+        if name is None or provider_name == name:
+            provider.reset()
+
+
+# --- Providers ---
+
+def _africastalking_sms():
+    username = getattr(settings, 'AFRICAS_TALKING_USERNAME', 'sandbox')
+    api_key = getattr(settings, 'AFRICAS_TALKING_API_KEY', '')
+    if not api_key:
+        logger.warning("Africa's Talking credentials not configured")
+        return None
+    import africastalking
+
+    africastalking.initialize(username, api_key)
+    logger.info(f"Africa's Talking initialized for {username}")
+    return africastalking.SMS
+
+
+def _twilio():
+    if not getattr(settings, 'TWILIO_ACCOUNT_SID', ''):
+        logger.warning("Twilio credentials not configured")
+        return None
+    from twilio.rest import Client
+
+    client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+    logger.info("Twilio client initialized for WhatsApp and backup SMS")
+    return client
+
+
+def _gemini():
+    """The configured google.generativeai module"""
+    import google.generativeai as genai
+
+    genai.configure(api_key=getattr(settings, 'GEMINI_API_KEY', ''))
+    return genai
+
+
+def _cloudinary():
+    """The configured cloudinary module (None without credentials)"""
+    options = getattr(settings, 'CLOUDINARY_STORAGE', {})
+    if not options.get('CLOUD_NAME'):
+        return None
+    import cloudinary
+
+    cloudinary.config(
+        cloud_name=options['CLOUD_NAME'],
+        api_key=options.get('API_KEY', ''),
+        api_secret=options.get('API_SECRET', ''),
+        secure=options.get('SECURE', True),
+    )
+    return cloudinary
+
+
+register('africastalking_sms', _africastalking_sms)
+register('twilio', _twilio)
+register('gemini', _gemini)
+register('cloudinary', _cloudinary)
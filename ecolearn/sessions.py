@@ -0,0 +1,42 @@
+"""
+Session middleware that only writes sessions that changed
+
+SESSION_SAVE_EVERY_REQUEST re-saved the session on every request just to
+slide its expiry, which was a database write per page view. This middleware
+saves a session when its data changed and otherwise refreshes the expiry at
+most once per SESSION_REFRESH_INTERVAL seconds. The idle timeout is
+therefore SESSION_COOKIE_AGE minus at most one refresh interval.
+
+Works with any session engine: the shared SQLite cache
+('django.contrib.sessions.backends.cache' with SESSION_CACHE_ALIAS), the
+database, or signed cookies (where skipping the save also skips re-sending
+the cookie).
+
+Usage (settings.py): replace django.contrib.sessions.middleware.SessionMiddleware
+with 'ecolearn.sessions.SessionMiddleware' and set
+SESSION_SAVE_EVERY_REQUEST = False.
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware as DjangoSessionMiddleware
+
+# Tunables (override in settings.py)
+SESSION_REFRESH_INTERVAL = getattr(settings, 'SESSION_REFRESH_INTERVAL', 300)
+
+REFRESHED_KEY = '_refreshed_at'
+
+
+class SessionMiddleware(DjangoSessionMiddleware):
+
+    def process_response(self, request, response):
+        session = getattr(request, 'session', None)
+        if session is not None and session.accessed and not session.modified and session.session_key:
+            # Only sessions this request loaded anyway; checking costs no extra read
+            refreshed = session.get(REFRESHED_KEY, 0)
+            if not session.is_empty() and time.time() - refreshed >= SESSION_REFRESH_INTERVAL:
+                session[REFRESHED_KEY] = int(time.time())
+        elif session is not None and session.modified and not session.is_empty():
+            session[REFRESHED_KEY] = int(time.time())
+        return super().process_response(request, response)
@@ -3,7 +3,9 @@ Django settings for ecolearn project - Optimized for Render deployment
 """
 
 import os
+from importlib.util import find_spec
 from pathlib import Path
+import django
 from decouple import config
 
 # Try to import optional packages, fallback if not available
@@ -13,12 +15,9 @@ try:
 except ImportError:
     HAS_DJ_DATABASE_URL = False
 
-try:
-    import cloudinary
-    import cloudinary_storage
-    HAS_CLOUDINARY = True
-except ImportError:
-    HAS_CLOUDINARY = False
+# Detected without importing: SDKs are imported on first use (ecolearn/providers.py)
+HAS_CLOUDINARY = bool(find_spec('cloudinary') and find_spec('cloudinary_storage'))
+CLOUDINARY_ENABLED = HAS_CLOUDINARY and bool(config('CLOUDINARY_CLOUD_NAME', default=''))
 
 # Build paths
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -66,10 +65,11 @@ INSTALLED_APPS = [
     'admin_dashboard',
     'ai_assistant',
     'security',
+    'search',
 ]
 
-# Add optional apps if available
-if HAS_CLOUDINARY:
+# Add optional apps if available and configured
+if CLOUDINARY_ENABLED:
     # Insert cloudinary_storage before django.contrib.staticfiles
     staticfiles_index = INSTALLED_APPS.index('django.contrib.staticfiles')
     INSTALLED_APPS.insert(staticfiles_index, 'cloudinary_storage')
@@ -78,9 +78,12 @@ if HAS_CLOUDINARY:
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # WhiteNoise for static files
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'ecolearn.lazy_context.LazyContextMiddleware',  # Reports lazy context values realized per request
+    'ecolearn.memory.MemoryGovernorMiddleware',  # Defers heavy requests near the worker memory limit
+    'ecolearn.sessions.SessionMiddleware',  # Saves only changed sessions
     'django.middleware.locale.LocaleMiddleware',  # Language switching
     'security.middleware.SecurityMiddleware',
+    'security.middleware.RateLimitMiddleware',  # Shared-cache rate limits (security/ratelimit.py)
     'security.middleware.AuditMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -117,26 +120,39 @@ WSGI_APPLICATION = 'ecolearn.wsgi.application'
 ASGI_APPLICATION = 'ecolearn.asgi.application'
 
 # SIMPLIFIED CACHING AND CHANNELS CONFIGURATION (NO REDIS)
-print("🔧 Using simplified local cache and session configuration (no Redis)")
+print("🔧 Using shared SQLite cache and session configuration (no Redis)")
 
-# Django Channels Configuration - In-Memory Only
+# Django Channels Configuration - SQLite file shared by every worker process
+# (InMemoryChannelLayer only delivered events published in the same process)
 CHANNEL_LAYERS = {
     'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer'
+        'BACKEND': 'ecolearn.channel_layer.SQLiteChannelLayer',
+        'CONFIG': {
+            'path': config('CHANNEL_LAYER_PATH', default=str(BASE_DIR / 'channels.sqlite3')),
+        },
     }
 }
 
-# LOCAL MEMORY CACHE CONFIGURATION
+# SHARED CACHE CONFIGURATION - one SQLite file (WAL) shared by every worker
+# process; survives max_requests recycles and restarts, LRU-bounded by size
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'ecolearn-cache',
+        'BACKEND': 'ecolearn.sqlite_cache.SQLiteCache',
+        'LOCATION': config('CACHE_PATH', default=str(BASE_DIR / 'cache.sqlite3')),
         'TIMEOUT': 300,  # 5 minutes default
         'OPTIONS': {
-            'MAX_ENTRIES': 1000,  # Maximum number of cache entries
-            'CULL_FREQUENCY': 3,  # Fraction of entries to cull when MAX_ENTRIES is reached
+            'MAX_SIZE': config('CACHE_MAX_SIZE', default=64 * 1024 * 1024, cast=int),  # Bytes of cached values
+            'CULL_TARGET': 0.8,  # Evict least recently used entries down to 80% of MAX_SIZE
         }
-    }
+    },
+    # Sessions get their own file so view cache churn never evicts a login
+    'sessions': {
+        'BACKEND': 'ecolearn.sqlite_cache.SQLiteCache',
+        'LOCATION': config('SESSION_CACHE_PATH', default=str(BASE_DIR / 'sessions.sqlite3')),
+        'OPTIONS': {
+            'MAX_SIZE': 256 * 1024 * 1024,
+        }
+    },
 }
 
 # Cache time settings - Reduced for memory optimization
@@ -148,11 +164,16 @@ CACHE_TTL = {
 
 # Memory optimization settings will be applied after DATABASES is defined
 
-# SESSION CONFIGURATION - DATABASE SESSIONS ONLY
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# SESSION CONFIGURATION - stored in the shared 'sessions' cache; set
+# SESSION_ENGINE=django.contrib.sessions.backends.signed_cookies (or .db) to switch
+SESSION_ENGINE = config('SESSION_ENGINE', default='django.contrib.sessions.backends.cache')
+SESSION_CACHE_ALIAS = 'sessions'
 SESSION_COOKIE_AGE = 3600  # 1 hour (in seconds)
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
-SESSION_SAVE_EVERY_REQUEST = True  # Update session expiry on every request
+# ecolearn.sessions.SessionMiddleware slides the expiry instead, writing an
+# unchanged session at most once per SESSION_REFRESH_INTERVAL
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_INTERVAL = 300  # 5 minutes
 
 # DATABASE CONFIGURATION
 DATABASE_URL = config('DATABASE_URL', default=None)
@@ -222,8 +243,15 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'timeout': 20,
+            },
         }
     }
+    if django.VERSION >= (5, 1):
+        # Background threads write too; take the write lock up front and wait
+        # for it instead of failing with "database is locked" on upgrade
+        DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
     print("✅ SQLite database configured for local development")
 
 # Memory optimization settings for production
@@ -265,24 +293,14 @@ LANGUAGE_COOKIE_NAME = 'django_language'
 LANGUAGE_COOKIE_AGE = 31536000  # 1 year
 
 # CLOUDINARY CONFIGURATION - GLOBAL FOR ALL APPS
-if HAS_CLOUDINARY:
-    import cloudinary.uploader
-    import cloudinary.api
-    
-    CLOUDINARY_STORAGE = {
-        'CLOUD_NAME': config('CLOUDINARY_CLOUD_NAME', default=''),
-        'API_KEY': config('CLOUDINARY_API_KEY', default=''),
-        'API_SECRET': config('CLOUDINARY_API_SECRET', default=''),
-        'SECURE': True,
-    }
-
-    # Configure Cloudinary
-    cloudinary.config(
-        cloud_name=config('CLOUDINARY_CLOUD_NAME', default=''),
-        api_key=config('CLOUDINARY_API_KEY', default=''),
-        api_secret=config('CLOUDINARY_API_SECRET', default=''),
-        secure=True
-    )
+# cloudinary_storage configures the SDK from this dict when its storage is
+# first used; direct SDK use goes through providers.get('cloudinary')
+CLOUDINARY_STORAGE = {
+    'CLOUD_NAME': config('CLOUDINARY_CLOUD_NAME', default=''),
+    'API_KEY': config('CLOUDINARY_API_KEY', default=''),
+    'API_SECRET': config('CLOUDINARY_API_SECRET', default=''),
+    'SECURE': True,
+}
 
 # STATIC FILES CONFIGURATION WITH WHITENOISE
 STATIC_URL = '/static/'
@@ -298,7 +316,7 @@ WHITENOISE_AUTOREFRESH = True
 WHITENOISE_MAX_AGE = 31536000  # 1 year cache for static files
 
 # MEDIA FILES CONFIGURATION
-if HAS_CLOUDINARY:
+if CLOUDINARY_ENABLED:
     # Use Cloudinary for media files in production
     DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 else:
@@ -344,10 +362,35 @@ TWILIO_API_KEY_SECRET = config('TWILIO_API_KEY_SECRET', default='')
 TWILIO_PHONE_NUMBER = config('TWILIO_PHONE_NUMBER', default='')
 TWILIO_WHATSAPP_NUMBER = config('TWILIO_WHATSAPP_NUMBER', default='whatsapp:+14155238886')
 
+# Outbound notification queue (community.outbound)
+# Use 'community.outbound.FakeBackend' to exercise the pipeline offline
+NOTIFICATION_BACKEND = config('NOTIFICATION_BACKEND', default='community.outbound.LiveBackend')
+NOTIFICATION_WORKERS = config('NOTIFICATION_WORKERS', default=4, cast=int)
+NOTIFICATION_MAX_ATTEMPTS = config('NOTIFICATION_MAX_ATTEMPTS', default=4, cast=int)
+
+# Daily analytics rollups (admin_dashboard.rollups); `manage.py rollup_analytics` from cron.
+# Analytics views top up today's rows when the last run is older than this (0 disables)
+ANALYTICS_ROLLUP_MAX_AGE = config('ANALYTICS_ROLLUP_MAX_AGE', default=600, cast=int)
+# ...but only within this many days of the last run; older gaps and the first backfill are left to the command
+ANALYTICS_ROLLUP_TOPUP_DAYS = config('ANALYTICS_ROLLUP_TOPUP_DAYS', default=2, cast=int)
+
+# Worker memory governor (ecolearn.memory, hooked up in gunicorn.conf.py). Render's instance has 512MB:
+# workers past the soft limit are recycled; heavy requests get a 503 within 96MB of the hard limit
+MEMORY_SOFT_LIMIT_MB = config('MEMORY_SOFT_LIMIT_MB', default=384, cast=int)
+MEMORY_HARD_LIMIT_MB = config('MEMORY_HARD_LIMIT_MB', default=480, cast=int)
+
 # Security Settings
+# Proxies in front of the app that append the client address to X-Forwarded-For
+# (Render's load balancer: 1). Rate limits and audit logs trust only that entry.
+TRUSTED_PROXY_COUNT = config('TRUSTED_PROXY_COUNT', default=1, cast=int)
 ENCRYPTION_KEY = config('ENCRYPTION_KEY', default='HqQOIjSgnmFaRQn56qQmkF2lkN6X365g-GWYRGqumXA=')
 BACKUP_DIR = os.path.join(BASE_DIR, 'backups')
 
+# Rate limits: overrides merged over security.ratelimit.DEFAULT_POLICIES
+# (e.g. {'login': {'views': ['accounts:login'], 'methods': ['POST'], 'limit': 5, 'period': 300}};
+# None disables a policy)
+RATE_LIMITS = {}
+
 # Security Headers
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -0,0 +1,313 @@
+"""
+SQLite-backed Django cache shared by every worker process (no Redis)
+
+LocMemCache lived and died with each gunicorn worker: every worker warmed its
+own copy, and all of it was lost on each max_requests recycle. This backend
+keeps entries in one SQLite file in WAL mode, so every process on the host
+reads the same cache and it survives restarts.
+
+- readers never block writers (WAL); writes are single short transactions
+- size-bounded LRU: each entry records its size and last access time; once
+  the file holds more than MAX_SIZE bytes of values, the least recently used
+  entries are dropped down to CULL_TARGET of the limit
+- last access is written at most once per ACCESS_RESOLUTION seconds per
+  entry, so hot reads stay reads
+- add/incr/decr run inside BEGIN IMMEDIATE, so they are atomic across
+  processes (the view cache generations and rate limits rely on that)
+
+Usage (settings.py):
+    CACHES = {
+        'default': {
+            'BACKEND': 'ecolearn.sqlite_cache.SQLiteCache',
+            'LOCATION': BASE_DIR / 'cache.sqlite3',
+            'TIMEOUT': 300,
+            'OPTIONS': {'MAX_SIZE': 64 * 1024 * 1024},
+        }
+    }
+"""
+
+import os
+import pickle
+import queue
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entry (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_entry_accessed ON cache_entry (accessed);
+CREATE INDEX IF NOT EXISTS cache_entry_expires ON cache_entry (expires);
+"""
+
+# Connection pools are per file and per process: a connection opened before
+# gunicorn forks (preload_app) must never be used by the children
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class SQLiteCache(BaseCache):
+    """Django cache backend on a shared SQLite file"""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.path = str(location or 'cache.sqlite3')
+        self.max_size = int(options.get('MAX_SIZE', 64 * 1024 * 1024))
+        self.cull_target = float(options.get('CULL_TARGET', 0.8))
+        self.cull_every = int(options.get('CULL_EVERY', 200))
+        self.access_resolution = float(options.get('ACCESS_RESOLUTION', 60))
+        self.pool_size = int(options.get('POOL_SIZE', 4))
+        self._writes = 0
+
+    # --- Connections ---
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _pool(self):
+        pid = os.getpid()
+        pool = _pools.get(self.path)
+        if pool is None or pool[0] != pid:
+            with _pools_lock:
+                pool = _pools.get(self.path)
+                if pool is None or pool[0] != pid:
+                    pool = (pid, queue.LifoQueue(maxsize=self.pool_size))
+                    _pools[self.path] = pool
+        return pool[1]
+
+    def _read(self, func, *args):
+        """Run func(conn, *args) in autocommit mode"""
+        pool = self._pool()
+        try:
+            conn = pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            return func(conn, *args)
+        finally:
+            try:
+                pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _write(self, func, *args):
+        """Run func(conn, *args) inside one write transaction"""
+        def transaction(conn):
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = func(conn, *args)
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+            return result
+
+        result = self._read(transaction)
+        self._writes += 1
+        if self._writes % self.cull_every == 0:
+            self._read(self._cull)
+        return result
+
+    # --- Serialization ---
+
+    @staticmethod
+    def _encode(value):
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(blob):
+        return pickle.loads(blob)
+
+    def _expiry(self, timeout):
+        # get_backend_timeout() already returns an absolute timestamp (None: never expires)
+        return self.get_backend_timeout(timeout)
+
+    @staticmethod
+    def _expired(expires):
+        return expires is not None and expires <= time.time()
+
+    # --- Eviction ---
+
+    def _cull(self, conn):
+        """Drop expired entries, then least recently used ones until under the size target"""
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Expiries over ten years out were written by an earlier build that added now twice
+            conn.execute(
+                'DELETE FROM cache_entry WHERE expires IS NOT NULL AND (expires <= ? OR expires > ?)',
+                (now, now + 10 * 365 * 86400),
+            )
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache_entry').fetchone()[0]
+            if total > self.max_size:
+                keep = int(self.max_size * self.cull_target)
+                # Newest first; everything past the running total `keep` goes
+                conn.execute(
+                    'DELETE FROM cache_entry WHERE key IN ('
+                    '  SELECT key FROM ('
+                    '    SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS running FROM cache_entry'
+                    '  ) WHERE running > ?'
+                    ')',
+                    (keep,),
+                )
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    # --- Cache API ---
+
+    def _get_rows(self, conn, keys):
+        now = time.time()
+        rows = {}
+        stale = []
+        # SQLite caps bound parameters; 500 keys per statement is well under it
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for key, blob, expires, accessed in conn.execute(
+                f'SELECT key, value, expires, accessed FROM cache_entry WHERE key IN ({placeholders})', chunk
+            ):
+                if expires is not None and expires <= now:
+                    continue
+                rows[key] = blob
+                if accessed < now - self.access_resolution:
+                    stale.append(key)
+        if stale:
+            placeholders = ','.join('?' * len(stale))
+            try:
+                conn.execute(f'UPDATE cache_entry SET accessed = ? WHERE key IN ({placeholders})', [now, *stale])
+            except sqlite3.OperationalError:
+                # Busy writer: recency is best effort
+                pass
+        return rows
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        blob = self._read(self._get_rows, [key]).get(key)
+        return default if blob is None else self._decode(blob)
+
+    def get_many(self, keys, version=None):
+        mapping = {self.make_and_validate_key(key, version=version): key for key in keys}
+        if not mapping:
+            return {}
+        rows = self._read(self._get_rows, list(mapping))
+        return {mapping[key]: self._decode(blob) for key, blob in rows.items()}
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._read(
+            lambda conn: conn.execute(
+                'SELECT 1 FROM cache_entry WHERE key = ? AND (expires IS NULL OR expires > ?)', (key, time.time())
+            ).fetchone() is not None
+        )
+
+    def _upsert(self, conn, rows):
+        conn.executemany(
+            'INSERT INTO cache_entry (key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value, size = excluded.size, '
+            'expires = excluded.expires, accessed = excluded.accessed',
+            rows,
+        )
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        expires = self._expiry(timeout)
+        if self._expired(expires):
+            # timeout <= 0: nothing to store, and any previous value must go
+            self._write(lambda conn: conn.execute('DELETE FROM cache_entry WHERE key = ?', (key,)))
+            return
+        blob = self._encode(value)
+        self._write(self._upsert, [(key, blob, len(blob), expires, time.time())])
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self._expiry(timeout)
+        if self._expired(expires):
+            self.delete_many(data, version=version)
+            return []
+        now = time.time()
+        rows = []
+        for key, value in data.items():
+            blob = self._encode(value)
+            rows.append((self.make_and_validate_key(key, version=version), blob, len(blob), expires, now))
+        if rows:
+            self._write(self._upsert, rows)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        blob = self._encode(value)
+        expires = self._expiry(timeout)
+
+        def add(conn):
+            now = time.time()
+            conn.execute('DELETE FROM cache_entry WHERE key = ? AND expires IS NOT NULL AND expires <= ?', (key, now))
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO cache_entry (key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?)',
+                (key, blob, len(blob), expires, now),
+            )
+            return cursor.rowcount == 1
+
+        return self._write(add)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        expires = self._expiry(timeout)
+        return self._write(lambda conn: conn.execute(
+            'UPDATE cache_entry SET expires = ?, accessed = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (expires, time.time(), key, time.time()),
+        ).rowcount == 1)
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+
+        def incr(conn):
+            row = conn.execute(
+                'SELECT value FROM cache_entry WHERE key = ? AND (expires IS NULL OR expires > ?)', (key, time.time())
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = self._decode(row[0]) + delta
+            blob = self._encode(value)
+            conn.execute('UPDATE cache_entry SET value = ?, size = ? WHERE key = ?', (blob, len(blob), key))
+            return value
+
+        return self._write(incr)
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._write(lambda conn: conn.execute('DELETE FROM cache_entry WHERE key = ?', (key,)).rowcount == 1)
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        if keys:
+            self._write(lambda conn: conn.executemany('DELETE FROM cache_entry WHERE key = ?', [(key,) for key in keys]))
+
+    def clear(self):
+        self._write(lambda conn: conn.execute('DELETE FROM cache_entry'))
+
+    def close(self, **kwargs):
+        # Connections are pooled per process and reused across requests
+        pass
+
+    # --- Introspection ---
+
+    def info(self):
+        """Entry count and stored bytes, for stats endpoints"""
+        entries, size = self._read(
+            lambda conn: conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entry').fetchone()
+        )
+        return {'entries': entries, 'bytes': size, 'max_size': self.max_size, 'path': self.path}
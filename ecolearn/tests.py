@@ -0,0 +1,171 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+LOCMEM = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'ecolearn-tests'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'ecolearn-test-sessions'},
+}
+
+
+@override_settings(CACHES=LOCMEM)
+class LazyContextTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = get_user_model().objects.create(username='staff', email='staff@example.com', is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.staff)
+
+    def proof_counts(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries.captured_queries if 'community_challengeproof' in query['sql']], response
+
+    def test_badge_count_runs_only_when_rendered(self):
+        from ecolearn.lazy_context import report
+
+        counted, response = self.proof_counts(reverse('admin_dashboard:users'))
+        self.assertEqual(len(counted), 1)
+        self.assertIn('pending_proofs_count', report(response.wsgi_request)[0])
+
+        # The grid partial never shows the badge
+        counted, response = self.proof_counts(reverse('admin_dashboard:user_grid_data'))
+        self.assertEqual(counted, [])
+        self.assertIn('pending_proofs_count', report(response.wsgi_request)[1])
+
+
+class ProviderRegistryTests(TestCase):
+
+    def setUp(self):
+        from ecolearn import providers
+
+        self.providers = providers
+        self.calls = []
+        providers.register('test_provider', lambda: self.calls.append(1) or object())
+        self.addCleanup(providers._registry.pop, 'test_provider')
+
+    def test_factory_runs_once_across_threads(self):
+        import threading
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.providers.get('test_provider'))) for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(len({id(result) for result in results}), 1)
+        self.assertIn('test_provider', self.providers.loaded())
+
+    def test_rebuilt_after_fork(self):
+        from unittest import mock
+
+        first = self.providers.get('test_provider')
+        with mock.patch('ecolearn.providers.os.getpid', return_value=-1):
+            self.assertIsNot(self.providers.get('test_provider'), first)
+        self.assertEqual(len(self.calls), 2)
+
+    @override_settings(TWILIO_ACCOUNT_SID='', AFRICAS_TALKING_API_KEY='')
+    def test_unconfigured_provider_is_none(self):
+        from community.notifications import NotificationService
+        from ecolearn.providers import ProviderUnavailable
+
+        self.providers.reset()
+        self.addCleanup(self.providers.reset)
+        self.assertIsNone(NotificationService().twilio_client)
+        self.assertIsNone(NotificationService().africas_talking_sms)
+        with self.assertRaises(ProviderUnavailable):
+            self.providers.require('twilio')
+
+
+@override_settings(ROOT_URLCONF='ecolearn.memory_harness')
+class MemoryGovernorTests(TestCase):
+
+    def setUp(self):
+        import logging
+        import os
+        from types import SimpleNamespace
+
+        from ecolearn import memory, memory_harness
+
+        if memory.rss() is None:
+            self.skipTest('RSS is not available on this platform')
+        self.memory = memory
+        memory.high_water.reset()
+        self.addCleanup(memory.high_water.reset)
+        self.addCleanup(memory_harness.release)
+        self.worker = SimpleNamespace(alive=True, pid=os.getpid(), log=logging.getLogger('gunicorn.error'))
+
+    def finish(self, response):
+        """What gunicorn's post_request hook does once the response is written"""
+        self.memory.post_request(self.worker, None, response.wsgi_request.META, response)
+
+    def test_growing_endpoint_recycles_worker_past_soft_limit(self):
+        from unittest import mock
+
+        soft_limit = self.memory.rss() // self.memory.MB + 16
+        with mock.patch.object(self.memory, 'MEMORY_SOFT_LIMIT_MB', soft_limit):
+            self.finish(self.client.get('/ping/'))
+            self.assertTrue(self.worker.alive)
+            self.finish(self.client.get('/grow/32/'))
+        self.assertFalse(self.worker.alive)
+
+        stats = dict(self.memory.high_water.top())['memory_harness_grow']
+        self.assertGreaterEqual(stats['peak_growth'], 32 * self.memory.MB)
+        self.assertGreaterEqual(stats['peak_rss'], soft_limit * self.memory.MB)
+
+    def test_heavy_requests_deferred_near_hard_limit(self):
+        from unittest import mock
+
+        near = (self.memory.MEMORY_HARD_LIMIT_MB - 1) * self.memory.MB
+        with mock.patch.object(self.memory, 'rss', return_value=near):
+            response = self.client.get('/heavy/')
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], str(self.memory.MEMORY_RETRY_AFTER))
+            self.assertEqual(self.client.get('/ping/').status_code, 200)
+            # Large upload bodies count as heavy whatever the endpoint
+            body = b'x' * (self.memory.MEMORY_HEAVY_UPLOAD_BYTES + 1)
+            self.assertEqual(self.client.post('/ping/', body, content_type='application/octet-stream').status_code, 503)
+        self.assertEqual(self.client.get('/heavy/').status_code, 200)
+
+
+class SQLiteCacheTests(TestCase):
+
+    def setUp(self):
+        import os
+        import tempfile
+
+        from ecolearn.sqlite_cache import SQLiteCache
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(lambda: [os.remove(os.path.join(directory, name)) for name in os.listdir(directory)])
+        self.cache = SQLiteCache(os.path.join(directory, 'cache.sqlite3'), {})
+
+    def test_expired_key_reads_as_missing(self):
+        import time
+
+        self.cache.set('short', 1, 1)
+        self.cache.set('long', 2, 60)
+        self.assertEqual(self.cache.get('short'), 1)
+        time.sleep(1.2)
+        self.assertIsNone(self.cache.get('short'))
+        self.assertFalse(self.cache.has_key('short'))
+        self.assertTrue(self.cache.add('short', 3, 60))
+        self.assertEqual(self.cache.get('long'), 2)
+
+    def test_zero_timeout_does_not_store(self):
+        self.cache.set('key', 'old')
+        self.cache.set('key', 'new', 0)
+        self.assertIsNone(self.cache.get('key'))
+        self.cache.set_many({'a': 1, 'b': 2}, 0)
+        self.assertEqual(self.cache.get_many(['a', 'b']), {})
+        self.assertEqual(self.cache.info()['entries'], 0)
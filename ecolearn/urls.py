@@ -56,6 +56,7 @@ urlpatterns = [
     path('payments/', include('payments.urls')),
     path('admin-dashboard/', include('admin_dashboard.urls')),
     path('ai-assistant/', include('ai_assistant.urls')),  # AI Assistant
+    path('search/', include('search.urls')),  # Full-text search
 
     # 🌟 NEW: Gamification App 
     path('rewards/', include('gamification.urls', namespace='gamification')),
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ElearningConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'elearning'
+
+    def ready(self):
+        from . import certificates, progress, view_cache
+        view_cache.connect_signals()
+        progress.connect_signals()
+        certificates.connect_signals()
@@ -0,0 +1,64 @@
+# elearning/certificate_pdf.py
+"""
+Certificate PDF rendering, from plain values
+No Django or ORM imports: render_pdf() is also what the render_certificates
+process pool runs, and its workers only need ReportLab. The canvas is
+invariant (no timestamps or random ids), so the same inputs always give the
+same bytes.
+"""
+
+import hashlib
+import io
+
+# Bump when the layout below changes: every certificate gets a new fingerprint
+TEMPLATE_VERSION = 1
+
+
+def fingerprint(learner_name, module_title, issued_on, certificate_id):
+    """Digest of everything printed on the certificate"""
+    content = '\x1f'.join([str(TEMPLATE_VERSION), learner_name, module_title, issued_on, certificate_id])
+    return hashlib.sha256(content.encode()).hexdigest()[:40]
+
+
+def render_pdf(learner_name, module_title, issued_on, certificate_id):
+    """
+    Returns:
+        bytes: the certificate PDF
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import landscape, letter
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=landscape(letter), invariant=1)
+    width, height = landscape(letter)
+
+    p.setFillColor(colors.HexColor('#dcfce7'))
+    p.rect(0, 0, width, height, fill=1, stroke=0)
+    p.setStrokeColor(colors.HexColor('#22c55e'))
+    p.setLineWidth(10)
+    p.rect(30, 30, width-60, height-60, fill=0, stroke=1)
+    p.setFillColor(colors.HexColor('#16a34a'))
+    p.setFont("Helvetica-Bold", 40)
+    p.drawCentredString(width/2, height-100, "Certificate of Completion")
+    p.setFont("Helvetica", 16)
+    p.drawCentredString(width/2, height-140, "This is to certify that")
+    p.setFont("Helvetica-Bold", 32)
+    p.setFillColor(colors.black)
+    p.drawCentredString(width/2, height-200, learner_name)
+    p.setFont("Helvetica", 16)
+    p.setFillColor(colors.HexColor('#16a34a'))
+    p.drawCentredString(width/2, height-240, "has successfully completed")
+    p.setFont("Helvetica-Bold", 24)
+    p.setFillColor(colors.black)
+    p.drawCentredString(width/2, height-280, module_title)
+    p.setFont("Helvetica", 12)
+    p.setFillColor(colors.HexColor('#16a34a'))
+    p.drawCentredString(width/2, height-340, f"Issued on: {issued_on}")
+    p.drawCentredString(width/2, height-360, f"Certificate ID: {certificate_id}")
+    p.setFont("Helvetica-Oblique", 10)
+    p.drawCentredString(width/2, 80, "EcoLearn Environmental Education Platform")
+
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
@@ -0,0 +1,209 @@
+# elearning/certificates.py
+"""
+Certificate PDFs, rendered once and served from storage
+Downloads used to rebuild the ReportLab PDF on every request, and the
+verification page queried the certificate every time.
+
+- the PDF is built from plain values by elearning/certificate_pdf.py,
+  which imports nothing from Django, so the render_certificates process
+  pool stays small
+- the file name is the digest of those inputs
+  (certificates/<fingerprint>.pdf): a rename of the learner or the module
+  gives a new file, and an existing file never needs re-rendering
+- certificates are rendered on issuance by the completion worker
+  (elearning/progress.py); downloads only render when the stored file is
+  missing or out of date
+- record() caches what the download and verification views need, so a
+  repeat download that matches the ETag costs no render and no certificate
+  query
+"""
+
+import io
+import logging
+
+from django.conf import settings
+
+from .certificate_pdf import fingerprint, render_pdf
+
+logger = logging.getLogger(__name__)
+
+# Tunables (override in settings.py)
+DOWNLOAD_MAX_AGE = getattr(settings, 'CERTIFICATE_DOWNLOAD_MAX_AGE', 86400)
+
+UPLOAD_DIR = 'certificates'
+
+
+def file_name(digest):
+    return f'{UPLOAD_DIR}/{digest}.pdf'
+
+
+def render_args(certificate):
+    """render_pdf() arguments for a Certificate with user and module loaded"""
+    return (
+        certificate.user.get_full_name() or certificate.user.username,
+        certificate.module.title,
+        certificate.issued_at.strftime('%B %d, %Y'),
+        certificate.certificate_id,
+    )
+
+
+def _storage():
+    from .models import Certificate
+    return Certificate._meta.get_field('certificate_file').storage
+
+
+def store(certificate_pk, certificate_id, digest, pdf):
+    """Save a rendered PDF under its content address and point the certificate at it"""
+    from . import view_cache
+    from django.core.files.base import ContentFile
+    from .models import Certificate
+
+    storage = _storage()
+    name = file_name(digest)
+    if not storage.exists(name):
+        name = storage.save(name, ContentFile(pdf))
+    Certificate.objects.filter(pk=certificate_pk).update(certificate_file=name)
+    view_cache.bump_on_commit(f'certificate-id:{certificate_id}')
+    return name
+
+
+def ensure_rendered(certificate):
+    """
+    Render and store `certificate` unless its current file is up to date
+
+    Returns:
+        str: the stored file name
+    """
+    args = render_args(certificate)
+    digest = fingerprint(*args)
+    if certificate.certificate_file.name == file_name(digest) and _storage().exists(certificate.certificate_file.name):
+        return certificate.certificate_file.name
+    return store(certificate.pk, certificate.certificate_id, digest, render_pdf(*args))
+
+
+def outstanding(force=False):
+    """
+    Certificates whose stored file is missing or out of date (all of them
+    with force=True)
+
+    Yields:
+        tuple: (pk, certificate_id, render_pdf() arguments)
+    """
+    from .models import Certificate
+
+    certificates = Certificate.objects.select_related('user', 'module').only(
+        'certificate_id', 'issued_at', 'certificate_file', 'user__username', 'user__first_name',
+        'user__last_name', 'module__title',
+    ).order_by('pk')
+    for certificate in certificates.iterator(chunk_size=500):
+        args = render_args(certificate)
+        if force or certificate.certificate_file.name != file_name(fingerprint(*args)):
+            yield certificate.pk, certificate.certificate_id, args
+
+
+def render_batch(pool, batch):
+    """Render `batch` (items from outstanding()) in a process pool and store the results in this process"""
+    pdfs = pool.map(render_pdf, *zip(*[args for _, _, args in batch]), chunksize=4)
+    for (pk, certificate_id, args), pdf in zip(batch, pdfs):
+        store(pk, certificate_id, fingerprint(*args), pdf)
+
+
+def record(certificate_id):
+    """
+    Cached certificate details for the download and verification views
+
+    Returns:
+        dict, or None if there is no such certificate
+    """
+    from . import view_cache
+    from .models import Certificate
+
+    def build():
+        certificate = Certificate.objects.select_related('user', 'module').filter(
+            certificate_id=certificate_id
+        ).first()
+        if certificate is None:
+            return {}
+        args = render_args(certificate)
+        return {
+            'pk': certificate.pk,
+            'certificate_id': certificate.certificate_id,
+            'user_id': certificate.user_id,
+            'learner_name': args[0],
+            'module_title': certificate.module.title,
+            'module_slug': certificate.module.slug,
+            'issued_at': certificate.issued_at,
+            'final_score': certificate.final_score,
+            'fingerprint': fingerprint(*args),
+            'file': certificate.certificate_file.name or '',
+        }
+
+    # Unknown ids are cached too (as {}); creating the certificate bumps its scope
+    value = view_cache.get_or_build(
+        'certificate', ['certificates', f'certificate-id:{certificate_id}'], (certificate_id,), build,
+        view_cache.SHARED_TTL
+    )
+    return value or None
+
+
+def open_pdf(data):
+    """
+    The stored PDF for a record(), rendering and storing it first if it is
+    missing or out of date
+
+    Returns:
+        file-like object
+    """
+    from .models import Certificate
+
+    storage = _storage()
+    if data['file'] == file_name(data['fingerprint']) and storage.exists(data['file']):
+        return storage.open(data['file'], 'rb')
+
+    certificate = Certificate.objects.select_related('user', 'module').get(pk=data['pk'])
+    args = render_args(certificate)
+    pdf = render_pdf(*args)
+    try:
+        store(certificate.pk, certificate.certificate_id, fingerprint(*args), pdf)
+    except Exception as e:
+        logger.error(f"Storing certificate {certificate.certificate_id} failed: {str(e)}")
+    return io.BytesIO(pdf)
+
+
+# --- Signals ---
+
+def certificate_changed(sender, instance, **kwargs):
+    from . import view_cache
+    view_cache.bump_on_commit(f'certificate-id:{instance.certificate_id}')
+
+
+def learner_changed(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login; anything else may rename the learner
+    from . import view_cache
+    from .models import Certificate
+
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    certificate_ids = list(Certificate.objects.filter(user_id=instance.pk).values_list('certificate_id', flat=True))
+    if certificate_ids:
+        view_cache.bump_on_commit(*[f'certificate-id:{certificate_id}' for certificate_id in certificate_ids])
+
+
+def module_renamed(sender, instance, update_fields=None, **kwargs):
+    # Counter updates (enrollments_count, average_rating) leave the title alone
+    from . import view_cache
+
+    if update_fields is not None and 'title' not in update_fields:
+        return
+    view_cache.bump_on_commit('certificates')
+
+
+def connect_signals():
+    from django.contrib.auth import get_user_model
+    from django.db.models.signals import post_delete, post_save
+    from .models import Certificate, Module
+
+    post_save.connect(certificate_changed, sender=Certificate, dispatch_uid='certificates_certificate_saved')
+    post_delete.connect(certificate_changed, sender=Certificate, dispatch_uid='certificates_certificate_deleted')
+    post_save.connect(learner_changed, sender=get_user_model(), dispatch_uid='certificates_learner_saved')
+    post_save.connect(module_renamed, sender=Module, dispatch_uid='certificates_module_saved')
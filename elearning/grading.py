@@ -0,0 +1,173 @@
+# elearning/grading.py
+"""
+Quiz grading with a fixed number of queries
+Grading used to fetch every selected Answer and insert every QuizResponse
+one at a time: a 30-question quiz cost 60+ queries per submission.
+
+- the answer key (questions, points, answers and which are correct) is
+  built once per quiz version and cached; any Question/Answer/Quiz save
+  or delete bumps the quiz's generation (see elearning/view_cache.py)
+- submissions are validated against the key in memory: an answer id that
+  does not belong to its question counts as unanswered
+- the attempt, all responses (one bulk_create) and, on a pass, the
+  lesson completion and enrollment progress are written in one transaction
+  with the enrollment row locked, so concurrent submissions cannot exceed
+  max_attempts
+"""
+
+import logging
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class AttemptLimitReached(Exception):
+    pass
+
+
+@dataclass
+class GradedQuestion:
+    question_id: int
+    points: int
+    answer_id: int = None
+    text: str = ''
+    is_correct: bool = False
+
+
+@dataclass
+class GradeResult:
+    attempt: object
+    earned_points: int
+    total_points: int
+    percentage: float
+    passed: bool
+    lesson_completed: bool = False
+    module_completed: bool = False
+    questions: list = field(default_factory=list)
+
+
+def answer_key(quiz_id):
+    """
+    Returns:
+        dict: 'questions' [(question_id, question_type, points)] in display order,
+              'answers' {answer_id: (question_id, is_correct)},
+              'labels' {question_id: {normalized answer text: answer_id}} and
+              'correct' {question_id: set of correct answer ids}
+    """
+    from . import view_cache
+    from .models import Answer, Question
+
+    def build():
+        questions = list(Question.objects.filter(quiz_id=quiz_id).order_by('order', 'id').values_list(
+            'id', 'question_type', 'points'
+        ))
+        answers, labels, correct = {}, {}, {}
+        rows = Answer.objects.filter(question__quiz_id=quiz_id).values_list('id', 'question_id', 'answer_text', 'is_correct')
+        for answer_id, question_id, text, is_correct in rows:
+            answers[answer_id] = (question_id, is_correct)
+            question_labels = labels.setdefault(question_id, {})
+            if is_correct or _normalize(text) not in question_labels:
+                question_labels[_normalize(text)] = answer_id
+            if is_correct:
+                correct.setdefault(question_id, set()).add(answer_id)
+        return {'questions': questions, 'answers': answers, 'labels': labels, 'correct': correct}
+
+    return view_cache.get_or_build('quiz_key', [f'quiz:{quiz_id}'], (quiz_id,), build, view_cache.SHARED_TTL)
+
+
+def _normalize(text):
+    return ' '.join((text or '').split()).casefold()
+
+
+def _grade_question(key, question_id, question_type, points, submitted):
+    graded = GradedQuestion(question_id, points)
+    submitted = (submitted or '').strip()
+    if not submitted:
+        return graded
+
+    labels = key['labels'].get(question_id, {})
+    if question_type == 'text':
+        # Free text is correct when it matches a correct answer's text
+        graded.text = submitted
+        answer_id = labels.get(_normalize(submitted))
+        graded.is_correct = answer_id in key['correct'].get(question_id, ())
+        return graded
+
+    if submitted.isdigit():
+        answer_id = int(submitted)
+    else:
+        # True/false questions post "true"/"false"; match the answer with that text
+        answer_id = labels.get(_normalize(submitted))
+    answer = key['answers'].get(answer_id)
+    if answer is None or answer[0] != question_id:
+        return graded
+    graded.answer_id = answer_id
+    graded.is_correct = answer[1]
+    return graded
+
+
+def grade(quiz, enrollment, submission):
+    """
+    Grade and record one quiz submission
+
+    Args:
+        quiz: Quiz, with lesson and lesson.module selected
+        enrollment: the submitting user's Enrollment in the quiz's module
+        submission: mapping of 'question_<id>' -> submitted value (request.POST)
+
+    Returns:
+        GradeResult
+
+    Raises:
+        AttemptLimitReached: the user has no attempts left
+    """
+    from . import progress
+    from .models import Enrollment, QuizAttempt, QuizResponse
+
+    key = answer_key(quiz.id)
+    graded = [
+        _grade_question(key, question_id, question_type, points, submission.get(f'question_{question_id}'))
+        for question_id, question_type, points in key['questions']
+    ]
+    total_points = sum(question.points for question in graded)
+    earned_points = sum(question.points for question in graded if question.is_correct)
+    percentage = (earned_points / total_points * 100) if total_points > 0 else 0
+    passed = percentage >= quiz.passing_score
+
+    with transaction.atomic():
+        # Serializes this user's submissions for the module
+        Enrollment.objects.select_for_update().filter(pk=enrollment.pk).values_list('pk', flat=True).first()
+        attempts_count = QuizAttempt.objects.filter(user_id=enrollment.user_id, quiz=quiz).count()
+        if attempts_count >= quiz.max_attempts:
+            raise AttemptLimitReached(quiz.max_attempts)
+
+        attempt = QuizAttempt.objects.create(
+            user_id=enrollment.user_id,
+            enrollment=enrollment,
+            quiz=quiz,
+            attempt_number=attempts_count + 1,
+            total_questions=len(graded),
+            score=earned_points,
+            percentage=round(percentage, 2),
+            passed=passed,
+            completed_at=timezone.now(),
+        )
+        QuizResponse.objects.bulk_create([
+            QuizResponse(
+                attempt=attempt,
+                question_id=question.question_id,
+                selected_answer_id=question.answer_id,
+                text_response=question.text,
+                is_correct=question.is_correct,
+            )
+            for question in graded
+            if question.answer_id or question.text
+        ])
+
+        result = GradeResult(attempt, earned_points, total_points, percentage, passed, questions=graded)
+        if passed:
+            result.lesson_completed, result.module_completed = progress.complete_lesson(enrollment, quiz.lesson)
+    return result
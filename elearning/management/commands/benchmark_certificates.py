@@ -0,0 +1,167 @@
+# elearning/management/commands/benchmark_certificates.py
+"""
+Benchmark for certificate rendering and serving.
+
+1. Rendering: renders per second in this process and across a process
+   pool, peak Python heap per render (tracemalloc) and the peak RSS of a
+   pool worker.
+2. Downloads: latency of the old path (render on every request), a
+   download served from the stored file, and a repeat download answered
+   304 from the ETag.
+
+Synthetic certificates only; files go to a temporary MEDIA_ROOT and the
+benchmark rows are deleted afterwards.
+Run: python manage.py benchmark_certificates --renders 200 --workers 4
+"""
+
+import multiprocessing
+import resource
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+
+from elearning.certificate_pdf import render_pdf
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def synthetic_args(count):
+    return [
+        (f'Learner Number {i}', 'Waste Sorting and Recycling Basics', 'June 01, 2025', f'BENCH-{i}')
+        for i in range(count)
+    ]
+
+
+def _worker_peak_rss(_=None):
+    """Peak RSS in KB. VmHWM starts over at exec; ru_maxrss would include the forking parent"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Command(BaseCommand):
+    help = 'Measure certificate renders per second, memory per render and download latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=200, help='Certificates to render per run')
+        parser.add_argument('--workers', type=int, default=4, help='Processes in the pool run')
+        parser.add_argument('--downloads', type=int, default=100, help='Requests per download path')
+
+    def handle(self, *args, **options):
+        self.benchmark_renders(options['renders'], options['workers'])
+        self.benchmark_downloads(options['downloads'])
+
+    # --- Rendering ---
+
+    def benchmark_renders(self, count, workers):
+        jobs = synthetic_args(count)
+        render_pdf(*jobs[0])  # imports and font setup
+
+        start = time.perf_counter()
+        sizes = [len(render_pdf(*job)) for job in jobs]
+        sequential = time.perf_counter() - start
+
+        # Heap measured in a separate pass: tracemalloc slows rendering several times over
+        peaks = []
+        for job in jobs[:50]:
+            tracemalloc.start()
+            render_pdf(*job)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        self.stdout.write(f'🧪 Rendering {count} certificates')
+        self.stdout.write(
+            f'   1 process   {count / sequential:7.1f} renders/s | heap per render p50 '
+            f'{percentile(peaks, 50) / 1024:6.0f} KB max {max(peaks) / 1024:6.0f} KB | '
+            f'PDF {statistics.mean(sizes) / 1024:.1f} KB'
+        )
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            list(pool.map(render_pdf, *zip(*jobs[:workers])))  # start the workers
+            start = time.perf_counter()
+            list(pool.map(render_pdf, *zip(*jobs), chunksize=4))
+            pooled = time.perf_counter() - start
+            worker_rss = max(pool.map(_worker_peak_rss, range(workers)))
+        self.stdout.write(
+            f'   {workers} processes {count / pooled:7.1f} renders/s | worker peak RSS {worker_rss / 1024:.0f} MB'
+        )
+
+    # --- Downloads ---
+
+    def timed(self, client, url, count, **headers):
+        latencies = []
+        for _ in range(count):
+            start = time.perf_counter()
+            response = client.get(url, **headers)
+            if hasattr(response, 'streaming_content'):
+                b''.join(response.streaming_content)
+            latencies.append(time.perf_counter() - start)
+        return response.status_code, latencies
+
+    def benchmark_downloads(self, count):
+        from django.contrib.auth import get_user_model
+        from elearning.certificates import ensure_rendered, record, render_args
+        from elearning.models import Category, Certificate, Module
+
+        User = get_user_model()
+        media_root = tempfile.mkdtemp(prefix='certificate-bench-')
+        user = User.objects.create_user(username='certificate_bench_user', email='certificate-bench@example.com',
+                                        first_name='Bench', last_name='Learner')
+        category = Category.objects.create(name='Certificate Bench', slug='certificate-bench')
+        module = None
+        try:
+            with override_settings(ALLOWED_HOSTS=['*'], MEDIA_ROOT=media_root):
+                module = Module.objects.create(
+                    title='Certificate Bench Module', slug='certificate-bench-module', description='d',
+                    category=category, created_by=user,
+                )
+                certificate = Certificate.objects.create(user=user, module=module, certificate_id='BENCH-DOWNLOAD')
+                certificate = Certificate.objects.select_related('user', 'module').get(pk=certificate.pk)
+
+                client = Client()
+                client.force_login(user)
+                url = f'/elearning/app/certificate/{certificate.certificate_id}/download/'
+
+                # Old path: every download rendered the PDF
+                args = render_args(certificate)
+                legacy = []
+                for _ in range(count):
+                    start = time.perf_counter()
+                    render_pdf(*args)
+                    legacy.append(time.perf_counter() - start)
+
+                ensure_rendered(certificate)
+                status, stored = self.timed(client, url, count)
+                etag = f'"{record(certificate.certificate_id)["fingerprint"]}"'
+                not_modified_status, not_modified = self.timed(client, url, count, HTTP_IF_NONE_MATCH=etag)
+
+            self.stdout.write(f'🧪 {count} downloads per path')
+            for label, code, latencies in [
+                ('render only (before, per request)', 200, legacy),
+                ('stored file', status, stored),
+                ('repeat download (ETag)', not_modified_status, not_modified),
+            ]:
+                self.stdout.write(
+                    f'   {label:<34} status {code} | p50 {percentile(latencies, 50) * 1000:6.2f}ms '
+                    f'p99 {percentile(latencies, 99) * 1000:6.2f}ms'
+                )
+        finally:
+            if module is not None:
+                module.delete()
+            category.delete()
+            user.delete()
+            shutil.rmtree(media_root, ignore_errors=True)
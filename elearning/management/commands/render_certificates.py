@@ -0,0 +1,49 @@
+# elearning/management/commands/render_certificates.py
+"""
+Render every certificate that has no up-to-date stored PDF, in parallel.
+New certificates are rendered by the completion worker; run this after
+deploying the certificate store, after changing the certificate layout
+(certificate_pdf.TEMPLATE_VERSION), or after bulk imports.
+Rendering runs in a process pool; files are saved and certificates
+updated from this process.
+Run: python manage.py render_certificates [--workers 4] [--force]
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from elearning.certificates import outstanding, render_batch
+
+
+class Command(BaseCommand):
+    help = 'Render outstanding certificate PDFs with a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Render processes')
+        parser.add_argument('--batch-size', type=int, default=200, help='Certificates per batch')
+        parser.add_argument('--force', action='store_true', help='Re-render certificates that are up to date')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        pending = outstanding(force=options['force'])
+        rendered = 0
+        with ProcessPoolExecutor(max_workers=options['workers'], mp_context=multiprocessing.get_context('spawn')) as pool:
+            while True:
+                batch = list(islice(pending, options['batch_size']))
+                if not batch:
+                    break
+                render_batch(pool, batch)
+                rendered += len(batch)
+                self.stdout.write(f'  📄 {rendered} certificate(s) rendered')
+
+        elapsed = time.perf_counter() - started
+        rate = rendered / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Rendered {rendered} certificate(s) in {elapsed:.2f}s '
+            f'({rate:.1f}/s, {options["workers"]} worker(s))'
+        ))
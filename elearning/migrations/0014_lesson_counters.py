@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:20
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Module = apps.get_model('elearning', 'Module')
+    Lesson = apps.get_model('elearning', 'Lesson')
+    Enrollment = apps.get_model('elearning', 'Enrollment')
+    LessonProgress = apps.get_model('elearning', 'LessonProgress')
+
+    lessons = Lesson.objects.filter(module=OuterRef('pk')).order_by().values('module').annotate(
+        total=Count('id')
+    ).values('total')
+    Module.objects.update(lessons_count=Coalesce(Subquery(lessons, output_field=IntegerField()), Value(0)))
+
+    completed = LessonProgress.objects.filter(enrollment=OuterRef('pk'), is_completed=True).order_by().values(
+        'enrollment'
+    ).annotate(total=Count('id')).values('total')
+    Enrollment.objects.update(
+        completed_lessons_count=Coalesce(Subquery(completed, output_field=IntegerField()), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elearning', '0013_remove_module_pdf_guide_alter_category_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_lessons_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='module',
+            name='lessons_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -129,6 +129,7 @@ class Module(models.Model):
     views_count = models.IntegerField(default=0, db_index=True)
     enrollments_count = models.IntegerField(default=0, db_index=True)
     completions_count = models.IntegerField(default=0)
+    lessons_count = models.IntegerField(default=0, editable=False)  # Kept current by elearning.progress signals
     average_rating = models.DecimalField(max_digits=3, decimal_places=1, default=0.0, db_index=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_modules')
     updated_at = models.DateTimeField(auto_now=True)
@@ -407,6 +408,7 @@ class Enrollment(models.Model):
     completed_at = models.DateTimeField(null=True, blank=True)
     progress_percentage = models.IntegerField(default=0)
     time_spent_minutes = models.IntegerField(default=0)
+    completed_lessons_count = models.IntegerField(default=0, editable=False)  # Incremented by elearning.progress
 
     class Meta:
         unique_together = ['user', 'module']
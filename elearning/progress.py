@@ -0,0 +1,236 @@
+# elearning/progress.py
+"""
+Lesson completion and enrollment progress
+Shared by the complete-lesson view and quiz grading (passing a quiz
+completes its lesson). Completing a lesson is the busiest write during
+course drives, so it does no counting:
+
+- Module.lessons_count is kept current by Lesson signals (created, moved
+  to another module, deleted; fixtures included)
+- the LessonProgress row is flipped with one conditional UPDATE (created
+  only if the learner never opened the lesson)
+- Enrollment.completed_lessons_count and progress_percentage move with one
+  F() UPDATE, and completed_at is set by a second UPDATE guarded on the
+  counter, so exactly one request sees the module complete
+- the completion count, certificate, notification and dashboard stats are
+  handed to a background thread after commit
+
+Callers run complete_lesson() inside their own transaction.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Least
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Tunables (override in settings.py)
+MAX_WORKERS = getattr(settings, 'ELEARNING_COMPLETION_WORKERS', 1)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide completion thread pool (created on first use)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='lesson-completion')
+        return _executor
+
+
+def _mark_completed(enrollment, lesson, now):
+    """Flip the LessonProgress row; True when this call completed it"""
+    from .models import LessonProgress
+
+    updated = LessonProgress.objects.filter(
+        enrollment=enrollment, lesson=lesson, is_completed=False
+    ).update(is_completed=True, completed_at=now, last_accessed=now)
+    if updated:
+        return True
+    if LessonProgress.objects.filter(enrollment=enrollment, lesson=lesson).exists():
+        return False
+    try:
+        with transaction.atomic():
+            LessonProgress.objects.create(enrollment=enrollment, lesson=lesson, is_completed=True, completed_at=now)
+        return True
+    except IntegrityError:
+        # A concurrent request created the row first
+        return False
+
+
+def complete_lesson(enrollment, lesson):
+    """
+    Mark `lesson` completed for `enrollment` and update its progress
+
+    Returns:
+        tuple: (newly_completed, module_completed)
+    """
+    from . import view_cache
+    from .models import Enrollment
+
+    now = timezone.now()
+    if not _mark_completed(enrollment, lesson, now):
+        return False, False
+
+    total_lessons = lesson.module.lessons_count
+    completed = F('completed_lessons_count') + 1
+    Enrollment.objects.filter(pk=enrollment.pk).update(
+        completed_lessons_count=completed,
+        progress_percentage=Least(completed * 100 / max(total_lessons, 1), Value(100)),
+    )
+    module_completed = Enrollment.objects.filter(
+        pk=enrollment.pk, completed_at__isnull=True, completed_lessons_count__gte=total_lessons
+    ).update(completed_at=now) == 1
+
+    # Keep the instance the caller holds in step with the row
+    enrollment.completed_lessons_count += 1
+    enrollment.progress_percentage = min(enrollment.completed_lessons_count * 100 // max(total_lessons, 1), 100)
+    if module_completed:
+        enrollment.completed_at = now
+
+    # Enrollment UPDATEs bypass post_save: invalidate the learner's cached progress here
+    view_cache.bump_on_commit(f'user:{enrollment.user_id}')
+    if module_completed or enrollment.completed_lessons_count == 1:
+        # Module started or finished: counters, certificate and notifications off the request path
+        enrollment_id = enrollment.pk
+        if getattr(settings, 'ELEARNING_COMPLETION_ASYNC', True):
+            transaction.on_commit(lambda: get_executor().submit(_run_in_thread, enrollment_id, module_completed))
+        else:
+            transaction.on_commit(lambda: after_progress(enrollment_id, module_completed))
+
+    return True, module_completed
+
+
+def _run_in_thread(enrollment_id, module_completed):
+    """Worker entry point - threads must manage their own DB connections"""
+    close_old_connections()
+    try:
+        after_progress(enrollment_id, module_completed)
+    finally:
+        close_old_connections()
+
+
+def after_progress(enrollment_id, module_completed):
+    """Dashboard stats, and on module completion the completion count, certificate and notifications"""
+    from accounts.dashboard_stats import refresh_user_stats
+    from . import certificates
+    from .models import Certificate, Enrollment, Module
+
+    try:
+        enrollment = Enrollment.objects.select_related('user', 'module').get(pk=enrollment_id)
+    except Enrollment.DoesNotExist:
+        return
+
+    try:
+        if module_completed:
+            module = enrollment.module
+            Module.objects.filter(pk=module.pk).update(completions_count=F('completions_count') + 1)
+            certificate, _ = Certificate.objects.get_or_create(
+                user=enrollment.user,
+                module=module,
+                defaults={'final_score': 100, 'certificate_id': f'C-{module.id}-{enrollment.user_id}'}
+            )
+            # Rendered now, so the learner's first download is served from storage
+            certificates.ensure_rendered(certificate)
+            _notify_module_completed(enrollment.user, module.title, module.slug)
+        refresh_user_stats(enrollment.user_id, sections=['learning'])
+    except Exception as e:
+        logger.error(f"Post-completion work failed for enrollment {enrollment_id}: {str(e)}")
+
+
+def _notify_module_completed(user, module_title, module_slug):
+    # USER NOTIFICATION: Module completed (SMS/WhatsApp queued for background delivery)
+    try:
+        from community.models import Notification
+        from community.outbound import notify, preferred_channels
+
+        user_name = user.get_full_name() or user.username
+
+        # In-app notification
+        notification = Notification.objects.create(
+            user=user,
+            notification_type='general',
+            title='Module Completed! 🎓',
+            message=f'Congratulations! You finished {module_title}. +20 points added!',
+            url=f'/elearning/modules/{module_slug}/'
+        )
+
+        # SMS/WhatsApp - PRO ZNBC style
+        channels = preferred_channels(user)
+        if channels:
+            notify(
+                user,
+                f"✅ Well done {user_name}! You finished '{module_title}'. +20 points added!",
+                channels=channels,
+                notification_type='module_complete',
+                notification=notification
+            )
+    except Exception as e:
+        logger.error(f"Error in module completion notifications: {str(e)}")
+
+
+# --- Signals ---
+
+def lesson_moving(sender, instance, raw=False, update_fields=None, **kwargs):
+    """pre_save - remember which module an existing lesson belonged to"""
+    if instance.pk is None or (update_fields is not None and 'module' not in update_fields):
+        return
+    instance._previous_module_id = sender.objects.filter(pk=instance.pk).values_list('module_id', flat=True).first()
+
+
+def lesson_added(sender, instance, created=False, **kwargs):
+    """post_save - count new lessons (fixtures included) and move the count with a moved lesson"""
+    from .models import Module
+
+    previous_module_id = instance.__dict__.pop('_previous_module_id', None)
+    if created:
+        Module.objects.filter(pk=instance.module_id).update(lessons_count=F('lessons_count') + 1)
+    elif previous_module_id is not None and previous_module_id != instance.module_id:
+        Module.objects.filter(pk=previous_module_id, lessons_count__gt=0).update(lessons_count=F('lessons_count') - 1)
+        Module.objects.filter(pk=instance.module_id).update(lessons_count=F('lessons_count') + 1)
+
+
+def lesson_removed(sender, instance, **kwargs):
+    from .models import Module
+
+    Module.objects.filter(pk=instance.module_id, lessons_count__gt=0).update(lessons_count=F('lessons_count') - 1)
+
+
+def lesson_progress_removed(sender, instance, **kwargs):
+    """post_delete - one completed lesson fewer: recompute the percentage and reopen a completed module"""
+    from .models import Enrollment
+
+    if not instance.is_completed:
+        return
+    enrollment = Enrollment.objects.filter(pk=instance.enrollment_id, completed_lessons_count__gt=0)
+    total_lessons = enrollment.values_list('module__lessons_count', flat=True).first()
+    if total_lessons is None:
+        return
+    completed = F('completed_lessons_count') - 1
+    enrollment.update(
+        completed_lessons_count=completed,
+        progress_percentage=Least(completed * 100 / max(total_lessons, 1), Value(100)),
+        # Every SET expression sees the old count: still complete only if it was above the total
+        completed_at=Case(
+            When(completed_lessons_count__gt=total_lessons, then=F('completed_at')),
+            default=Value(None),
+        ),
+    )
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save, pre_save
+    from .models import Lesson, LessonProgress
+
+    pre_save.connect(lesson_moving, sender=Lesson, dispatch_uid='progress_lesson_moving')
+    post_save.connect(lesson_added, sender=Lesson, dispatch_uid='progress_lesson_added')
+    post_delete.connect(lesson_removed, sender=Lesson, dispatch_uid='progress_lesson_removed')
+    post_delete.connect(lesson_progress_removed, sender=LessonProgress, dispatch_uid='progress_lessonprogress_removed')
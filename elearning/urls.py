@@ -35,6 +35,9 @@ urlpatterns = [
     path('app/certificates/', views.certificates_view, name='certificates'),
     path('app/certificate/<str:certificate_id>/download/', views.download_certificate, name='download_certificate'),
     path('app/certificate/<str:certificate_id>/verify/', views.verify_certificate, name='verify_certificate'),
+
+    # Staff: view cache hit ratio and memory
+    path('app/cache-stats/', views.cache_stats, name='cache_stats'),
     
     # Removed path('i18n/setlang/', set_language, name='set_language') to avoid duplicate name conflict
 ]
\ No newline at end of file
@@ -0,0 +1,414 @@
+# elearning/view_cache.py
+"""
+Generation-keyed caching for the module list and module detail views (and
+quiz answer keys, see elearning/grading.py)
+Cached data is split in two:
+
+- shared: the module page, categories, tags, stats, lessons, reviews. The
+  same for every user, keyed by the filters and the 'catalog' and/or
+  'module:<id>' generations.
+- per-user overlay: enrollments and lesson progress, keyed by the
+  'user:<id>' generation. Small, and cheap to rebuild.
+
+Every key embeds the current generation numbers of the scopes it depends on
+(ecolearn.generations). Invalidation bumps a generation (signals below, on
+commit) instead of deleting keys.
+
+Hits, misses and bytes written per namespace are counted in-process;
+stats() reports them for the cache stats endpoint.
+"""
+
+import hashlib
+import logging
+import pickle
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from ecolearn import generations as shared_generations
+
+logger = logging.getLogger(__name__)
+
+# Tunables (override in settings.py)
+CACHE_TTL = getattr(settings, 'CACHE_TTL', {})
+SHARED_TTL = CACHE_TTL.get('queries', 1800)
+USER_TTL = CACHE_TTL.get('views', 900)
+
+KEY_PREFIX = 'elearning'
+
+_stats_lock = threading.Lock()
+_stats = defaultdict(lambda: {'hits': 0, 'misses': 0, 'sets': 0, 'bytes': 0})
+_started = time.time()
+
+
+def generations(*scopes):
+    """Current generation of each scope, creating missing ones"""
+    return shared_generations.current(KEY_PREFIX, *scopes)
+
+
+def bump(*scopes):
+    """Invalidate everything cached under these scopes"""
+    shared_generations.bump(KEY_PREFIX, *scopes)
+
+
+def bump_on_commit(*scopes):
+    """Bump after the surrounding transaction commits, so no request re-caches the old rows"""
+    transaction.on_commit(lambda: bump(*scopes))
+
+
+def make_key(namespace, scopes, *parts):
+    versions = '.'.join(str(value) for value in generations(*scopes))
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f'{KEY_PREFIX}:{namespace}:{versions}:{digest}'
+
+
+def _record(namespace, field, amount=1):
+    with _stats_lock:
+        _stats[namespace][field] += amount
+
+
+def get(namespace, key):
+    value = cache.get(key)
+    _record(namespace, 'misses' if value is None else 'hits')
+    return value
+
+
+def set(namespace, key, value, timeout):
+    cache.set(key, value, timeout)
+    try:
+        size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        size = 0
+    with _stats_lock:
+        _stats[namespace]['sets'] += 1
+        _stats[namespace]['bytes'] += size
+
+
+def get_or_build(namespace, scopes, parts, build, timeout):
+    """Cached value for (scopes' generations, parts), built and stored on a miss"""
+    key = make_key(namespace, scopes, *parts)
+    value = get(namespace, key)
+    if value is None:
+        value = build()
+        set(namespace, key, value, timeout)
+    return value
+
+
+# --- Shared data and per-user overlay ---
+
+def user_overlay(user):
+    """Enrolled module ids and progress for `user`"""
+    from .models import Enrollment
+
+    def build():
+        rows = Enrollment.objects.filter(user=user).values_list('module_id', 'progress_percentage')
+        return {
+            'enrollments': [module_id for module_id, _ in rows],
+            'progress': {module_id: progress for module_id, progress in rows},
+        }
+
+    return get_or_build('user_overlay', [f'user:{user.id}'], (user.id,), build, USER_TTL)
+
+
+def module_progress(user, module):
+    """The user's Enrollment and lesson progress for one module"""
+    from .models import Enrollment, LessonProgress
+
+    def build():
+        enrollment = Enrollment.objects.filter(user=user, module=module).first()
+        progress = {}
+        completed = []
+        if enrollment:
+            rows = LessonProgress.objects.filter(enrollment=enrollment).values_list(
+                'lesson_id', 'is_completed', 'time_spent_minutes'
+            )
+            for lesson_id, is_completed, time_spent in rows:
+                progress[lesson_id] = {'is_completed': is_completed, 'time_spent': time_spent}
+                if is_completed:
+                    completed.append(lesson_id)
+        return {
+            'is_enrolled': enrollment is not None,
+            'enrollment': enrollment,
+            'user_progress': progress,
+            'completed_lesson_ids': completed,
+        }
+
+    return get_or_build('module_progress', [f'user:{user.id}'], (user.id, module.id), build, USER_TTL)
+
+
+def module_listing(search_query, category_id, difficulty, tag_slug, sort_by, page, per_page=20):
+    """One page of the filtered module list (shared by every user)"""
+    from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+    from django.db.models import Case, IntegerField, Q, When
+    from .models import Module
+
+    def build():
+        modules = Module.objects.filter(
+            is_published=True,
+            is_active=True
+        ).select_related('category', 'created_by').prefetch_related('tags')
+
+        ranked_ids = []
+        if search_query:
+            from search.indexing import is_indexed, search_ids
+            if is_indexed('module'):
+                # Ranked full-text search over all three languages (search app)
+                ranked_ids = search_ids('module', search_query)
+                modules = modules.filter(id__in=ranked_ids)
+            else:
+                # Index not built yet (rebuild_search_index runs on deploy): plain substring match
+                modules = modules.filter(
+                    Q(title__icontains=search_query) |
+                    Q(description__icontains=search_query) |
+                    Q(title_bem__icontains=search_query) |
+                    Q(title_ny__icontains=search_query)
+                )
+        if category_id:
+            modules = modules.filter(category_id=category_id)
+        if difficulty:
+            modules = modules.filter(difficulty=difficulty)
+        if tag_slug:
+            modules = modules.filter(tags__slug=tag_slug)
+
+        if ranked_ids and sort_by == 'featured':
+            # Best match first
+            modules = modules.order_by(
+                Case(*[When(id=pk, then=position) for position, pk in enumerate(ranked_ids)], output_field=IntegerField())
+            )
+        elif sort_by == 'popular':
+            modules = modules.order_by('-enrollments_count', '-views_count')
+        elif sort_by == 'newest':
+            modules = modules.order_by('-created_at')
+        elif sort_by == 'rating':
+            modules = modules.order_by('-average_rating', '-enrollments_count')
+        else:  # featured
+            modules = modules.order_by('-is_featured', '-enrollments_count', 'order')
+
+        paginator = Paginator(modules, per_page)
+        try:
+            modules_page = paginator.page(page)
+        except PageNotAnInteger:
+            modules_page = paginator.page(1)
+        except EmptyPage:
+            modules_page = paginator.page(paginator.num_pages)
+        return {
+            'modules': list(modules_page.object_list),
+            'number': modules_page.number,
+            'count': paginator.count,
+        }
+
+    listing = get_or_build(
+        'module_list', ['catalog'],
+        (search_query, category_id, difficulty, tag_slug, sort_by, str(page), per_page),
+        build, SHARED_TTL,
+    )
+    # Rebuild the Page for the template from the cached slice and total count
+    paginator = Paginator([], per_page)
+    paginator.count = listing['count']  # primes the cached_property
+    return Page(listing['modules'], listing['number'], paginator)
+
+
+def module_sidebar():
+    """Categories, popular tags, stats and featured modules for the module list"""
+    from django.db.models import Count, Q
+    from .models import Category, Enrollment, Module, Tag
+
+    def build():
+        return {
+            'categories': list(Category.objects.filter(is_active=True).annotate(
+                module_count=Count('modules', filter=Q(modules__is_published=True))
+            ).order_by('order')),
+            'tags': list(Tag.objects.annotate(
+                module_count=Count('modules', filter=Q(modules__is_published=True))
+            ).filter(module_count__gt=0).order_by('-module_count')[:10]),
+            'stats': {
+                'total_modules': Module.objects.filter(is_published=True).count(),
+                'total_students': Enrollment.objects.values('user').distinct().count(),
+                'total_completions': Enrollment.objects.filter(completed_at__isnull=False).count(),
+                'featured_modules': list(Module.objects.filter(
+                    is_published=True,
+                    is_featured=True
+                ).select_related('category')[:3]),
+            },
+        }
+
+    return get_or_build('module_sidebar', ['catalog'], (), build, SHARED_TTL)
+
+
+def module_data(module_id):
+    """Everything on the module detail page that is the same for every user"""
+    from django.db.models import Prefetch
+    from .models import Enrollment, Lesson, Module, ModuleReview
+
+    def build():
+        module = Module.objects.select_related('category', 'created_by').prefetch_related(
+            'tags',
+            'prerequisites',
+            Prefetch('lessons', queryset=Lesson.objects.select_related('quiz').order_by('order')),
+        ).get(id=module_id)
+        lessons = list(module.lessons.all())
+        return {
+            'module': module,
+            'lessons': lessons,
+            'total_lessons': len(lessons),
+            'preview_lessons': sum(1 for lesson in lessons if lesson.is_preview),
+            'total_enrollments': Enrollment.objects.filter(module=module).count(),
+            'reviews': list(ModuleReview.objects.filter(
+                module=module
+            ).select_related('user').order_by('-created_at')[:5]),
+            'avg_rating': module.average_rating or 0,
+            'similar_modules': list(Module.objects.filter(
+                category=module.category,
+                is_published=True
+            ).exclude(id=module.id).select_related('category')[:3]),
+        }
+
+    return get_or_build('module_detail', ['catalog', f'module:{module_id}'], (module_id,), build, SHARED_TTL)
+
+
+def lesson_index(module_id):
+    """The module's lessons in order (id, slug and titles only), for prev/next navigation"""
+    from .models import Lesson
+
+    def build():
+        return list(Lesson.objects.filter(module_id=module_id).order_by('order', 'created_at', 'id').only(
+            'id', 'module_id', 'slug', 'title', 'title_bem', 'title_ny', 'order'
+        ))
+
+    return get_or_build('lesson_index', [f'module:{module_id}'], (module_id,), build, SHARED_TTL)
+
+
+def lesson_neighbors(module_id, lesson_id):
+    """
+    Returns:
+        tuple: (previous lesson, next lesson), either may be None
+    """
+    lessons = lesson_index(module_id)
+    for position, lesson in enumerate(lessons):
+        if lesson.id == lesson_id:
+            previous = lessons[position - 1] if position > 0 else None
+            following = lessons[position + 1] if position < len(lessons) - 1 else None
+            return previous, following
+    return None, None
+
+
+# --- Stats ---
+
+def stats():
+    with _stats_lock:
+        namespaces = {name: dict(values) for name, values in _stats.items()}
+
+    totals = {'hits': 0, 'misses': 0, 'sets': 0, 'bytes': 0}
+    for name, values in namespaces.items():
+        lookups = values['hits'] + values['misses']
+        values['hit_ratio'] = round(values['hits'] / lookups, 3) if lookups else None
+        values['avg_entry_bytes'] = values['bytes'] // values['sets'] if values['sets'] else 0
+        for field in totals:
+            totals[field] += values[field]
+    lookups = totals['hits'] + totals['misses']
+    totals['hit_ratio'] = round(totals['hits'] / lookups, 3) if lookups else None
+
+    from django.core.cache import caches
+
+    default = caches['default']
+    backend = {'class': type(default).__name__}
+    store = getattr(default, '_cache', None)
+    if hasattr(default, 'info'):
+        # Shared SQLite cache: entries and bytes across every process
+        try:
+            backend.update(default.info())
+        except Exception as e:
+            logger.error(f"Cache info failed: {str(e)}")
+    elif isinstance(store, dict):
+        # LocMemCache: entries currently held by this process and the cull threshold
+        backend['entries'] = len(store)
+        backend['max_entries'] = getattr(default, '_max_entries', None)
+        backend['elearning_entries'] = sum(1 for key in list(store) if f':{KEY_PREFIX}:' in key)
+        backend['bytes'] = sum(len(value) for value in list(store.values()) if isinstance(value, bytes))
+
+    return {
+        'since_seconds': int(time.time() - _started),
+        'namespaces': namespaces,
+        'totals': totals,
+        'backend': backend,
+    }
+
+
+# --- Signals ---
+
+def module_changed(sender, instance, **kwargs):
+    bump_on_commit('catalog', f'module:{instance.pk}')
+
+
+def lesson_changed(sender, instance, **kwargs):
+    bump_on_commit('catalog', f'module:{instance.module_id}')
+
+
+def catalog_changed(sender, instance, **kwargs):
+    bump_on_commit('catalog')
+
+
+def review_changed(sender, instance, **kwargs):
+    bump_on_commit(f'module:{instance.module_id}')
+
+
+def enrollment_changed(sender, instance, created=True, **kwargs):
+    # Progress updates only touch the user's overlay; joining or leaving
+    # also changes the module's enrollment count and the catalog stats
+    if created:
+        bump_on_commit(f'user:{instance.user_id}', f'module:{instance.module_id}', 'catalog')
+    else:
+        bump_on_commit(f'user:{instance.user_id}')
+
+
+def lesson_progress_changed(sender, instance, **kwargs):
+    from .models import Enrollment
+
+    enrollment = instance._state.fields_cache.get('enrollment')
+    user_id = enrollment.user_id if enrollment is not None else (
+        Enrollment.objects.filter(pk=instance.enrollment_id).values_list('user_id', flat=True).first()
+    )
+    if user_id:
+        bump_on_commit(f'user:{user_id}')
+
+
+def quiz_changed(sender, instance, **kwargs):
+    # Quiz answer keys (elearning/grading.py)
+    from .models import Question, Quiz
+
+    if sender is Quiz:
+        quiz_id = instance.pk
+    elif sender is Question:
+        quiz_id = instance.quiz_id
+    else:
+        quiz_id = Question.objects.filter(pk=instance.question_id).values_list('quiz_id', flat=True).first()
+    if quiz_id:
+        bump_on_commit(f'quiz:{quiz_id}')
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save
+    from .models import (
+        Answer, Category, Enrollment, Lesson, LessonProgress, Module, ModuleReview, Question, Quiz, Tag,
+    )
+
+    receivers = [
+        (Module, module_changed),
+        (Lesson, lesson_changed),
+        (Category, catalog_changed),
+        (Tag, catalog_changed),
+        (ModuleReview, review_changed),
+        (Enrollment, enrollment_changed),
+        (LessonProgress, lesson_progress_changed),
+        (Quiz, quiz_changed),
+        (Question, quiz_changed),
+        (Answer, quiz_changed),
+    ]
+    for model, receiver in receivers:
+        name = model.__name__.lower()
+        post_save.connect(receiver, sender=model, dispatch_uid=f'view_cache_{name}_saved')
+        post_delete.connect(receiver, sender=model, dispatch_uid=f'view_cache_{name}_deleted')
@@ -2,31 +2,24 @@
 
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.db.models import Q, Count, Avg, F, Prefetch
+from django.db.models import Count, Avg, F
 from django.utils import timezone
-from django.http import JsonResponse, HttpResponse, HttpResponseNotAllowed
+from django.http import JsonResponse, HttpResponseNotAllowed, Http404
 from django.views.decorators.http import require_POST
-from django.views.decorators.cache import cache_page
-from django.core.cache import cache
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.db import transaction
 from django.urls import reverse
 from datetime import datetime, timedelta
-import io
 
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
 from .models import (
-    Module, Category, Lesson, Quiz, Question, Answer,
+    Module, Category, Lesson, Quiz, Question,
     Enrollment, LessonProgress, QuizAttempt, QuizResponse,
     Certificate, ModuleReview, LearningStreak, Badge, UserBadge, Tag
 )
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from reportlab.lib import colors 
 
 def get_user_language(request):
     """Get user's preferred language"""
@@ -42,90 +35,27 @@ def get_user_language(request):
 def module_detail(request, slug):
     """
     Display detailed information about a specific module
+    Module data is cached per module generation and shared by every user; the
+    user's enrollment and lesson progress are a separate per-user overlay
+    (elearning/view_cache.py).
     """
-    # Get the module
-    module = get_object_or_404(
-        Module.objects.select_related('category', 'created_by')
-        .prefetch_related('lessons', 'tags', 'prerequisites'),
-        slug=slug,
-        is_published=True
-    )
-    
-    # Increment views
-    module.increment_views()
-    
-    # Get all lessons ordered
-    lessons = module.lessons.all().order_by('order')
-    
-    # Check if user is enrolled
-    is_enrolled = False
-    enrollment = None
-    user_progress = {}
-    completed_lesson_ids = []
-    
-    if request.user.is_authenticated:
-        try:
-            enrollment = Enrollment.objects.get(
-                user=request.user,
-                module=module
-            )
-            is_enrolled = True
-            
-            # Get lesson progress
-            lesson_progress = LessonProgress.objects.filter(
-                enrollment=enrollment
-            ).select_related('lesson')
-            
-            # Build progress dictionary
-            for lp in lesson_progress:
-                user_progress[lp.lesson.id] = {
-                    'is_completed': lp.is_completed,
-                    'time_spent': lp.time_spent_minutes,
-                }
-                if lp.is_completed:
-                    completed_lesson_ids.append(lp.lesson.id)
-        
-        except Enrollment.DoesNotExist:
-            pass
-    
-    # Get module statistics
-    total_lessons = lessons.count()
-    preview_lessons = lessons.filter(is_preview=True).count()
-    
-    # Get total enrollments (FIXED: use 'enrollment' not 'enrollment_set')
-    total_enrollments = Enrollment.objects.filter(module=module).count()
-    
-    # Get reviews
-    reviews = ModuleReview.objects.filter(
-        module=module
-    ).select_related('user').order_by('-created_at')[:5]
-    
-    # Calculate average rating
-    avg_rating = module.average_rating or 0
+    from . import view_cache
+
+    module_id = Module.objects.filter(slug=slug, is_published=True).values_list('id', flat=True).first()
+    if module_id is None:
+        raise Http404("No Module matches the given query.")
     
-    # Get similar modules (same category)
-    similar_modules = Module.objects.filter(
-        category=module.category,
-        is_published=True
-    ).exclude(id=module.id)[:3]
+    # Increment views atomically (the cached count catches up on the next rebuild)
+    Module.objects.filter(pk=module_id).update(views_count=F('views_count') + 1)
     
-    # Get user's preferred language
-    user_language = request.session.get('language', 'en')
+    shared = view_cache.module_data(module_id)
+    # is_enrolled, enrollment, user_progress, completed_lesson_ids
+    overlay = view_cache.module_progress(request.user, shared['module'])
     
     context = {
-        'module': module,
-        'lessons': lessons,
-        'is_enrolled': is_enrolled,
-        'enrollment': enrollment,
-        'user_progress': user_progress,
-        'completed_lesson_ids': completed_lesson_ids,
-        'total_lessons': total_lessons,
-        'preview_lessons': preview_lessons,
-        'total_enrollments': total_enrollments,
-        'reviews': reviews,
-        'avg_rating': avg_rating,
-        'similar_modules': similar_modules,
-        'user_language': user_language,
+        **shared,
+        **overlay,
+        'user_language': request.session.get('language', 'en'),
     }
     
     return render(request, 'elearning/module_detail.html', context)
@@ -225,11 +155,15 @@ def enroll_module(request, slug):
     return redirect('elearning:module_detail', slug=slug)
 
 @login_required
-@cache_page(60 * 15)  # Cache for 15 minutes
 def module_list(request):
     """
     OPTIMIZED: Display list of all available modules with filters, caching, and pagination
+    The page of modules, categories, tags and stats are shared by every user
+    (keyed by the filters and the catalog generation); enrollments and
+    progress come from a small per-user overlay (elearning/view_cache.py).
     """
+    from . import view_cache
+
     # Get query parameters
     search_query = request.GET.get('q', '')
     category_id = request.GET.get('category', '')
@@ -238,143 +172,32 @@ def module_list(request):
     sort_by = request.GET.get('sort', 'featured')
     page = request.GET.get('page', 1)
     
-    # Create cache key for this specific query
-    cache_key = f"module_list_{search_query}_{category_id}_{difficulty}_{tag_slug}_{sort_by}_{page}_{request.user.id}"
-    cached_data = cache.get(cache_key)
-    
-    if cached_data:
-        return render(request, 'elearning/module_list.html', cached_data)
-    
-    # OPTIMIZED: Base queryset with select_related and prefetch_related
-    modules = Module.objects.filter(
-        is_published=True,
-        is_active=True
-    ).select_related('category', 'created_by').prefetch_related(
-        'tags',
-        Prefetch('enrollment_set', queryset=Enrollment.objects.select_related('user'))
-    )
-    
-    # Apply filters
-    if search_query:
-        modules = modules.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(title_bem__icontains=search_query) |
-            Q(title_ny__icontains=search_query)
-        )
-    
     if category_id:
-        modules = modules.filter(category_id=category_id)
         selected_category = get_object_or_404(Category, id=category_id)
     else:
         selected_category = None
     
-    if difficulty:
-        modules = modules.filter(difficulty=difficulty)
-    
-    if tag_slug:
-        modules = modules.filter(tags__slug=tag_slug)
-    
-    # Apply sorting
-    if sort_by == 'popular':
-        modules = modules.order_by('-enrollments_count', '-views_count')
-    elif sort_by == 'newest':
-        modules = modules.order_by('-created_at')
-    elif sort_by == 'rating':
-        modules = modules.order_by('-average_rating', '-enrollments_count')
-    else:  # featured
-        modules = modules.order_by('-is_featured', '-enrollments_count', 'order')
-    
     # PAGINATION - 20 items per page
-    paginator = Paginator(modules, 20)
-    try:
-        modules_page = paginator.page(page)
-    except PageNotAnInteger:
-        modules_page = paginator.page(1)
-    except EmptyPage:
-        modules_page = paginator.page(paginator.num_pages)
-    
-    # CACHED: Get categories with module counts
-    categories_cache_key = "categories_with_counts"
-    categories = cache.get(categories_cache_key)
-    if not categories:
-        categories = Category.objects.filter(is_active=True).annotate(
-            module_count=Count('modules', filter=Q(modules__is_published=True))
-        ).order_by('order')
-        cache.set(categories_cache_key, categories, 60 * 30)  # Cache for 30 minutes
-    
-    # CACHED: Get popular tags
-    tags_cache_key = "popular_tags"
-    tags = cache.get(tags_cache_key)
-    if not tags:
-        tags = Tag.objects.annotate(
-            module_count=Count('modules', filter=Q(modules__is_published=True))
-        ).filter(module_count__gt=0).order_by('-module_count')[:10]
-        cache.set(tags_cache_key, tags, 60 * 30)  # Cache for 30 minutes
-    
-    # CACHED: Get featured modules
-    featured_cache_key = "featured_modules"
-    featured_modules = cache.get(featured_cache_key)
-    if not featured_modules:
-        featured_modules = Module.objects.filter(
-            is_published=True,
-            is_featured=True
-        ).select_related('category')[:3]
-        cache.set(featured_cache_key, featured_modules, 60 * 30)  # Cache for 30 minutes
-    
-    # OPTIMIZED: Get user enrollments
-    user_enrollments = []
-    user_progress = {}
-    if request.user.is_authenticated:
-        user_cache_key = f"user_enrollments_{request.user.id}"
-        user_data = cache.get(user_cache_key)
-        if not user_data:
-            enrollments = Enrollment.objects.filter(
-                user=request.user
-            ).select_related('module').only('module_id', 'progress_percentage')
-            
-            user_enrollments = [e.module_id for e in enrollments]
-            user_progress = {e.module_id: e.progress_percentage for e in enrollments}
-            user_data = {'enrollments': user_enrollments, 'progress': user_progress}
-            cache.set(user_cache_key, user_data, 60 * 15)  # Cache for 15 minutes
-        else:
-            user_enrollments = user_data['enrollments']
-            user_progress = user_data['progress']
-    
-    # CACHED: Get stats
-    stats_cache_key = "module_stats"
-    stats = cache.get(stats_cache_key)
-    if not stats:
-        stats = {
-            'total_modules': Module.objects.filter(is_published=True).count(),
-            'total_students': Enrollment.objects.values('user').distinct().count(),
-            'total_completions': Enrollment.objects.filter(completed_at__isnull=False).count(),
-            'featured_modules': featured_modules,
-        }
-        cache.set(stats_cache_key, stats, 60 * 30)  # Cache for 30 minutes
-    
-    # Get user's preferred language
-    user_language = request.session.get('language', 'en')
+    modules_page = view_cache.module_listing(search_query, category_id, difficulty, tag_slug, sort_by, page)
+    sidebar = view_cache.module_sidebar()
+    user_data = view_cache.user_overlay(request.user)
     
     context = {
         'modules': modules_page,
-        'categories': categories,
-        'tags': tags,
+        'categories': sidebar['categories'],
+        'tags': sidebar['tags'],
         'selected_category': selected_category,
         'search_query': search_query,
         'current_difficulty': difficulty,
         'sort_by': sort_by,
-        'user_enrollments': user_enrollments,
-        'user_progress': user_progress,
-        'stats': stats,
-        'user_language': user_language,
-        'paginator': paginator,
+        'user_enrollments': user_data['enrollments'],
+        'user_progress': user_data['progress'],
+        'stats': sidebar['stats'],
+        'user_language': request.session.get('language', 'en'),
+        'paginator': modules_page.paginator,
         'page_obj': modules_page,
     }
     
-    # Cache the context for 15 minutes
-    cache.set(cache_key, context, 60 * 15)
-    
     return render(request, 'elearning/module_list.html', context)
 
 # --- Lesson Views ---
@@ -411,12 +234,9 @@ def lesson_detail(request, module_slug, lesson_slug):
                 lesson_progress.last_accessed = timezone.now()
                 lesson_progress.save()
 
-    # Lesson navigation
-    all_lessons = list(module.lessons.all().order_by('order'))
-    current_index = all_lessons.index(lesson)
-    
-    prev_lesson = all_lessons[current_index - 1] if current_index > 0 else None
-    next_lesson = all_lessons[current_index + 1] if current_index < len(all_lessons) - 1 else None
+    # Lesson navigation (cached ordered index per module)
+    from .view_cache import lesson_neighbors
+    prev_lesson, next_lesson = lesson_neighbors(module.id, lesson.id)
 
     # Get quizzes for this lesson
     quizzes = [lesson.quiz] if hasattr(lesson, 'quiz') else []
@@ -450,85 +270,20 @@ def lesson_view(request, lesson_id):
 @require_POST
 def complete_lesson(request, lesson_id):
     """Mark lesson as completed"""
-    lesson = get_object_or_404(Lesson, id=lesson_id)
+    from . import progress
+
+    lesson = get_object_or_404(Lesson.objects.select_related('module'), id=lesson_id)
     # NOTE: Your Enrollment model has a foreign key to Module, not Lesson.
     # The lookup is correct: finding enrollment via user and module.
     enrollment = get_object_or_404(Enrollment, user=request.user, module=lesson.module)
     
-    lesson_progress, created = LessonProgress.objects.get_or_create(
-        enrollment=enrollment,
-        lesson=lesson
-    )
+    with transaction.atomic():
+        newly_completed, module_completed = progress.complete_lesson(enrollment, lesson)
     
-    if not lesson_progress.is_completed:
-        lesson_progress.is_completed = True
-        lesson_progress.completed_at = timezone.now()
-        lesson_progress.save()
-        
-        # Update overall enrollment progress
-        total_lessons = lesson.module.lessons.count()
-        completed = LessonProgress.objects.filter(
-            enrollment=enrollment,
-            is_completed=True
-        ).count()
-        
-        enrollment.progress_percentage = int((completed / total_lessons) * 100)
-        enrollment.save()
-        
-        # Check if module is complete
-        if enrollment.progress_percentage == 100 and not enrollment.completed_at:
-            enrollment.completed_at = timezone.now()
-            enrollment.save()
-            
-            # Update module completion count
-            lesson.module.completions_count = F('completions_count') + 1
-            lesson.module.save(update_fields=['completions_count'])
-            
-            # Award certificate
-            Certificate.objects.get_or_create(
-                user=request.user,
-                module=lesson.module,
-                defaults={'final_score': 100, 'certificate_id': f'C-{lesson.module.id}-{request.user.id}'}
-            )
-            
-            # REAL-TIME USER NOTIFICATION: Module completed
-            try:
-                from community.notifications import notification_service
-                from community.models import Notification
-                
-                user = request.user
-                user_name = user.get_full_name() or user.username
-                module_title = lesson.module.title
-                prefs = getattr(user, 'notification_preferences', None)
-                
-                # SMS notification - PRO ZNBC style
-                if prefs and prefs.sms_enabled and user.phone_number:
-                    sms_message = f"✅ Well done {user_name}! You finished '{module_title}'. +20 points added!"
-                    result = notification_service.send_sms(str(user.phone_number), sms_message)
-                    if result.get('success'):
-                        print(f"✅ Lesson completion SMS sent to {user.username}")
-                
-                # WhatsApp notification - PRO Zambian style
-                if prefs and prefs.whatsapp_enabled and user.phone_number:
-                    whatsapp_message = f"✅ Well done {user_name}! You finished '{module_title}'. +20 points added!"
-                    result = notification_service.send_whatsapp(str(user.phone_number), whatsapp_message)
-                    if result.get('success'):
-                        print(f"✅ Lesson completion WhatsApp sent to {user.username}")
-                
-                # In-app notification
-                Notification.objects.create(
-                    user=user,
-                    notification_type='general',
-                    title=f'Module Completed! 🎓',
-                    message=f'Congratulations! You finished {module_title}. +20 points added!',
-                    url=f'/elearning/modules/{lesson.module.slug}/'
-                )
-            except Exception as e:
-                print(f"Error in module completion notifications: {e}")
-            
-            messages.success(request, f'🎉 Congratulations! You completed {lesson.module.title}! Certificate awarded!')
-        else:
-            messages.success(request, f'✅ Lesson "{lesson.title}" marked as complete! Keep going!')
+    if module_completed:
+        messages.success(request, f'🎉 Congratulations! You completed {lesson.module.title}! Certificate awarded!')
+    elif newly_completed:
+        messages.success(request, f'✅ Lesson "{lesson.title}" marked as complete! Keep going!')
     else:
         messages.info(request, f'You already completed this lesson.')
     
@@ -541,8 +296,10 @@ def complete_lesson(request, lesson_id):
 @login_required
 def quiz_take(request, quiz_id):
     """Take a quiz"""
+    from .grading import AttemptLimitReached, grade
+
     quiz = get_object_or_404(
-        Quiz.objects.prefetch_related('questions__answers'),
+        Quiz.objects.select_related('lesson__module'),
         id=quiz_id
     )
     
@@ -566,54 +323,20 @@ def quiz_take(request, quiz_id):
         return redirect('elearning:module_detail', slug=module.slug)
     
     if request.method == 'POST':
-        # Create quiz attempt
-        # NOTE: Updated to use user and enrollment fields as per your QuizAttempt model
-        attempt = QuizAttempt.objects.create(
-            user=request.user,
-            enrollment=enrollment,
-            quiz=quiz,
-            attempt_number=attempts_count + 1,
-            total_questions=quiz.questions.count()
-        )
-        
-        # Process answers
-        total_points = 0
-        earned_points = 0
-        
-        for question in quiz.questions.all():
-            answer_id = request.POST.get(f'question_{question.id}')
-            if answer_id:
-                selected_answer = get_object_or_404(Answer, id=answer_id)
-                is_correct = selected_answer.is_correct
-                points = question.points if is_correct else 0
-                
-                QuizResponse.objects.create(
-                    attempt=attempt,
-                    question=question,
-                    selected_answer=selected_answer,
-                    is_correct=is_correct,
-                )
-                
-                total_points += question.points
-                earned_points += points
-            else:
-                # Still need to count the question points in the total, even if unanswered
-                total_points += question.points
-        
-        # Calculate score
-        score_percentage = (earned_points / total_points * 100) if total_points > 0 else 0
-        attempt.score = earned_points
-        attempt.percentage = score_percentage
-        attempt.passed = score_percentage >= quiz.passing_score
-        attempt.completed_at = timezone.now()
-        attempt.save()
+        # Graded against the cached answer key; attempt, responses and
+        # progress are written in one transaction (elearning/grading.py)
+        try:
+            result = grade(quiz, enrollment, request.POST)
+        except AttemptLimitReached:
+            messages.error(request, f'You have reached the maximum number of attempts ({quiz.max_attempts}) for this quiz.')
+            return redirect('elearning:module_detail', slug=module.slug)
         
-        if attempt.passed:
-            messages.success(request, f'Congratulations! You passed with {score_percentage:.1f}%')
+        if result.passed:
+            messages.success(request, f'Congratulations! You passed with {result.percentage:.1f}%')
         else:
-            messages.warning(request, f'You scored {score_percentage:.1f}%. Pass score is {quiz.passing_score}%. You can try again.')
+            messages.warning(request, f'You scored {result.percentage:.1f}%. Pass score is {quiz.passing_score}%. You can try again.')
         
-        return redirect('elearning:quiz_result', attempt_id=attempt.id)
+        return redirect('elearning:quiz_result', attempt_id=result.attempt.id)
     
     # Get questions for display
     questions = quiz.questions.all().prefetch_related('answers')
@@ -788,40 +511,33 @@ def learning_path(request):
 @login_required
 def leaderboard(request):
     """Learning leaderboard"""
-    # NOTE: This implementation can be slow. It assumes LearningStreak.total_points_earned exists.
-    top_learners = []
+    from gamification import leaderboards
     
-    # Efficiently fetch all streaks
-    streaks = LearningStreak.objects.select_related('user').filter(
-        total_points_earned__gt=0
-    ).order_by('-total_points_earned')[:50]
+    entries = leaderboards.top_with_users('learning', 50)
     
-    # Fetch completion counts
+    # Fetch completion counts and streaks for the displayed users only
+    user_ids = [entry['user'].id for entry in entries]
     completion_counts = Certificate.objects.filter(
-        user__in=streaks.values_list('user_id', flat=True)
+        user_id__in=user_ids
     ).values('user').annotate(modules_completed=Count('module'))
-    
     completion_map = {item['user']: item['modules_completed'] for item in completion_counts}
+    streak_map = dict(LearningStreak.objects.filter(user_id__in=user_ids).values_list('user_id', 'current_streak'))
+    
+    top_learners = [
+        {
+            'rank': entry['rank'],
+            'user': entry['user'],
+            'points': entry['score'],
+            'modules_completed': completion_map.get(entry['user'].id, 0),
+            'streak': streak_map.get(entry['user'].id, 0),
+        }
+        for entry in entries
+    ]
     
-    for streak in streaks:
-        top_learners.append({
-            'user': streak.user,
-            'points': streak.total_points_earned,
-            'modules_completed': completion_map.get(streak.user.id, 0),
-            'streak': streak.current_streak,
-        })
-    
-    # The list is already sorted by the query, but we keep the sorting logic just in case.
-    # top_learners.sort(key=lambda x: x['points'], reverse=True) 
-    
-    user_rank = next((i+1 for i, l in enumerate(top_learners) if l['user'] == request.user), None)
-    if user_rank is None and request.user.is_authenticated:
-        # Check if current user is not in the top 50, but still has points
-        user_streak = LearningStreak.objects.filter(user=request.user).first()
-        if user_streak and user_streak.total_points_earned > 0:
-            # This requires fetching all streaks again for accurate ranking (slow, but needed for user's rank)
-            all_streaks = LearningStreak.objects.filter(total_points_earned__gt=0).order_by('-total_points_earned')
-            user_rank = next((i+1 for i, s in enumerate(all_streaks) if s.user == request.user), None)
+    # Rank among everyone with learning points (binary search, no table scan)
+    user_rank = None
+    if request.user.is_authenticated:
+        user_rank = leaderboards.rank('learning', request.user.id)
         
     context = {
         'top_learners': top_learners,
@@ -847,64 +563,46 @@ def certificates_view(request):
 
 @login_required
 def download_certificate(request, certificate_id):
-    """Download certificate as PDF"""
-    certificate = get_object_or_404(
-        Certificate,
-        certificate_id=certificate_id,
-        user=request.user
-    )
-    
-    # Create PDF (logic retained from user's original code)
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer, pagesize=landscape(letter))
-    width, height = landscape(letter)
-    
-    # ... PDF generation code ...
-    p.setFillColor(colors.HexColor('#dcfce7'))
-    p.rect(0, 0, width, height, fill=1, stroke=0)
-    p.setStrokeColor(colors.HexColor('#22c55e'))
-    p.setLineWidth(10)
-    p.rect(30, 30, width-60, height-60, fill=0, stroke=1)
-    p.setFillColor(colors.HexColor('#16a34a'))
-    p.setFont("Helvetica-Bold", 40)
-    p.drawCentredString(width/2, height-100, "Certificate of Completion")
-    p.setFont("Helvetica", 16)
-    p.drawCentredString(width/2, height-140, "This is to certify that")
-    p.setFont("Helvetica-Bold", 32)
-    p.setFillColor(colors.black)
-    p.drawCentredString(width/2, height-200, request.user.get_full_name() or request.user.username)
-    p.setFont("Helvetica", 16)
-    p.setFillColor(colors.HexColor('#16a34a'))
-    p.drawCentredString(width/2, height-240, "has successfully completed")
-    p.setFont("Helvetica-Bold", 24)
-    p.setFillColor(colors.black)
-    p.drawCentredString(width/2, height-280, certificate.module.title)
-    p.setFont("Helvetica", 12)
-    p.setFillColor(colors.HexColor('#16a34a'))
-    p.drawCentredString(width/2, height-340, f"Issued on: {certificate.issued_at.strftime('%B %d, %Y')}")
-    p.drawCentredString(width/2, height-360, f"Certificate ID: {certificate.certificate_id}") 
-    p.setFont("Helvetica-Oblique", 10)
-    p.drawCentredString(width/2, 80, "EcoLearn Environmental Education Platform")
-    
-    p.showPage()
-    p.save()
-    
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="certificate_{certificate.certificate_id}.pdf"'
-    
+    """Download certificate as PDF (rendered once, then served from storage)"""
+    from django.http import FileResponse
+    from django.utils.cache import get_conditional_response, patch_cache_control
+    from django.utils.http import http_date
+    from . import certificates
+
+    certificate = certificates.record(certificate_id)
+    if certificate is None or certificate['user_id'] != request.user.id:
+        raise Http404("Certificate not found")
+
+    # The fingerprint covers everything printed on the PDF
+    etag = f'"{certificate["fingerprint"]}"'
+    last_modified = int(certificate['issued_at'].timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = FileResponse(
+            certificates.open_pdf(certificate),
+            content_type='application/pdf',
+            as_attachment=True,
+            filename=f'certificate_{certificate["certificate_id"]}.pdf',
+        )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, max_age=certificates.DOWNLOAD_MAX_AGE)
     return response
 
 
 def verify_certificate(request, certificate_id):
     """Public certificate verification page"""
-    certificate = get_object_or_404(Certificate, certificate_id=certificate_id)
-    
+    from . import certificates
+
+    certificate = certificates.record(certificate_id)
+    if certificate is None:
+        raise Http404("Certificate not found")
+
     context = {
         'certificate': certificate,
         'is_valid': True,
     }
-    
+
     return render(request, 'elearning/verify_certificate.html', context)
 
 
@@ -1022,3 +720,12 @@ def user_dashboard(request):
 
 # --- Language Switching View ---
 
+
+
+# --- Cache Stats ---
+
+@staff_member_required
+def cache_stats(request):
+    """Hit ratio and memory of the module list/detail caches (this process)"""
+    from . import view_cache
+    return JsonResponse(view_cache.stats())
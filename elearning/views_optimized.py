@@ -2,9 +2,9 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Count, Avg, F, Prefetch
+from django.db.models import Count, Avg, F
 from django.utils import timezone
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, Http404
 from django.views.decorators.http import require_POST
 from django.views.decorators.cache import cache_page
 from django.core.cache import cache
@@ -16,7 +16,7 @@ import io
 from .models import (
     Module, Category, Lesson, Quiz, Question, Answer,
     Enrollment, LessonProgress, QuizAttempt, QuizResponse,
-    Certificate, ModuleReview, LearningStreak, Badge, UserBadge, Tag
+    Certificate, LearningStreak, Badge, UserBadge
 )
 
 # Cache timeout settings
@@ -45,113 +45,41 @@ def get_user_language(request):
 def module_detail(request, slug):
     """
     Display detailed information about a specific module - OPTIMIZED
+    Module data is cached per module generation and shared by every user; the
+    user's enrollment and lesson progress are a separate per-user overlay
+    (elearning/view_cache.py).
     """
-    # Cache key for this module
-    cache_key = f'module_detail_{slug}_{request.user.id}'
-    cached_data = cache.get(cache_key)
-    
-    if cached_data and not settings.DEBUG:
-        return render(request, 'elearning/module_detail.html', cached_data)
-    
-    # Optimized query with select_related and prefetch_related
-    module = get_object_or_404(
-        Module.objects.select_related('category', 'created_by')
-        .prefetch_related(
-            'lessons__quiz',
-            'tags',
-            'prerequisites',
-            Prefetch('lessons', queryset=Lesson.objects.order_by('order'))
-        ),
-        slug=slug,
-        is_published=True
-    )
-    
-    # Increment views atomically
-    Module.objects.filter(pk=module.pk).update(views_count=F('views_count') + 1)
+    from . import view_cache
+
+    module_id = Module.objects.filter(slug=slug, is_published=True).values_list('id', flat=True).first()
+    if module_id is None:
+        raise Http404("No Module matches the given query.")
     
-    # Get lessons with optimized query
-    lessons = module.lessons.all()
+    # Increment views atomically (the cached count catches up on the next rebuild)
+    Module.objects.filter(pk=module_id).update(views_count=F('views_count') + 1)
     
-    # Check enrollment and progress
-    is_enrolled = False
-    enrollment = None
-    user_progress = {}
-    completed_lesson_ids = []
-    
-    if request.user.is_authenticated:
-        enrollment = Enrollment.objects.select_related('module').filter(
-            user=request.user, module=module
-        ).first()
-        
-        if enrollment:
-            is_enrolled = True
-            # Optimized progress query
-            lesson_progress = LessonProgress.objects.filter(
-                enrollment=enrollment
-            ).select_related('lesson').values(
-                'lesson_id', 'is_completed', 'time_spent_minutes'
-            )
-            
-            for lp in lesson_progress:
-                user_progress[lp['lesson_id']] = {
-                    'is_completed': lp['is_completed'],
-                    'time_spent': lp['time_spent_minutes'],
-                }
-                if lp['is_completed']:
-                    completed_lesson_ids.append(lp['lesson_id'])
-    
-    # Get module statistics
-    total_lessons = lessons.count()
-    preview_lessons = lessons.filter(is_preview=True).count()
-    
-    # Cached enrollment count
-    enrollment_cache_key = f'module_enrollments_{module.id}'
-    total_enrollments = cache.get(enrollment_cache_key)
-    if total_enrollments is None:
-        total_enrollments = Enrollment.objects.filter(module=module).count()
-        cache.set(enrollment_cache_key, total_enrollments, QUERY_CACHE_TTL)
-    
-    # Get recent reviews with limit
-    reviews = ModuleReview.objects.filter(
-        module=module
-    ).select_related('user').order_by('-created_at')[:5]
-    
-    # Get similar modules (cached)
-    similar_cache_key = f'similar_modules_{module.category_id}'
-    similar_modules = cache.get(similar_cache_key)
-    if similar_modules is None:
-        similar_modules = list(Module.objects.filter(
-            category=module.category,
-            is_published=True
-        ).exclude(id=module.id).select_related('category')[:3])
-        cache.set(similar_cache_key, similar_modules, QUERY_CACHE_TTL)
+    shared = view_cache.module_data(module_id)
+    # is_enrolled, enrollment, user_progress, completed_lesson_ids
+    overlay = view_cache.module_progress(request.user, shared['module'])
     
     context = {
-        'module': module,
-        'lessons': lessons,
-        'is_enrolled': is_enrolled,
-        'enrollment': enrollment,
-        'user_progress': user_progress,
-        'completed_lesson_ids': completed_lesson_ids,
-        'total_lessons': total_lessons,
-        'preview_lessons': preview_lessons,
-        'total_enrollments': total_enrollments,
-        'reviews': reviews,
-        'avg_rating': module.average_rating or 0,
-        'similar_modules': similar_modules,
+        **shared,
+        **overlay,
         'user_language': get_user_language(request),
     }
     
-    # Cache the context for 15 minutes
-    cache.set(cache_key, context, VIEW_CACHE_TTL)
-    
     return render(request, 'elearning/module_detail.html', context)
 
 @login_required
 def module_list(request):
     """
     Display paginated list of modules with filters - OPTIMIZED
+    The page of modules, categories, tags and stats are shared by every user
+    (keyed by the filters and the catalog generation); enrollments and
+    progress come from a small per-user overlay (elearning/view_cache.py).
     """
+    from . import view_cache
+
     # Get query parameters
     search_query = request.GET.get('q', '')
     category_id = request.GET.get('category', '')
@@ -160,130 +88,32 @@ def module_list(request):
     sort_by = request.GET.get('sort', 'featured')
     page = request.GET.get('page', 1)
     
-    # Create cache key based on filters
-    cache_key = f'module_list_{search_query}_{category_id}_{difficulty}_{tag_slug}_{sort_by}_{page}_{request.user.id}'
-    cached_data = cache.get(cache_key)
-    
-    if cached_data and not settings.DEBUG:
-        return render(request, 'elearning/module_list.html', cached_data)
-    
-    # Optimized base queryset
-    modules = Module.objects.filter(
-        is_published=True,
-        is_active=True
-    ).select_related('category', 'created_by').prefetch_related('tags')
-    
-    # Apply filters
-    if search_query:
-        modules = modules.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(title_bem__icontains=search_query) |
-            Q(title_ny__icontains=search_query)
-        )
-    
     if category_id:
-        modules = modules.filter(category_id=category_id)
         selected_category = get_object_or_404(Category, id=category_id)
     else:
         selected_category = None
     
-    if difficulty:
-        modules = modules.filter(difficulty=difficulty)
-    
-    if tag_slug:
-        modules = modules.filter(tags__slug=tag_slug)
-    
-    # Apply sorting with database indexes
-    if sort_by == 'popular':
-        modules = modules.order_by('-enrollments_count', '-views_count')
-    elif sort_by == 'newest':
-        modules = modules.order_by('-created_at')
-    elif sort_by == 'rating':
-        modules = modules.order_by('-average_rating', '-enrollments_count')
-    else:  # featured
-        modules = modules.order_by('-is_featured', '-enrollments_count', 'order')
-    
     # PAGINATION - 20 items per page
-    paginator = Paginator(modules, 20)
-    try:
-        modules_page = paginator.page(page)
-    except PageNotAnInteger:
-        modules_page = paginator.page(1)
-    except EmptyPage:
-        modules_page = paginator.page(paginator.num_pages)
-    
-    # Get categories with module counts (cached)
-    categories_cache_key = 'module_categories_with_counts'
-    categories = cache.get(categories_cache_key)
-    if categories is None:
-        categories = Category.objects.filter(is_active=True).annotate(
-            module_count=Count('modules', filter=Q(modules__is_published=True))
-        ).order_by('order')
-        cache.set(categories_cache_key, categories, QUERY_CACHE_TTL)
-    
-    # Get popular tags (cached)
-    tags_cache_key = 'popular_tags'
-    tags = cache.get(tags_cache_key)
-    if tags is None:
-        tags = Tag.objects.annotate(
-            module_count=Count('modules', filter=Q(modules__is_published=True))
-        ).filter(module_count__gt=0).order_by('-module_count')[:10]
-        cache.set(tags_cache_key, tags, QUERY_CACHE_TTL)
-    
-    # Get user enrollments efficiently
-    user_enrollments = []
-    user_progress = {}
-    if request.user.is_authenticated:
-        enrollments = Enrollment.objects.filter(
-            user=request.user
-        ).select_related('module').values('module_id', 'progress_percentage')
-        
-        user_enrollments = [e['module_id'] for e in enrollments]
-        user_progress = {e['module_id']: e['progress_percentage'] for e in enrollments}
-    
-    # Get stats (cached)
-    stats_cache_key = 'module_stats'
-    stats = cache.get(stats_cache_key)
-    if stats is None:
-        stats = {
-            'total_modules': Module.objects.filter(is_published=True).count(),
-            'total_students': Enrollment.objects.values('user').distinct().count(),
-            'total_completions': Enrollment.objects.filter(completed_at__isnull=False).count(),
-        }
-        cache.set(stats_cache_key, stats, QUERY_CACHE_TTL)
-    
-    # Get featured modules (cached)
-    featured_cache_key = 'featured_modules'
-    featured_modules = cache.get(featured_cache_key)
-    if featured_modules is None:
-        featured_modules = list(Module.objects.filter(
-            is_published=True,
-            is_featured=True
-        ).select_related('category')[:3])
-        cache.set(featured_cache_key, featured_modules, QUERY_CACHE_TTL)
-    
-    stats['featured_modules'] = featured_modules
+    modules_page = view_cache.module_listing(search_query, category_id, difficulty, tag_slug, sort_by, page)
+    sidebar = view_cache.module_sidebar()
+    user_data = view_cache.user_overlay(request.user)
     
     context = {
         'modules': modules_page,
-        'categories': categories,
-        'tags': tags,
+        'categories': sidebar['categories'],
+        'tags': sidebar['tags'],
         'selected_category': selected_category,
         'search_query': search_query,
         'current_difficulty': difficulty,
         'sort_by': sort_by,
-        'user_enrollments': user_enrollments,
-        'user_progress': user_progress,
-        'stats': stats,
+        'user_enrollments': user_data['enrollments'],
+        'user_progress': user_data['progress'],
+        'stats': sidebar['stats'],
         'user_language': get_user_language(request),
-        'paginator': paginator,
+        'paginator': modules_page.paginator,
         'page_obj': modules_page,
     }
     
-    # Cache for 15 minutes
-    cache.set(cache_key, context, VIEW_CACHE_TTL)
-    
     return render(request, 'elearning/module_list.html', context)
 
 @login_required
@@ -327,18 +157,9 @@ def lesson_detail(request, module_slug, lesson_slug):
                 lesson_progress.last_accessed = timezone.now()
                 lesson_progress.save(update_fields=['last_accessed'])
 
-    # Optimized lesson navigation
-    cache_key = f'lesson_navigation_{module.id}'
-    all_lessons = cache.get(cache_key)
-    if all_lessons is None:
-        all_lessons = list(module.lessons.all().order_by('order').values('id', 'slug', 'title', 'order'))
-        cache.set(cache_key, all_lessons, QUERY_CACHE_TTL)
-    
-    current_lesson = next((l for l in all_lessons if l['slug'] == lesson_slug), None)
-    current_index = all_lessons.index(current_lesson) if current_lesson else 0
-    
-    prev_lesson = all_lessons[current_index - 1] if current_index > 0 else None
-    next_lesson = all_lessons[current_index + 1] if current_index < len(all_lessons) - 1 else None
+    # Optimized lesson navigation (cached ordered index per module)
+    from .view_cache import lesson_neighbors
+    prev_lesson, next_lesson = lesson_neighbors(module.id, lesson.id)
 
     context = {
         'module': module,
@@ -457,21 +278,22 @@ def leaderboard(request):
     """
     Learning leaderboard with pagination - OPTIMIZED
     """
-    # Optimized query for top learners
-    top_learners_query = LearningStreak.objects.select_related('user').filter(
-        total_points_earned__gt=0
-    ).order_by('-total_points_earned')
+    from gamification import leaderboards
+    
+    # Ranked entries come from the in-memory learning board
+    entries = leaderboards.top('learning', limit=None)
     
     # Pagination
-    paginator = Paginator(top_learners_query, 20)
+    paginator = Paginator(entries, 20)
     page = request.GET.get('page', 1)
     try:
         top_learners_page = paginator.page(page)
     except (PageNotAnInteger, EmptyPage):
         top_learners_page = paginator.page(1)
     
-    # Get completion counts for displayed users
-    user_ids = [learner.user_id for learner in top_learners_page]
+    # Get users, streaks and completion counts for displayed users
+    user_ids = [member for _rank, member, _score in top_learners_page]
+    streaks = LearningStreak.objects.select_related('user').in_bulk(user_ids, field_name='user_id')
     completion_counts = Certificate.objects.filter(
         user_id__in=user_ids
     ).values('user').annotate(modules_completed=Count('module'))
@@ -480,26 +302,26 @@ def leaderboard(request):
     
     # Prepare leaderboard data
     leaderboard_data = []
-    for i, streak in enumerate(top_learners_page, start=top_learners_page.start_index()):
+    for rank, user_id, points in top_learners_page:
+        streak = streaks.get(user_id)
+        if streak is None:
+            continue
         leaderboard_data.append({
-            'rank': i,
+            'rank': rank,
             'user': streak.user,
-            'points': streak.total_points_earned,
-            'modules_completed': completion_map.get(streak.user.id, 0),
+            'points': points,
+            'modules_completed': completion_map.get(user_id, 0),
             'streak': streak.current_streak,
         })
     
     # Find current user's rank
     user_rank = None
     if request.user.is_authenticated:
-        user_streak = LearningStreak.objects.filter(user=request.user).first()
-        if user_streak and user_streak.total_points_earned > 0:
-            user_rank = LearningStreak.objects.filter(
-                total_points_earned__gt=user_streak.total_points_earned
-            ).count() + 1
+        user_rank = leaderboards.rank('learning', request.user.id)
     
     context = {
         'leaderboard_data': leaderboard_data,
+        'top_learners': leaderboard_data,
         'user_rank': user_rank,
         'paginator': paginator,
         'page_obj': top_learners_page,
@@ -543,51 +365,24 @@ def enroll_module(request, slug):
 @login_required
 @require_POST
 def complete_lesson(request, lesson_id):
-    """Mark lesson as completed - Clear relevant caches"""
-    lesson = get_object_or_404(Lesson, id=lesson_id)
+    """Mark lesson as completed - incremental progress, completion work in the background"""
+    from django.db import transaction
+    from . import progress
+
+    lesson = get_object_or_404(Lesson.objects.select_related('module'), id=lesson_id)
     enrollment = get_object_or_404(Enrollment, user=request.user, module=lesson.module)
     
-    lesson_progress, created = LessonProgress.objects.get_or_create(
-        enrollment=enrollment,
-        lesson=lesson
-    )
+    with transaction.atomic():
+        newly_completed, module_completed = progress.complete_lesson(enrollment, lesson)
     
-    if not lesson_progress.is_completed:
-        lesson_progress.is_completed = True
-        lesson_progress.completed_at = timezone.now()
-        lesson_progress.save()
-        
-        # Update progress
-        total_lessons = lesson.module.lessons.count()
-        completed = LessonProgress.objects.filter(
-            enrollment=enrollment,
-            is_completed=True
-        ).count()
-        
-        enrollment.progress_percentage = int((completed / total_lessons) * 100)
-        enrollment.save()
-        
+    if newly_completed:
         # Clear caches
         cache.delete(f'progress_dashboard_{request.user.id}')
-        cache.delete(f'lesson_navigation_{lesson.module.id}')
-        
-        if enrollment.progress_percentage == 100 and not enrollment.completed_at:
-            enrollment.completed_at = timezone.now()
-            enrollment.save()
-            
-            # Update completion count
-            Module.objects.filter(pk=lesson.module.pk).update(completions_count=F('completions_count') + 1)
-            
-            # Award certificate
-            Certificate.objects.get_or_create(
-                user=request.user,
-                module=lesson.module,
-                defaults={'final_score': 100, 'certificate_id': f'C-{lesson.module.id}-{request.user.id}'}
-            )
-            
-            messages.success(request, f'🎉 Congratulations! You completed {lesson.module.title}! Certificate awarded!')
-        else:
-            messages.success(request, f'✅ Lesson "{lesson.title}" marked as complete! Keep going!')
+    
+    if module_completed:
+        messages.success(request, f'🎉 Congratulations! You completed {lesson.module.title}! Certificate awarded!')
+    elif newly_completed:
+        messages.success(request, f'✅ Lesson "{lesson.title}" marked as complete! Keep going!')
     else:
         messages.info(request, f'You already completed this lesson.')
     
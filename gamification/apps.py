@@ -5,3 +5,7 @@ class GamificationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gamification'
     verbose_name = 'Gamification & Rewards'
+
+    def ready(self):
+        from .signals import connect_leaderboard_signals
+        connect_leaderboard_signals()
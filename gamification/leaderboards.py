@@ -0,0 +1,298 @@
+# gamification/leaderboards.py
+"""
+Leaderboard service
+Each board is an in-process sorted index of (score, member) pairs kept with
+bisect, so "my rank" is a binary search and top-N is a slice - no COUNT scan
+or Python loop over the whole table per request.
+
+Board keys:
+    individual            UserPoints.total_points
+    learning              LearningStreak.total_points_earned
+    challenge:<id>        community ChallengeParticipant.contribution
+    community:<location>  UserPoints.total_points of users in one location
+    weekly:<YYYY-Www>     points earned (PointTransaction) in an ISO week
+    monthly:<YYYY-MM>     points earned (PointTransaction) in a month
+
+Boards load lazily from the database on first read and are updated in place
+by UserPoints.add_points and ChallengeProof.approve. They are reloaded after
+LEADERBOARD_TTL seconds so other worker processes converge on the same order.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import date, datetime, time as dt_time, timedelta
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BOARD_TTL = getattr(settings, 'LEADERBOARD_TTL', 300)
+
+PERIODS = ('weekly', 'monthly')
+
+
+class SortedBoard:
+    """
+    Ordered index of member scores (highest first)
+
+    Ties share a rank (1, 1, 3) - the same numbering the old
+    COUNT(score > mine) + 1 queries produced.
+    """
+
+    def __init__(self, scores=None):
+        self._lock = threading.Lock()
+        self._scores = {}
+        self._entries = []  # sorted (-score, member_id)
+        if scores:
+            self._scores = {member: score for member, score in scores}
+            self._entries = sorted((-score, member) for member, score in self._scores.items())
+
+    def __len__(self):
+        return len(self._scores)
+
+    def set(self, member, score):
+        with self._lock:
+            self._remove(member)
+            self._scores[member] = score
+            insort(self._entries, (-score, member))
+
+    def incr(self, member, delta):
+        with self._lock:
+            score = self._remove(member) + delta
+            self._scores[member] = score
+            insort(self._entries, (-score, member))
+            return score
+
+    def remove(self, member):
+        with self._lock:
+            self._remove(member)
+
+    def _remove(self, member):
+        score = self._scores.pop(member, None)
+        if score is None:
+            return 0
+        index = bisect_left(self._entries, (-score, member))
+        del self._entries[index]
+        return score
+
+    def score(self, member):
+        return self._scores.get(member)
+
+    def rank_for_score(self, score):
+        """Rank a member with this score would have"""
+        # (-score,) sorts before every (-score, member), so this counts strictly higher scores
+        return bisect_left(self._entries, (-score,)) + 1
+
+    def rank(self, member):
+        """1-based rank of a member, or None if not on the board"""
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        return self.rank_for_score(score)
+
+    def top(self, limit=50):
+        """
+        Returns:
+            list: (rank, member_id, score) for the highest `limit` members
+        """
+        with self._lock:
+            head = self._entries[:limit]
+
+        results = []
+        rank = 0
+        previous = None
+        for position, (negative_score, member) in enumerate(head, start=1):
+            if negative_score != previous:
+                rank = position
+                previous = negative_score
+            results.append((rank, member, -negative_score))
+        return results
+
+
+# --- Board keys ---
+
+def period_key(period, day=None):
+    """Board key for the weekly/monthly period containing `day` (default today)"""
+    day = day or timezone.localdate()
+    if period == 'weekly':
+        year, week, _weekday = day.isocalendar()
+        return f'weekly:{year}-W{week:02d}'
+    if period == 'monthly':
+        return f'monthly:{day.year}-{day.month:02d}'
+    raise ValueError(f"Unknown leaderboard period: {period}")
+
+
+def challenge_key(challenge_id):
+    return f'challenge:{challenge_id}'
+
+
+def community_key(location):
+    return f'community:{location}'
+
+
+def _period_range(key):
+    kind, label = key.split(':', 1)
+    if kind == 'weekly':
+        year, week = label.split('-W')
+        start = date.fromisocalendar(int(year), int(week), 1)
+        end = start + timedelta(days=7)
+    else:
+        year, month = (int(part) for part in label.split('-'))
+        start = date(year, month, 1)
+        end = date(year + month // 12, month % 12 + 1, 1)
+
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, dt_time.min), tz),
+        timezone.make_aware(datetime.combine(end, dt_time.min), tz),
+    )
+
+
+# --- Loaders (one query per board) ---
+
+def _load_board(key):
+    from .models import UserPoints, PointTransaction
+
+    kind, _sep, arg = key.partition(':')
+
+    if kind == 'individual':
+        rows = UserPoints.objects.values_list('user_id', 'total_points')
+    elif kind == 'community':
+        rows = UserPoints.objects.filter(user__location=arg).values_list('user_id', 'total_points')
+    elif kind == 'learning':
+        from elearning.models import LearningStreak
+        rows = LearningStreak.objects.filter(total_points_earned__gt=0).values_list('user_id', 'total_points_earned')
+    elif kind == 'challenge':
+        from community.models import ChallengeParticipant
+        rows = ChallengeParticipant.objects.filter(challenge_id=int(arg)).values_list('user_id', 'contribution')
+    elif kind in PERIODS:
+        start, end = _period_range(key)
+        rows = PointTransaction.objects.filter(
+            created_at__gte=start, created_at__lt=end, points__gt=0
+        ).values('user_id').annotate(earned=Sum('points')).values_list('user_id', 'earned')
+    else:
+        raise ValueError(f"Unknown leaderboard: {key}")
+
+    return SortedBoard(rows)
+
+
+# --- Registry ---
+
+_boards = {}  # key -> (SortedBoard, loaded_at)
+_registry_lock = threading.Lock()
+
+
+def get_board(key):
+    """Return the board for `key`, loading it from the database when missing or stale"""
+    with _registry_lock:
+        cached = _boards.get(key)
+    if cached and time.monotonic() - cached[1] < BOARD_TTL:
+        return cached[0]
+
+    board = _load_board(key)
+    with _registry_lock:
+        _boards[key] = (board, time.monotonic())
+    return board
+
+
+def _loaded_board(key):
+    """The board for `key` if it is already in memory (updates never force a load)"""
+    with _registry_lock:
+        cached = _boards.get(key)
+    return cached[0] if cached else None
+
+
+def invalidate(key=None):
+    """Drop one board (or all) so the next read reloads from the database"""
+    with _registry_lock:
+        if key is None:
+            _boards.clear()
+        else:
+            _boards.pop(key, None)
+
+
+def top(key, limit=50):
+    return get_board(key).top(limit)
+
+
+def rank(key, member_id):
+    return get_board(key).rank(member_id)
+
+
+def rank_for_score(key, score):
+    return get_board(key).rank_for_score(score)
+
+
+def score(key, member_id):
+    return get_board(key).score(member_id)
+
+
+# --- Update hooks ---
+
+def record_points(user_points, points, when=None):
+    """
+    Apply a points award to every board it affects
+    Called from UserPoints.add_points after the row is saved.
+    """
+    try:
+        user_id = user_points.user_id
+        keys = ['individual']
+        location = getattr(user_points.user, 'location', None)
+        if location:
+            keys.append(community_key(location))
+        for key in keys:
+            board = _loaded_board(key)
+            if board is not None:
+                board.set(user_id, user_points.total_points)
+
+        if points > 0:
+            day = timezone.localdate(when) if when else timezone.localdate()
+            for period in PERIODS:
+                board = _loaded_board(period_key(period, day))
+                if board is not None:
+                    board.incr(user_id, points)
+    except Exception as e:
+        logger.error(f"Leaderboard update failed for user {user_points.user_id}: {str(e)}")
+
+
+def record_contribution(participant):
+    """Apply a challenge participant's new contribution to the challenge board"""
+    try:
+        board = _loaded_board(challenge_key(participant.challenge_id))
+        if board is not None:
+            board.set(participant.user_id, participant.contribution)
+    except Exception as e:
+        logger.error(f"Challenge leaderboard update failed for participant {participant.id}: {str(e)}")
+
+
+def record_learning_points(streak):
+    """Apply a LearningStreak change to the learning board"""
+    board = _loaded_board('learning')
+    if board is None:
+        return
+    if streak.total_points_earned > 0:
+        board.set(streak.user_id, streak.total_points_earned)
+    else:
+        board.remove(streak.user_id)
+
+
+def top_with_users(key, limit=50):
+    """
+    Top-N entries with their user objects (one IN query)
+
+    Returns:
+        list: dicts with 'rank', 'user' and 'score'
+    """
+    from django.contrib.auth import get_user_model
+
+    entries = top(key, limit)
+    users = get_user_model().objects.in_bulk([member for _rank, member, _score in entries])
+    return [
+        {'rank': position, 'user': users[member], 'score': value}
+        for position, member, value in entries
+        if member in users
+    ]
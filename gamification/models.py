@@ -54,7 +54,7 @@ class UserPoints(models.Model):
         self.save()
         
         # Create transaction record
-        PointTransaction.objects.create(
+        point_transaction = PointTransaction.objects.create(
             user=self.user,
             transaction_type=transaction_type,
             points=points,
@@ -62,26 +62,17 @@ class UserPoints(models.Model):
             reference_id=reference_id
         )
         
-        # REAL-TIME NOTIFICATION: Points awarded
+        # Move the user on the individual, community and weekly/monthly boards
+        from .leaderboards import record_points
+        record_points(self, points, when=point_transaction.created_at)
+        
+        # NOTIFICATION: Points awarded (SMS/WhatsApp queued for background delivery)
         try:
-            from community.notifications import notification_service
+            from community.outbound import notify, preferred_channels
             from community.models import Notification
             
-            # Notify user
-            prefs = getattr(self.user, 'notification_preferences', None)
-            
-            # SMS to user
-            if prefs and prefs.sms_enabled and self.user.phone_number:
-                sms_message = f"🎉 +{points} points earned! {description}. Total: {self.total_points} points"
-                notification_service.send_sms(str(self.user.phone_number), sms_message)
-            
-            # WhatsApp to user
-            if prefs and prefs.whatsapp_enabled and self.user.phone_number:
-                whatsapp_message = f"🎉 *Points Earned!*\n\n*+{points} points*\n\n{description}\n\n*Total Points:* {self.total_points}\n*Available:* {self.available_points}"
-                notification_service.send_whatsapp(str(self.user.phone_number), whatsapp_message)
-            
             # In-app notification to user
-            Notification.objects.create(
+            notification = Notification.objects.create(
                 user=self.user,
                 notification_type='achievement',
                 title=f'+{points} Points Earned!',
@@ -89,6 +80,18 @@ class UserPoints(models.Model):
                 url='/gamification/leaderboard/'
             )
             
+            # SMS/WhatsApp to user
+            channels = preferred_channels(self.user)
+            if channels:
+                notify(
+                    self.user,
+                    f"🎉 +{points} points earned! {description}. Total: {self.total_points} points",
+                    channels=channels,
+                    notification_type='points',
+                    whatsapp_message=f"🎉 *Points Earned!*\n\n*+{points} points*\n\n{description}\n\n*Total Points:* {self.total_points}\n*Available:* {self.available_points}",
+                    notification=notification
+                )
+            
             # Log for admin view (create admin notification for significant points)
             if points >= 100:  # Only notify admins for significant point awards
                 from accounts.models import CustomUser
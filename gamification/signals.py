@@ -0,0 +1,35 @@
+# gamification/signals.py
+"""
+Keep in-memory leaderboards in step with rows they don't see through
+UserPoints.add_points / ChallengeProof.approve (new participants, streak edits).
+"""
+
+from django.db.models.signals import post_save, post_delete
+
+from . import leaderboards
+
+
+def learning_streak_saved(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    leaderboards.record_learning_points(instance)
+
+
+def challenge_participant_changed(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    if kwargs.get('signal') is post_delete:
+        leaderboards.invalidate(leaderboards.challenge_key(instance.challenge_id))
+    elif kwargs.get('created'):
+        leaderboards.record_contribution(instance)
+
+
+def connect_leaderboard_signals():
+    from django.apps import apps
+
+    streak_model = apps.get_model('elearning.LearningStreak')
+    participant_model = apps.get_model('community.ChallengeParticipant')
+
+    post_save.connect(learning_streak_saved, sender=streak_model, dispatch_uid='leaderboard_learning_streak')
+    post_save.connect(challenge_participant_changed, sender=participant_model, dispatch_uid='leaderboard_participant')
+    post_delete.connect(challenge_participant_changed, sender=participant_model, dispatch_uid='leaderboard_participant_delete')
@@ -10,6 +10,7 @@ from .models import (
     Reward, RewardRedemption, CommunityImpact
 )
 from collaboration.models import Leaderboard, Badge, UserBadge
+from . import leaderboards
 
 
 @login_required
@@ -43,15 +44,24 @@ def points_dashboard(request):
 def leaderboard_view(request):
     """Display leaderboards"""
     leaderboard_type = request.GET.get('type', 'individual')
-    period = request.GET.get('period', 'monthly')
+    period = request.GET.get('period', 'all_time')
     
     if leaderboard_type == 'individual':
-        # Individual leaderboard
-        top_users = UserPoints.objects.select_related('user').order_by('-total_points')[:50]
+        # Individual leaderboard - all time or points earned this week/month
+        if period in leaderboards.PERIODS:
+            board_key = leaderboards.period_key(period)
+        else:
+            period = 'all_time'
+            board_key = 'individual'
+        
+        top_users = leaderboards.top_with_users(board_key, 50)
         
         # Get user's rank
         user_points = UserPoints.objects.get_or_create(user=request.user)[0]
-        user_rank = UserPoints.objects.filter(total_points__gt=user_points.total_points).count() + 1
+        user_score = leaderboards.score(board_key, request.user.id)
+        if user_score is None:
+            user_score = user_points.total_points if board_key == 'individual' else 0
+        user_rank = leaderboards.rank(board_key, request.user.id) or leaderboards.rank_for_score(board_key, user_score)
         
         context = {
             'leaderboard_type': leaderboard_type,
@@ -59,6 +69,7 @@ def leaderboard_view(request):
             'top_users': top_users,
             'user_rank': user_rank,
             'user_points': user_points,
+            'user_score': user_score,
         }
     
     elif leaderboard_type == 'community':
@@ -11,13 +11,12 @@ workers = 1
 worker_class = "gthread"  # Use threads instead of processes
 threads = 2  # 2 threads per worker
 worker_connections = 500
-max_requests = 500
-max_requests_jitter = 50
 preload_app = True
 timeout = 300  # Increased timeout for slower operations
 keepalive = 2
 
-# Restart workers after this many requests, to help prevent memory leaks
+# Restart workers after this many requests, to help prevent memory leaks.
+# Workers are also recycled by memory (post_request below, ecolearn/memory.py)
 max_requests = 1000
 max_requests_jitter = 100
 
@@ -61,6 +60,33 @@ def post_fork(server, worker):
 
 def post_worker_init(worker):
     worker.log.info("Worker initialized (pid: %s)", worker.pid)
+    # Resume alert dispatches a previous worker was killed in the middle of (community/dispatch.py)
+    try:
+        from community.dispatch import recover_alert_dispatches
+        recover_alert_dispatches()
+    except Exception as e:
+        worker.log.error("Alert dispatch recovery failed (pid: %s): %s", worker.pid, e)
 
 def worker_abort(worker):
-    worker.log.info("Worker aborted (pid: %s)", worker.pid)
\ No newline at end of file
+    worker.log.info("Worker aborted (pid: %s)", worker.pid)
+
+def post_request(worker, req, environ, resp):
+    # Per-endpoint memory high-water marks; recycle past MEMORY_SOFT_LIMIT_MB
+    try:
+        from ecolearn.memory import post_request
+        post_request(worker, req, environ, resp)
+    except Exception as e:
+        worker.log.error("Memory governor failed (pid: %s): %s", worker.pid, e)
+
+def worker_exit(server, worker):
+    try:
+        from ecolearn.memory import log_high_water
+        log_high_water(worker)
+    except Exception as e:
+        server.log.error("Memory high-water summary failed (pid: %s): %s", worker.pid, e)
+    # Write out audit entries still buffered in this worker (security/audit.py)
+    try:
+        from security.audit import flush
+        flush()
+    except Exception as e:
+        server.log.error("Audit flush on exit failed (pid: %s): %s", worker.pid, e)
@@ -0,0 +1,125 @@
+# reporting/management/commands/benchmark_report_map.py
+"""
+Benchmark for the clustered reports map API.
+Inserts synthetic DumpingReports around Zambian towns inside a transaction
+that is rolled back afterwards, then compares serializing every public report
+(what reports_map used to embed in the page) with spatial.clusters() for a few
+typical viewports.
+Run: python manage.py benchmark_report_map --reports 100000
+"""
+
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from reporting import spatial
+from reporting.models import DumpingReport
+
+TOWNS = [
+    ('Lusaka', -15.3875, 28.3228),
+    ('Kitwe', -12.8024, 28.2132),
+    ('Ndola', -12.9587, 28.6366),
+    ('Livingstone', -17.8419, 25.8543),
+    ('Kabwe', -14.4469, 28.4464),
+    ('Chipata', -13.6333, 32.6500),
+]
+
+# (label, west, south, east, north, zoom)
+VIEWPORTS = [
+    ('country', 21.0, -18.5, 34.0, -8.0, 6),
+    ('lusaka city', 28.15, -15.52, 28.50, -15.25, 12),
+    ('lusaka suburb', 28.30, -15.41, 28.35, -15.37, 15),
+    ('street', 28.318, -15.392, 28.327, -15.383, 18),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare full-page report serialization with the clustered bbox/zoom map API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reports', type=int, default=100000, help='Synthetic reports to insert')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per viewport')
+
+    def synthetic_reports(self, count):
+        rng = random.Random(42)
+        statuses = ['verified', 'in_progress', 'resolved', 'pending', 'rejected']
+        severities = [code for code, _ in DumpingReport.SEVERITY_CHOICES]
+        for i in range(count):
+            if rng.random() < 0.8:
+                _name, lat, lon = rng.choice(TOWNS)
+                lat, lon = lat + rng.gauss(0, 0.08), lon + rng.gauss(0, 0.08)
+            else:
+                lat, lon = rng.uniform(-18.0, -8.5), rng.uniform(22.0, 33.5)
+            yield DumpingReport(
+                location_description=f'Synthetic site {i}',
+                latitude=round(lat, 6),
+                longitude=round(lon, 6),
+                quadkey=spatial.encode(lat, lon),
+                description='benchmark',
+                severity=rng.choice(severities),
+                status=rng.choice(statuses),
+                reference_number=f'BENCH{i:010d}',
+            )
+
+    def timed(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                payload = json.dumps(func(), default=str)
+                elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, len(queries), len(payload)
+
+    def report(self, label, elapsed, queries, size, extra=''):
+        self.stdout.write(
+            f'  {label:<28} {elapsed * 1000:9.1f} ms  {queries:>2} queries  '
+            f'{size / 1024:9.1f} KB{extra}'
+        )
+
+    def handle(self, *args, **options):
+        count = options['reports']
+        repeat = options['repeat']
+
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                batch = []
+                for report in self.synthetic_reports(count):
+                    batch.append(report)
+                    if len(batch) >= 5000:
+                        DumpingReport.objects.bulk_create(batch)
+                        batch = []
+                if batch:
+                    DumpingReport.objects.bulk_create(batch)
+                self.stdout.write(f'📥 Inserted {count} synthetic reports in {time.perf_counter() - started:.1f}s')
+
+                self.stdout.write('📊 Full serialization (old reports_map page payload)')
+                elapsed, queries, size = self.timed(lambda: list(DumpingReport.objects.filter(
+                    status__in=spatial.PUBLIC_STATUSES
+                ).values(*spatial.POINT_FIELDS)), repeat)
+                self.report('all public reports', elapsed, queries, size)
+
+                self.stdout.write('📊 Clustered viewport API')
+                for label, west, south, east, north, zoom in VIEWPORTS:
+                    result = spatial.clusters(west, south, east, north, zoom)
+                    elapsed, queries, size = self.timed(
+                        lambda: spatial.clusters(west, south, east, north, zoom), repeat
+                    )
+                    self.report(
+                        f'{label} (z{zoom})', elapsed, queries, size,
+                        f'  {result["total"]:>6} reports → {len(result["clusters"])} clusters + {len(result["points"])} points'
+                    )
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('✅ Done (synthetic reports rolled back)'))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:56
+
+from django.db import migrations, models
+
+
+def backfill_quadkeys(apps, schema_editor):
+    from reporting.spatial import encode
+
+    DumpingReport = apps.get_model('reporting', 'DumpingReport')
+    batch = []
+    for report in DumpingReport.objects.only('id', 'latitude', 'longitude').iterator(chunk_size=2000):
+        report.quadkey = encode(report.latitude, report.longitude)
+        batch.append(report)
+        if len(batch) >= 2000:
+            DumpingReport.objects.bulk_update(batch, ['quadkey'])
+            batch = []
+    if batch:
+        DumpingReport.objects.bulk_update(batch, ['quadkey'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0003_alter_dumpingreport_photo1_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dumpingreport',
+            name='quadkey',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20),
+        ),
+        migrations.RunPython(backfill_quadkeys, migrations.RunPython.noop),
+    ]
@@ -5,6 +5,39 @@ from django.utils import timezone
 
 User = get_user_model()
 
+COORDINATE_FIELDS = {'latitude', 'longitude'}
+
+
+class DumpingReportQuerySet(models.QuerySet):
+    """Keeps quadkey in step on the paths that skip save()"""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.set_quadkey()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        fields = list(fields)
+        if COORDINATE_FIELDS & set(fields):
+            for obj in objs:
+                obj.set_quadkey()
+            if 'quadkey' not in fields:
+                fields.append('quadkey')
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if not COORDINATE_FIELDS & set(kwargs):
+            return super().update(**kwargs)
+        pks = list(self.values_list('pk', flat=True))
+        updated = super().update(**kwargs)
+        moved = list(self.model._base_manager.filter(pk__in=pks).only('pk', 'latitude', 'longitude'))
+        for obj in moved:
+            obj.set_quadkey()
+        self.model._base_manager.bulk_update(moved, ['quadkey'], batch_size=1000)
+        return updated
+
 
 class DumpingReport(models.Model):
     STATUS_CHOICES = [
@@ -32,6 +65,7 @@ class DumpingReport(models.Model):
     latitude = models.DecimalField(max_digits=9, decimal_places=6)
     longitude = models.DecimalField(max_digits=9, decimal_places=6)
     address = models.CharField(max_length=500, blank=True)
+    quadkey = models.CharField(max_length=20, blank=True, db_index=True, editable=False)  # Map tile index, see spatial.py
     
     # Report details
     description = models.TextField()
@@ -61,6 +95,8 @@ class DumpingReport(models.Model):
     
     # Admin notes
     admin_notes = models.TextField(blank=True)
+
+    objects = DumpingReportQuerySet.as_manager()
     
     class Meta:
         ordering = ['-reported_at']
@@ -73,8 +109,20 @@ class DumpingReport(models.Model):
             # Generate unique reference number
             import uuid
             self.reference_number = f"ECO{str(uuid.uuid4())[:8].upper()}"
+        if self.set_quadkey():
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'quadkey' not in update_fields:
+                kwargs['update_fields'] = [*update_fields, 'quadkey']
         super().save(*args, **kwargs)
 
+    def set_quadkey(self):
+        """Derive quadkey from the coordinates; False when they are not set"""
+        if self.latitude is None or self.longitude is None:
+            return False
+        from .spatial import encode
+        self.quadkey = encode(self.latitude, self.longitude)
+        return True
+
 
 class ReportUpdate(models.Model):
     report = models.ForeignKey(DumpingReport, on_delete=models.CASCADE, related_name='updates')
@@ -0,0 +1,168 @@
+# reporting/spatial.py
+"""
+Spatial index and server-side clustering for the dumping reports map
+Every DumpingReport stores the Bing-style quadkey of its Web Mercator tile at
+QUADKEY_LEVEL (~38 m). A tile's quadkey is a prefix of the quadkeys of all
+tiles inside it, so:
+
+- "reports inside tile T" is the index range quadkey >= T and quadkey < T + '4'
+  (digits are 0-3)
+- clustering at zoom z is GROUP BY the first z + CLUSTER_DEPTH digits, which
+  gives 2**CLUSTER_DEPTH cells across each 256px map tile
+
+clusters() answers a map viewport (bbox + zoom) with a fixed number of queries
+no matter how many reports exist.
+"""
+
+import math
+
+from django.conf import settings
+from django.db.models import Avg, Case, Count, IntegerField, Max, Min, Q, Value, When
+from django.db.models.functions import Substr
+
+# Tunables (override in settings.py)
+QUADKEY_LEVEL = 20
+CLUSTER_DEPTH = getattr(settings, 'REPORT_MAP_CLUSTER_DEPTH', 2)
+MAX_COVER_TILES = getattr(settings, 'REPORT_MAP_MAX_COVER_TILES', 16)
+POINT_ZOOM = getattr(settings, 'REPORT_MAP_POINT_ZOOM', 17)
+MAX_POINTS = getattr(settings, 'REPORT_MAP_MAX_POINTS', 2000)
+
+MAX_LATITUDE = 85.05112878
+
+# Statuses shown on the public map
+PUBLIC_STATUSES = ('verified', 'in_progress', 'resolved')
+
+SEVERITY_ORDER = ('low', 'medium', 'high', 'critical')
+
+POINT_FIELDS = (
+    'id', 'latitude', 'longitude', 'location_description',
+    'severity', 'status', 'reference_number',
+)
+
+
+def _tile_xy(latitude, longitude, level):
+    """Web Mercator tile column/row containing the point at `level`"""
+    latitude = min(max(float(latitude), -MAX_LATITUDE), MAX_LATITUDE)
+    longitude = min(max(float(longitude), -180.0), 180.0)
+    size = 1 << level
+    x = (longitude + 180.0) / 360.0
+    sin_lat = math.sin(math.radians(latitude))
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return (
+        min(max(int(x * size), 0), size - 1),
+        min(max(int(y * size), 0), size - 1),
+    )
+
+
+def tile_quadkey(x, y, level):
+    digits = []
+    for i in range(level, 0, -1):
+        mask = 1 << (i - 1)
+        digits.append(str((1 if x & mask else 0) + (2 if y & mask else 0)))
+    return ''.join(digits)
+
+
+def encode(latitude, longitude, level=QUADKEY_LEVEL):
+    """Quadkey of the tile containing (latitude, longitude)"""
+    x, y = _tile_xy(latitude, longitude, level)
+    return tile_quadkey(x, y, level)
+
+
+def covering_tiles(west, south, east, north, zoom):
+    """
+    Quadkeys of the tiles covering the bbox, at zoom or the deepest coarser
+    level that needs no more than MAX_COVER_TILES tiles
+    """
+    level = max(0, min(int(zoom), QUADKEY_LEVEL))
+    while True:
+        x0, y0 = _tile_xy(north, west, level)
+        x1, y1 = _tile_xy(south, east, level)
+        if level == 0 or (x1 - x0 + 1) * (y1 - y0 + 1) <= MAX_COVER_TILES:
+            break
+        level -= 1
+    return [tile_quadkey(x, y, level) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def bbox_filter(west, south, east, north, zoom):
+    """Q() selecting reports in the bbox: quadkey index ranges, then exact coordinates"""
+    ranges = Q()
+    for prefix in covering_tiles(west, south, east, north, zoom):
+        ranges |= Q(quadkey__gte=prefix, quadkey__lt=prefix + '4')
+    return ranges & Q(
+        latitude__gte=south, latitude__lte=north,
+        longitude__gte=west, longitude__lte=east,
+    )
+
+
+def _severity_rank():
+    return Case(
+        *[When(severity=severity, then=Value(rank)) for rank, severity in enumerate(SEVERITY_ORDER)],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _point(row):
+    row['latitude'] = float(row['latitude'])
+    row['longitude'] = float(row['longitude'])
+    return row
+
+
+def clusters(west, south, east, north, zoom, statuses=PUBLIC_STATUSES):
+    """
+    Reports visible in the bbox at `zoom`, clustered on the quadkey grid
+
+    Returns:
+        dict: 'zoom', 'total' (reports in view), 'clusters' (cells with 2+ reports:
+              quadkey, count, centroid, worst severity) and 'points' (single reports,
+              all reports from POINT_ZOOM on, capped at MAX_POINTS)
+    """
+    from .models import DumpingReport
+
+    zoom = max(0, min(int(zoom), QUADKEY_LEVEL))
+    south, north = max(south, -MAX_LATITUDE), min(north, MAX_LATITUDE)
+    west, east = max(west, -180.0), min(east, 180.0)
+
+    result = {'zoom': zoom, 'total': 0, 'clusters': [], 'points': []}
+    if west > east or south > north or not statuses:
+        return result
+
+    reports = DumpingReport.objects.filter(
+        bbox_filter(west, south, east, north, zoom), status__in=statuses
+    ).order_by()
+
+    if zoom >= POINT_ZOOM:
+        points = list(reports.values(*POINT_FIELDS)[:MAX_POINTS])
+        result['points'] = [_point(row) for row in points]
+        result['total'] = len(points)
+        return result
+
+    level = min(zoom + CLUSTER_DEPTH, QUADKEY_LEVEL)
+    cells = reports.values(cell=Substr('quadkey', 1, level)).annotate(
+        count=Count('id'),
+        latitude=Avg('latitude'),
+        longitude=Avg('longitude'),
+        severity=Max(_severity_rank()),
+        first_id=Min('id'),
+    )
+
+    single_ids = []
+    for cell in cells:
+        result['total'] += cell['count']
+        if cell['count'] == 1:
+            single_ids.append(cell['first_id'])
+            continue
+        result['clusters'].append({
+            'quadkey': cell['cell'],
+            'count': cell['count'],
+            'latitude': float(cell['latitude']),
+            'longitude': float(cell['longitude']),
+            'severity': SEVERITY_ORDER[cell['severity'] or 0],
+        })
+
+    if single_ids:
+        result['points'] = [
+            _point(row)
+            for row in DumpingReport.objects.filter(id__in=single_ids[:MAX_POINTS]).order_by().values(*POINT_FIELDS)
+        ]
+    return result
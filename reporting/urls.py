@@ -8,6 +8,7 @@ urlpatterns = [
     path('report/success/<str:reference_number>/', views.report_success, name='report_success'),
     path('track/', views.track_report, name='track_report'),
     path('map/', views.reports_map, name='reports_map'),
+    path('map/clusters/', views.reports_map_clusters, name='reports_map_clusters'),
     path('my-reports/', views.my_reports, name='my_reports'),
     path('report/<int:report_id>/', views.report_detail, name='report_detail'),
     path('report/<int:report_id>/update/', views.update_report, name='update_report'),
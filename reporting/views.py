@@ -8,8 +8,10 @@ from django.db.models import Count, Q
 from django.core.paginator import Paginator
 from .models import DumpingReport, ReportUpdate, Authority, ReportStatistics
 from .forms import DumpingReportForm, ReportUpdateForm
+from .spatial import PUBLIC_STATUSES, clusters
 import requests
 import json
+import math
 
 
 @login_required
@@ -28,49 +30,45 @@ def report_dumping(request):
             # Forward to appropriate authority
             forward_to_authority(report)
             
-            # REAL-TIME NOTIFICATION: Notify ALL admins instantly via WhatsApp/SMS
+            # NOTIFICATION: Notify ALL admins - WhatsApp/SMS queued for background delivery
             try:
                 from accounts.models import CustomUser
-                from community.notifications import notification_service
+                from community.outbound import notify, preferred_channels
                 from community.models import Notification
                 from django.utils import timezone
                 
                 # Get all superusers/admins
-                admins = CustomUser.objects.filter(Q(is_superuser=True) | Q(is_staff=True))
+                admins = CustomUser.objects.filter(
+                    Q(is_superuser=True) | Q(is_staff=True)
+                ).select_related('notification_preferences')
                 
                 # Count today's reports
                 today_reports = DumpingReport.objects.filter(
                     reported_at__date=timezone.now().date()
                 ).count()
                 
+                photo_count = sum([1 for p in [report.photo1, report.photo2, report.photo3] if p])
+                alert_message = f"🚨 NEW ILLEGAL DUMP in {report.location_description}! {photo_count} photos attached. Act now!"
+                
                 for admin in admins:
                     try:
-                        prefs = getattr(admin, 'notification_preferences', None)
-                        
-                        photo_count = sum([1 for p in [report.photo1, report.photo2, report.photo3] if p])
-                        
-                        # SMS notification - PRO ZNBC style
-                        if admin.phone_number and (not prefs or prefs.sms_enabled):
-                            sms_message = f"🚨 NEW ILLEGAL DUMP in {report.location_description}! {photo_count} photos attached. Act now!"
-                            result = notification_service.send_sms(str(admin.phone_number), sms_message)
-                            if result.get('success'):
-                                print(f"✅ Admin SMS sent to {admin.username}")
-                        
-                        # WhatsApp notification - PRO admin alert
-                        if admin.phone_number and (not prefs or prefs.whatsapp_enabled):
-                            whatsapp_message = f"🚨 NEW ILLEGAL DUMP in {report.location_description}! {photo_count} photos attached. Act now!"
-                            result = notification_service.send_whatsapp(str(admin.phone_number), whatsapp_message)
-                            if result.get('success'):
-                                print(f"✅ Admin WhatsApp sent to {admin.username}")
-                        
                         # In-app notification
-                        Notification.objects.create(
+                        notification = Notification.objects.create(
                             user=admin,
                             notification_type='emergency',
                             title=f'New Report: {report.location_description}',
                             message=f'New illegal dumping report ({report.get_severity_display()} severity). {today_reports} reports today. Ref: {report.reference_number}',
                             url=f'/admin-dashboard/reports/{report.id}/'
                         )
+                        
+                        # SMS/WhatsApp - admins get both unless they opted out
+                        notify(
+                            admin,
+                            alert_message,
+                            channels=preferred_channels(admin, default=('sms', 'whatsapp')),
+                            notification_type='report_submitted',
+                            notification=notification
+                        )
                     except Exception as e:
                         print(f"Error notifying admin {admin.username}: {e}")
             except Exception as e:
@@ -119,20 +117,50 @@ def track_report(request):
 
 @login_required
 def reports_map(request):
-    # Get all verified reports for map display
-    reports = DumpingReport.objects.filter(
-        status__in=['verified', 'in_progress', 'resolved']
-    ).values(
-        'id', 'latitude', 'longitude', 'location_description', 
-        'severity', 'status', 'reference_number'
+    # Markers are loaded per viewport from reports_map_clusters; only the totals render here
+    stats = DumpingReport.objects.aggregate(
+        total=Count('id', filter=Q(status__in=PUBLIC_STATUSES)),
+        pending=Count('id', filter=Q(status='pending')),
+        in_progress=Count('id', filter=Q(status='in_progress')),
+        resolved=Count('id', filter=Q(status='resolved')),
     )
     
     context = {
-        'reports': list(reports),
+        'stats': stats,
     }
     return render(request, 'reporting/reports_map.html', context)
 
 
+@login_required
+def reports_map_clusters(request):
+    """
+    Clustered reports for one map viewport
+    GET bbox=west,south,east,north&zoom=N[&status=verified,resolved]
+    Staff may also ask for pending/rejected reports or status=all.
+    """
+    try:
+        west, south, east, north = (float(value) for value in request.GET.get('bbox', '').split(','))
+        zoom = int(request.GET.get('zoom', 6))
+        if not all(math.isfinite(value) for value in (west, south, east, north)):
+            raise ValueError('bbox must be finite')
+    except ValueError:
+        return JsonResponse({'error': 'bbox=west,south,east,north and zoom are required'}, status=400)
+    # float() also takes huge values; keep the viewport on the globe
+    west, east = (min(max(value, -180.0), 180.0) for value in (west, east))
+    south, north = (min(max(value, -90.0), 90.0) for value in (south, north))
+    
+    allowed = [code for code, _ in DumpingReport.STATUS_CHOICES] if request.user.is_staff else PUBLIC_STATUSES
+    requested = request.GET.get('status', '')
+    if requested == 'all':
+        statuses = allowed
+    elif requested:
+        statuses = [status for status in requested.split(',') if status in allowed]
+    else:
+        statuses = PUBLIC_STATUSES
+    
+    return JsonResponse(clusters(west, south, east, north, zoom, statuses))
+
+
 @login_required
 def my_reports(request):
     if request.user.is_staff:
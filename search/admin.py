@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import SearchDocument
+
+
+@admin.register(SearchDocument)
+class SearchDocumentAdmin(admin.ModelAdmin):
+    list_display = ('title', 'kind', 'object_id', 'language', 'updated_at')
+    list_filter = ('kind', 'language')
+    search_fields = ('title',)
+    readonly_fields = ('title_terms', 'body_terms', 'updated_at')
@@ -0,0 +1,100 @@
+# search/analysis.py
+"""
+Text analysis shared by every search backend
+Documents and queries go through the same steps, so the SQLite, Postgres
+and in-process indexes all see identical terms:
+
+- Unicode NFKD, diacritics removed, case-folded
+- split on anything that is not a letter or digit
+- English: stopwords dropped and each word indexed both as typed and in a
+  light suffix-stripped form ("recycling", "recycled" -> "recycl")
+- Bemba and Nyanja: no stemmer or stopword list exists for them here, and
+  their prefix-heavy morphology would be damaged by English suffix rules, so
+  words are indexed exactly as written. Prefix search covers most of the gap
+  while typing.
+"""
+
+import re
+import unicodedata
+
+from django.utils.html import strip_tags
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+
+MIN_TERM_LENGTH = 2
+
+ENGLISH_STOPWORDS = frozenset("""
+a an and are as at be but by for from has have how i if in into is it its
+of on or our so that the their them then there these they this to was we
+were what when where which who why will with you your
+""".split())
+
+# Longest suffixes first; (suffix, replacement, minimum stem length)
+_SUFFIXES = (
+    ('ational', 'ate', 3), ('ation', 'ate', 3), ('ments', '', 4), ('ment', '', 4),
+    ('ness', '', 3), ('ies', 'y', 2), ('sses', 'ss', 2), ('ing', '', 3),
+    ('edly', '', 3), ('ly', '', 4), ('ed', '', 3), ('es', 'e', 3), ('s', '', 3),
+)
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(normalize(text)) if len(token) >= MIN_TERM_LENGTH]
+
+
+def stem(word):
+    """Light English suffix stripping; good enough to fold plurals and verb forms together"""
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith(('ss', 'us', 'is')) and not word.endswith('sses'):
+        return word
+    for suffix, replacement, min_stem in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+            word = word[:len(word) - len(suffix)] + replacement
+            break
+    if len(word) > 4 and word.endswith('e'):
+        word = word[:-1]
+    return word
+
+
+def analyze(text, language='en'):
+    """
+    Returns:
+        list: index terms for `text` in `language`
+    """
+    terms = []
+    for token in tokenize(strip_tags(text or '')):
+        if language == 'en':
+            if token in ENGLISH_STOPWORDS:
+                continue
+            terms.append(token)
+            stemmed = stem(token)
+            if stemmed != token:
+                terms.append(stemmed)
+        else:
+            terms.append(token)
+    return terms
+
+
+def parse_query(query):
+    """
+    Split a search box query into alternatives per word
+
+    Returns:
+        tuple: (terms, prefix) where terms is a list of sets of alternative
+               spellings that must all match and prefix is the last word when
+               the user may still be typing it (no trailing space), else None
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return [], None
+    meaningful = [token for token in tokens if token not in ENGLISH_STOPWORDS] or tokens
+    prefix = None
+    if query and not query[-1].isspace() and meaningful[-1] == tokens[-1]:
+        prefix = meaningful.pop()
+    terms = [{token, stem(token)} for token in meaningful]
+    return terms, prefix
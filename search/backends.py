@@ -0,0 +1,282 @@
+# search/backends.py
+"""
+Full-text index backends
+All three take the analyzed query from search.analysis.parse_query() and
+return (document_id, kind, object_id, language, score) rows, best first.
+The last, possibly unfinished word matches as a prefix or by its stem.
+
+    PostgresBackend  search_vector tsvector column with a GIN index, ts_rank_cd
+    SQLiteBackend    search_fts FTS5 external-content table, bm25()
+    PythonBackend    in-process inverted index with BM25 scoring, for databases
+                     without either (or SQLite builds without FTS5)
+
+The database indexes are kept current by the database itself (generated
+column / triggers, see the migrations). The Python index is built from the
+SearchDocument table on first use, updated in place for this process's own
+writes, and rebuilt when another process bumps the shared index version.
+"""
+
+import bisect
+import logging
+import math
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from .analysis import stem
+
+logger = logging.getLogger(__name__)
+
+# Tunables (override in settings.py)
+SEARCH_BACKEND = getattr(settings, 'SEARCH_BACKEND', 'auto')  # 'auto', 'postgres', 'sqlite' or 'python'
+
+TITLE_WEIGHT = 4.0
+BODY_WEIGHT = 1.0
+
+VERSION_KEY = 'search_index_version'
+
+
+class PostgresBackend:
+    name = 'postgres'
+
+    def _tsquery(self, terms, prefix):
+        parts = ['(' + ' | '.join(sorted(alternatives)) + ')' for alternatives in terms]
+        if prefix:
+            parts.append(f'({prefix}:* | {stem(prefix)})')
+        return ' & '.join(parts)
+
+    def search(self, terms, prefix, kinds=None, limit=100):
+        sql = (
+            "SELECT d.id, d.kind, d.object_id, d.language, ts_rank_cd(d.search_vector, q) AS score "
+            "FROM search_searchdocument d, to_tsquery('simple', %s) q "
+            "WHERE d.search_vector @@ q"
+        )
+        params = [self._tsquery(terms, prefix)]
+        if kinds:
+            sql += " AND d.kind IN (" + ', '.join(['%s'] * len(kinds)) + ")"
+            params.extend(kinds)
+        sql += " ORDER BY score DESC LIMIT %s"
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [(*row[:4], float(row[4])) for row in cursor.fetchall()]
+
+    def document_changed(self, *args, **kwargs):
+        pass
+
+
+class SQLiteBackend:
+    name = 'sqlite'
+
+    def _match(self, terms, prefix):
+        parts = ['(' + ' OR '.join(f'"{term}"' for term in sorted(alternatives)) + ')' for alternatives in terms]
+        if prefix:
+            parts.append(f'("{prefix}"* OR "{stem(prefix)}")')
+        return ' AND '.join(parts)
+
+    def search(self, terms, prefix, kinds=None, limit=100):
+        sql = (
+            f"SELECT d.id, d.kind, d.object_id, d.language, bm25(search_fts, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score "
+            "FROM search_fts JOIN search_searchdocument d ON d.id = search_fts.rowid "
+            "WHERE search_fts MATCH %s"
+        )
+        params = [self._match(terms, prefix)]
+        if kinds:
+            sql += " AND d.kind IN (" + ', '.join(['%s'] * len(kinds)) + ")"
+            params.extend(kinds)
+        sql += " ORDER BY score LIMIT %s"
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            # bm25() is lower-is-better
+            return [(*row[:4], -row[4]) for row in cursor.fetchall()]
+
+    def document_changed(self, *args, **kwargs):
+        pass
+
+
+class PythonBackend:
+    """BM25 over an in-memory inverted index of the SearchDocument table"""
+    name = 'python'
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._version = None
+        self.postings = defaultdict(dict)  # term -> {doc_id: weighted term frequency}
+        self.doc_terms = {}                # doc_id -> set of terms (for removal)
+        self.doc_length = {}
+        self.doc_meta = {}                 # doc_id -> (kind, object_id, language)
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+
+    # --- Maintenance ---
+
+    def _current_version(self):
+        return cache.get(VERSION_KEY, 0)
+
+    def _add(self, doc_id, kind, object_id, language, title_terms, body_terms):
+        weights = Counter()
+        for term in title_terms.split():
+            weights[term] += TITLE_WEIGHT
+        for term in body_terms.split():
+            weights[term] += BODY_WEIGHT
+        for term, weight in weights.items():
+            if term not in self.postings:
+                self._vocabulary_dirty = True
+            self.postings[term][doc_id] = weight
+        self.doc_terms[doc_id] = set(weights)
+        self.doc_length[doc_id] = sum(weights.values())
+        self.doc_meta[doc_id] = (kind, object_id, language)
+
+    def _remove(self, doc_id):
+        for term in self.doc_terms.pop(doc_id, ()):
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+                    self._vocabulary_dirty = True
+        self.doc_length.pop(doc_id, None)
+        self.doc_meta.pop(doc_id, None)
+
+    def load(self):
+        from .models import SearchDocument
+
+        with self._lock:
+            version = self._current_version()
+            self.postings = defaultdict(dict)
+            self.doc_terms, self.doc_length, self.doc_meta = {}, {}, {}
+            rows = SearchDocument.objects.values_list(
+                'id', 'kind', 'object_id', 'language', 'title_terms', 'body_terms'
+            )
+            for row in rows.iterator(chunk_size=5000):
+                self._add(*row)
+            self._vocabulary = sorted(self.postings)
+            self._vocabulary_dirty = False
+            self._version = version
+            self._loaded = True
+
+    def _ensure_current(self):
+        if not self._loaded or self._current_version() != self._version:
+            self.load()
+
+    def document_changed(self, removed_ids=(), added=(), reload=False):
+        """
+        Apply this process's writes in place
+        `added` holds (id, kind, object_id, language, title_terms, body_terms)
+        tuples; reload=True
+        (after bulk rebuilds) drops the index instead.
+        """
+        try:
+            new_version = cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, 1, None)
+            new_version = 1
+        with self._lock:
+            if not self._loaded:
+                return
+            if reload or self._version is None or new_version != self._version + 1:
+                # Someone else wrote too; rebuild on the next search
+                self._loaded = False
+                return
+            for doc_id in removed_ids:
+                self._remove(doc_id)
+            for row in added:
+                self._remove(row[0])
+                self._add(*row)
+            self._version = new_version
+
+    # --- Querying ---
+
+    def _prefix_terms(self, prefix):
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self.postings)
+            self._vocabulary_dirty = False
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + '\uffff')
+        return self._vocabulary[start:end]
+
+    def _scores(self, alternatives, total_docs, average_length):
+        scores = defaultdict(float)
+        for term in alternatives:
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (total_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                norm = tf + self.K1 * (1 - self.B + self.B * self.doc_length[doc_id] / average_length)
+                scores[doc_id] = max(scores[doc_id], idf * tf * (self.K1 + 1) / norm)
+        return scores
+
+    def search(self, terms, prefix, kinds=None, limit=100):
+        with self._lock:
+            self._ensure_current()
+            total_docs = len(self.doc_length)
+            if not total_docs:
+                return []
+            average_length = sum(self.doc_length.values()) / total_docs
+
+            groups = [set(alternatives) for alternatives in terms]
+            if prefix:
+                groups.append(set(self._prefix_terms(prefix)) | {stem(prefix)})
+
+            # Smallest posting lists first so the intersection shrinks fast
+            per_group = sorted(
+                (self._scores(group, total_docs, average_length) for group in groups),
+                key=len,
+            )
+            if not per_group or not per_group[0]:
+                return []
+            totals = dict(per_group[0])
+            for scores in per_group[1:]:
+                totals = {doc_id: score + scores[doc_id] for doc_id, score in totals.items() if doc_id in scores}
+                if not totals:
+                    return []
+
+            if kinds:
+                kinds = set(kinds)
+                totals = {doc_id: score for doc_id, score in totals.items() if self.doc_meta[doc_id][0] in kinds}
+
+            best = sorted(totals.items(), key=lambda item: -item[1])[:limit]
+            return [(doc_id, *self.doc_meta[doc_id], score) for doc_id, score in best]
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _fts5_table_exists():
+    try:
+        return 'search_fts' in connection.introspection.table_names()
+    except Exception as e:
+        logger.error(f"Search backend detection failed: {str(e)}")
+        return False
+
+
+def get_backend():
+    global _backend
+    if _backend is not None:
+        return _backend
+    with _backend_lock:
+        if _backend is None:
+            choice = SEARCH_BACKEND
+            if choice == 'auto':
+                if connection.vendor == 'postgresql':
+                    choice = 'postgres'
+                elif connection.vendor == 'sqlite' and _fts5_table_exists():
+                    choice = 'sqlite'
+                else:
+                    choice = 'python'
+            _backend = {
+                'postgres': PostgresBackend,
+                'sqlite': SQLiteBackend,
+                'python': PythonBackend,
+            }[choice]()
+    return _backend
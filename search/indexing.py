@@ -0,0 +1,351 @@
+# search/indexing.py
+"""
+What gets indexed, keeping the index current, and the query entry point
+Each source turns one model instance into a SearchDocument per language it
+has text for. post_save/post_delete receivers re-index the instance after the
+transaction commits, so editing a module, lesson, topic or story is
+searchable immediately; `rebuild_search_index` does a full rebuild.
+
+search() is what views call: it analyzes the query, asks the active backend
+for ranked documents and folds the language variants of each object into
+one hit.
+"""
+
+import logging
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.html import strip_tags
+
+from .analysis import analyze, parse_query
+from .backends import get_backend
+
+logger = logging.getLogger(__name__)
+
+# Tunables (override in settings.py)
+SEARCH_MAX_RESULTS = getattr(settings, 'SEARCH_MAX_RESULTS', 500)
+
+LANGUAGES = ('en', 'bem', 'ny')
+
+
+@dataclass
+class Hit:
+    kind: str
+    object_id: int
+    title: str
+    url: str
+    language: str
+    score: float
+
+
+def _translated(obj, field, language):
+    value = getattr(obj, field if language == 'en' else f'{field}_{language}', None)
+    return strip_tags(value or '').strip()
+
+
+class Source:
+    """How one model is indexed"""
+    kind = None
+    model_label = None
+    # Saves touching only these fields leave the documents alone
+    counter_fields = frozenset()
+
+    @property
+    def model(self):
+        from django.apps import apps
+        return apps.get_model(self.model_label)
+
+    def queryset(self):
+        """Public objects, with whatever build() needs selected"""
+        raise NotImplementedError
+
+    def build(self, obj):
+        """
+        Returns:
+            list: (language, title, body, url) per language with text
+        """
+        raise NotImplementedError
+
+
+class ModuleSource(Source):
+    kind = 'module'
+    model_label = 'elearning.Module'
+    counter_fields = frozenset([
+        'views_count', 'enrollments_count', 'completions_count', 'lessons_count', 'average_rating', 'updated_at',
+    ])
+
+    def queryset(self):
+        return self.model.objects.filter(is_published=True, is_active=True)
+
+    def build(self, module):
+        from django.urls import reverse
+
+        url = reverse('elearning:module_detail', args=[module.slug]) if module.slug else ''
+        texts = []
+        for language in LANGUAGES:
+            title = _translated(module, 'title', language)
+            description = _translated(module, 'description', language)
+            if title or description:
+                texts.append((language, title or module.title, description, url))
+        return texts
+
+
+class LessonSource(Source):
+    kind = 'lesson'
+    model_label = 'elearning.Lesson'
+
+    def queryset(self):
+        return self.model.objects.filter(
+            is_published=True, module__is_published=True, module__is_active=True
+        ).select_related('module')
+
+    def build(self, lesson):
+        url = lesson.get_absolute_url() if lesson.slug and lesson.module.slug else ''
+        texts = []
+        for language in LANGUAGES:
+            title = _translated(lesson, 'title', language)
+            content = _translated(lesson, 'content', language)
+            if title or content:
+                texts.append((language, title or lesson.title, content, url))
+        return texts
+
+
+class TopicSource(Source):
+    kind = 'topic'
+    model_label = 'community.ForumTopic'
+    counter_fields = frozenset(['views', 'updated_at'])
+
+    def queryset(self):
+        return self.model.objects.all()
+
+    def build(self, topic):
+        # Members write in any of the three languages; the English analyzer
+        # keeps every word as typed, so Bemba/Nyanja posts still match
+        return [('en', topic.title, strip_tags(topic.content), topic.get_absolute_url())]
+
+
+class StorySource(Source):
+    kind = 'story'
+    model_label = 'community.SuccessStory'
+
+    def queryset(self):
+        return self.model.objects.filter(is_approved=True)
+
+    def build(self, story):
+        body = f"{strip_tags(story.content)} {story.location}"
+        return [('en', story.title, body, story.get_absolute_url())]
+
+
+SOURCES = {source.kind: source for source in (ModuleSource(), LessonSource(), TopicSource(), StorySource())}
+
+
+def _documents(source, objects):
+    from .models import SearchDocument
+
+    documents = []
+    for obj in objects:
+        for language, title, body, url in source.build(obj):
+            documents.append(SearchDocument(
+                kind=source.kind,
+                object_id=obj.pk,
+                language=language,
+                title=title[:255],
+                url=url[:500],
+                title_terms=' '.join(analyze(title, language)),
+                body_terms=' '.join(analyze(body, language)),
+            ))
+    return documents
+
+
+def index_objects(kind, object_ids):
+    """Re-index the given objects of one kind (dropping any that are no longer public)"""
+    from .models import SearchDocument
+
+    source = SOURCES[kind]
+    object_ids = list(object_ids)
+    if not object_ids:
+        return 0
+
+    with transaction.atomic():
+        stale = SearchDocument.objects.filter(kind=kind, object_id__in=object_ids)
+        removed_ids = list(stale.values_list('id', flat=True))
+        stale.delete()
+        documents = SearchDocument.objects.bulk_create(
+            _documents(source, source.queryset().filter(pk__in=object_ids)), batch_size=1000
+        )
+
+    get_backend().document_changed(
+        removed_ids=removed_ids,
+        added=[
+            (doc.id, doc.kind, doc.object_id, doc.language, doc.title_terms, doc.body_terms)
+            for doc in documents if doc.id
+        ],
+    )
+    return len(documents)
+
+
+def remove_objects(kind, object_ids):
+    from .models import SearchDocument
+
+    stale = SearchDocument.objects.filter(kind=kind, object_id__in=list(object_ids))
+    removed_ids = list(stale.values_list('id', flat=True))
+    if removed_ids:
+        SearchDocument.objects.filter(id__in=removed_ids).delete()
+        get_backend().document_changed(removed_ids=removed_ids)
+
+
+def rebuild(kinds=None, chunk_size=2000):
+    """
+    Drop and rebuild the documents of every (or the given) kind
+
+    Returns:
+        dict: kind -> documents indexed
+    """
+    from .models import SearchDocument
+
+    counts = {}
+    for kind in kinds or SOURCES:
+        source = SOURCES[kind]
+        with transaction.atomic():
+            SearchDocument.objects.filter(kind=kind).delete()
+            counts[kind] = 0
+            batch = []
+            for obj in source.queryset().iterator(chunk_size=chunk_size):
+                batch.append(obj)
+                if len(batch) >= chunk_size:
+                    counts[kind] += len(SearchDocument.objects.bulk_create(_documents(source, batch)))
+                    batch = []
+            if batch:
+                counts[kind] += len(SearchDocument.objects.bulk_create(_documents(source, batch)))
+    # In-process indexes reload from the table on their next search
+    get_backend().document_changed(reload=True)
+    return counts
+
+
+# --- Signals ---
+
+def _kind_for(sender):
+    for kind, source in SOURCES.items():
+        if source.model is sender:
+            return kind
+    return None
+
+
+def object_saved(sender, instance, update_fields=None, **kwargs):
+    if kwargs.get('raw'):
+        return
+    kind = _kind_for(sender)
+    if update_fields is not None and set(update_fields) <= SOURCES[kind].counter_fields:
+        return  # enrollment, rating and view counters
+    pk = instance.pk
+
+    def reindex():
+        from .models import SearchDocument
+
+        try:
+            was_public = kind == 'module' and SearchDocument.objects.filter(kind=kind, object_id=pk).exists()
+            is_public = index_objects(kind, [pk]) > 0
+            if kind == 'module' and was_public != is_public:
+                # Lesson visibility follows the module's published/active state
+                lesson_ids = SOURCES['lesson'].model.objects.filter(module_id=pk).values_list('id', flat=True)
+                index_objects('lesson', lesson_ids)
+        except Exception as e:
+            logger.error(f"Search indexing failed for {kind} {pk}: {str(e)}")
+
+    transaction.on_commit(reindex)
+
+
+def object_deleted(sender, instance, **kwargs):
+    kind = _kind_for(sender)
+    pk = instance.pk
+
+    def remove():
+        try:
+            remove_objects(kind, [pk])
+        except Exception as e:
+            logger.error(f"Search index removal failed for {kind} {pk}: {str(e)}")
+
+    transaction.on_commit(remove)
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save
+
+    for kind, source in SOURCES.items():
+        post_save.connect(object_saved, sender=source.model, dispatch_uid=f'search_index_{kind}_saved')
+        post_delete.connect(object_deleted, sender=source.model, dispatch_uid=f'search_index_{kind}_deleted')
+
+
+# --- Querying ---
+
+def _ranked(query, kinds, limit):
+    """Best-scoring document per object: {(kind, object_id): (score, [(language, doc_id), ...])}"""
+    terms, prefix = parse_query(query)
+    if not terms and not prefix:
+        return {}
+    try:
+        rows = get_backend().search(terms, prefix, kinds=kinds, limit=limit * len(LANGUAGES))
+    except Exception as e:
+        logger.error(f"Search failed for {query!r}: {str(e)}")
+        return {}
+
+    objects = {}
+    for doc_id, kind, object_id, language, score in rows:
+        best = objects.get((kind, object_id))
+        if best is None:
+            objects[(kind, object_id)] = (score, [(language, doc_id)])
+        else:
+            best[1].append((language, doc_id))
+            if score > best[0]:
+                objects[(kind, object_id)] = (score, best[1])
+    return objects
+
+
+def search(query, kinds=None, language='en', limit=50):
+    """
+    Ranked search across the indexed content
+
+    Args:
+        query: What the user typed; the last word matches as a prefix unless
+               followed by a space
+        kinds: Optional list of 'module', 'lesson', 'topic', 'story'
+        language: Preferred language for the returned titles
+
+    Returns:
+        list: Hit objects, best first, one per object
+    """
+    from .models import SearchDocument
+
+    objects = _ranked(query, kinds, limit)
+    top = sorted(objects.items(), key=lambda item: -item[1][0])[:limit]
+    if not top:
+        return []
+
+    # Title in the preferred language, else English, else whatever matched
+    preference = {language: 0, 'en': 1}
+    chosen = {
+        key: min(variants, key=lambda variant: preference.get(variant[0], 2))[1]
+        for key, (_score, variants) in top
+    }
+    documents = SearchDocument.objects.in_bulk(list(chosen.values()))
+    hits = []
+    for key, (score, _variants) in top:
+        doc = documents.get(chosen[key])
+        if doc is not None:
+            hits.append(Hit(doc.kind, doc.object_id, doc.title, doc.url, doc.language, score))
+    return hits
+
+
+def is_indexed(kind):
+    """Whether any documents of this kind exist (False until the first rebuild after deploying the index)"""
+    from .models import SearchDocument
+
+    return SearchDocument.objects.filter(kind=kind).exists()
+
+
+def search_ids(kind, query, limit=SEARCH_MAX_RESULTS):
+    """Ranked object ids of one kind, best first (no document fetch)"""
+    objects = _ranked(query, [kind], limit)
+    ranked = sorted(objects.items(), key=lambda item: -item[1][0])[:limit]
+    return [object_id for (_kind, object_id), _best in ranked]
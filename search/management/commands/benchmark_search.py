@@ -0,0 +1,150 @@
+# search/management/commands/benchmark_search.py
+"""
+Benchmark for module search.
+Inserts synthetic trilingual modules (Zipf-distributed vocabulary) inside a transaction that is rolled back
+afterwards, indexes them, and times the old module_list filter (four
+icontains predicates, unranked) against the full-text path (ranked ids from
+the active backend, then the same queryset filtered by id) and the
+in-process Python index.
+Run: python manage.py benchmark_search --docs 10000 100000
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from elearning.models import Category, Module
+from search.analysis import parse_query
+from search.backends import PythonBackend, get_backend
+from search.indexing import SOURCES, _documents, search_ids
+from search.models import SearchDocument
+
+ENGLISH = (
+    'waste plastic bottles recycling composting organic household collection sorting landfill '
+    'burning hazardous batteries electronics reuse reduce community cleanup drainage water '
+    'sanitation market street garden soil manure paper glass metal cans bags hygiene health'
+).split()
+BEMBA = 'ukusunga ifya bucushi ukwisula amenshi ifisote umushili ukubomba icalo ukusambilila'.split()
+NYANJA = 'zinyalala kusamalira madzi nthaka kubwezeretsa mapepala chilengedwe ukhondo msika'.split()
+
+QUERIES = ['plastic', 'composting organic', 'recyc', 'ukusunga', 'zinyalala madzi', 'battery hazardous']
+
+
+def vocabulary(seed=7, filler=5000):
+    """Real topic words mixed into filler words with Zipf-like frequencies"""
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnoprstuwyz'
+    words = ENGLISH + BEMBA + NYANJA + [
+        ''.join(rng.choices(letters, k=rng.randint(4, 9))) for _ in range(filler)
+    ]
+    rng.shuffle(words)
+    cumulative, total = [], 0.0
+    for rank in range(len(words)):
+        total += 1.0 / (rank + 1)
+        cumulative.append(total)
+    return words, cumulative
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare icontains module search with the full-text search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--docs', type=int, nargs='+', default=[10000, 100000], help='Module counts')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query')
+
+    def synthetic_modules(self, count, category, offset):
+        rng = random.Random(offset)
+        words, cumulative = vocabulary()
+
+        def text(k):
+            return ' '.join(rng.choices(words, cum_weights=cumulative, k=k))
+
+        for i in range(count):
+            n = offset + i
+            yield Module(
+                title=f'{rng.choice(ENGLISH)} {text(3)}'.capitalize(),
+                title_bem=f'{rng.choice(BEMBA)} {text(2)}' if rng.random() < 0.5 else None,
+                title_ny=f'{rng.choice(NYANJA)} {text(2)}' if rng.random() < 0.5 else None,
+                description=text(60),
+                description_bem=text(30) if rng.random() < 0.3 else None,
+                description_ny=text(30) if rng.random() < 0.3 else None,
+                category=category,
+                difficulty='beginner',
+                slug=f'bench-module-{n}',
+            )
+
+    def best(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - started)
+        return min(timings) * 1000, result
+
+    def icontains_page(self, query):
+        modules = Module.objects.filter(is_published=True, is_active=True).filter(
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Q(title_bem__icontains=query) |
+            Q(title_ny__icontains=query)
+        ).order_by('-is_featured', '-enrollments_count', 'order')
+        return modules.count(), list(modules[:20])
+
+    def search_page(self, query):
+        ids = search_ids('module', query)
+        modules = Module.objects.filter(is_published=True, is_active=True, id__in=ids)
+        return modules.count(), list(modules[:20])
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        backend = get_backend()
+        source = SOURCES['module']
+
+        try:
+            with transaction.atomic():
+                category = Category.objects.create(name='Benchmark', slug='benchmark-search')
+                inserted = 0
+                for size in sorted(options['docs']):
+                    started = time.perf_counter()
+                    batch = []
+                    for module in self.synthetic_modules(size - inserted, category, inserted):
+                        batch.append(module)
+                        if len(batch) >= 2000:
+                            SearchDocument.objects.bulk_create(_documents(source, Module.objects.bulk_create(batch)))
+                            batch = []
+                    if batch:
+                        SearchDocument.objects.bulk_create(_documents(source, Module.objects.bulk_create(batch)))
+                    inserted = size
+                    self.stdout.write(
+                        f'\n📥 {size} modules ({SearchDocument.objects.filter(kind="module").count()} documents) '
+                        f'inserted and indexed in {time.perf_counter() - started:.1f}s'
+                    )
+
+                    python_index = PythonBackend()
+                    load_ms, _ = self.best(python_index.load, 1)
+                    self.stdout.write(f'   python index built in {load_ms:.0f} ms')
+
+                    self.stdout.write(
+                        f'   {"query":<22} {"icontains":>12} {backend.name + " page":>14} {"python index":>13}   matches'
+                    )
+                    for query in QUERIES:
+                        old_ms, (old_count, _) = self.best(lambda: self.icontains_page(query), repeat)
+                        new_ms, (new_count, _) = self.best(lambda: self.search_page(query), repeat)
+                        terms, prefix = parse_query(query)
+                        py_ms, _ = self.best(lambda: python_index.search(terms, prefix, kinds=['module'], limit=500), repeat)
+                        self.stdout.write(
+                            f'   {query:<22} {old_ms:>9.1f} ms {new_ms:>11.1f} ms {py_ms:>10.1f} ms   '
+                            f'{old_count} substring / {new_count} ranked (top 500)'
+                        )
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Done (synthetic modules rolled back)'))
@@ -0,0 +1,31 @@
+# search/management/commands/rebuild_search_index.py
+"""
+Rebuild the full-text search documents from the source tables.
+Saves and deletes keep the index current on their own; run this after
+bulk imports or raw SQL changes, or once after deploying the search app.
+Run: python manage.py rebuild_search_index [--kind module lesson]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from search.backends import get_backend
+from search.indexing import SOURCES, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', nargs='+', choices=list(SOURCES), help='Only rebuild these kinds')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = rebuild(options['kind'])
+        for kind, count in counts.items():
+            self.stdout.write(f'  📄 {kind}: {count} document(s)')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Indexed {sum(counts.values())} document(s) in {time.perf_counter() - started:.2f}s '
+            f'(backend: {get_backend().name})'
+        ))
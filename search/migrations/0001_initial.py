@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('language', models.CharField(choices=[('en', 'English'), ('bem', 'Bemba'), ('ny', 'Nyanja')], default='en', max_length=3)),
+                ('title', models.CharField(max_length=255)),
+                ('url', models.CharField(blank=True, max_length=500)),
+                ('title_terms', models.TextField(blank=True)),
+                ('body_terms', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id', 'language'), name='unique_search_document')],
+            },
+        ),
+    ]
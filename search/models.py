@@ -0,0 +1,33 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    One searchable text per (source object, language)
+    title_terms/body_terms hold the analyzed tokens (see search.analysis); the
+    full-text index over them is a SQLite FTS5 table or a Postgres tsvector
+    column created in the migrations, or the in-process index in
+    search.backends when neither is available.
+    """
+    LANGUAGE_CHOICES = [
+        ('en', 'English'),
+        ('bem', 'Bemba'),
+        ('ny', 'Nyanja'),
+    ]
+
+    kind = models.CharField(max_length=20)  # 'module', 'lesson', 'topic', 'story'
+    object_id = models.PositiveBigIntegerField()
+    language = models.CharField(max_length=3, choices=LANGUAGE_CHOICES, default='en')
+    title = models.CharField(max_length=255)
+    url = models.CharField(max_length=500, blank=True)
+    title_terms = models.TextField(blank=True)
+    body_terms = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id', 'language'], name='unique_search_document'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} [{self.language}] {self.title}"
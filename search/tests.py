@@ -0,0 +1,165 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from elearning.models import Category, Lesson, Module
+
+from .indexing import SOURCES
+from .models import SearchDocument
+
+LOCMEM = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'search-tests'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'search-test-sessions'},
+}
+
+
+@override_settings(CACHES=LOCMEM)
+class IndexSignalTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        user = get_user_model().objects.create(username='author', email='author@example.com')
+        category = Category.objects.create(name='Soil', slug='soil')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.module = Module.objects.create(
+                title='Composting at home', slug='composting', description='Turn food scraps into soil',
+                category=category, created_by=user, is_published=True,
+            )
+            for number in range(3):
+                Lesson.objects.create(
+                    module=self.module, title=f'Lesson {number}', slug=f'lesson-{number}',
+                    content_type='text', content='Layer greens and browns', is_published=True,
+                )
+
+    def indexed(self, kind):
+        return set(SearchDocument.objects.filter(kind=kind).values_list('object_id', flat=True))
+
+    def test_counter_saves_do_not_reindex(self):
+        from unittest import mock
+
+        self.module.enrollments_count = 5
+        with mock.patch('search.indexing.index_objects') as index_objects:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.module.save(update_fields=['enrollments_count'])
+                self.module.save(update_fields=['average_rating'])
+        index_objects.assert_not_called()
+
+    def test_lessons_follow_module_visibility_changes_only(self):
+        from unittest import mock
+        from .indexing import index_objects
+
+        lesson_ids = set(self.module.lessons.values_list('id', flat=True))
+        self.assertEqual(self.indexed('lesson'), lesson_ids)
+
+        # A title edit reindexes the module alone
+        with mock.patch('search.indexing.index_objects', wraps=index_objects) as spy:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.module.title = 'Composting in the yard'
+                self.module.save()
+        self.assertEqual([call.args[0] for call in spy.call_args_list], ['module'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.module.is_published = False
+            self.module.save()
+        self.assertEqual(self.indexed('module'), set())
+        self.assertEqual(self.indexed('lesson'), set())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.module.is_published = True
+            self.module.save()
+        self.assertEqual(self.indexed('lesson'), lesson_ids)
+
+    def test_every_counter_field_exists(self):
+        for source in SOURCES.values():
+            field_names = {field.name for field in source.model._meta.get_fields()}
+            self.assertLessEqual(source.counter_fields, field_names, source.kind)
+
+
+class AnalysisTests(TestCase):
+
+    def test_stemming_folds_word_forms(self):
+        from .analysis import analyze
+
+        self.assertEqual(analyze('Recycling', 'en'), ['recycling', 'recycl'])
+        self.assertIn('recycl', analyze('recycled bottles', 'en'))
+        self.assertIn('bottl', analyze('recycled bottles', 'en'))
+        # No English suffix rules for Bemba and Nyanja
+        self.assertEqual(analyze('ukusunga', 'bem'), ['ukusunga'])
+
+    def test_diacritics_and_case_are_folded(self):
+        from .analysis import analyze
+
+        self.assertEqual(analyze('CAFÉ Crème', 'ny'), ['cafe', 'creme'])
+
+    def test_last_word_is_a_prefix_until_a_space(self):
+        from .analysis import parse_query
+
+        self.assertEqual(parse_query('plastic bott'), ([{'plastic'}], 'bott'))
+        self.assertEqual(parse_query('plastic bottles '), ([{'plastic'}, {'bottles', 'bottl'}], None))
+        self.assertEqual(parse_query('the '), ([{'the'}], None))
+
+
+@override_settings(CACHES=LOCMEM)
+class SearchTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        user = get_user_model().objects.create(username='author', email='author@example.com')
+        category = Category.objects.create(name='Waste', slug='waste')
+        self.recycling = Module.objects.create(
+            title='Recycling plastic', slug='recycling', description='Sort bottles before collection day',
+            category=category, created_by=user, is_published=True,
+        )
+        self.compost = Module.objects.create(
+            title='Composting at home', slug='compost', description='Garden waste and recycled paper',
+            category=category, created_by=user, is_published=True,
+        )
+        self.cafe = Module.objects.create(
+            title='Café waste', slug='cafe', description='Coffee grounds make good compost',
+            category=category, created_by=user, is_published=True,
+        )
+        self.lesson = Lesson.objects.create(
+            module=self.compost, title='Turning the heap', slug='turning', content_type='text',
+            content='Recycle kitchen peelings weekly', is_published=True,
+        )
+        from .indexing import rebuild
+        rebuild()
+
+    def ids(self, query, kind='module'):
+        from .indexing import search_ids
+        return search_ids(kind, query)
+
+    def test_stemmed_query_matches_other_forms(self):
+        # "recycled" in a description, "Recycling" in a title: title weight ranks it first
+        self.assertEqual(self.ids('recycles '), [self.recycling.id, self.compost.id])
+
+    def test_accented_and_plain_spellings_match(self):
+        self.assertEqual(self.ids('cafe '), [self.cafe.id])
+        self.assertEqual(self.ids('CAFÉ '), [self.cafe.id])
+
+    def test_last_word_matches_as_prefix(self):
+        self.assertEqual(self.ids('compo'), [self.compost.id, self.cafe.id])
+        self.assertEqual(self.ids('compo '), [])
+        self.assertEqual(self.ids('waste bott'), [])
+        self.assertEqual(self.ids('plastic bott'), [self.recycling.id])
+
+    def test_lessons_of_unpublished_modules_drop_out(self):
+        self.assertEqual(self.ids('peelings', 'lesson'), [self.lesson.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.compost.is_published = False
+            self.compost.save()
+        self.assertEqual(self.ids('peelings', 'lesson'), [])
+        self.assertNotIn(self.compost.id, self.ids('compo'))
+
+    def test_sqlite_and_python_backends_rank_alike(self):
+        from .analysis import parse_query
+        from .backends import PythonBackend, SQLiteBackend, _fts5_table_exists
+
+        if not _fts5_table_exists():
+            self.skipTest('SQLite build without FTS5')
+        python = PythonBackend()
+        for query in ['recycl', 'recycling ', 'waste ', 'compo', 'garden waste', 'sort bottles ']:
+            terms, prefix = parse_query(query)
+            expected = [row[:4] for row in SQLiteBackend().search(terms, prefix)]
+            self.assertTrue(expected, query)
+            self.assertEqual([row[:4] for row in python.search(terms, prefix)], expected, query)
@@ -0,0 +1,48 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from .indexing import SOURCES, search
+
+KIND_LABELS = {
+    'module': 'Module',
+    'lesson': 'Lesson',
+    'topic': 'Forum Topic',
+    'story': 'Success Story',
+}
+
+
+def _kinds(request):
+    kinds = [kind for kind in request.GET.get('type', '').split(',') if kind in SOURCES]
+    return kinds or None
+
+
+@login_required
+def search_view(request):
+    """Ranked results across modules, lessons, forum topics and success stories"""
+    query = request.GET.get('q', '').strip()
+    kinds = _kinds(request)
+    language = request.session.get('language', 'en')
+    hits = search(query, kinds=kinds, language=language, limit=50) if query else []
+
+    context = {
+        'query': query,
+        'hits': [{'hit': hit, 'label': KIND_LABELS[hit.kind]} for hit in hits],
+        'kind_labels': KIND_LABELS,
+        'selected_type': request.GET.get('type', ''),
+    }
+    return render(request, 'search/results.html', context)
+
+
+@login_required
+def suggest(request):
+    """Search-as-you-type: the last word matches as a prefix"""
+    query = request.GET.get('q', '')
+    language = request.session.get('language', 'en')
+    hits = search(query, kinds=_kinds(request), language=language, limit=8) if len(query.strip()) >= 2 else []
+    return JsonResponse({
+        'results': [
+            {'type': hit.kind, 'label': KIND_LABELS[hit.kind], 'title': hit.title, 'url': hit.url}
+            for hit in hits
+        ]
+    })
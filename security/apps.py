@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class SecurityConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'security'
+
+    def ready(self):
+        from . import inspection, permissions
+        inspection.connect_signals()
+        permissions.connect_signals()
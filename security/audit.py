@@ -0,0 +1,318 @@
+# security/audit.py
+"""
+Write-behind audit log
+log_activity() used to INSERT one AuditLog row per admin, admin_dashboard
+and api page view (and per login/logout) inside the request. Entries now go
+into a bounded per-process buffer and a background thread writes them with
+bulk_create:
+
+- a flush happens when AUDIT_BATCH_SIZE entries are waiting, every
+  AUDIT_FLUSH_INTERVAL seconds, and at process exit
+- backpressure: when AUDIT_BUFFER_SIZE entries are waiting, the request
+  waits up to AUDIT_BACKPRESSURE_TIMEOUT seconds for the flusher to make
+  room, then writes its entry to the fallback file itself. Entries are
+  never dropped.
+- when a bulk insert fails (database down or locked), the batch is
+  appended to AUDIT_FALLBACK_PATH as JSON lines. After the next successful
+  flush the file is claimed (renamed, so one process replays it) and
+  inserted. A claim left behind by a replay that failed part-way is taken
+  over only once its owner has exited or it has not been touched for
+  AUDIT_REPLAY_LEASE seconds, so two workers never replay the same entries.
+
+Entries are enqueued on commit, so an entry is kept exactly when the
+surrounding transaction commits, as it was with the synchronous INSERT.
+Audit pages may lag behind by up to one flush interval.
+"""
+
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+# Tunables (override in settings.py)
+BUFFER_SIZE = getattr(settings, 'AUDIT_BUFFER_SIZE', 10000)
+BATCH_SIZE = getattr(settings, 'AUDIT_BATCH_SIZE', 500)
+FLUSH_INTERVAL = getattr(settings, 'AUDIT_FLUSH_INTERVAL', 2.0)  # seconds
+BACKPRESSURE_TIMEOUT = getattr(settings, 'AUDIT_BACKPRESSURE_TIMEOUT', 0.5)  # seconds
+FALLBACK_PATH = getattr(
+    settings, 'AUDIT_FALLBACK_PATH', os.path.join(getattr(settings, 'BASE_DIR', '.'), 'logs', 'audit-fallback.jsonl')
+)
+REPLAY_INTERVAL = getattr(settings, 'AUDIT_REPLAY_INTERVAL', 60)  # seconds between fallback file checks
+REPLAY_LEASE = getattr(settings, 'AUDIT_REPLAY_LEASE', 600)  # seconds before an untouched claim is taken over
+
+
+class AuditBuffer:
+    """Bounded buffer of AuditLog field dicts, drained by one flusher thread per process"""
+
+    def __init__(self, capacity=BUFFER_SIZE, batch_size=BATCH_SIZE, interval=FLUSH_INTERVAL,
+                 fallback_path=FALLBACK_PATH, backpressure_timeout=BACKPRESSURE_TIMEOUT):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.interval = interval
+        self.fallback_path = fallback_path
+        self.backpressure_timeout = backpressure_timeout
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._entries = deque()
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._thread = None
+        self._last_replay_check = 0
+        self.counters = {'recorded': 0, 'flushed': 0, 'spilled': 0, 'replayed': 0, 'backpressure': 0, 'flushes': 0}
+
+    def _ensure_started(self):
+        if self._pid != os.getpid():
+            # Forked (gunicorn preload_app): the parent's thread and entries are not ours
+            self._reset()
+        if self._thread is None:
+            with self._condition:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='audit-flusher', daemon=True)
+                    self._thread.start()
+
+    def record(self, entry):
+        """Queue one AuditLog field dict"""
+        self._ensure_started()
+        with self._condition:
+            if len(self._entries) >= self.capacity:
+                self.counters['backpressure'] += 1
+                self._condition.notify_all()
+                self._condition.wait_for(lambda: len(self._entries) < self.capacity, timeout=self.backpressure_timeout)
+            queued = len(self._entries) < self.capacity
+            if queued:
+                self._entries.append(entry)
+                self.counters['recorded'] += 1
+                if len(self._entries) >= self.batch_size:
+                    self._condition.notify_all()
+        if not queued:
+            # The flusher cannot keep up (or the database is stuck): keep the entry on disk
+            self._spill([entry])
+
+    def pending(self):
+        return len(self._entries)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._entries) >= self.batch_size, timeout=self.interval)
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Audit flush failed: {str(e)}")
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        """Write everything queued so far; returns the number of entries written to the database"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._condition:
+                    batch = [self._entries.popleft() for _ in range(min(self.batch_size, len(self._entries)))]
+                    self._condition.notify_all()
+                if not batch:
+                    break
+                if not self._write(batch):
+                    self._spill(batch)
+                    break
+                written += len(batch)
+            if written:
+                self._maybe_replay()
+        return written
+
+    def _write(self, batch):
+        from django.db import IntegrityError
+        from .models import AuditLog
+
+        try:
+            try:
+                AuditLog.objects.bulk_create([AuditLog(**entry) for entry in batch])
+            except IntegrityError:
+                # A user deleted while their entries were queued: keep the entries, as SET_NULL would
+                batch = _without_deleted_users(batch)
+                AuditLog.objects.bulk_create([AuditLog(**entry) for entry in batch])
+        except Exception as e:
+            logger.error(f"Audit bulk insert of {len(batch)} entries failed: {str(e)}")
+            return False
+        self.counters['flushed'] += len(batch)
+        self.counters['flushes'] += 1
+        return True
+
+    # --- Fallback file ---
+
+    def _spill(self, entries):
+        lines = ''.join(json.dumps(entry, cls=DjangoJSONEncoder, default=str) + '\n' for entry in entries)
+        try:
+            os.makedirs(os.path.dirname(self.fallback_path) or '.', exist_ok=True)
+            with self._file_lock, open(self.fallback_path, 'a', encoding='utf-8') as fallback:
+                fallback.write(lines)
+            self.counters['spilled'] += len(entries)
+        except OSError as e:
+            logger.error(f"Audit fallback write failed, logging {len(entries)} entries instead: {str(e)}")
+            for entry in entries:
+                logger.warning(f"AUDIT {json.dumps(entry, cls=DjangoJSONEncoder, default=str)}")
+
+    def _maybe_replay(self):
+        now = time.monotonic()
+        if now - self._last_replay_check < REPLAY_INTERVAL:
+            return
+        self._last_replay_check = now
+        self.replay()
+
+    def replay(self):
+        """Insert entries from the fallback file (and unfinished earlier replays); returns how many"""
+        replayed = 0
+        claims = [path for path in glob.glob(f'{self.fallback_path}.*.replay') if not self._claim_in_use(path)]
+        for number, source in enumerate([self.fallback_path] + claims):
+            # Renaming claims the file: only one process replays it. Its mtime is the lease
+            claimed = f'{self.fallback_path}.{os.getpid()}.{time.time_ns()}.{number}.replay'
+            try:
+                with self._file_lock:
+                    os.rename(source, claimed)
+                os.utime(claimed)
+            except OSError:
+                continue
+            try:
+                with open(claimed, encoding='utf-8') as fallback:
+                    entries = [_decode(line) for line in fallback if line.strip()]
+                for start in range(0, len(entries), self.batch_size):
+                    if not self._write(entries[start:start + self.batch_size]):
+                        # Keep the rest for a later attempt
+                        with open(claimed, 'w', encoding='utf-8') as remaining:
+                            remaining.writelines(
+                                json.dumps(entry, cls=DjangoJSONEncoder, default=str) + '\n'
+                                for entry in entries[start:]
+                            )
+                        return replayed
+                    replayed += len(entries[start:start + self.batch_size])
+                    self.counters['replayed'] += len(entries[start:start + self.batch_size])
+                    os.utime(claimed)
+                os.remove(claimed)
+            except (OSError, ValueError) as e:
+                logger.error(f"Audit fallback replay of {claimed} failed: {str(e)}")
+        return replayed
+
+    def _claim_in_use(self, path):
+        """True while the process that claimed `path` may still be replaying it"""
+        try:
+            pid = int(path[len(self.fallback_path) + 1:].split('.')[0])
+            age = time.time() - os.path.getmtime(path)
+        except (ValueError, OSError):
+            return False
+        if pid == os.getpid() or age > REPLAY_LEASE:
+            return False  # our own unfinished claim, or its owner stopped renewing it
+        if os.name != 'posix':
+            return True  # no cheap liveness check; wait for the lease
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            pass  # exists but belongs to someone else
+        return True
+
+
+def _without_deleted_users(batch):
+    from django.contrib.auth import get_user_model
+
+    user_ids = {entry['user_id'] for entry in batch if entry.get('user_id')}
+    existing = set(get_user_model().objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+    return [
+        dict(entry, user_id=None, details=dict(entry.get('details') or {}, deleted_user_id=entry['user_id']))
+        if entry.get('user_id') and entry['user_id'] not in existing else entry
+        for entry in batch
+    ]
+
+
+def _decode(line):
+    entry = json.loads(line)
+    if isinstance(entry.get('timestamp'), str):
+        entry['timestamp'] = parse_datetime(entry['timestamp'])
+    return entry
+
+
+_buffer = AuditBuffer()
+
+
+def record(entry):
+    """Queue an AuditLog field dict once the current transaction commits"""
+    if getattr(settings, 'AUDIT_ASYNC', True):
+        transaction.on_commit(lambda: _buffer.record(entry))
+    else:
+        from .models import AuditLog
+        AuditLog.objects.create(**entry)
+
+
+def flush():
+    """Write out everything queued in this process (shutdown hooks, management commands)"""
+    if _buffer._pid == os.getpid():
+        return _buffer.flush()
+    return 0
+
+
+def stats():
+    return dict(_buffer.counters, pending=_buffer.pending(), capacity=_buffer.capacity)
+
+
+atexit.register(flush)
+
+
+# --- Retention ---
+
+def prune(before, archive_dir=None, batch_size=5000):
+    """
+    Delete audit entries older than `before`, one day at a time (oldest
+    first), optionally archiving each day to <archive_dir>/audit-YYYY-MM-DD.jsonl.gz
+
+    Every batch is a short primary-key DELETE driven by the timestamp index,
+    so pruning millions of rows never holds a long lock.
+
+    Yields:
+        tuple: (date, entries deleted from that day)
+    """
+    import gzip
+    from datetime import timedelta
+    from .models import AuditLog
+
+    oldest = AuditLog.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+    if oldest is None or oldest >= before:
+        return
+    if archive_dir:
+        os.makedirs(archive_dir, exist_ok=True)
+
+    day_start = oldest.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day_start < before:
+        day_end = min(day_start + timedelta(days=1), before)
+        bucket = AuditLog.objects.filter(timestamp__gte=day_start, timestamp__lt=day_end).order_by('timestamp')
+        deleted = 0
+        while True:
+            rows = list(bucket.values(
+                'id', 'user_id', 'action', 'resource_type', 'resource_id', 'ip_address', 'user_agent',
+                'timestamp', 'details', 'success',
+            )[:batch_size])
+            if not rows:
+                break
+            if archive_dir:
+                path = os.path.join(archive_dir, f'audit-{day_start:%Y-%m-%d}.jsonl.gz')
+                with gzip.open(path, 'at', encoding='utf-8') as archive:
+                    archive.writelines(json.dumps(row, cls=DjangoJSONEncoder, default=str) + '\n' for row in rows)
+            AuditLog.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+            deleted += len(rows)
+        if deleted:
+            yield day_start.date(), deleted
+        day_start = day_end
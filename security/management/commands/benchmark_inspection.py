@@ -0,0 +1,94 @@
+# security/management/commands/benchmark_inspection.py
+"""
+Microbenchmark for the suspicious-pattern check in SecurityMiddleware.
+Times the previous implementation (str(GET) + str(POST) + path, lowercased
+once per pattern) against the compiled inspector on:
+
+- a typical GET with a query string
+- a typical url-encoded form POST
+- a 5 MB multipart upload (the old check parsed it to print request.POST)
+
+Only the check is timed; each iteration gets a freshly built request so
+parsing done by the check is included.
+Run: python manage.py benchmark_inspection --iterations 500
+"""
+
+import statistics
+import time
+from urllib.parse import urlencode
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from security.inspection import DEFAULT_RULES, Inspector
+
+LEGACY_PATTERNS = [
+    'union select', 'drop table', 'script>', 'javascript:', '../', '..\\', 'cmd.exe', '/etc/passwd', 'base64_decode',
+]
+
+
+def legacy_scan(request):
+    """The check as it was (without logging)"""
+    request_data = str(request.GET) + str(request.POST) + request.path
+    for pattern in LEGACY_PATTERNS:
+        if pattern.lower() in request_data.lower():
+            return pattern
+    return None
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request overhead of the old and the compiled suspicious-pattern check'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500, help='Requests per case and implementation')
+        parser.add_argument('--upload-mb', type=int, default=5, help='Size of the multipart upload')
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        upload = b'\x89PNG' + b'x' * (options['upload_mb'] * 1024 * 1024)
+        cases = [
+            ('GET with query string', lambda: factory.get(
+                '/elearning/modules/', {'search': 'waste sorting', 'category': '3', 'difficulty': 'beginner',
+                                        'sort': 'popular', 'page': '2'}
+            ), options['iterations']),
+            ('url-encoded form POST', lambda: factory.post(
+                '/community/reports/new/', urlencode({f'field_{i}': f'value number {i} with some text' for i in range(12)}),
+                content_type='application/x-www-form-urlencoded'
+            ), options['iterations']),
+            (f'{options["upload_mb"]} MB multipart upload', lambda: factory.post(
+                '/reporting/report/', {'description': 'Dumping near the market', 'location': 'Lusaka',
+                                       'photo': SimpleUploadedFile('photo.png', upload, content_type='image/png')}
+            ), max(10, options['iterations'] // 20)),
+        ]
+
+        inspector = Inspector(DEFAULT_RULES)
+        self.stdout.write(f'🧪 Suspicious-pattern check, per request ({len(DEFAULT_RULES)} rules)')
+        for label, build, iterations in cases:
+            results = {}
+            for name, check in [('before', legacy_scan), ('after', inspector.scan)]:
+                samples = []
+                for _ in range(iterations):
+                    request = build()
+                    start = time.perf_counter()
+                    check(request)
+                    samples.append(time.perf_counter() - start)
+                results[name] = samples
+            before, after = statistics.median(results['before']), statistics.median(results['after'])
+            self.stdout.write(
+                f'   {label:<26} before p50 {before * 1e6:10.1f}µs p99 {percentile(results["before"], 99) * 1e6:10.1f}µs | '
+                f'after p50 {after * 1e6:8.1f}µs p99 {percentile(results["after"], 99) * 1e6:8.1f}µs | '
+                f'{before / after if after else 0:,.0f}x'
+            )
+
+        # Both must agree on what is suspicious
+        probes = ['/x/?q=1 UNION  SELECT', '/x/?next=../../etc', '/x/?u=javascript:alert(1)', '/x/?q=hello']
+        for url in probes:
+            legacy, compiled = legacy_scan(factory.get(url)), inspector.scan(factory.get(url))
+            mark = '✅' if bool(legacy) == bool(compiled) or (compiled and not legacy) else '❌'
+            self.stdout.write(f'   {mark} {url}: before {legacy!r}, after {compiled!r}')
@@ -0,0 +1,126 @@
+# security/management/commands/benchmark_ratelimit.py
+"""
+Benchmark for the rate limiter under many distinct clients.
+
+Replays a synthetic request stream from --ips client addresses (a few hot
+addresses send most of the traffic, the rest one or two requests each)
+and reports the per-request cost of:
+
+- the old RateLimitMiddleware (per-process dict rebuilt on every request),
+  on a shorter stream because it slows down as clients accumulate
+- the sliding-window limiter on LocMemCache and on the shared SQLite cache
+
+plus how many requests each limiter refused and whether every refused
+client was a hot one. Cache files go to a temporary directory.
+Run: python manage.py benchmark_ratelimit --ips 10000 --requests 50000
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from security import ratelimit
+
+
+class LegacyRateLimiter:
+    """The previous RateLimitMiddleware.process_request, without logging"""
+
+    def __init__(self):
+        self.request_counts = {}
+
+    def check(self, ip_address):
+        current_time = timezone.now()
+        cutoff_time = current_time - timedelta(hours=1)
+        self.request_counts = {
+            ip: timestamps for ip, timestamps in self.request_counts.items()
+            if any(ts > cutoff_time for ts in timestamps)
+        }
+        if ip_address not in self.request_counts:
+            self.request_counts[ip_address] = []
+        self.request_counts[ip_address] = [ts for ts in self.request_counts[ip_address] if ts > cutoff_time]
+        self.request_counts[ip_address].append(current_time)
+        return len(self.request_counts[ip_address]) <= 100
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def request_stream(ips, count, hot=20, hot_share=0.5, seed=7):
+    rng = random.Random(seed)
+    addresses = [f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}' for i in range(ips)]
+    return [
+        addresses[rng.randrange(hot)] if rng.random() < hot_share else addresses[rng.randrange(hot, ips)]
+        for _ in range(count)
+    ], set(addresses[:hot])
+
+
+class Command(BaseCommand):
+    help = 'Measure rate limiter cost and accuracy under a simulated many-client load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ips', type=int, default=10000, help='Distinct client addresses')
+        parser.add_argument('--requests', type=int, default=50000, help='Requests in the stream')
+        parser.add_argument('--legacy-requests', type=int, default=5000, help='Requests replayed on the old limiter')
+        parser.add_argument('--limit', type=int, default=100, help='Requests allowed per client per period')
+
+    def handle(self, *args, **options):
+        stream, hot = request_stream(options['ips'], options['requests'])
+        self.stdout.write(
+            f'🧪 {options["requests"]} requests from {options["ips"]} addresses '
+            f'({len(hot)} hot addresses send half of them), limit {options["limit"]}/min'
+        )
+
+        legacy = LegacyRateLimiter()
+        samples, refused = [], set()
+        for ip in stream[:options['legacy_requests']]:
+            start = time.perf_counter()
+            if not legacy.check(ip):
+                refused.add(ip)
+            samples.append(time.perf_counter() - start)
+        self.report(f'old dict limiter (first {options["legacy_requests"]})', samples, refused, hot)
+
+        workdir = tempfile.mkdtemp(prefix='ratelimit-bench-')
+        backends = [
+            ('sliding window, LocMemCache', {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                             'LOCATION': 'ratelimit-bench', 'OPTIONS': {'MAX_ENTRIES': 100000}}),
+            ('sliding window, SQLite cache', {'BACKEND': 'ecolearn.sqlite_cache.SQLiteCache',
+                                              'LOCATION': os.path.join(workdir, 'cache.sqlite3')}),
+        ]
+        try:
+            for label, backend in backends:
+                with override_settings(CACHES={'default': backend}):
+                    self.run_limiter(label, stream, hot, options['limit'])
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def run_limiter(self, label, stream, hot, limit):
+        policies = ratelimit.load_policies({'default': {'limit': limit, 'period': 60, 'key': 'ip'}})
+        policies = [policy for policy in policies if policy.name == 'default']
+        request = RequestFactory().get('/')
+        samples, refused, refused_requests = [], set(), 0
+        for ip in stream:
+            start = time.perf_counter()
+            decision = ratelimit.check(policies, request, 'elearning:module_list', ip)
+            samples.append(time.perf_counter() - start)
+            if decision is not None:
+                refused.add(ip)
+                refused_requests += 1
+        self.report(label, samples, refused, hot, refused_requests)
+
+    def report(self, label, samples, refused, hot, refused_requests=None):
+        mark = '✅' if refused <= hot else '❌'
+        extra = f' ({refused_requests} requests)' if refused_requests is not None else ''
+        self.stdout.write(
+            f'   {label:<40} p50 {percentile(samples, 50) * 1e6:8.1f}µs p99 {percentile(samples, 99) * 1e6:9.1f}µs '
+            f'max {max(samples) * 1e6:9.1f}µs | {mark} {len(refused)} addresses refused{extra}'
+        )
@@ -0,0 +1,36 @@
+# security/management/commands/cleanup_audit_logs.py
+"""
+Apply the audit log retention policy.
+Deletes entries older than AUDIT_RETENTION_DAYS (default 365) in daily
+buckets, oldest first, optionally archiving each day to a gzipped JSON
+lines file first. Schedule daily (cron / Render cron job).
+Run: python manage.py cleanup_audit_logs [--days 365] [--archive-dir /backups/audit]
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from security.audit import prune
+
+
+class Command(BaseCommand):
+    help = 'Delete (and optionally archive) audit log entries past the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=getattr(settings, 'AUDIT_RETENTION_DAYS', 365),
+                            help='Keep this many days of audit entries')
+        parser.add_argument('--archive-dir', help='Write each deleted day to <dir>/audit-YYYY-MM-DD.jsonl.gz first')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per DELETE')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        total = 0
+        for day, deleted in prune(cutoff, options['archive_dir'], options['batch_size']):
+            total += deleted
+            self.stdout.write(f'  🗑️  {day}: {deleted} entr{"y" if deleted == 1 else "ies"}')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Removed {total} audit entr{"y" if total == 1 else "ies"} older than {cutoff:%Y-%m-%d}'
+        ))
@@ -1,7 +1,8 @@
+from django.http import HttpResponse, JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 from django.contrib.auth.signals import user_logged_in, user_logged_out
 from django.dispatch import receiver
-from django.utils import timezone
+from .inspection import get_inspector, record_hit
 from .permissions import log_activity, get_client_ip
 import logging
 
@@ -20,6 +21,24 @@ class SecurityMiddleware(MiddlewareMixin):
     
     def process_response(self, request, response):
         """Add security headers to response"""
+        # Audited here: request.user does not exist yet when process_request runs
+        match = getattr(request, '_suspicious_match', None)
+        if match and hasattr(request, 'user') and request.user.is_authenticated:
+            rule, field = match
+            log_activity(
+                request.user,
+                'suspicious_activity',
+                'security_alert',
+                details={
+                    'rule': rule,
+                    'field': field,
+                    'path': request.path,
+                    'user_agent': request.META.get('HTTP_USER_AGENT', '')
+                },
+                success=False,
+                request=request
+            )
+
         # Add security headers
         response['X-Content-Type-Options'] = 'nosniff'
         response['X-Frame-Options'] = 'DENY'
@@ -40,46 +59,15 @@ class SecurityMiddleware(MiddlewareMixin):
         return response
     
     def check_suspicious_patterns(self, request):
-        """Check for suspicious activity patterns"""
-        ip_address = get_client_ip(request)
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
-        
-        # Check for common attack patterns
-        suspicious_patterns = [
-            'union select',
-            'drop table',
-            'script>',
-            'javascript:',
-            '../',
-            '..\\',
-            'cmd.exe',
-            '/etc/passwd',
-            'base64_decode',
-        ]
-        
-        request_data = str(request.GET) + str(request.POST) + request.path
-        
-        for pattern in suspicious_patterns:
-            if pattern.lower() in request_data.lower():
-                logger.warning(
-                    f"Suspicious activity detected from {ip_address}: {pattern} in {request.path}"
-                )
-                
-                # Log the suspicious activity
-                if hasattr(request, 'user') and request.user.is_authenticated:
-                    log_activity(
-                        request.user,
-                        'suspicious_activity',
-                        'security_alert',
-                        details={
-                            'pattern': pattern,
-                            'path': request.path,
-                            'user_agent': user_agent
-                        },
-                        success=False,
-                        request=request
-                    )
-                break
+        """Check for suspicious activity patterns (see security/inspection.py)"""
+        match = get_inspector().scan(request)
+        if match:
+            rule, field = match
+            record_hit(rule)
+            logger.warning(
+                f"Suspicious activity detected from {get_client_ip(request)}: {rule} in {field} of {request.path}"
+            )
+            request._suspicious_match = match
 
 class AuditMiddleware(MiddlewareMixin):
     """Middleware for comprehensive audit logging"""
@@ -141,54 +129,47 @@ def log_user_logout(sender, request, user, **kwargs):
         logger.info(f"User {user.username} logged out from {get_client_ip(request)}")
 
 class RateLimitMiddleware(MiddlewareMixin):
-    """Simple rate limiting middleware"""
+    """Per-endpoint rate limits shared by all workers (see security/ratelimit.py)"""
     
     def __init__(self, get_response):
-        self.get_response = get_response
-        self.request_counts = {}  # In production, use Redis or database
+        from .ratelimit import load_policies
+        self.policies = load_policies()
         super().__init__(get_response)
     
-    def process_request(self, request):
-        """Check rate limits"""
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Check rate limits; runs after authentication so limits can be per user"""
+        from .ratelimit import check
+
+        match = request.resolver_match
+        view_name = match.view_name if match else ''
         ip_address = get_client_ip(request)
-        current_time = timezone.now()
-        
-        # Clean old entries (older than 1 hour)
-        cutoff_time = current_time - timezone.timedelta(hours=1)
-        self.request_counts = {
-            ip: timestamps for ip, timestamps in self.request_counts.items()
-            if any(ts > cutoff_time for ts in timestamps)
-        }
-        
-        # Update timestamps for current IP
-        if ip_address not in self.request_counts:
-            self.request_counts[ip_address] = []
-        
-        # Remove old timestamps for this IP
-        self.request_counts[ip_address] = [
-            ts for ts in self.request_counts[ip_address]
-            if ts > cutoff_time
-        ]
-        
-        # Add current request
-        self.request_counts[ip_address].append(current_time)
-        
-        # Check if rate limit exceeded (100 requests per hour)
-        if len(self.request_counts[ip_address]) > 100:
-            logger.warning(f"Rate limit exceeded for IP: {ip_address}")
-            
-            # Log rate limit violation
-            if hasattr(request, 'user') and request.user.is_authenticated:
-                log_activity(
-                    request.user,
-                    'rate_limit_exceeded',
-                    'security_alert',
-                    details={
-                        'request_count': len(self.request_counts[ip_address]),
-                        'time_window': '1 hour'
-                    },
-                    success=False,
-                    request=request
-                )
-        
-        return None
\ No newline at end of file
+        decision = check(self.policies, request, view_name, ip_address)
+        if decision is None:
+            return None
+
+        policy = decision.policy
+        logger.warning(f"Rate limit {policy.name} exceeded for IP: {ip_address} on {request.path}")
+        if hasattr(request, 'user') and request.user.is_authenticated:
+            log_activity(
+                request.user,
+                'rate_limit_exceeded',
+                'security_alert',
+                details={
+                    'policy': policy.name,
+                    'request_count': round(decision.count, 1),
+                    'limit': policy.limit,
+                    'time_window': f'{policy.period} seconds'
+                },
+                success=False,
+                request=request
+            )
+
+        message = 'Too many requests. Please try again later.'
+        if request.headers.get('Accept', '').startswith('application/json') or request.content_type == 'application/json':
+            response = JsonResponse({'error': message, 'retry_after': decision.retry_after}, status=429)
+        else:
+            response = HttpResponse(message, status=429, content_type='text/plain; charset=utf-8')
+        response['Retry-After'] = str(decision.retry_after)
+        response['X-RateLimit-Limit'] = str(policy.limit)
+        response['X-RateLimit-Remaining'] = '0'
+        return response
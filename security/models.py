@@ -66,12 +66,21 @@ class AuditLog(models.Model):
     resource_id = models.CharField(max_length=100, null=True, blank=True)
     ip_address = models.GenericIPAddressField()
     user_agent = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens: rows are inserted later, in batches (security/audit.py)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     details = models.JSONField(default=dict)
     success = models.BooleanField(default=True)
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # Newest-first listing, date filters, export and retention
+            models.Index(fields=['-timestamp'], name='auditlog_timestamp_idx'),
+            models.Index(fields=['action', '-timestamp'], name='auditlog_action_ts_idx'),
+            models.Index(fields=['user', '-timestamp'], name='auditlog_user_ts_idx'),
+            # Failed-attempt counts on the security dashboard
+            models.Index(fields=['-timestamp'], condition=models.Q(success=False), name='auditlog_failed_ts_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user} - {self.action} - {self.timestamp}"
@@ -1,20 +1,48 @@
+import ipaddress
+import logging
+from dataclasses import dataclass, field
 from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
 from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.core.exceptions import PermissionDenied
-from .models import UserRole, AuditLog
+from django.utils import timezone
+from ecolearn import generations
+from . import audit
+from .models import Role, UserRole
+
+logger = logging.getLogger(__name__)
+
+# Tunables (override in settings.py)
+PERMISSION_CACHE_TIMEOUT = getattr(settings, 'PERMISSION_CACHE_TIMEOUT', 3600)  # seconds
+TRUSTED_PROXY_COUNT = getattr(settings, 'TRUSTED_PROXY_COUNT', 0)  # proxies in front that append to X-Forwarded-For
 
 def get_client_ip(request):
-    """Get client IP address from request"""
+    """
+    Get client IP address from request
+
+    Entries at the left of X-Forwarded-For are whatever the client sent, so
+    only the address appended by our own proxies is used: with
+    TRUSTED_PROXY_COUNT proxies, the entry that many places from the right.
+    Without trusted proxies (or a header shorter than that), REMOTE_ADDR.
+    Rate limits and audit logs key on this value, so it must not be forgeable.
+    """
+    ip = request.META.get('REMOTE_ADDR')
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0].strip()
-    else:
-        ip = request.META.get('REMOTE_ADDR')
-    
+    if TRUSTED_PROXY_COUNT and x_forwarded_for:
+        entries = [entry.strip() for entry in x_forwarded_for.split(',')]
+        if len(entries) >= TRUSTED_PROXY_COUNT:
+            ip = entries[-TRUSTED_PROXY_COUNT]
+
     # Ensure we always return a valid IP address
-    return ip if ip else '127.0.0.1'
+    try:
+        return str(ipaddress.ip_address(ip))
+    except ValueError:
+        return request.META.get('REMOTE_ADDR') or '127.0.0.1'
 
 def log_activity(user, action, resource_type, resource_id=None, details=None, success=True, request=None):
     """Log user activity for audit trail"""
@@ -29,32 +57,147 @@ def log_activity(user, action, resource_type, resource_id=None, details=None, su
     if not ip_address:
         ip_address = '127.0.0.1'
     
-    AuditLog.objects.create(
-        user=user,
-        action=action,
-        resource_type=resource_type,
-        resource_id=str(resource_id) if resource_id else None,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        details=details or {},
-        success=success
-    )
+    # Written behind the request in batches (security/audit.py)
+    audit.record({
+        'user_id': user.pk if user is not None else None,
+        'action': action,
+        'resource_type': resource_type,
+        'resource_id': str(resource_id) if resource_id else None,
+        'ip_address': ip_address,
+        'user_agent': user_agent,
+        'timestamp': timezone.now(),
+        'details': details or {},
+        'success': success,
+    })
+
+# --- Permission resolution ---
+#
+# A user's active roles and the permissions they grant are resolved once
+# and kept in the shared cache under two generation numbers
+# (ecolearn.generations): 'roles' (any Role saved or deleted) and
+# 'user:<id>' (that user's UserRole rows changed). Changes bump the
+# generation on commit, so stale entries are never read again and age out
+# after PERMISSION_CACHE_TIMEOUT. Within a request the result is also
+# memoized on the user object, so a view that checks several permissions
+# costs at most one cache lookup.
+
+PERMISSIONS_KEY_PREFIX = 'security:perms'
+MEMO_ATTRIBUTE = '_effective_permissions'
+
+
+@dataclass(frozen=True)
+class EffectivePermissions:
+    roles: frozenset = field(default_factory=frozenset)
+    permissions: frozenset = field(default_factory=frozenset)
+    superuser: bool = False
+
+    def has(self, permission):
+        return self.superuser or permission in self.permissions
+
+    def has_role(self, role_name):
+        return self.superuser or role_name in self.roles
+
+
+ANONYMOUS = EffectivePermissions()
+
+
+def granted(permissions):
+    """Names in a Role.permissions dict whose value is truthy"""
+    return frozenset(name for name, allowed in (permissions or {}).items() if allowed)
+
+
+def _resolve(user_id):
+    roles = UserRole.objects.filter(user_id=user_id, is_active=True).values_list('role__name', 'role__permissions')
+    names, permissions = set(), set()
+    for name, role_permissions in roles:
+        names.add(name)
+        permissions |= granted(role_permissions)
+    return EffectivePermissions(frozenset(names), frozenset(permissions))
+
+
+def effective_permissions(user):
+    """
+    Roles and permissions of `user`, resolved once per request
+
+    Returns:
+        EffectivePermissions
+    """
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS
+    memo = getattr(user, MEMO_ATTRIBUTE, None)
+    if memo is not None:
+        return memo
+
+    if user.is_superuser:
+        resolved = EffectivePermissions(superuser=True)
+    else:
+        try:
+            versions = '.'.join(str(value) for value in generations.current(PERMISSIONS_KEY_PREFIX, 'roles', f'user:{user.pk}'))
+            key = f'{PERMISSIONS_KEY_PREFIX}:{versions}:{user.pk}'
+            resolved = cache.get(key)
+        except Exception as e:
+            logger.error(f"Permission cache lookup failed: {str(e)}")
+            key = resolved = None
+        if resolved is None:
+            resolved = _resolve(user.pk)
+            if key is not None:
+                try:
+                    cache.set(key, resolved, PERMISSION_CACHE_TIMEOUT)
+                except Exception as e:
+                    logger.error(f"Permission cache write failed: {str(e)}")
+    setattr(user, MEMO_ATTRIBUTE, resolved)
+    return resolved
+
 
 def has_permission(user, permission):
     """Check if user has specific permission"""
-    if not user.is_authenticated:
-        return False
-    
-    if user.is_superuser:
-        return True
-    
-    user_roles = UserRole.objects.filter(user=user, is_active=True)
-    for user_role in user_roles:
-        role_permissions = user_role.role.permissions
-        if permission in role_permissions and role_permissions[permission]:
-            return True
-    
-    return False
+    return effective_permissions(user).has(permission)
+
+
+def has_role(user, role_name):
+    """Check if user has an active role"""
+    return effective_permissions(user).has_role(role_name)
+
+
+def roles_granting(permission):
+    """Ids of the roles whose permissions include `permission`"""
+    return [
+        pk for pk, permissions in Role.objects.values_list('pk', 'permissions')
+        if permission in granted(permissions)
+    ]
+
+
+def users_with_permission(queryset, permission):
+    """
+    Filter a user queryset down to the users holding `permission`
+    (superusers, or an active role granting it), in a single query
+    """
+    holders = UserRole.objects.filter(user=OuterRef('pk'), is_active=True, role__in=roles_granting(permission))
+    return queryset.filter(Q(is_superuser=True) | Q(Exists(holders)))
+
+
+def users_with_role(queryset, role_name):
+    """Filter a user queryset down to superusers and active holders of `role_name`"""
+    holders = UserRole.objects.filter(user=OuterRef('pk'), is_active=True, role__name=role_name)
+    return queryset.filter(Q(is_superuser=True) | Q(Exists(holders)))
+
+
+def user_roles_changed(sender, instance, **kwargs):
+    user_id = instance.user_id
+    transaction.on_commit(lambda: generations.bump(PERMISSIONS_KEY_PREFIX, f'user:{user_id}'))
+
+
+def role_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: generations.bump(PERMISSIONS_KEY_PREFIX, 'roles'))
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save
+
+    post_save.connect(user_roles_changed, sender=UserRole, dispatch_uid='permissions_user_role_saved')
+    post_delete.connect(user_roles_changed, sender=UserRole, dispatch_uid='permissions_user_role_deleted')
+    post_save.connect(role_changed, sender=Role, dispatch_uid='permissions_role_saved')
+    post_delete.connect(role_changed, sender=Role, dispatch_uid='permissions_role_deleted')
 
 def require_permission(permission):
     """Decorator to require specific permission"""
@@ -89,16 +232,7 @@ def require_role(role_name):
             if not request.user.is_authenticated:
                 return redirect('accounts:login')
             
-            if request.user.is_superuser:
-                return view_func(request, *args, **kwargs)
-            
-            user_roles = UserRole.objects.filter(
-                user=request.user,
-                role__name=role_name,
-                is_active=True
-            )
-            
-            if not user_roles.exists():
+            if not has_role(request.user, role_name):
                 log_activity(
                     request.user,
                     'role_denied',
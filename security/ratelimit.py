@@ -0,0 +1,162 @@
+# security/ratelimit.py
+"""
+Rate limiting with sliding-window counters in the shared cache
+Each policy allows `limit` requests per `period` seconds per client. A
+client's rate is estimated from two fixed-window counters: the current
+window's count plus the previous window's count weighted by how much of it
+still overlaps the sliding window. That is one atomic incr and one get per
+request, whatever the number of clients, and all workers share the counters
+through the default cache (see ecolearn/sqlite_cache.py).
+
+Policies (RATE_LIMITS in settings.py, merged over DEFAULT_POLICIES; set a
+policy to None to disable it):
+
+    'login': {
+        'views': ['accounts:login'],  # URL names the policy applies to
+        'methods': ['POST'],          # omitted: every method
+        'limit': 10,
+        'period': 300,                # seconds
+        'key': 'ip',                  # or 'user_or_ip'
+    }
+
+A policy without 'views' applies to every view. A request is checked against
+every policy that applies; the first exceeded one answers 429 with
+Retry-After. Requests are counted even when refused, so clients that keep
+retrying stay limited. Cache errors let the request through.
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'rl'
+
+DEFAULT_POLICIES = {
+    'default': {'limit': 600, 'period': 60, 'key': 'ip'},
+    'login': {
+        'views': ['accounts:login', 'account_login'], 'methods': ['POST'],
+        'limit': 10, 'period': 300, 'key': 'ip',
+    },
+    'password_reset': {
+        'views': ['accounts:password_reset_request', 'accounts:password_reset_verify', 'account_reset_password'],
+        'methods': ['POST'], 'limit': 5, 'period': 900, 'key': 'ip',
+    },
+    'ai_send_message': {
+        'views': ['ai_assistant:send_message'], 'methods': ['POST'],
+        'limit': 20, 'period': 60, 'key': 'user_or_ip',
+    },
+    'report_submission': {
+        'views': ['reporting:report_dumping'], 'methods': ['POST'],
+        'limit': 10, 'period': 3600, 'key': 'user_or_ip',
+    },
+    'webhooks': {
+        'views': ['payments:webhook_handler'],
+        'limit': 120, 'period': 60, 'key': 'ip',
+    },
+}
+
+
+@dataclass(frozen=True)
+class Policy:
+    name: str
+    limit: int
+    period: int
+    key: str = 'ip'
+    views: frozenset = field(default_factory=frozenset)
+    methods: frozenset = field(default_factory=frozenset)
+
+    def applies(self, view_name, method):
+        return (not self.views or view_name in self.views) and (not self.methods or method in self.methods)
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    policy: Policy
+    count: float
+    retry_after: int = 0
+
+    @property
+    def remaining(self):
+        return max(0, int(self.policy.limit - self.count))
+
+
+def load_policies(overrides=None):
+    policies = dict(DEFAULT_POLICIES)
+    policies.update(getattr(settings, 'RATE_LIMITS', {}) if overrides is None else overrides)
+    return [
+        Policy(
+            name=name,
+            limit=int(options['limit']),
+            period=int(options['period']),
+            key=options.get('key', 'ip'),
+            views=frozenset(options.get('views', ())),
+            methods=frozenset(method.upper() for method in options.get('methods', ())),
+        )
+        for name, options in policies.items()
+        if options
+    ]
+
+
+def _incr(key, timeout):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout):
+            return 1
+        return cache.incr(key)
+
+
+def hit(policy, identity, now=None):
+    """Count one request by `identity` against `policy`"""
+    now = time.time() if now is None else now
+    window = int(now // policy.period)
+    elapsed = now - window * policy.period
+    base = f'{KEY_PREFIX}:{policy.name}:{identity}'
+
+    current = _incr(f'{base}:{window}', policy.period * 2)
+    previous = cache.get(f'{base}:{window - 1}') or 0
+    overlap = 1 - elapsed / policy.period
+    count = previous * overlap + current
+    if count <= policy.limit:
+        return Decision(True, policy, count)
+
+    if current > policy.limit:
+        # Over the limit within this window alone: wait until enough of it slides out
+        retry_after = (policy.period - elapsed) + policy.period * (1 - policy.limit / current)
+    else:
+        # The previous window's share has to shrink to what is left of the limit
+        retry_after = policy.period * (overlap - (policy.limit - current) / previous)
+    return Decision(False, policy, count, max(1, math.ceil(retry_after)))
+
+
+def identity(policy, request, client_ip):
+    if policy.key == 'user_or_ip':
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f'u{user.pk}'
+    return client_ip
+
+
+def check(policies, request, view_name, client_ip):
+    """
+    Returns:
+        Decision: the first refusal, or None when every applicable policy allows the request
+    """
+    for policy in policies:
+        if not policy.applies(view_name, request.method):
+            continue
+        try:
+            decision = hit(policy, identity(policy, request, client_ip))
+        except Exception as e:
+            logger.error(f"Rate limit check failed for {policy.name}: {str(e)}")
+            continue
+        if not decision.allowed:
+            return decision
+    return None
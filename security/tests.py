@@ -0,0 +1,399 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Role, UserRole
+from .permissions import (
+    DEFAULT_ROLE_PERMISSIONS, effective_permissions, has_permission, has_role, users_with_permission,
+)
+from .ratelimit import Policy, hit
+
+LOCMEM = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'security-tests'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'security-test-sessions'},
+}
+
+
+def role_queries(queries):
+    return [query['sql'] for query in queries.captured_queries if 'security_userrole' in query['sql']]
+
+
+@override_settings(CACHES=LOCMEM)
+class PermissionResolverTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.roles = {
+            name: Role.objects.create(name=name, description=name, permissions=permissions)
+            for name, permissions in DEFAULT_ROLE_PERMISSIONS.items()
+        }
+        cls.admin = User.objects.create_user(username='admin', email='admin@example.com', password='x')
+        cls.analyst = User.objects.create_user(username='analyst', email='analyst@example.com', password='x')
+        cls.nobody = User.objects.create_user(username='nobody', email='nobody@example.com', password='x')
+        cls.root = User.objects.create_superuser(username='root', email='root@example.com', password='x')
+        UserRole.objects.create(user=cls.admin, role=cls.roles['admin'])
+        UserRole.objects.create(user=cls.analyst, role=cls.roles['analyst'])
+
+    def setUp(self):
+        cache.clear()
+
+    def fresh(self, user):
+        # A new user object, as on the next request
+        return get_user_model().objects.get(pk=user.pk)
+
+    def test_roles_resolved_once_per_request_then_cached(self):
+        user = self.fresh(self.analyst)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(has_permission(user, 'view_analytics'))
+            self.assertTrue(has_permission(user, 'export_data'))
+            self.assertFalse(has_permission(user, 'manage_users'))
+            self.assertTrue(has_role(user, 'analyst'))
+            self.assertFalse(has_role(user, 'admin'))
+        self.assertEqual(len(queries), 1)
+
+        user = self.fresh(self.analyst)
+        with self.assertNumQueries(0):
+            self.assertEqual(effective_permissions(user).roles, frozenset({'analyst'}))
+
+    def test_superuser_and_anonymous_need_no_queries(self):
+        from django.contrib.auth.models import AnonymousUser
+
+        root = self.fresh(self.root)
+        with self.assertNumQueries(0):
+            self.assertTrue(has_permission(root, 'manage_security'))
+            self.assertTrue(has_role(root, 'health_officer'))
+            self.assertFalse(has_permission(AnonymousUser(), 'view_dashboard'))
+
+    def test_user_role_changes_invalidate(self):
+        self.assertFalse(has_permission(self.fresh(self.nobody), 'send_alerts'))
+        with self.captureOnCommitCallbacks(execute=True):
+            assignment = UserRole.objects.create(user=self.nobody, role=self.roles['health_officer'])
+        self.assertTrue(has_permission(self.fresh(self.nobody), 'send_alerts'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            assignment.is_active = False
+            assignment.save()
+        self.assertFalse(has_permission(self.fresh(self.nobody), 'send_alerts'))
+        # Other users' entries stay cached
+        self.assertTrue(has_permission(self.fresh(self.analyst), 'view_analytics'))
+        analyst = self.fresh(self.analyst)
+        with self.assertNumQueries(0):
+            has_permission(analyst, 'view_analytics')
+
+    def test_role_permission_edit_invalidates(self):
+        self.assertFalse(has_permission(self.fresh(self.analyst), 'manage_reports'))
+        role = self.roles['analyst']
+        with self.captureOnCommitCallbacks(execute=True):
+            role.permissions = dict(role.permissions, manage_reports=True, export_data=False)
+            role.save()
+        resolved = effective_permissions(self.fresh(self.analyst))
+        self.assertTrue(resolved.has('manage_reports'))
+        self.assertFalse(resolved.has('export_data'))
+
+    def test_users_with_permission(self):
+        User = get_user_model()
+        with CaptureQueriesContext(connection) as queries:
+            holders = set(users_with_permission(User.objects.all(), 'export_data').values_list('username', flat=True))
+        self.assertEqual(holders, {'admin', 'analyst', 'root'})
+        # One to find the granting roles, one for the users
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(
+            set(users_with_permission(User.objects.filter(is_superuser=False), 'manage_security')
+                .values_list('username', flat=True)),
+            {'admin'},
+        )
+
+
+@override_settings(CACHES=LOCMEM)
+class SecurityDashboardQueryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        role = Role.objects.create(name='admin', description='admin', permissions=DEFAULT_ROLE_PERMISSIONS['admin'])
+        cls.admin = User.objects.create_user(username='admin', email='admin@example.com', password='x', is_staff=True)
+        UserRole.objects.create(user=cls.admin, role=role)
+        cls.moderator_role = Role.objects.create(
+            name='moderator', description='moderator', permissions=DEFAULT_ROLE_PERMISSIONS['moderator']
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def get_counting(self, name):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(name))
+        self.assertEqual(response.status_code, 200)
+        return queries
+
+    def test_permission_check_is_cached_across_requests(self):
+        for name in ['admin_dashboard:security:dashboard', 'admin_dashboard:security:audit_logs']:
+            first = self.get_counting(name)
+            second = self.get_counting(name)
+            self.assertLessEqual(len(role_queries(first)), 1, name)
+            self.assertEqual(role_queries(second), [], name)
+
+    def test_role_management_queries_do_not_grow_with_users(self):
+        User = get_user_model()
+        self.get_counting('admin_dashboard:security:role_management')
+        few = len(self.get_counting('admin_dashboard:security:role_management').captured_queries)
+        for i in range(10):
+            user = User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='x')
+            UserRole.objects.create(user=user, role=self.moderator_role)
+        many = len(self.get_counting('admin_dashboard:security:role_management').captured_queries)
+        self.assertEqual(few, many)
+
+    def test_revoked_role_is_denied_on_next_request(self):
+        self.get_counting('admin_dashboard:security:dashboard')
+        with self.captureOnCommitCallbacks(execute=True):
+            for assignment in UserRole.objects.filter(user=self.admin):
+                assignment.is_active = False
+                assignment.save()
+        response = self.client.get(reverse('admin_dashboard:security:dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+
+class ClientIPTests(TestCase):
+
+    def ip(self, forwarded=None, remote='10.0.0.5'):
+        from django.test import RequestFactory
+        from .permissions import get_client_ip
+
+        headers = {'HTTP_X_FORWARDED_FOR': forwarded} if forwarded else {}
+        return get_client_ip(RequestFactory().get('/', REMOTE_ADDR=remote, **headers))
+
+    def test_forged_forwarded_entries_are_ignored(self):
+        from unittest import mock
+
+        with mock.patch('security.permissions.TRUSTED_PROXY_COUNT', 1):
+            self.assertEqual(self.ip('203.0.113.9'), '203.0.113.9')
+            # The client prepends whatever it likes; the proxy appends the real address
+            self.assertEqual(self.ip('1.2.3.4, 203.0.113.9'), '203.0.113.9')
+            self.assertEqual(self.ip('1.2.3.4, not-an-ip'), '10.0.0.5')
+        with mock.patch('security.permissions.TRUSTED_PROXY_COUNT', 2):
+            self.assertEqual(self.ip('1.2.3.4, 203.0.113.9, 10.1.1.1'), '203.0.113.9')
+            self.assertEqual(self.ip('203.0.113.9'), '10.0.0.5')
+
+    def test_without_trusted_proxies_uses_remote_addr(self):
+        from unittest import mock
+
+        with mock.patch('security.permissions.TRUSTED_PROXY_COUNT', 0):
+            self.assertEqual(self.ip('1.2.3.4'), '10.0.0.5')
+
+
+@override_settings(CACHES=LOCMEM)
+class AuditReplayTests(TestCase):
+
+    def setUp(self):
+        import tempfile
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def claim(self, buffer, pid, resource_id, age=0):
+        import json
+        import os
+        import time
+
+        path = f'{buffer.fallback_path}.{pid}.{time.time_ns()}.0.replay'
+        entry = {'action': 'view', 'resource_type': 'page', 'resource_id': resource_id,
+                 'ip_address': '127.0.0.1', 'user_agent': 'test'}
+        with open(path, 'w', encoding='utf-8') as claim:
+            claim.write(json.dumps(entry) + '\n')
+        if age:
+            os.utime(path, (time.time() - age, time.time() - age))
+        return path
+
+    def test_replay_skips_claims_of_live_workers(self):
+        import os
+        import subprocess
+        import sys
+        from .audit import REPLAY_LEASE, AuditBuffer
+        from .models import AuditLog
+
+        buffer = AuditBuffer(fallback_path=os.path.join(self.tmp.name, 'audit-fallback.jsonl'))
+        dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+        dead.wait()
+        live = self.claim(buffer, os.getppid(), 'live')
+        self.claim(buffer, dead.pid, 'dead')
+        self.claim(buffer, os.getppid(), 'stale', age=REPLAY_LEASE + 60)
+
+        self.assertEqual(buffer.replay(), 2)
+        self.assertEqual(
+            sorted(AuditLog.objects.values_list('resource_id', flat=True)), ['dead', 'stale']
+        )
+        # Still there for the worker replaying it
+        self.assertTrue(os.path.exists(live))
+
+
+class InspectorScanTests(TestCase):
+
+    def setUp(self):
+        from django.test import RequestFactory
+        from .inspection import DEFAULT_RULES, Inspector
+
+        self.factory = RequestFactory()
+        self.inspector = Inspector(DEFAULT_RULES)
+
+    def test_hits_in_path_query_and_form_body(self):
+        scan = self.inspector.scan
+        self.assertEqual(scan(self.factory.get('/static/../../etc/passwd')), ('path_traversal', 'path'))
+        self.assertEqual(scan(self.factory.get('/search/?q=1%20UNION+Select%20*')), ('sql_union_select', 'query'))
+        request = self.factory.post('/comment/', 'text=%3Cscript%3Ealert(1)%3C%2Fscript%3E',
+                                    content_type='application/x-www-form-urlencoded')
+        self.assertEqual(scan(request), ('script_tag', 'body'))
+        # The body stays readable for the view
+        self.assertEqual(request.POST['text'], '<script>alert(1)</script>')
+
+    def test_clean_requests_pass(self):
+        self.assertIsNone(self.inspector.scan(self.factory.get('/modules/?q=composting+at+home')))
+        self.assertIsNone(self.inspector.scan(self.factory.post('/comment/', {'text': 'Sort bottles first'})))
+
+    def test_multipart_bodies_are_never_read(self):
+        request = self.factory.post('/upload/', {'caption': 'union select password from users'})
+        self.assertTrue(request.content_type.startswith('multipart/'))
+        self.assertIsNone(self.inspector.scan(request))
+        self.assertFalse(hasattr(request, '_body'))
+
+    def test_oversized_form_bodies_are_skipped(self):
+        request = self.factory.post('/comment/', 'text=drop+table+users',
+                                    content_type='application/x-www-form-urlencoded')
+        with mock.patch('security.inspection.MAX_BODY', 8):
+            self.assertIsNone(self.inspector.scan(request))
+        self.assertFalse(hasattr(request, '_body'))
+
+
+@override_settings(CACHES=LOCMEM)
+class RuntimeInspectionRuleTests(TestCase):
+
+    def setUp(self):
+        from . import inspection
+
+        inspection.reload()
+        self.addCleanup(inspection.reload)
+
+    def save_rules(self, rules):
+        from .models import SecuritySettings
+
+        SecuritySettings.objects.update_or_create(
+            setting_name='inspection_rules',
+            defaults={'setting_value': rules, 'description': 'Runtime inspection rules'},
+        )
+
+    def test_null_disables_a_default_rule(self):
+        from .inspection import get_inspector
+
+        self.assertEqual(get_inspector().match('<script>'), 'script_tag')
+        self.save_rules({'script_tag': None})
+        inspector = get_inspector()
+        self.assertNotIn('script_tag', inspector.rules)
+        self.assertIsNone(inspector.match('<script>'))
+        self.assertEqual(inspector.match('/etc/passwd'), 'etc_passwd')
+
+    def test_invalid_pattern_is_skipped(self):
+        from .inspection import DEFAULT_RULES, get_inspector
+
+        with self.assertLogs('security.inspection', 'ERROR'):
+            self.save_rules({'broken': 'union(select', 'wp_admin': r'wp-admin/'})
+            inspector = get_inspector()
+        self.assertNotIn('broken', inspector.rules)
+        self.assertEqual(set(inspector.rules), set(DEFAULT_RULES) | {'wp_admin'})
+        self.assertEqual(inspector.match('/wp-admin/setup.php'), 'wp_admin')
+        self.assertEqual(inspector.match('1 union select 2'), 'sql_union_select')
+
+
+@override_settings(CACHES=LOCMEM)
+class SlidingWindowTests(TestCase):
+    """10 requests per 60s; window 10 starts at t=600"""
+
+    policy = Policy(name='test', limit=10, period=60)
+
+    def setUp(self):
+        cache.clear()
+
+    def hits(self, identity, count, now):
+        return [hit(self.policy, identity, now=now) for _ in range(count)]
+
+    def test_allows_up_to_the_limit(self):
+        decisions = self.hits('a', 10, now=600)
+        self.assertTrue(all(decision.allowed for decision in decisions))
+        self.assertEqual(decisions[-1].count, 10)
+        self.assertEqual(decisions[-1].remaining, 0)
+
+        refused = hit(self.policy, 'a', now=600)
+        self.assertFalse(refused.allowed)
+        self.assertEqual(refused.count, 11)
+
+    def test_current_window_alone_over_the_limit(self):
+        self.hits('a', 10, now=615)
+        refused = hit(self.policy, 'a', now=615)
+        # The rest of this window, then until 1/11 of its count has slid out: 45 + 60 * (1 - 10/11) = 50.45
+        self.assertEqual(refused.retry_after, 51)
+
+    def test_previous_window_weight_decays(self):
+        self.hits('a', 10, now=540)
+        # Window start: the previous window still counts in full
+        self.assertEqual(hit(self.policy, 'a', now=600).count, 11)
+
+        self.hits('b', 10, now=540)
+        # Halfway: 10 * 0.5 + 1
+        self.assertEqual(hit(self.policy, 'b', now=630).count, 6)
+        # 54s in: 10 * 0.1 + 2
+        self.assertAlmostEqual(hit(self.policy, 'b', now=654).count, 3)
+
+    def test_previous_window_share_must_shrink(self):
+        self.hits('a', 10, now=540)
+        decisions = self.hits('a', 6, now=630)
+        self.assertTrue(all(decision.allowed for decision in decisions[:5]))
+        refused = decisions[-1]
+        # 10 * 0.5 + 6 = 11: the previous share has to drop to 4, i.e. overlap 0.4, 6s later
+        self.assertFalse(refused.allowed)
+        self.assertEqual(refused.count, 11)
+        self.assertEqual(refused.retry_after, 6)
+
+    def test_retry_after_rounds_up_to_a_whole_second(self):
+        self.hits('a', 10, now=540)
+        refused = hit(self.policy, 'a', now=605.5)
+        # 10 * (1 - 5.5/60) + 1 = 10.08; the previous share is small enough 0.5s later
+        self.assertFalse(refused.allowed)
+        self.assertEqual(refused.retry_after, 1)
+
+
+@override_settings(
+    CACHES=LOCMEM,
+    ROOT_URLCONF='ecolearn.memory_harness',
+    RATE_LIMITS={'default': {'limit': 2, 'period': 60}},
+)
+class RateLimitMiddlewareTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_refusal_response(self):
+        from django.urls import reverse
+
+        url = reverse('memory_harness_ping')
+        with mock.patch('security.ratelimit.time.time', return_value=600.0):
+            self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertEqual(self.client.get(url).status_code, 200)
+            response = self.client.get(url, HTTP_ACCEPT='application/json')
+            plain = self.client.get(url)
+
+        # 3 requests in a 2-per-minute window: 60 + 60 * (1 - 2/3) = 80s
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json(), {'error': 'Too many requests. Please try again later.', 'retry_after': 80})
+        self.assertEqual(response['Retry-After'], '80')
+        self.assertEqual(response['X-RateLimit-Limit'], '2')
+        self.assertEqual(response['X-RateLimit-Remaining'], '0')
+
+        self.assertEqual(plain.status_code, 429)
+        self.assertEqual(plain['Content-Type'], 'text/plain; charset=utf-8')
+        self.assertEqual(plain.content.decode(), 'Too many requests. Please try again later.')
+        self.assertEqual(plain['Retry-After'], '90')
@@ -11,4 +11,5 @@ urlpatterns = [
     path('audit-logs/export/', views.export_audit_logs, name='export_audit_logs'),
     path('backups/', views.backup_management, name='backup_management'),
     path('settings/', views.security_settings, name='security_settings'),
+    path('inspection/', views.inspection_stats, name='inspection_stats'),
 ]
\ No newline at end of file
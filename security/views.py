@@ -3,7 +3,7 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse, HttpResponse
 from django.core.paginator import Paginator
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Exists, OuterRef, Prefetch
 from django.utils import timezone
 from datetime import timedelta
 from django.contrib.auth import get_user_model
@@ -12,6 +12,7 @@ User = get_user_model()
 from .models import Role, UserRole, AuditLog, SecuritySettings, BackupRecord
 from .permissions import require_permission, log_activity, DEFAULT_ROLE_PERMISSIONS
 from .backup import BackupManager
+from ecolearn.memory import memory_heavy
 import json
 
 @login_required
@@ -63,7 +64,12 @@ def security_dashboard(request):
 def role_management(request):
     """Manage user roles and permissions"""
     roles = Role.objects.all().order_by('name')
-    users_with_roles = User.objects.prefetch_related('user_roles__role').all()
+    # Ordered prefetch: the template's .exists and .first are answered from it, not one query per user
+    users_with_roles = User.objects.filter(
+        Exists(UserRole.objects.filter(user=OuterRef('pk')))
+    ).prefetch_related(
+        Prefetch('user_roles', queryset=UserRole.objects.select_related('role', 'assigned_by').order_by('pk'))
+    ).order_by('username')
     
     if request.method == 'POST':
         action = request.POST.get('action')
@@ -376,6 +382,7 @@ def initialize_roles(request):
     
     return redirect('admin_dashboard:security:role_management')
 
+@memory_heavy
 @login_required
 @require_permission('view_audit_logs')
 def export_audit_logs(request):
@@ -414,4 +421,12 @@ def export_audit_logs(request):
         request=request
     )
     
-    return response
\ No newline at end of file
+    return response
+
+
+@login_required
+@require_permission('manage_security')
+def inspection_stats(request):
+    """Suspicious-pattern rules and their hit counts"""
+    from .inspection import stats
+    return JsonResponse(stats())